@@ -0,0 +1,34 @@
+-- Admin User Search Migration
+-- Execute this script in your Supabase SQL Editor to support cursor paging
+-- and email/name search of users on /admin/users (used by
+-- app/services/admin_users.py)
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- Keyset paging on (created_at DESC, id DESC), overall and per role
+CREATE INDEX IF NOT EXISTS idx_users_created_id
+    ON users (created_at DESC, id DESC);
+
+CREATE INDEX IF NOT EXISTS idx_users_role_created_id
+    ON users (role, created_at DESC, id DESC);
+
+-- Prefix search (terms shorter than 3 characters)
+CREATE INDEX IF NOT EXISTS idx_users_email_lower_prefix
+    ON users (lower(email) text_pattern_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_full_name_lower_prefix
+    ON users (lower(full_name) text_pattern_ops);
+
+-- Substring search (LIKE '%term%' on 3+ characters)
+CREATE INDEX IF NOT EXISTS idx_users_email_lower_trgm
+    ON users USING GIN (lower(email) gin_trgm_ops);
+
+CREATE INDEX IF NOT EXISTS idx_users_full_name_lower_trgm
+    ON users USING GIN (lower(full_name) gin_trgm_ops);
+
+-- Verification query
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'users'
+    AND indexname LIKE 'idx_users_%'
+ORDER BY indexname;
@@ -0,0 +1,130 @@
+-- Analytics Rollups Migration
+-- Execute this script in your Supabase SQL Editor to keep hourly and daily
+-- activity counts for the admin analytics endpoints (used by
+-- app/services/admin_analytics.py). Admin charts read these compact tables
+-- instead of scanning profiles, ideas, matching_history, connection_requests
+-- and startup_views.
+
+-- One row per (hour, metric, dimension); hourly rows are kept for 90 days
+CREATE TABLE IF NOT EXISTS analytics_hourly (
+    bucket TIMESTAMPTZ NOT NULL,
+    metric TEXT NOT NULL,
+    dimension TEXT NOT NULL DEFAULT '',
+    count BIGINT NOT NULL,
+    PRIMARY KEY (bucket, metric, dimension)
+);
+
+-- One row per (UTC day, metric, dimension); kept indefinitely
+CREATE TABLE IF NOT EXISTS analytics_daily (
+    day DATE NOT NULL,
+    metric TEXT NOT NULL,
+    dimension TEXT NOT NULL DEFAULT '',
+    count BIGINT NOT NULL,
+    PRIMARY KEY (day, metric, dimension)
+);
+
+-- Start of the hour the next refresh recomputes from
+CREATE TABLE IF NOT EXISTS analytics_rollup_state (
+    id BOOLEAN PRIMARY KEY DEFAULT TRUE CHECK (id),
+    recompute_from TIMESTAMPTZ NOT NULL,
+    refreshed_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Only the API (service role) reads or writes rollups
+ALTER TABLE analytics_hourly ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_daily ENABLE ROW LEVEL SECURITY;
+ALTER TABLE analytics_rollup_state ENABLE ROW LEVEL SECURITY;
+
+-- Range scans over the source tables' timestamps
+CREATE INDEX IF NOT EXISTS idx_profiles_created_at ON profiles(created_at);
+CREATE INDEX IF NOT EXISTS idx_ideas_updated_at ON ideas(updated_at);
+CREATE INDEX IF NOT EXISTS idx_connection_requests_created_at ON connection_requests(created_at);
+
+-- Recompute the rollups from the last refresh to now. Each run rescans only
+-- the hours since the previous run (plus p_overlap_seconds, for rows committed
+-- late), so its cost does not grow with the size of the source tables. The
+-- first run backfills everything. Concurrent calls return FALSE immediately.
+--
+-- Metrics (dimension in brackets):
+--   signups [role], ideas_created, ai_judgments, matching_runs,
+--   connection_requests, views [view source]
+CREATE OR REPLACE FUNCTION refresh_analytics_rollups(
+    p_overlap_seconds INTEGER DEFAULT 3600, p_hourly_retention_days INTEGER DEFAULT 90
+)
+RETURNS BOOLEAN
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_from TIMESTAMPTZ;
+    v_now TIMESTAMPTZ := NOW();
+BEGIN
+    IF NOT pg_try_advisory_xact_lock(hashtext('refresh_analytics_rollups')) THEN
+        RETURN FALSE;
+    END IF;
+
+    SELECT recompute_from INTO v_from FROM analytics_rollup_state WHERE id;
+    v_from := date_trunc('hour', COALESCE(v_from, '-infinity'::TIMESTAMPTZ));
+
+    DELETE FROM analytics_hourly WHERE bucket >= v_from;
+
+    INSERT INTO analytics_hourly (bucket, metric, dimension, count)
+    SELECT date_trunc('hour', e.at), e.metric, e.dimension, COUNT(*)
+    FROM (
+        SELECT p.created_at AS at, 'signups' AS metric, COALESCE(p.role, '') AS dimension
+        FROM profiles AS p WHERE p.created_at >= v_from
+        UNION ALL
+        SELECT i.created_at, 'ideas_created', ''
+        FROM ideas AS i WHERE i.created_at >= v_from
+        UNION ALL
+        -- A judgment also bumps updated_at, which keeps this scan indexed
+        SELECT (i.ai_metadata -> 'ai_judgment' ->> 'judgment_timestamp')::TIMESTAMPTZ, 'ai_judgments', ''
+        FROM ideas AS i
+        WHERE i.updated_at >= v_from
+          AND (i.ai_metadata -> 'ai_judgment' ->> 'judgment_timestamp')::TIMESTAMPTZ >= v_from
+        UNION ALL
+        SELECT m.created_at, 'matching_runs', ''
+        FROM matching_history AS m WHERE m.created_at >= v_from
+        UNION ALL
+        SELECT c.created_at, 'connection_requests', ''
+        FROM connection_requests AS c WHERE c.created_at >= v_from
+        UNION ALL
+        SELECT v.viewed_at, 'views', COALESCE(v.view_source, '')
+        FROM startup_views AS v WHERE v.viewed_at >= v_from
+    ) AS e
+    WHERE e.at < v_now
+    GROUP BY 1, 2, 3;
+
+    -- Days touched by this run, re-summed from the hourly rows
+    DELETE FROM analytics_daily WHERE day >= (v_from AT TIME ZONE 'UTC')::DATE;
+
+    INSERT INTO analytics_daily (day, metric, dimension, count)
+    SELECT (h.bucket AT TIME ZONE 'UTC')::DATE, h.metric, h.dimension, SUM(h.count)
+    FROM analytics_hourly AS h
+    WHERE h.bucket >= date_trunc('day', v_from AT TIME ZONE 'UTC') AT TIME ZONE 'UTC'
+    GROUP BY 1, 2, 3;
+
+    DELETE FROM analytics_hourly
+    WHERE bucket < v_now - make_interval(days => p_hourly_retention_days);
+
+    INSERT INTO analytics_rollup_state (id, recompute_from, refreshed_at)
+    VALUES (TRUE, date_trunc('hour', v_now - make_interval(secs => p_overlap_seconds)), v_now)
+    ON CONFLICT (id) DO UPDATE
+    SET recompute_from = EXCLUDED.recompute_from, refreshed_at = EXCLUDED.refreshed_at;
+
+    RETURN TRUE;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION refresh_analytics_rollups(INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_analytics_rollups(INTEGER, INTEGER) TO service_role;
+
+-- Backfill now; the API refreshes every ANALYTICS_ROLLUP_INTERVAL_SECONDS
+SELECT refresh_analytics_rollups();
+
+-- Verification query
+SELECT metric, SUM(count) AS total
+FROM analytics_daily
+GROUP BY metric
+ORDER BY metric;
@@ -0,0 +1,22 @@
+-- Browse Keyset Pagination Migration
+-- Execute this script in your Supabase SQL Editor to support cursor paging
+-- of public ideas on /investor/browse-startups
+
+-- Composite index matching the browse ordering (created_at DESC, id DESC)
+-- restricted to publicly visible ideas. The case-insensitive industry
+-- filter is evaluated while walking this index in order.
+CREATE INDEX IF NOT EXISTS idx_ideas_public_created_id
+    ON ideas (created_at DESC, id DESC)
+    WHERE visibility IN ('public', 'public_ideas');
+
+-- Status filter within the public set
+CREATE INDEX IF NOT EXISTS idx_ideas_public_status_created_id
+    ON ideas (status, created_at DESC, id DESC)
+    WHERE visibility IN ('public', 'public_ideas');
+
+-- Verification query
+SELECT indexname, indexdef
+FROM pg_indexes
+WHERE tablename = 'ideas'
+    AND indexname LIKE 'idx_ideas_public_%'
+ORDER BY indexname;
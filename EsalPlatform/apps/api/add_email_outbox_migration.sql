@@ -0,0 +1,105 @@
+-- Email Outbox Migration
+-- Execute this script in your Supabase SQL Editor to queue outgoing email
+-- durably (used by app/services/email_outbox.py). Requests only insert a row;
+-- a dispatcher in each API worker sends them over pooled SMTP connections.
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id BIGSERIAL PRIMARY KEY,
+    to_email TEXT NOT NULL,
+    subject TEXT NOT NULL,
+    text_body TEXT NOT NULL,
+    html_body TEXT,
+    reply_to TEXT,
+    category TEXT NOT NULL DEFAULT 'transactional',
+    -- pending -> sending -> sent | failed (sending returns to pending on retry)
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'sending', 'sent', 'failed')),
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    claimed_at TIMESTAMPTZ,
+    sent_at TIMESTAMPTZ,
+    last_error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+-- Messages due for sending, in order
+CREATE INDEX IF NOT EXISTS idx_email_outbox_ready
+    ON email_outbox(next_attempt_at, id) WHERE status = 'pending';
+
+-- Recent deliveries per recipient (throttling)
+CREATE INDEX IF NOT EXISTS idx_email_outbox_recipient
+    ON email_outbox(to_email, sent_at) WHERE status IN ('sending', 'sent');
+
+-- Only the API (service role) reads or writes the outbox
+ALTER TABLE email_outbox ENABLE ROW LEVEL SECURITY;
+
+-- Claim up to p_limit due messages for sending. A recipient gets at most
+-- p_per_recipient messages per p_window_seconds, counting messages in
+-- flight; throttled messages are left out before the limit is applied, so a
+-- burst to one address never takes the batch from other recipients. The
+-- chosen rows are then locked with SKIP LOCKED, so concurrent dispatchers
+-- never claim the same message. Messages claimed by a dispatcher that died
+-- are reclaimed after p_lease_seconds.
+CREATE OR REPLACE FUNCTION claim_email_outbox(
+    p_limit INTEGER, p_per_recipient INTEGER, p_window_seconds INTEGER, p_lease_seconds INTEGER
+)
+RETURNS SETOF email_outbox
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    WITH due AS (
+        SELECT o.id,
+               o.to_email,
+               o.next_attempt_at,
+               ROW_NUMBER() OVER (PARTITION BY o.to_email ORDER BY o.next_attempt_at, o.id) AS position
+        FROM email_outbox AS o
+        WHERE (o.status = 'pending' AND o.next_attempt_at <= NOW())
+           OR (o.status = 'sending' AND o.claimed_at < NOW() - make_interval(secs => p_lease_seconds))
+    ),
+    recent AS (
+        SELECT s.to_email, COUNT(*) AS sent
+        FROM email_outbox AS s
+        WHERE s.to_email IN (SELECT DISTINCT d.to_email FROM due AS d)
+          AND ((s.status = 'sending' AND s.claimed_at >= NOW() - make_interval(secs => p_lease_seconds))
+               OR (s.status = 'sent' AND s.sent_at > NOW() - make_interval(secs => p_window_seconds)))
+        GROUP BY s.to_email
+    ),
+    allowed AS (
+        -- Twice the limit leaves room for rows another dispatcher has locked
+        SELECT d.id
+        FROM due AS d
+        LEFT JOIN recent AS r ON r.to_email = d.to_email
+        WHERE COALESCE(r.sent, 0) + d.position <= p_per_recipient
+        ORDER BY d.next_attempt_at, d.id
+        LIMIT p_limit * 2
+    ),
+    claimable AS (
+        SELECT o.id
+        FROM email_outbox AS o
+        WHERE o.id IN (SELECT a.id FROM allowed AS a)
+          AND ((o.status = 'pending' AND o.next_attempt_at <= NOW())
+               OR (o.status = 'sending' AND o.claimed_at < NOW() - make_interval(secs => p_lease_seconds)))
+        ORDER BY o.next_attempt_at, o.id
+        LIMIT p_limit
+        FOR UPDATE SKIP LOCKED
+    )
+    UPDATE email_outbox AS o
+    SET status = 'sending',
+        attempts = o.attempts + 1,
+        claimed_at = NOW()
+    FROM claimable AS c
+    WHERE o.id = c.id
+    RETURNING o.*;
+END;
+$$;
+
+REVOKE ALL ON FUNCTION claim_email_outbox(INTEGER, INTEGER, INTEGER, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION claim_email_outbox(INTEGER, INTEGER, INTEGER, INTEGER) TO service_role;
+
+-- Verification query
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname = 'claim_email_outbox';
@@ -0,0 +1,43 @@
+-- Export Jobs Migration
+-- Execute this script in your Supabase SQL Editor to enable background data
+-- exports for large accounts (used by app/services/data_export.py)
+
+-- Private bucket for export archives; downloads use short-lived signed URLs
+INSERT INTO storage.buckets (id, name, public, file_size_limit, allowed_mime_types)
+VALUES ('exports', 'exports', false, NULL, ARRAY['application/zip'])
+ON CONFLICT (id) DO NOTHING;
+
+-- One row per requested export. status moves pending -> running ->
+-- completed | failed, and completed -> expired once the archive is deleted
+-- (EXPORT_RETENTION_HOURS after completion, or on account deletion);
+-- file_path is the archive in the exports bucket. A job
+-- whose worker died is failed by the API once EXPORT_JOB_TIMEOUT_SECONDS
+-- have passed since started_at (or created_at while still pending).
+CREATE TABLE IF NOT EXISTS export_jobs (
+    id UUID PRIMARY KEY DEFAULT gen_random_uuid(),
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    status TEXT NOT NULL DEFAULT 'pending'
+        CHECK (status IN ('pending', 'running', 'completed', 'failed', 'expired')),
+    file_path TEXT,
+    file_size BIGINT,
+    error TEXT,
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    started_at TIMESTAMPTZ,
+    completed_at TIMESTAMPTZ
+);
+
+CREATE INDEX IF NOT EXISTS idx_export_jobs_user_status ON export_jobs(user_id, status);
+
+-- Archives due for deletion
+CREATE INDEX IF NOT EXISTS idx_export_jobs_completed
+    ON export_jobs(completed_at) WHERE status = 'completed';
+
+ALTER TABLE export_jobs ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own export jobs" ON export_jobs;
+CREATE POLICY "Users can view own export jobs" ON export_jobs
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Verification query
+SELECT id, public, allowed_mime_types FROM storage.buckets WHERE id = 'exports';
+SELECT column_name, data_type FROM information_schema.columns WHERE table_name = 'export_jobs';
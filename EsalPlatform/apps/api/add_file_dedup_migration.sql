@@ -0,0 +1,141 @@
+-- File Deduplication Migration
+-- Execute this script in your Supabase SQL Editor to store uploaded files
+-- content-addressed and reference-counted (used by app/services/file_blobs.py)
+
+-- SHA-256 of each file's content (NULL for files stored before deduplication
+-- and for direct uploads, which own their object outright)
+ALTER TABLE files ADD COLUMN IF NOT EXISTS content_sha256 TEXT;
+
+-- Files without a hash own their object, so each path backs only one row
+-- (a repeated upload intent confirm returns the existing row)
+CREATE UNIQUE INDEX IF NOT EXISTS idx_files_unshared_path
+    ON files (file_path) WHERE content_sha256 IS NULL;
+
+-- One stored object per (user, bucket, content). ref_count is the number of
+-- files rows pointing at file_path; the object is removed when it reaches 0.
+-- Deduplication is per user, so nobody can reference another user's content
+-- by presenting its hash.
+CREATE TABLE IF NOT EXISTS file_blobs (
+    user_id UUID NOT NULL REFERENCES auth.users(id) ON DELETE CASCADE,
+    bucket TEXT NOT NULL,
+    sha256 TEXT NOT NULL,
+    file_path TEXT NOT NULL,
+    size BIGINT NOT NULL,
+    ref_count INTEGER NOT NULL DEFAULT 1 CHECK (ref_count >= 0),
+    created_at TIMESTAMPTZ NOT NULL DEFAULT NOW(),
+    PRIMARY KEY (user_id, bucket, sha256)
+);
+
+-- Only the API (service role) reads or writes blobs
+ALTER TABLE file_blobs ENABLE ROW LEVEL SECURITY;
+
+-- Take a reference to the blob with this content, creating it at p_file_path
+-- if there is none. created is false when an existing blob was referenced;
+-- its file_path is returned and p_file_path is unused.
+CREATE OR REPLACE FUNCTION acquire_file_blob(
+    p_user_id UUID, p_bucket TEXT, p_sha256 TEXT, p_file_path TEXT, p_size BIGINT
+)
+RETURNS TABLE(file_path TEXT, created BOOLEAN)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    INSERT INTO file_blobs AS b (user_id, bucket, sha256, file_path, size, ref_count)
+    VALUES (p_user_id, p_bucket, p_sha256, p_file_path, p_size, 1)
+    ON CONFLICT (user_id, bucket, sha256) DO UPDATE SET ref_count = b.ref_count + 1
+    RETURNING b.file_path, b.file_path = p_file_path;
+END;
+$$;
+
+-- Take a reference to an existing blob only (no row if there is none). Used
+-- when the client sends the content hash ahead of the body.
+CREATE OR REPLACE FUNCTION reference_file_blob(p_user_id UUID, p_bucket TEXT, p_sha256 TEXT)
+RETURNS TABLE(file_path TEXT, size BIGINT)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    RETURN QUERY
+    UPDATE file_blobs AS b SET ref_count = b.ref_count + 1
+    WHERE b.user_id = p_user_id AND b.bucket = p_bucket AND b.sha256 = p_sha256
+    RETURNING b.file_path, b.size;
+END;
+$$;
+
+-- Drop one reference. remove_object is true when it was the last one: the
+-- blob row is gone and the caller deletes file_path from storage. A blob
+-- recreated afterwards gets a new path, so the deletion never races it.
+CREATE OR REPLACE FUNCTION release_file_blob(p_user_id UUID, p_bucket TEXT, p_sha256 TEXT)
+RETURNS TABLE(file_path TEXT, remove_object BOOLEAN)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_path TEXT;
+    v_refs INTEGER;
+BEGIN
+    UPDATE file_blobs AS b SET ref_count = b.ref_count - 1
+    WHERE b.user_id = p_user_id AND b.bucket = p_bucket AND b.sha256 = p_sha256
+    RETURNING b.file_path, b.ref_count INTO v_path, v_refs;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF v_refs <= 0 THEN
+        DELETE FROM file_blobs AS b
+        WHERE b.user_id = p_user_id AND b.bucket = p_bucket AND b.sha256 = p_sha256;
+    END IF;
+    RETURN QUERY SELECT v_path, v_refs <= 0;
+END;
+$$;
+
+-- Delete a user's files row and release its blob in one transaction. No row
+-- if the file does not exist; files without a content hash own their object.
+CREATE OR REPLACE FUNCTION release_file(p_file_id UUID, p_user_id UUID, p_bucket TEXT)
+RETURNS TABLE(file_path TEXT, remove_object BOOLEAN)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_path TEXT;
+    v_sha256 TEXT;
+BEGIN
+    DELETE FROM files AS f
+    WHERE f.id = p_file_id AND f.user_id = p_user_id
+    RETURNING f.file_path, f.content_sha256 INTO v_path, v_sha256;
+
+    IF NOT FOUND THEN
+        RETURN;
+    END IF;
+
+    IF v_sha256 IS NULL THEN
+        RETURN QUERY SELECT v_path, TRUE;
+    ELSE
+        RETURN QUERY SELECT v_path, COALESCE(
+            (SELECT r.remove_object FROM release_file_blob(p_user_id, p_bucket, v_sha256) AS r),
+            FALSE
+        );
+    END IF;
+END;
+$$;
+
+-- Only the API (service role) may manage blobs
+REVOKE ALL ON FUNCTION acquire_file_blob(UUID, TEXT, TEXT, TEXT, BIGINT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION reference_file_blob(UUID, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION release_file_blob(UUID, TEXT, TEXT) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION release_file(UUID, UUID, TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION acquire_file_blob(UUID, TEXT, TEXT, TEXT, BIGINT) TO service_role;
+GRANT EXECUTE ON FUNCTION reference_file_blob(UUID, TEXT, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION release_file_blob(UUID, TEXT, TEXT) TO service_role;
+GRANT EXECUTE ON FUNCTION release_file(UUID, UUID, TEXT) TO service_role;
+
+-- Verification query
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname IN ('acquire_file_blob', 'reference_file_blob', 'release_file_blob', 'release_file');
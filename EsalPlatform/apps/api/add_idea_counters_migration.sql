@@ -0,0 +1,39 @@
+-- Idea Counters Migration
+-- Execute this script in your Supabase SQL Editor to enable batched,
+-- atomic view/interest count updates (used by app/services/idea_counters.py)
+
+-- Apply a batch of deltas in a single UPDATE. Each element of `deltas` is
+-- {"idea_id": <bigint>, "views": <int>, "interests": <int>}. Increments are
+-- relative, so concurrent workers never overwrite each other's counts.
+CREATE OR REPLACE FUNCTION increment_idea_counters(deltas JSONB)
+RETURNS INTEGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    updated_rows INTEGER;
+BEGIN
+    UPDATE ideas AS i
+    SET view_count = COALESCE(i.view_count, 0) + d.views,
+        interest_count = COALESCE(i.interest_count, 0) + d.interests
+    FROM (
+        SELECT idea_id, SUM(views)::INTEGER AS views, SUM(interests)::INTEGER AS interests
+        FROM jsonb_to_recordset(deltas) AS x(idea_id BIGINT, views INTEGER, interests INTEGER)
+        GROUP BY idea_id
+    ) AS d
+    WHERE i.id = d.idea_id;
+
+    GET DIAGNOSTICS updated_rows = ROW_COUNT;
+    RETURN updated_rows;
+END;
+$$;
+
+-- Only the API (service role) may apply counter batches
+REVOKE ALL ON FUNCTION increment_idea_counters(JSONB) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION increment_idea_counters(JSONB) TO service_role;
+
+-- Verification query
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname = 'increment_idea_counters';
@@ -0,0 +1,113 @@
+-- Idea Full-Text Search Migration
+-- Execute this script in your Supabase SQL Editor to enable ranked idea
+-- search (used by SupabaseIdeasService.search_ideas)
+
+-- Weighted search document: title (A) > tags, description (B) > problem, solution (C)
+ALTER TABLE ideas ADD COLUMN IF NOT EXISTS search_vector TSVECTOR;
+
+-- Maintained by trigger: array_to_string is not immutable, so a generated
+-- column cannot be used for tags
+CREATE OR REPLACE FUNCTION ideas_search_vector_update()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', COALESCE(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', COALESCE(array_to_string(NEW.tags, ' '), '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(NEW.description, '')), 'B') ||
+        setweight(to_tsvector('english', COALESCE(NEW.problem, '')), 'C') ||
+        setweight(to_tsvector('english', COALESCE(NEW.solution, '')), 'C');
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ideas_search_vector_trigger ON ideas;
+CREATE TRIGGER ideas_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, tags, description, problem, solution ON ideas
+    FOR EACH ROW EXECUTE FUNCTION ideas_search_vector_update();
+
+-- Backfill existing rows (fires the trigger)
+UPDATE ideas SET title = title WHERE search_vector IS NULL;
+
+CREATE INDEX IF NOT EXISTS idx_ideas_search_vector ON ideas USING GIN (search_vector);
+
+-- Ranked search with highlight snippets and keyset paging on (rank, id).
+-- Pass the rank and id of the last row of a page as after_rank/after_id to
+-- get the next one. Snippets are only computed for the returned page, and
+-- are HTML-escaped text with <mark> around the matches.
+CREATE OR REPLACE FUNCTION search_ideas(
+    search_query TEXT,
+    max_results INTEGER DEFAULT 20,
+    after_rank REAL DEFAULT NULL,
+    after_id BIGINT DEFAULT NULL,
+    status_filter TEXT DEFAULT NULL,
+    public_only BOOLEAN DEFAULT FALSE,
+    owner_id UUID DEFAULT NULL
+)
+RETURNS TABLE (
+    id BIGINT,
+    user_id UUID,
+    title VARCHAR,
+    description TEXT,
+    category VARCHAR,
+    tags TEXT[],
+    status VARCHAR,
+    visibility VARCHAR,
+    problem TEXT,
+    solution TEXT,
+    target_market TEXT,
+    view_count INTEGER,
+    interest_count INTEGER,
+    ai_score FLOAT,
+    created_at TIMESTAMPTZ,
+    updated_at TIMESTAMPTZ,
+    rank REAL,
+    snippet TEXT
+)
+LANGUAGE sql
+STABLE
+AS $$
+    WITH q AS (
+        SELECT websearch_to_tsquery('english', search_query) AS query
+    ),
+    page AS (
+        SELECT i.*, ts_rank(i.search_vector, q.query) AS rank, q.query
+        FROM ideas i, q
+        WHERE i.search_vector @@ q.query
+            AND (status_filter IS NULL OR i.status = status_filter)
+            AND (NOT public_only OR i.visibility IN ('public', 'public_ideas'))
+            AND (owner_id IS NULL OR i.user_id = owner_id)
+            AND (after_rank IS NULL
+                 OR ts_rank(i.search_vector, q.query) < after_rank
+                 OR (ts_rank(i.search_vector, q.query) = after_rank AND i.id < after_id))
+        ORDER BY rank DESC, i.id DESC
+        LIMIT max_results
+    )
+    SELECT
+        p.id, p.user_id, p.title, p.description, p.category, p.tags, p.status,
+        p.visibility, p.problem, p.solution, p.target_market, p.view_count,
+        p.interest_count, p.ai_score, p.created_at, p.updated_at, p.rank,
+        -- HTML-escape the idea text, then turn the markers into <mark> tags
+        replace(replace(
+            replace(replace(replace(replace(replace(h.headline,
+                '&', '&amp;'), '<', '&lt;'), '>', '&gt;'), '"', '&quot;'), '''', '&#x27;'),
+            chr(2), '<mark>'), chr(3), '</mark>'
+        ) AS snippet
+    FROM page p
+    CROSS JOIN LATERAL (
+        -- Control characters mark the matches; any already in the text are dropped
+        SELECT ts_headline(
+            'english',
+            translate(COALESCE(NULLIF(p.description, ''), p.problem, p.title), chr(2) || chr(3), ''),
+            p.query,
+            'StartSel=' || chr(2) || ', StopSel=' || chr(3) || ', MaxFragments=2, MaxWords=20, MinWords=5'
+        ) AS headline
+    ) h
+    ORDER BY p.rank DESC, p.id DESC;
+$$;
+
+-- Verification query
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname IN ('search_ideas', 'ideas_search_vector_update');
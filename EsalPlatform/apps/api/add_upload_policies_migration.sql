@@ -0,0 +1,36 @@
+-- Upload Policies Migration
+-- Execute this script in your Supabase SQL Editor to enforce size and content
+-- type limits in Storage itself. Direct (signed URL) uploads never pass
+-- through the API, so these bucket limits are what actually reject oversized
+-- or disallowed files; keep them in sync with UPLOAD_POLICIES in
+-- app/services/upload_intents.py and MAX_*_UPLOAD_MB in app/config.py.
+
+-- Idea attachments: documents, images and videos up to 100MB
+UPDATE storage.buckets
+SET file_size_limit = 104857600,
+    allowed_mime_types = ARRAY[
+        'application/pdf',
+        'application/msword',
+        'application/vnd.ms-excel',
+        'application/vnd.ms-powerpoint',
+        'application/vnd.openxmlformats-officedocument.wordprocessingml.document',
+        'application/vnd.openxmlformats-officedocument.spreadsheetml.sheet',
+        'application/vnd.openxmlformats-officedocument.presentationml.presentation',
+        'application/zip',
+        'text/plain',
+        'text/csv',
+        'image/*',
+        'video/*'
+    ]
+WHERE id = 'idea-files';
+
+-- Avatars: images up to 5MB
+UPDATE storage.buckets
+SET file_size_limit = 5242880,
+    allowed_mime_types = ARRAY['image/jpeg', 'image/png', 'image/webp', 'image/gif']
+WHERE id = 'avatars';
+
+-- Verification query
+SELECT id, public, file_size_limit, allowed_mime_types
+FROM storage.buckets
+WHERE id IN ('idea-files', 'avatars');
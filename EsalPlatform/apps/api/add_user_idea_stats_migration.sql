@@ -0,0 +1,158 @@
+-- Per-User Idea Statistics Migration
+-- Execute this script in your Supabase SQL Editor to maintain a one-row
+-- summary of each user's ideas (used by dashboard and analytics endpoints)
+
+CREATE TABLE IF NOT EXISTS user_idea_stats (
+    user_id UUID PRIMARY KEY REFERENCES auth.users(id) ON DELETE CASCADE,
+    total_ideas INTEGER NOT NULL DEFAULT 0,
+    active_ideas INTEGER NOT NULL DEFAULT 0,
+    draft_ideas INTEGER NOT NULL DEFAULT 0,
+    ai_generated_ideas INTEGER NOT NULL DEFAULT 0,
+    total_views BIGINT NOT NULL DEFAULT 0,
+    total_interests BIGINT NOT NULL DEFAULT 0,
+    ai_score_sum DOUBLE PRECISION NOT NULL DEFAULT 0,
+    ai_score_count INTEGER NOT NULL DEFAULT 0,
+    ai_score_max DOUBLE PRECISION,
+    -- AI score histogram buckets: [0,3) [3,5) [5,7) [7,8) [8,10]
+    score_0_3 INTEGER NOT NULL DEFAULT 0,
+    score_3_5 INTEGER NOT NULL DEFAULT 0,
+    score_5_7 INTEGER NOT NULL DEFAULT 0,
+    score_7_8 INTEGER NOT NULL DEFAULT 0,
+    score_8_10 INTEGER NOT NULL DEFAULT 0,
+    category_counts JSONB NOT NULL DEFAULT '{}'::jsonb,
+    -- Top performing ideas, resolved to titles with one multi-get
+    most_viewed_id BIGINT,
+    most_interested_id BIGINT,
+    highest_score_id BIGINT,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT NOW()
+);
+
+ALTER TABLE user_idea_stats ENABLE ROW LEVEL SECURITY;
+
+DROP POLICY IF EXISTS "Users can view own idea stats" ON user_idea_stats;
+CREATE POLICY "Users can view own idea stats" ON user_idea_stats
+    FOR SELECT USING (auth.uid() = user_id);
+
+-- Recompute the summary rows of the given users from their ideas. Each call
+-- touches only the listed users' ideas (via idx_ideas_user_id), so a write
+-- costs O(ideas of that user) and a read is always a single row.
+CREATE OR REPLACE FUNCTION refresh_user_idea_stats(user_ids UUID[])
+RETURNS VOID
+LANGUAGE sql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+    DELETE FROM user_idea_stats s
+    WHERE s.user_id = ANY(user_ids)
+        AND NOT EXISTS (SELECT 1 FROM ideas i WHERE i.user_id = s.user_id);
+
+    INSERT INTO user_idea_stats AS s (
+        user_id, total_ideas, active_ideas, draft_ideas, ai_generated_ideas,
+        total_views, total_interests, ai_score_sum, ai_score_count, ai_score_max,
+        score_0_3, score_3_5, score_5_7, score_7_8, score_8_10,
+        category_counts, most_viewed_id, most_interested_id, highest_score_id, updated_at
+    )
+    SELECT
+        i.user_id,
+        COUNT(*),
+        COUNT(*) FILTER (WHERE i.status IN ('active', 'published')),
+        COUNT(*) FILTER (WHERE i.status = 'draft'),
+        COUNT(*) FILTER (WHERE i.ai_generated),
+        COALESCE(SUM(i.view_count), 0),
+        COALESCE(SUM(i.interest_count), 0),
+        COALESCE(SUM(i.ai_score), 0),
+        COUNT(i.ai_score),
+        MAX(i.ai_score),
+        COUNT(*) FILTER (WHERE i.ai_score < 3),
+        COUNT(*) FILTER (WHERE i.ai_score >= 3 AND i.ai_score < 5),
+        COUNT(*) FILTER (WHERE i.ai_score >= 5 AND i.ai_score < 7),
+        COUNT(*) FILTER (WHERE i.ai_score >= 7 AND i.ai_score < 8),
+        COUNT(*) FILTER (WHERE i.ai_score >= 8),
+        (
+            SELECT COALESCE(jsonb_object_agg(c.category, c.n), '{}'::jsonb)
+            FROM (
+                SELECT COALESCE(NULLIF(ci.category, ''), 'technology') AS category, COUNT(*) AS n
+                FROM ideas ci
+                WHERE ci.user_id = i.user_id
+                GROUP BY 1
+            ) c
+        ),
+        (ARRAY_AGG(i.id ORDER BY COALESCE(i.view_count, 0) DESC, i.id))[1],
+        (ARRAY_AGG(i.id ORDER BY COALESCE(i.interest_count, 0) DESC, i.id))[1],
+        (ARRAY_AGG(i.id ORDER BY i.ai_score DESC, i.id) FILTER (WHERE i.ai_score IS NOT NULL))[1],
+        NOW()
+    FROM ideas i
+    WHERE i.user_id = ANY(user_ids)
+    GROUP BY i.user_id
+    ON CONFLICT (user_id) DO UPDATE SET
+        total_ideas = EXCLUDED.total_ideas,
+        active_ideas = EXCLUDED.active_ideas,
+        draft_ideas = EXCLUDED.draft_ideas,
+        ai_generated_ideas = EXCLUDED.ai_generated_ideas,
+        total_views = EXCLUDED.total_views,
+        total_interests = EXCLUDED.total_interests,
+        ai_score_sum = EXCLUDED.ai_score_sum,
+        ai_score_count = EXCLUDED.ai_score_count,
+        ai_score_max = EXCLUDED.ai_score_max,
+        score_0_3 = EXCLUDED.score_0_3,
+        score_3_5 = EXCLUDED.score_3_5,
+        score_5_7 = EXCLUDED.score_5_7,
+        score_7_8 = EXCLUDED.score_7_8,
+        score_8_10 = EXCLUDED.score_8_10,
+        category_counts = EXCLUDED.category_counts,
+        most_viewed_id = EXCLUDED.most_viewed_id,
+        most_interested_id = EXCLUDED.most_interested_id,
+        highest_score_id = EXCLUDED.highest_score_id,
+        updated_at = EXCLUDED.updated_at;
+$$;
+
+-- Only the triggers below (and the service role) may recompute stats
+REVOKE ALL ON FUNCTION refresh_user_idea_stats(UUID[]) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION refresh_user_idea_stats(UUID[]) TO service_role;
+
+-- Statement-level triggers: a batched write (e.g. a counter flush touching
+-- many ideas) refreshes each affected user once, not once per row. Runs as
+-- the owner, since writers of ideas cannot call refresh_user_idea_stats.
+CREATE OR REPLACE FUNCTION ideas_refresh_user_stats()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM refresh_user_idea_stats(ARRAY(SELECT DISTINCT user_id FROM new_rows));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM refresh_user_idea_stats(ARRAY(
+            SELECT user_id FROM new_rows UNION SELECT user_id FROM old_rows
+        ));
+    ELSE
+        PERFORM refresh_user_idea_stats(ARRAY(SELECT DISTINCT user_id FROM old_rows));
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS ideas_stats_after_insert ON ideas;
+CREATE TRIGGER ideas_stats_after_insert
+    AFTER INSERT ON ideas
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION ideas_refresh_user_stats();
+
+DROP TRIGGER IF EXISTS ideas_stats_after_update ON ideas;
+CREATE TRIGGER ideas_stats_after_update
+    AFTER UPDATE ON ideas
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION ideas_refresh_user_stats();
+
+DROP TRIGGER IF EXISTS ideas_stats_after_delete ON ideas;
+CREATE TRIGGER ideas_stats_after_delete
+    AFTER DELETE ON ideas
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION ideas_refresh_user_stats();
+
+-- Backfill existing users
+SELECT refresh_user_idea_stats(ARRAY(SELECT DISTINCT user_id FROM ideas));
+
+-- Verification query
+SELECT COUNT(*) AS users_with_stats FROM user_idea_stats;
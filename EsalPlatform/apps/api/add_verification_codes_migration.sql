@@ -0,0 +1,81 @@
+-- Verification Codes Migration
+-- Execute this script in your Supabase SQL Editor to issue and check email
+-- verification codes in a single round trip each (used by
+-- app/services/verification_codes.py). Requires email_verifications_table.sql.
+
+-- Wrong codes entered against a verification record
+ALTER TABLE public.email_verifications
+    ADD COLUMN IF NOT EXISTS attempts INTEGER NOT NULL DEFAULT 0;
+
+-- Active (unused) code lookup
+CREATE INDEX IF NOT EXISTS idx_email_verifications_active
+    ON public.email_verifications(user_id, created_at DESC) WHERE is_used = FALSE;
+
+-- Replace a user's unused codes with a new one. A used record with the same
+-- code is removed as well, so the (user_id, code) constraint cannot fail.
+CREATE OR REPLACE FUNCTION issue_verification_code(
+    p_user_id UUID, p_email TEXT, p_code TEXT, p_ttl_seconds INTEGER
+)
+RETURNS TABLE (id UUID, expires_at TIMESTAMPTZ)
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DELETE FROM email_verifications AS v
+    WHERE v.user_id = p_user_id AND (v.is_used = FALSE OR v.code = p_code);
+
+    RETURN QUERY
+    INSERT INTO email_verifications (user_id, email, code, expires_at, is_used)
+    VALUES (p_user_id, p_email, p_code, NOW() + make_interval(secs => p_ttl_seconds), FALSE)
+    RETURNING email_verifications.id, email_verifications.expires_at;
+END;
+$$;
+
+-- Check a code against the user's latest unused record and consume it.
+-- Returns 'verified', 'invalid' (attempt counted), 'locked' (too many wrong
+-- attempts), 'expired' or 'missing'.
+CREATE OR REPLACE FUNCTION consume_verification_code(
+    p_user_id UUID, p_code TEXT, p_max_attempts INTEGER
+)
+RETURNS TEXT
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    v_row email_verifications%ROWTYPE;
+BEGIN
+    SELECT * INTO v_row
+    FROM email_verifications AS v
+    WHERE v.user_id = p_user_id AND v.is_used = FALSE
+    ORDER BY v.created_at DESC
+    LIMIT 1
+    FOR UPDATE;
+
+    IF NOT FOUND THEN
+        RETURN 'missing';
+    ELSIF v_row.expires_at <= NOW() THEN
+        RETURN 'expired';
+    ELSIF v_row.attempts >= p_max_attempts THEN
+        RETURN 'locked';
+    ELSIF v_row.code <> p_code THEN
+        UPDATE email_verifications SET attempts = attempts + 1 WHERE id = v_row.id;
+        RETURN 'invalid';
+    END IF;
+
+    UPDATE email_verifications SET is_used = TRUE, verified_at = NOW() WHERE id = v_row.id;
+    RETURN 'verified';
+END;
+$$;
+
+-- Only the API (service role) may issue or check codes
+REVOKE ALL ON FUNCTION issue_verification_code(UUID, TEXT, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+REVOKE ALL ON FUNCTION consume_verification_code(UUID, TEXT, INTEGER) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION issue_verification_code(UUID, TEXT, TEXT, INTEGER) TO service_role;
+GRANT EXECUTE ON FUNCTION consume_verification_code(UUID, TEXT, INTEGER) TO service_role;
+
+-- Verification query
+SELECT proname, pg_get_function_arguments(oid) AS arguments
+FROM pg_proc
+WHERE proname IN ('issue_verification_code', 'consume_verification_code');
@@ -24,8 +24,19 @@ class Settings(BaseSettings):
     SMTP_PASSWORD: str = Field(default="", description="SMTP password")
     SMTP_FROM_EMAIL: str = Field(default="", description="Email sender address")
     SMTP_FROM_NAME: str = Field(default="ESAL Platform", description="Email sender name")
+    
+    # Email outbox delivery (see add_email_outbox_migration.sql)
+    EMAIL_POOL_SIZE: int = Field(default=2, description="Pooled SMTP connections per worker")
+    EMAIL_BATCH_SIZE: int = Field(default=20, description="Queued emails claimed per dispatch")
+    EMAIL_POLL_INTERVAL_SECONDS: float = Field(default=10.0, description="Outbox poll interval when idle")
+    EMAIL_MAX_ATTEMPTS: int = Field(default=6, description="Delivery attempts before an email is marked failed")
+    EMAIL_RETRY_BASE_SECONDS: float = Field(default=30.0, description="First retry delay (doubles per attempt)")
+    EMAIL_RECIPIENT_MAX_PER_WINDOW: int = Field(default=5, description="Emails per recipient per throttle window")
+    EMAIL_RECIPIENT_WINDOW_SECONDS: int = Field(default=60, description="Per-recipient throttle window")
       # Email verification settings
     VERIFICATION_CODE_EXPIRY_MINUTES: int = Field(default=10, description="Code expiry time in minutes")
+    VERIFICATION_MAX_ATTEMPTS: int = Field(default=5, description="Wrong codes allowed before a code is locked")
+    VERIFICATION_SWEEP_INTERVAL_SECONDS: float = Field(default=60.0, description="How often expired codes are purged")
     SITE_URL: str = Field(default="", description="Site base URL")
     CONFIRM_EMAIL_REDIRECT_URL: str = Field(default="", description="Email confirmation redirect URL")
       # AI APIs
@@ -69,6 +80,50 @@ class Settings(BaseSettings):
         description="Allowed CORS origins"
     )
     
+    # Idea view/interest counters (write-behind)
+    COUNTER_FLUSH_INTERVAL_SECONDS: float = Field(default=5.0, description="How often buffered idea counters are flushed")
+    COUNTER_SHARDS: int = Field(default=16, description="Number of in-memory counter shards")
+    
+    # Idea read cache (per process; 0 disables)
+    IDEA_CACHE_MAX_ENTRIES: int = Field(default=2048, description="Maximum cached idea reads per process")
+    IDEA_CACHE_TTL_SECONDS: float = Field(default=30.0, description="Lifetime of a cached idea read")
+    
+    # Admin user counts (per process)
+    ADMIN_STATS_TTL_SECONDS: float = Field(default=15.0, description="Lifetime of cached admin user counts")
+    
+    # Admin analytics rollups (see add_analytics_rollups_migration.sql)
+    ANALYTICS_ROLLUP_INTERVAL_SECONDS: float = Field(default=300.0, description="How often new rows are rolled up")
+    ANALYTICS_SNAPSHOT_FRESH_SECONDS: float = Field(default=60.0, description="Analytics snapshots served without reloading")
+    ANALYTICS_SNAPSHOT_MAX_STALE_SECONDS: float = Field(default=3600.0, description="Oldest snapshot served while reloading")
+    
+    # Bulk admin user operations
+    BULK_MAX_USERS: int = Field(default=5000, description="Most users one bulk operation may change")
+    BULK_SUPABASE_CONCURRENCY: int = Field(default=8, description="Supabase Auth admin calls in flight per bulk operation")
+    
+    # Dependency health probes (background; endpoints serve the latest results)
+    HEALTH_PROBE_INTERVAL_SECONDS: float = Field(default=30.0, description="How often each dependency is probed")
+    HEALTH_PROBE_TIMEOUT_SECONDS: float = Field(default=5.0, description="Probe time after which a dependency counts as down")
+    HEALTH_WINDOW_SECONDS: float = Field(default=3600.0, description="Window of the latency percentiles and error rates")
+    
+    # Uploads (streamed; memory per upload is bounded by one 6MB chunk)
+    MAX_FILE_UPLOAD_MB: int = Field(default=100, description="Largest idea attachment accepted")
+    MAX_AVATAR_UPLOAD_MB: int = Field(default=5, description="Largest avatar image accepted")
+    UPLOAD_INTENT_TTL_SECONDS: int = Field(default=900, description="Lifetime of a direct-upload intent")
+    SIGNED_URL_TTL_SECONDS: int = Field(default=3600, description="Default lifetime of signed download URLs")
+    AVATAR_PROCESS_WORKERS: int = Field(default=2, description="Processes encoding avatar variants (0: thread pool)")
+
+    # Data export (streamed ZIP; constant memory per export)
+    EXPORT_FETCH_CONCURRENCY: int = Field(default=4, description="Concurrent file downloads per export")
+    EXPORT_INLINE_MAX_MB: int = Field(default=500, description="Largest file total exported inline; larger accounts use export jobs")
+    EXPORT_MAX_MB: int = Field(default=20480, description="Largest archive an export job stores")
+    EXPORT_RETENTION_HOURS: int = Field(default=168, description="Export job archives are deleted this long after they complete")
+    EXPORT_JOB_TIMEOUT_SECONDS: int = Field(default=7200, description="Export jobs not finished this long after starting (or queued) count as failed")
+    
+    # Response compression
+    COMPRESSION_MINIMUM_SIZE: int = Field(default=1024, description="Smallest response body (bytes) that is compressed")
+    COMPRESSION_GZIP_LEVEL: int = Field(default=6, description="gzip level (1-9)")
+    COMPRESSION_BROTLI_QUALITY: int = Field(default=4, description="Brotli quality (0-11); low values suit dynamic responses")
+    
     # App
     DEBUG: bool = Field(default=False, description="Debug mode")
     ENVIRONMENT: str = Field(default="production", description="Environment: development, staging, production")
@@ -1,7 +1,7 @@
 """
 ESAL Platform Backend - FastAPI Application Entry Point
 """
-from fastapi import FastAPI, Request, Response
+from fastapi import FastAPI, Request, Response, status
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.middleware.trustedhost import TrustedHostMiddleware
 from contextlib import asynccontextmanager
@@ -9,8 +9,17 @@ import logging
 import sys
 
 from app.database import create_tables
-from app.routers import auth, innovator, hub, investor, admin, ideas, users, contact, chat
+from app.routers import auth, innovator, hub, investor, admin, ideas, users, contact, chat, files
 from app.config import settings
+from app.middleware import AuthMiddleware, CompressionMiddleware
+from app.services.idea_counters import idea_counters
+from app.services.avatar_images import avatar_processor
+from app.services.email_outbox import email_outbox
+from app.services.verification_codes import verification_codes
+from app.services.admin_analytics import analytics_rollups
+from app.services.data_export import export_retention
+from app.services.health_probes import health_monitor, uptime_seconds
+from app.utils.fast_json import FastJSONResponse
 
 # Configure logging based on environment
 if settings.DEBUG:
@@ -37,10 +46,23 @@ async def lifespan(app: FastAPI):
     logger.info(f"CORS Origins: {settings.ALLOWED_ORIGINS}")
     logger.info(f"CORS Origins Type: {type(settings.ALLOWED_ORIGINS)}")
     create_tables()
+    idea_counters.start()
+    email_outbox.start()
+    verification_codes.start()
+    analytics_rollups.start()
+    export_retention.start()
+    health_monitor.start()
     yield
     # Shutdown
     logger.info("Shutting down ESAL Platform API...")
-    pass
+    # Write out buffered view/interest counts before the worker exits
+    await idea_counters.stop()
+    avatar_processor.shutdown()
+    await email_outbox.stop()
+    await verification_codes.stop()
+    await analytics_rollups.stop()
+    await export_retention.stop()
+    await health_monitor.stop()
 
 
 # Initialize FastAPI app
@@ -49,6 +71,7 @@ app = FastAPI(
     description="Innovation matchmaking platform for Innovators, Hubs, Investors, and Admins",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=FastJSONResponse,
     docs_url="/api/docs",
     redoc_url="/api/redoc",
     openapi_url="/api/openapi.json"
@@ -71,6 +94,18 @@ else:
         ]
     )
 
+# Resolve the bearer token once per request; wrapped by CORS below
+app.add_middleware(AuthMiddleware)
+
+# Compress responses inside CORS, so CORS headers land on the final response
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MINIMUM_SIZE,
+    gzip_level=settings.COMPRESSION_GZIP_LEVEL,
+    brotli_quality=settings.COMPRESSION_BROTLI_QUALITY,
+    precompressed_paths=(app.openapi_url,)
+)
+
 # CORS middleware - Configure before other middleware
 def is_allowed_origin(origin: str) -> bool:
     """Check if origin is allowed, supporting wildcard patterns"""
@@ -132,6 +167,7 @@ app.include_router(investor.router, prefix="/api/v1/investor", tags=["Investor"]
 app.include_router(admin.router, prefix="/api/v1/admin", tags=["Admin"])
 app.include_router(ideas.router, prefix="/api/v1/ideas", tags=["Ideas"])
 app.include_router(users.router, prefix="/api/v1/users", tags=["User Management"])
+app.include_router(files.router, prefix="/api/v1/files", tags=["Files"])
 app.include_router(contact.router, prefix="/api/v1/contact", tags=["Contact"])
 app.include_router(chat.router, prefix="/api/v1", tags=["Chat Assistant"])
 
@@ -198,6 +234,19 @@ async def health_check():
     return {"status": "healthy"}
 
 
+@app.get("/health/ready")
+async def readiness_check(response: Response):
+    """Readiness probe: 503 until Supabase and auth answered their latest background probe"""
+    ready, dependencies = health_monitor.ready()
+    if not ready:
+        response.status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    return {
+        "status": "ready" if ready else "not_ready",
+        "dependencies": dependencies,
+        "uptime_seconds": int(uptime_seconds())
+    }
+
+
 @app.middleware("http")
 async def cors_debug_middleware(request: Request, call_next):
     """Debug CORS requests - Only in debug mode"""
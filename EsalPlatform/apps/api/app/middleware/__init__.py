@@ -1 +1,12 @@
 # Middleware package
+from .auth import AuthMiddleware, PathPrefixTrie
+from .compression import CompressionMiddleware, cache_compressed, compression_stats, no_compression
+
+__all__ = [
+    "AuthMiddleware",
+    "PathPrefixTrie",
+    "CompressionMiddleware",
+    "cache_compressed",
+    "compression_stats",
+    "no_compression",
+]
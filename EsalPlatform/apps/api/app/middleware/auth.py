@@ -0,0 +1,142 @@
+"""
+Pure-ASGI authentication middleware.
+
+Resolves the bearer token of a request at most once and stores the principal
+in scope["state"], where get_current_user and require_role pick it up
+without re-verifying. Public paths are matched with a prefix trie built once
+at startup.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from fastapi import HTTPException
+from starlette.concurrency import run_in_threadpool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from app.utils.jwt import resolve_principal
+
+logger = logging.getLogger(__name__)
+
+
+# Paths that are public only when matched exactly
+PUBLIC_EXACT_PATHS = (
+    "/",
+    "/health",
+    "/api/health",
+    "/health/ready",
+)
+
+# Paths whose whole subtree is public
+PUBLIC_PATH_PREFIXES = (
+    "/api/docs",
+    "/api/redoc",
+    "/api/openapi.json",
+    "/api/debug/cors",
+    "/api/v1/auth/register",
+    "/api/v1/auth/login",
+    "/api/v1/auth/login-json",
+    "/api/v1/auth/verify-email",
+    "/api/v1/auth/resend-verification",
+    "/api/v1/contact",
+)
+
+
+class _TrieNode:
+    __slots__ = ("children", "exact", "prefix")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.exact = False
+        self.prefix = False
+
+
+class PathPrefixTrie:
+    """
+    Segment-based trie over URL paths.
+
+    A prefix entry matches the path itself and everything below it on a
+    segment boundary ("/api/docs" matches "/api/docs/oauth2-redirect" but not
+    "/api/docsx"). Lookup cost is bounded by the number of path segments,
+    not by the number of registered paths.
+    """
+
+    def __init__(self, exact: Iterable[str] = (), prefixes: Iterable[str] = ()):
+        self._root = _TrieNode()
+        for path in exact:
+            self.add(path, prefix=False)
+        for path in prefixes:
+            self.add(path, prefix=True)
+
+    @staticmethod
+    def _segments(path: str):
+        return [segment for segment in path.split("/") if segment]
+
+    def add(self, path: str, prefix: bool = True) -> None:
+        """Register a public path (or path prefix)"""
+        node = self._root
+        for segment in self._segments(path):
+            node = node.children.setdefault(segment, _TrieNode())
+        if prefix:
+            node.prefix = True
+        else:
+            node.exact = True
+
+    def match(self, path: str) -> bool:
+        """Check whether a request path is covered by a registered entry"""
+        node = self._root
+        if node.prefix:
+            return True
+        for segment in self._segments(path):
+            node = node.children.get(segment)
+            if node is None:
+                return False
+            if node.prefix:
+                return True
+        return node.exact
+
+
+def _extract_bearer_token(scope: Scope) -> Optional[str]:
+    """Read the bearer token from raw ASGI headers"""
+    for name, value in scope.get("headers", ()):
+        if name == b"authorization":
+            scheme, _, credentials = value.decode("latin-1").partition(" ")
+            if scheme.lower() != "bearer" or not credentials:
+                return None
+            return credentials.strip()
+    return None
+
+
+class AuthMiddleware:
+    """
+    Authenticate the bearer token once per request.
+
+    Failures are not turned into responses here: the error is memoized in
+    scope["state"] and re-raised by the first dependency that asks for the
+    current user, so unauthenticated endpoints behave as before.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        public_paths: Iterable[str] = PUBLIC_EXACT_PATHS,
+        public_prefixes: Iterable[str] = PUBLIC_PATH_PREFIXES,
+    ):
+        self.app = app
+        self.public_paths = PathPrefixTrie(exact=public_paths, prefixes=public_prefixes)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["method"] == "OPTIONS":
+            await self.app(scope, receive, send)
+            return
+
+        if not self.public_paths.match(scope["path"]):
+            token = _extract_bearer_token(scope)
+            if token:
+                state = scope.setdefault("state", {})
+                try:
+                    # Token verification calls Supabase synchronously
+                    await run_in_threadpool(resolve_principal, state, token)
+                except HTTPException as e:
+                    logger.debug(f"Authentication failed for {scope['path']}: {e.detail}")
+
+        await self.app(scope, receive, send)
@@ -0,0 +1,338 @@
+"""
+Pure-ASGI response compression.
+
+Negotiates brotli or gzip from Accept-Encoding and compresses responses whose
+body is at least `minimum_size` bytes and whose content type is textual
+(JSON, text/*, JavaScript, XML, SVG). Streamed bodies are compressed chunk by
+chunk with a sync flush, so downloads stay progressive.
+
+Routes opt out with @no_compression (e.g. already-compressed archives).
+Responses that are identical between requests (the OpenAPI schema, routes
+marked @cache_compressed) keep their compressed bytes in a small LRU keyed
+by body digest, so they are compressed once per distinct body.
+
+Added inside CORSMiddleware, so CORS headers are applied to the final
+(compressed) response. Totals are kept in `compression_stats`.
+"""
+import gzip
+import hashlib
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+from starlette.datastructures import Headers, MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - brotli is in requirements.txt
+    brotli = None
+
+
+COMPRESSIBLE_TYPES = (
+    "application/json",
+    "application/javascript",
+    "application/xml",
+    "image/svg+xml",
+)
+
+# Statuses that never carry a body worth compressing
+_NO_BODY_STATUSES = frozenset({204, 205, 304})
+
+
+def no_compression(endpoint: Callable) -> Callable:
+    """Mark a route endpoint so its responses are never compressed"""
+    endpoint.__no_compression__ = True
+    return endpoint
+
+
+def cache_compressed(endpoint: Callable) -> Callable:
+    """Mark a route endpoint whose compressed responses may be reused"""
+    endpoint.__cache_compressed__ = True
+    return endpoint
+
+
+def supported_encodings() -> Tuple[str, ...]:
+    return ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: Optional[str]) -> Optional[str]:
+    """
+    Pick a content coding from an Accept-Encoding header
+
+    Highest q-value wins; brotli is preferred over gzip on ties. "*" applies
+    to codings not listed explicitly, and q=0 rejects a coding.
+    """
+    if not accept_encoding:
+        return None
+    weights: Dict[str, float] = {}
+    for item in accept_encoding.split(","):
+        coding, _, params = item.strip().partition(";")
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            name, _, value = param.strip().partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        weights[coding] = q
+
+    best, best_q = None, 0.0
+    for coding in supported_encodings():
+        q = weights.get(coding, weights.get("*", 0.0))
+        if q > best_q:
+            best, best_q = coding, q
+    return best
+
+
+def is_compressible(content_type: str) -> bool:
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type in COMPRESSIBLE_TYPES
+        or media_type.endswith("+json")
+    )
+
+
+class CompressionStats:
+    """Thread-safe running totals of compression work and bytes saved"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        self.responses = 0
+        self.compressed = 0
+        self.bytes_in = 0
+        self.bytes_out = 0
+        self.cache_hits = 0
+        self.by_encoding: Dict[str, int] = {}
+
+    def record(self, encoding: Optional[str], bytes_in: int = 0, bytes_out: int = 0,
+               cache_hit: bool = False) -> None:
+        with self._lock:
+            self.responses += 1
+            if encoding is None:
+                return
+            self.compressed += 1
+            self.bytes_in += bytes_in
+            self.bytes_out += bytes_out
+            self.by_encoding[encoding] = self.by_encoding.get(encoding, 0) + 1
+            if cache_hit:
+                self.cache_hits += 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "responses": self.responses,
+                "compressed": self.compressed,
+                "by_encoding": dict(self.by_encoding),
+                "cache_hits": self.cache_hits,
+                "bytes_in": self.bytes_in,
+                "bytes_out": self.bytes_out,
+                "bytes_saved": self.bytes_in - self.bytes_out,
+                "ratio": round(self.bytes_out / self.bytes_in, 4) if self.bytes_in else None,
+            }
+
+
+compression_stats = CompressionStats()
+
+
+class _CompressedBodyCache:
+    """Small LRU of compressed bodies keyed by (encoding, body digest)"""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Tuple[str, bytes], bytes]" = OrderedDict()
+
+    @staticmethod
+    def key(encoding: str, body: bytes) -> Tuple[str, bytes]:
+        return encoding, hashlib.blake2b(body, digest_size=16).digest()
+
+    def get(self, key: Tuple[str, bytes]) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: Tuple[str, bytes], value: bytes) -> None:
+        if self.max_entries <= 0:
+            return
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+
+class _Compressor:
+    """Incremental gzip/brotli encoder with a common interface"""
+
+    def __init__(self, encoding: str, gzip_level: int, brotli_quality: int):
+        self.encoding = encoding
+        if encoding == "br":
+            self._br = brotli.Compressor(quality=brotli_quality)
+        else:
+            self._zlib = zlib.compressobj(gzip_level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, data: bytes) -> bytes:
+        """Compress a chunk and flush it so the client can decode it now"""
+        if self.encoding == "br":
+            return self._br.process(data) + self._br.flush()
+        return self._zlib.compress(data) + self._zlib.flush(zlib.Z_SYNC_FLUSH)
+
+    def finish(self) -> bytes:
+        if self.encoding == "br":
+            return self._br.finish()
+        return self._zlib.flush(zlib.Z_FINISH)
+
+
+class CompressionMiddleware:
+    """Negotiated gzip/brotli compression with a size threshold"""
+
+    def __init__(self,
+                 app: ASGIApp,
+                 minimum_size: int = 1024,
+                 gzip_level: int = 6,
+                 brotli_quality: int = 4,
+                 precompressed_paths: Iterable[str] = ("/api/openapi.json",),
+                 cache_entries: int = 128):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.precompressed_paths = frozenset(precompressed_paths)
+        self.cache = _CompressedBodyCache(cache_entries)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding"))
+        responder = _CompressionResponder(self, scope, send, encoding)
+        await self.app(scope, receive, responder.send)
+
+    def compress(self, encoding: str, body: bytes) -> bytes:
+        if encoding == "br":
+            return brotli.compress(body, quality=self.brotli_quality)
+        return gzip.compress(body, compresslevel=self.gzip_level, mtime=0)
+
+
+class _CompressionResponder:
+    """Per-request send wrapper; holds response start until the body is seen"""
+
+    def __init__(self, middleware: CompressionMiddleware, scope: Scope, send: Send,
+                 encoding: Optional[str]):
+        self.middleware = middleware
+        self.scope = scope
+        self._send = send
+        self.encoding = encoding
+        self.start: Optional[Message] = None
+        self.passthrough = False
+        self.compressor: Optional[_Compressor] = None
+        self.bytes_in = 0
+        self.bytes_out = 0
+
+    def _skip(self, message: Message) -> bool:
+        """Decide from the route and response headers whether to leave the body alone"""
+        endpoint = self.scope.get("endpoint")
+        if getattr(endpoint, "__no_compression__", False):
+            return True
+        status_code = message["status"]
+        if status_code < 200 or status_code in _NO_BODY_STATUSES:
+            return True
+        headers = Headers(raw=message["headers"])
+        if "content-encoding" in headers:
+            return True
+        return not is_compressible(headers.get("content-type", ""))
+
+    def _cacheable(self) -> bool:
+        if self.scope.get("method") not in ("GET", "HEAD"):
+            return False
+        endpoint = self.scope.get("endpoint")
+        return (
+            self.scope.get("path") in self.middleware.precompressed_paths
+            or getattr(endpoint, "__cache_compressed__", False)
+        )
+
+    def _compressed_start(self, content_length: Optional[int]) -> Message:
+        headers = MutableHeaders(raw=self.start["headers"])
+        headers["Content-Encoding"] = self.encoding
+        headers.add_vary_header("Accept-Encoding")
+        if content_length is None:
+            del headers["Content-Length"]
+        else:
+            headers["Content-Length"] = str(content_length)
+        return self.start
+
+    async def send(self, message: Message) -> None:
+        message_type = message["type"]
+        if message_type == "http.response.start":
+            if self._skip(message):
+                self.passthrough = True
+            elif self.encoding is None:
+                # Compressible, so caches must still key on Accept-Encoding
+                MutableHeaders(raw=message["headers"]).add_vary_header("Accept-Encoding")
+                self.passthrough = True
+            if self.passthrough:
+                compression_stats.record(None)
+                await self._send(message)
+                return
+            self.start = message
+            return
+
+        if message_type != "http.response.body" or self.passthrough:
+            await self._send(message)
+            return
+
+        body = message.get("body", b"")
+        more_body = message.get("more_body", False)
+
+        if self.compressor is None and not more_body:
+            await self._send_whole(body)
+            return
+
+        # Streamed body
+        if self.compressor is None:
+            self.compressor = _Compressor(self.encoding, self.middleware.gzip_level,
+                                          self.middleware.brotli_quality)
+            await self._send(self._compressed_start(None))
+        self.bytes_in += len(body)
+        chunk = self.compressor.compress(body) if body else b""
+        if not more_body:
+            chunk += self.compressor.finish()
+        self.bytes_out += len(chunk)
+        await self._send({"type": "http.response.body", "body": chunk, "more_body": more_body})
+        if not more_body:
+            compression_stats.record(self.encoding, self.bytes_in, self.bytes_out)
+
+    async def _send_whole(self, body: bytes) -> None:
+        if len(body) < self.middleware.minimum_size:
+            compression_stats.record(None)
+            MutableHeaders(raw=self.start["headers"]).add_vary_header("Accept-Encoding")
+            await self._send(self.start)
+            await self._send({"type": "http.response.body", "body": body})
+            return
+
+        cache_hit = False
+        if self._cacheable():
+            key = self.middleware.cache.key(self.encoding, body)
+            compressed = self.middleware.cache.get(key)
+            cache_hit = compressed is not None
+            if compressed is None:
+                compressed = self.middleware.compress(self.encoding, body)
+                self.middleware.cache.put(key, compressed)
+        else:
+            compressed = self.middleware.compress(self.encoding, body)
+
+        compression_stats.record(self.encoding, len(body), len(compressed), cache_hit=cache_hit)
+        await self._send(self._compressed_start(len(compressed)))
+        await self._send({"type": "http.response.body", "body": compressed})
@@ -3,9 +3,11 @@ Contact form router for handling contact form submissions
 """
 from fastapi import APIRouter, HTTPException, BackgroundTasks, Request
 from pydantic import BaseModel, EmailStr, ValidationError
+from datetime import datetime, timezone
 import logging
 
 from app.services.email_service import email_service
+from app.services.email_templates import email_templates
 
 logger = logging.getLogger(__name__)
 
@@ -102,100 +104,29 @@ async def send_contact_email(contact_data: ContactFormData):
     try:
         # Email to ESAL team
         esal_email = "esalventuresltd@gmail.com"
-        subject = f"New Contact Form Submission from {contact_data.firstName} {contact_data.lastName}"
-        
-        # Create HTML email content
-        html_content = f"""
-        <!DOCTYPE html>
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                .header {{ background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 20px; text-align: center; border-radius: 8px 8px 0 0; }}
-                .content {{ padding: 20px; background-color: #f9f9f9; border-radius: 0 0 8px 8px; }}
-                .field {{ margin-bottom: 15px; }}
-                .label {{ font-weight: bold; color: #555; }}
-                .value {{ margin-top: 5px; padding: 10px; background-color: white; border-radius: 4px; border-left: 4px solid #667eea; }}
-                .message-box {{ background-color: white; padding: 15px; border-radius: 4px; border-left: 4px solid #764ba2; margin-top: 10px; }}
-                .footer {{ text-align: center; padding: 20px; color: #666; font-size: 14px; }}
-            </style>
-        </head>
-        <body>
-            <div class="container">
-                <div class="header">
-                    <h1>New Contact Form Submission</h1>
-                    <p>ESAL Platform Landing Page</p>
-                </div>
-                <div class="content">
-                    <div class="field">
-                        <div class="label">Contact Information:</div>
-                        <div class="value">
-                            <strong>Name:</strong> {contact_data.firstName} {contact_data.lastName}<br>
-                            <strong>Email:</strong> {contact_data.email}<br>
-                            <strong>Role:</strong> {contact_data.role}
-                        </div>
-                    </div>
-                    
-                    <div class="field">
-                        <div class="label">Message:</div>
-                        <div class="message-box">
-                            {contact_data.message.replace(chr(10), '<br>')}
-                        </div>
-                    </div>
-                    
-                    <div class="field">
-                        <div class="label">Submission Details:</div>
-                        <div class="value">
-                            <strong>Submitted:</strong> {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}<br>
-                            <strong>Source:</strong> ESAL Platform Landing Page
-                        </div>
-                    </div>
-                </div>
-                <div class="footer">
-                    <p>This message was sent from the ESAL Platform contact form.</p>
-                    <p>Please respond directly to: {contact_data.email}</p>
-                </div>
-            </div>
-        </body>
-        </html>
-        """
-        
-        # Create text email content
-        text_content = f"""
-        New Contact Form Submission - ESAL Platform
-        
-        Contact Information:
-        Name: {contact_data.firstName} {contact_data.lastName}
-        Email: {contact_data.email}
-        Role: {contact_data.role}
-        
-        Message:
-        {contact_data.message}
-        
-        Submission Details:
-        Submitted: {datetime.now().strftime('%Y-%m-%d %H:%M:%S UTC')}
-        Source: ESAL Platform Landing Page
-        
-        Please respond directly to: {contact_data.email}
-        """
+        subject, text_content, html_content = email_templates.render(
+            "contact",
+            first_name=contact_data.firstName,
+            last_name=contact_data.lastName,
+            email=contact_data.email,
+            role=contact_data.role,
+            message=contact_data.message,
+            submitted_at=datetime.now(timezone.utc).strftime('%Y-%m-%d %H:%M:%S UTC')
+        )
         
         # Send email to ESAL team
         success = await email_service._send_email(
             esal_email,
             subject,
             text_content,
-            html_content
+            html_content,
+            reply_to=contact_data.email
         )
         
         if success:
-            logger.info(f"Contact form email sent successfully to {esal_email}")
+            logger.info(f"Contact form email queued for {esal_email}")
         else:
             logger.error(f"Failed to send contact form email to {esal_email}")
             
     except Exception as e:
         logger.error(f"Error sending contact form email: {e}")
-
-
-# Import datetime here to avoid circular import
-from datetime import datetime
@@ -0,0 +1,157 @@
+"""
+Files router - direct-to-storage uploads and signed download URLs
+
+File bytes go straight between the client and Supabase Storage:
+
+1. POST /upload-intents          -> signed upload URL + intent token
+2. PUT the file to upload_url    (Supabase Storage, not this API)
+3. POST /upload-intents/confirm  -> registers the files row / avatar (once)
+
+POST /signed-urls returns short-lived download URLs for a batch of files.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from postgrest.exceptions import APIError
+import logging
+
+from app.config import settings
+from app.schemas import (
+    UserResponse, UploadIntentRequest, UploadIntentResponse, UploadConfirmRequest,
+    SignedUrlsRequest, SignedUrlsResponse
+)
+from app.utils.jwt import get_current_user
+from app.services.supabase_files import SupabaseFileService
+from app.services.supabase_profiles import SupabaseProfileService
+from app.services.upload_intents import UploadIntentService
+from app.services.avatar_images import avatar_variants
+
+router = APIRouter()
+logger = logging.getLogger(__name__)
+
+# Postgres error code of the files(file_path) uniqueness check
+UNIQUE_VIOLATION = "23505"
+
+# Roles allowed to upload into each bucket (None: any authenticated user)
+BUCKET_ROLES = {
+    "idea-files": {"innovator"},
+    "avatars": None,
+}
+
+# Bounds for requested signed URL lifetimes
+MIN_SIGNED_URL_SECONDS = 60
+MAX_SIGNED_URL_SECONDS = 24 * 3600
+
+
+def _check_bucket_role(bucket: str, user: UserResponse) -> None:
+    roles = BUCKET_ROLES.get(bucket)
+    if roles is not None and user.role not in roles:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN,
+            detail=f"Uploads to {bucket} are not allowed for role {user.role}"
+        )
+
+
+@router.post("/upload-intents", response_model=UploadIntentResponse)
+async def create_upload_intent(
+    intent_request: UploadIntentRequest,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Issue a signed URL for uploading one file directly to storage"""
+    try:
+        file_service = SupabaseFileService()
+        intents = UploadIntentService(file_service.supabase)
+        intents.policy(intent_request.bucket)
+        _check_bucket_role(intent_request.bucket, current_user)
+
+        return await intents.create_intent(
+            user_id=current_user.id,
+            bucket=intent_request.bucket,
+            filename=intent_request.filename,
+            size=intent_request.size,
+            content_type=intent_request.content_type,
+            idea_id=intent_request.idea_id,
+            description=intent_request.description
+        )
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating upload intent: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to create upload intent"
+        )
+
+
+@router.post("/upload-intents/confirm")
+async def confirm_upload(
+    confirm_request: UploadConfirmRequest,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Register a file uploaded through an intent (files row or avatar)"""
+    try:
+        file_service = SupabaseFileService()
+        upload = await UploadIntentService(file_service.supabase).confirm(
+            current_user.id, confirm_request.intent
+        )
+
+        if upload.bucket == "avatars":
+            avatar_url = await SupabaseProfileService().avatar_from_upload(current_user.id, upload.path)
+            return {
+                "message": "Avatar uploaded successfully",
+                "avatar_url": avatar_url,
+                "avatar_variants": avatar_variants(avatar_url)
+            }
+
+        # Confirming is single-use: a repeated confirm (a retry, or a replayed
+        # token) returns the row registered the first time
+        file_record = await file_service.get_file_by_path(current_user.id, upload.path, upload.bucket)
+        if file_record is not None:
+            return {
+                "message": "File already uploaded",
+                "file": file_record
+            }
+        try:
+            file_record = await file_service.register_file(
+                user_id=current_user.id,
+                filename=upload.filename,
+                file_path=upload.path,
+                file_size=upload.size,
+                content_type=upload.content_type,
+                bucket_name=upload.bucket,
+                idea_id=upload.idea_id,
+                description=upload.description
+            )
+        except APIError as e:
+            # A concurrent confirm of the same intent registered it first
+            if e.code != UNIQUE_VIOLATION:
+                raise
+            file_record = await file_service.get_file_by_path(current_user.id, upload.path, upload.bucket)
+        return {
+            "message": "File uploaded successfully",
+            "file": file_record
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error confirming upload: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to confirm upload"
+        )
+
+
+@router.post("/signed-urls", response_model=SignedUrlsResponse)
+async def get_signed_urls(
+    urls_request: SignedUrlsRequest,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Short-lived download URLs for a batch of the current user's files"""
+    expires_in = urls_request.expires_in or settings.SIGNED_URL_TTL_SECONDS
+    expires_in = max(MIN_SIGNED_URL_SECONDS, min(expires_in, MAX_SIGNED_URL_SECONDS))
+
+    file_service = SupabaseFileService()
+    urls = await file_service.get_signed_urls(
+        current_user.id,
+        list(dict.fromkeys(urls_request.file_ids)),
+        expires_in
+    )
+    return {"urls": urls}
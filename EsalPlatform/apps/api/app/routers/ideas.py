@@ -1,7 +1,7 @@
 """
 Ideas router - Metrics and analytics for ideas
 """
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Form, Request, Response
 from typing import List, Dict, Any, Optional
 from datetime import datetime, timedelta
 from pydantic import BaseModel
@@ -9,6 +9,10 @@ from pydantic import BaseModel
 # Import from the direct schemas.py module instead of the package
 import app.schemas as schemas
 from app.utils.roles import require_role
+from app.utils.fast_json import FastJSONResponse
+from app.utils.conditional import (
+    make_etag, rows_etag, parse_timestamp, is_not_modified, not_modified_response, set_validators
+)
 
 router = APIRouter()
 
@@ -45,28 +49,13 @@ async def get_ideas_metrics(
     
     try:
         # Import Supabase service
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_METRICS
         
         # Initialize service
         ideas_service = SupabaseIdeasService()
         
-        # Get real user ideas from database
-        user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        
-        # Transform data to match frontend expectations
-        metrics_data = []
-        for idea in user_ideas:
-            metrics_data.append({
-                "id": str(idea.get("id", "")),
-                "title": idea.get("title", "Untitled Idea"),
-                "views": idea.get("view_count", 0),
-                "interests": idea.get("interest_count", 0),
-                "ai_score": idea.get("ai_score", None),  # May be None if not calculated yet
-                "status": idea.get("status", "draft"),
-                "created_at": idea.get("created_at", datetime.now().isoformat())
-            })
-        
-        return metrics_data
+        # Fetch only the metric columns, already in the frontend shape
+        return await ideas_service.get_user_ideas(current_user.id, projection=IDEA_METRICS)
         
     except Exception as e:
         # Log error but don't expose internal details
@@ -91,33 +80,29 @@ async def get_ideas_analytics(
         # Initialize service
         ideas_service = SupabaseIdeasService()
         
-        # Get real user ideas from database
-        user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        
-        # Calculate real statistics
-        total_ideas = len(user_ideas)
-        active_ideas = len([idea for idea in user_ideas if idea.get("status") in ["active", "published"]])
-        draft_ideas = len([idea for idea in user_ideas if idea.get("status") == "draft"])
-        total_views = sum(idea.get("view_count", 0) for idea in user_ideas)
-        total_interests = sum(idea.get("interest_count", 0) for idea in user_ideas)
+        # Precomputed per-user summary - one row however many ideas
+        stats = await ideas_service.get_user_stats(current_user.id)
         
-        # Calculate average AI score (only for ideas that have scores)
-        ideas_with_scores = [idea for idea in user_ideas if idea.get("ai_score") is not None]
         avg_ai_score = (
-            sum(idea.get("ai_score", 0) for idea in ideas_with_scores) / len(ideas_with_scores)
-            if ideas_with_scores else 0
+            stats["ai_score_sum"] / stats["ai_score_count"]
+            if stats["ai_score_count"] else 0
         )
         
-        # Find top performing ideas
-        most_viewed = max(user_ideas, key=lambda x: x.get("view_count", 0)) if user_ideas else None
-        most_interested = max(user_ideas, key=lambda x: x.get("interest_count", 0)) if user_ideas else None
-        highest_score = max(ideas_with_scores, key=lambda x: x.get("ai_score", 0)) if ideas_with_scores else None
-        
-        # Count categories (map to existing categories)
-        category_counts = {}
-        for idea in user_ideas:
-            category = idea.get("category") or "technology"  # Default to technology
-            category_counts[category] = category_counts.get(category, 0) + 1
+        # Resolve the top performing ideas with a single multi-get
+        top_ids = [
+            stats["most_viewed_id"],
+            stats["most_interested_id"],
+            stats["highest_score_id"]
+        ]
+        top_ideas = await ideas_service.get_ideas_by_ids(
+            [idea_id for idea_id in top_ids if idea_id is not None],
+            columns="title, view_count, interest_count, ai_score",
+            user_id=current_user.id
+        )
+        top_by_id = {str(idea["id"]): idea for idea in top_ideas}
+        most_viewed = top_by_id.get(str(stats["most_viewed_id"]))
+        most_interested = top_by_id.get(str(stats["most_interested_id"]))
+        highest_score = top_by_id.get(str(stats["highest_score_id"]))
         
         # Generate trend data (for now, return empty arrays - can be enhanced later with real time-series data)
         performance_trends = {
@@ -127,11 +112,11 @@ async def get_ideas_analytics(
         
         return {
             "overview": {
-                "total_ideas": total_ideas,
-                "active_ideas": active_ideas,
-                "draft_ideas": draft_ideas,
-                "total_views": total_views,
-                "total_interests": total_interests,
+                "total_ideas": stats["total_ideas"],
+                "active_ideas": stats["active_ideas"],
+                "draft_ideas": stats["draft_ideas"],
+                "total_views": stats["total_views"],
+                "total_interests": stats["total_interests"],
                 "avg_ai_score": round(avg_ai_score, 2)
             },
             "performance_trends": performance_trends,
@@ -152,7 +137,7 @@ async def get_ideas_analytics(
                     "ai_score": highest_score.get("ai_score", 0)
                 } if highest_score else None
             },
-            "categories": category_counts
+            "categories": stats["category_counts"]
         }
         
     except Exception as e:
@@ -186,48 +171,40 @@ async def get_ideas_analytics(
 
 @router.get("/list", response_model=List[Dict[str, Any]])
 async def get_all_ideas(
+    request: Request,
     status: Optional[str] = None,
     industry: Optional[str] = None,
     current_user: schemas.UserResponse = Depends(require_role("innovator"))
 ) -> List[Dict[str, Any]]:
-    """Get all ideas for the current user with filters using real database data"""
+    """Get all ideas for the current user with filters using real database data
+    
+    Supports If-None-Match: an unchanged list is answered with 304.
+    """
     
     try:
         # Import Supabase service
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_ROW, IDEA_VERSION_FIELDS
         
         # Initialize service
         ideas_service = SupabaseIdeasService()
         
-        # Get real user ideas from database
-        user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        
-        # Transform data to match frontend expectations and apply filters
-        ideas_list = []
-        for idea in user_ideas:
-            # Apply status filter
-            if status and idea.get("status") != status:
-                continue
-                
-            # Apply industry filter (checking category field)
-            if industry and idea.get("category", "").lower() != industry.lower():
-                continue
-            
-            # Transform idea data
-            ideas_list.append({
-                "id": str(idea.get("id", "")),
-                "title": idea.get("title", "Untitled Idea"),
-                "description": idea.get("description", ""),
-                "industry": idea.get("category", "Technology"),  # Map category to industry
-                "stage": "idea",  # Default stage since not in current schema
-                "status": idea.get("status", "draft"),
-                "created_at": idea.get("created_at", datetime.now().isoformat()),
-                "updated_at": idea.get("updated_at", datetime.now().isoformat()),
-                "views_count": idea.get("view_count", 0),
-                "interests_count": idea.get("interest_count", 0)
-            })
+        # Filters are applied by the database; rows come back in the list shape
+        ideas = await ideas_service.get_user_ideas(
+            current_user.id,
+            projection=IDEA_ROW,
+            status_filter=status,
+            category=industry
+        )
+        
+        etag = rows_etag(ideas, *IDEA_VERSION_FIELDS, extra=current_user.id)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
         
-        return ideas_list
+        # Rows are plain dicts already in the response shape: encode them
+        # directly instead of through the generic response-model path
+        response = FastJSONResponse(ideas)
+        set_validators(response, etag)
+        return response
         
     except Exception as e:
         # Log error but don't expose internal details
@@ -242,13 +219,18 @@ async def get_all_ideas(
 @router.get("/{idea_id}")
 async def get_idea_details(
     idea_id: str,
+    request: Request,
+    response: Response,
     current_user: schemas.UserResponse = Depends(require_role("innovator"))
 ):
-    """Get detailed information about a specific idea using real database data"""
+    """Get detailed information about a specific idea using real database data
+    
+    Supports If-None-Match and If-Modified-Since.
+    """
     
     try:
         # Import Supabase service
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_DETAIL_COLUMNS
         import logging
         
         logger = logging.getLogger(__name__)
@@ -257,16 +239,8 @@ async def get_idea_details(
         # Initialize service
         ideas_service = SupabaseIdeasService()
         
-        # Get real user ideas from database
-        user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        logger.debug(f"Retrieved {len(user_ideas)} ideas for user")
-        
-        # Find the specific idea
-        idea = None
-        for user_idea in user_ideas:
-            if str(user_idea.get("id")) == idea_id:
-                idea = user_idea
-                break
+        # Point lookup on the primary key, restricted to the user's own ideas
+        idea = await ideas_service.get_idea_by_id(idea_id, current_user.id, columns=IDEA_DETAIL_COLUMNS)
         
         if not idea:
             logger.warning(f"Idea with ID {idea_id} not found for user {current_user.id}")
@@ -277,6 +251,15 @@ async def get_idea_details(
         
         logger.debug(f"Found idea: {idea.get('title', 'Unknown')} with data keys: {list(idea.keys())}")
         
+        author_name = getattr(current_user, 'full_name', getattr(current_user, 'name', 'Unknown User'))
+        etag = make_etag(
+            idea.get("id"), idea.get("updated_at"), idea.get("view_count"), idea.get("interest_count"), author_name
+        )
+        last_modified = parse_timestamp(idea.get("updated_at"))
+        if is_not_modified(request, etag, last_modified):
+            return not_modified_response(etag, last_modified)
+        set_validators(response, etag, last_modified)
+        
         # Transform idea data to match frontend expectations with manual validation
         try:
             idea_details = {
@@ -297,7 +280,7 @@ async def get_idea_details(
                 "views_count": idea.get("view_count", idea.get("views_count", 0)),
                 "interests_count": idea.get("interest_count", idea.get("interests_count", 0)),
                 "user_id": str(current_user.id),
-                "author_name": getattr(current_user, 'full_name', getattr(current_user, 'name', 'Unknown User')),
+                "author_name": author_name,
                 "comments": [],  # TODO: Implement real comments from database
                 "files": [],     # TODO: Implement real files from database
                 "similar_ideas": []  # TODO: Implement real similar ideas logic
@@ -425,20 +408,15 @@ async def update_idea(
     
     try:
         # Import Supabase service
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_OWNER_COLUMNS
         
         # Initialize service
         ideas_service = SupabaseIdeasService()
         
-        # Get user ideas to verify ownership
-        user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        
-        # Check if idea exists and belongs to current user
-        idea_exists = False
-        for idea in user_ideas:
-            if str(idea.get("id")) == idea_id:
-                idea_exists = True
-                break
+        # Verify ownership with a point lookup
+        idea_exists = await ideas_service.get_idea_by_id(
+            idea_id, current_user.id, columns=IDEA_OWNER_COLUMNS
+        ) is not None
         
         if not idea_exists:
             raise HTTPException(
@@ -494,20 +472,15 @@ async def delete_idea(
     
     try:
         # Import Supabase service
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_OWNER_COLUMNS
         
         # Initialize service
         ideas_service = SupabaseIdeasService()
         
-        # Get user ideas to verify ownership
-        user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        
-        # Check if idea exists and belongs to current user
-        idea_exists = False
-        for idea in user_ideas:
-            if str(idea.get("id")) == idea_id:
-                idea_exists = True
-                break
+        # Verify ownership with a point lookup
+        idea_exists = await ideas_service.get_idea_by_id(
+            idea_id, current_user.id, columns=IDEA_OWNER_COLUMNS
+        ) is not None
         
         if not idea_exists:
             raise HTTPException(
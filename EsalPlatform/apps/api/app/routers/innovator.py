@@ -1,11 +1,12 @@
 """
 Innovator router - Supabase + AI integration
 """
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Header, Query, Request
 from fastapi.security import HTTPBearer
 from sqlalchemy.orm import Session
 from typing import List, Optional
 import logging
+from pydantic import ValidationError
 from datetime import datetime
 
 from app.config import settings
@@ -16,11 +17,15 @@ from app.schemas import (
 )
 from app.utils.jwt import get_current_user
 from app.utils.roles import require_role
+from app.utils.conditional import rows_etag, is_not_modified, not_modified_response, set_validators
+from app.utils.fast_json import IDEA_RESPONSES, adapter_response
 
 # Import Supabase services
-from app.services.supabase_ideas import SupabaseIdeasService
+from app.services.supabase_ideas import SupabaseIdeasService, IDEA_VERSION_FIELDS
 from app.services.supabase_files import SupabaseFileService
 from app.services.supabase_profiles import SupabaseProfileService
+from app.services.avatar_images import avatar_variants
+from app.services.storage_uploads import iter_request_body
 
 # Only import database dependencies if local DB is enabled
 if settings.USE_LOCAL_DB:
@@ -113,51 +118,39 @@ async def delete_idea(
 
 @router.get("/view-ideas")
 async def view_ideas(
+    request: Request,
     current_user: UserResponse = Depends(require_role("innovator"))
 ):
-    """Get all ideas for the current user"""
+    """Get all ideas for the current user
+    
+    Supports If-None-Match: an unchanged list is answered with 304.
+    """
     try:
         ideas_service = SupabaseIdeasService()
         ideas = await ideas_service.get_user_ideas(current_user.id)
         
-        # Log the data structure for debugging
+        etag = rows_etag(ideas, *IDEA_VERSION_FIELDS, extra=current_user.id)
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        
         logger.info(f"Successfully fetched {len(ideas)} ideas for user {current_user.id}")
-        if ideas:
-            logger.debug(f"Sample idea structure: {ideas[0]}")
         
-        # Validate each idea against the schema manually to catch validation errors
-        validated_ideas = []
-        for i, idea in enumerate(ideas):
-            try:
-                # Ensure all required fields are present with defaults
-                validated_idea = {
-                    "id": str(idea.get("id", "")),
-                    "title": idea.get("title", "Untitled"),
-                    "description": idea.get("description", ""),
-                    "industry": idea.get("industry", idea.get("category", "Other")),  # Use industry first, fallback to category
-                    "stage": idea.get("stage", "idea"),
-                    "status": idea.get("status", "draft"),
-                    "created_at": idea.get("created_at", ""),
-                    "updated_at": idea.get("updated_at", ""),
-                    "views_count": idea.get("views_count", 0),
-                    "interests_count": idea.get("interests_count", 0),
-                    "user_id": str(idea.get("user_id", current_user.id)),
-                    "ai_score": idea.get("ai_score"),
-                    # Optional fields
-                    "target_market": idea.get("target_market", ""),
-                    "problem": idea.get("problem", ""),
-                    "solution": idea.get("solution", ""),
-                    "category": idea.get("category", ""),
-                    "tags": idea.get("tags", []),
-                    "visibility": idea.get("visibility", "private")
-                }
-                validated_ideas.append(validated_idea)
-            except Exception as validation_error:
-                logger.error(f"Validation error for idea {i}: {validation_error}")
-                logger.error(f"Problematic idea data: {idea}")
-                continue
+        # Rows are already in the IdeaResponse shape; validate them in one
+        # pass and skip only the rows that fail
+        try:
+            validated_ideas = IDEA_RESPONSES.validate_python(ideas)
+        except ValidationError:
+            validated_ideas = []
+            for i, idea in enumerate(ideas):
+                try:
+                    validated_ideas.append(IdeaResponse.model_validate(idea))
+                except ValidationError as validation_error:
+                    logger.error(f"Validation error for idea {i}: {validation_error}")
+                    logger.error(f"Problematic idea data: {idea}")
         
-        return validated_ideas
+        response = adapter_response(IDEA_RESPONSES, validated_ideas)
+        set_validators(response, etag)
+        return response
     except Exception as e:
         logger.error(f"Error fetching user ideas: {str(e)}", exc_info=True)
         raise HTTPException(
@@ -230,9 +223,14 @@ async def upload_file(
     file: UploadFile = File(...),
     idea_id: Optional[int] = Form(None),
     description: Optional[str] = Form(None),
+    sha256: Optional[str] = Form(None),
     current_user: UserResponse = Depends(require_role("innovator"))
 ):
-    """Upload a file and optionally associate it with an idea"""
+    """Upload a file and optionally associate it with an idea
+    
+    sha256 (optional) is the hex SHA-256 of the file; if the same content
+    was uploaded before, the new file references it without storing it again.
+    """
     try:
         file_service = SupabaseFileService()
         
@@ -243,13 +241,16 @@ async def upload_file(
             bucket_name="idea-files",  # Use the idea-files bucket
             folder="ideas",
             idea_id=idea_id,
-            description=description
+            description=description,
+            sha256=sha256
         )
         
         return {
             "message": "File uploaded successfully",
             "file": file_record
         }    
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading file: {str(e)}")
         raise HTTPException(
@@ -258,6 +259,54 @@ async def upload_file(
         )
 
 
+@router.put("/upload-file/stream")
+async def upload_file_stream(
+    request: Request,
+    filename: str = Query(..., min_length=1, max_length=255),
+    idea_id: Optional[int] = None,
+    description: Optional[str] = None,
+    content_sha256: Optional[str] = Header(None, alias="X-Content-SHA256"),
+    current_user: UserResponse = Depends(require_role("innovator"))
+):
+    """Upload a large file sent as the raw request body
+    
+    The body is streamed to storage as it arrives (no multipart spooling),
+    so pitch decks and videos up to MAX_FILE_UPLOAD_MB are accepted with
+    constant memory. Send Content-Type and Content-Length as usual, and
+    X-Content-SHA256 to skip the body entirely when the content is already
+    stored.
+    """
+    try:
+        file_service = SupabaseFileService()
+        content_length = request.headers.get("content-length")
+        
+        file_record = await file_service.upload_stream(
+            user_id=current_user.id,
+            chunks=iter_request_body(request),
+            filename=filename,
+            content_type=request.headers.get("content-type"),
+            size_hint=int(content_length) if content_length and content_length.isdigit() else None,
+            bucket_name="idea-files",
+            folder="ideas",
+            idea_id=idea_id,
+            description=description,
+            sha256=content_sha256
+        )
+        
+        return {
+            "message": "File uploaded successfully",
+            "file": file_record
+        }
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error streaming file upload: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=str(e)
+        )
+
+
 @router.get("/files")
 async def get_user_files(
     current_user: UserResponse = Depends(require_role("innovator"))
@@ -342,6 +391,7 @@ async def get_profile(
             "github_url": profile.get("github_url"),
             "phone": profile.get("phone"),
             "avatar_url": profile.get("avatar_url"),
+            "avatar_variants": profile.get("avatar_variants"),
             "experience_years": profile.get("experience_years", 0),
             "education": profile.get("education"),            "total_ideas": 0,  # Will be populated by frontend from dashboard
             "total_views": 0,
@@ -395,20 +445,19 @@ async def upload_avatar(
         logger.info(f"Token extracted: {token_str[:20]}...")
         profile_service = SupabaseProfileService(user_token=token_str)
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Upload avatar
+        # Upload avatar (streamed to storage in chunks)
         avatar_url = await profile_service.upload_avatar(
             user_id=current_user.id,
-            file_content=file_content,
-            filename=file.filename
+            file=file
         )
         
         return {
             "message": "Avatar uploaded successfully",
-            "avatar_url": avatar_url
+            "avatar_url": avatar_url,
+            "avatar_variants": avatar_variants(avatar_url)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading avatar: {str(e)}")
         raise HTTPException(
@@ -421,13 +470,19 @@ async def upload_avatar(
 @router.get("/search-ideas")
 async def search_ideas(
     q: str,
+    limit: int = Query(20, ge=1, le=50),
+    cursor: Optional[str] = None,
     current_user: UserResponse = Depends(require_role("innovator"))
 ):
-    """Search ideas by title and description"""
+    """Ranked full-text search over published ideas"""
     try:
         ideas_service = SupabaseIdeasService()
-        ideas = await ideas_service.search_ideas(q, current_user.id)
-        return {"ideas": ideas}
+        results = await ideas_service.search_ideas(q, limit=limit, cursor=cursor)
+        return {
+            "ideas": results["ideas"],
+            "next_cursor": results["next_cursor"],
+            "has_more": results["next_cursor"] is not None
+        }
     except Exception as e:
         logger.error(f"Error searching ideas: {str(e)}")
         raise HTTPException(
@@ -1,7 +1,7 @@
 """
 Investor router - Auth-protected API endpoints
 """
-from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query
+from fastapi import APIRouter, Depends, HTTPException, status, File, UploadFile, Query, Request, Response
 from fastapi.security import HTTPBearer
 from typing import Optional, List
 import logging
@@ -11,7 +11,11 @@ from app.schemas import (
     StartupMatch, InvestorPreferences, MatchingHistory, MatchingStatistics
 )
 from app.utils.roles import require_role
+from app.utils.fast_json import AI_MATCHING_RESPONSE, adapter_response
+from app.utils.conditional import rows_etag, is_not_modified, not_modified_response, set_validators
+from app.utils.projection import Projection, Field, Const, as_str, or_zero
 from app.services.supabase_profiles import SupabaseProfileService
+from app.services.avatar_images import avatar_variants
 from app.services.investor_matching import InvestorMatchingService
 from app.services.investor_preferences import InvestorPreferencesService
 
@@ -19,6 +23,25 @@ router = APIRouter()
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
+# Browse response cards, built from the service's IdeaRecords
+STARTUP_CARD = Projection("startup_card", {
+    "id": Field("id", "", as_str),
+    "title": "title",
+    "description": "description",
+    "industry": Field("category", "Technology"),
+    "stage": Field("stage", "Ideation"),
+    "target_market": Field("target_market", ""),
+    "problem": Field("problem", ""),
+    "solution": Field("solution", ""),
+    "funding_needed": Const(""),  # TODO: Add funding_needed field
+    "team_size": Const(1),  # TODO: Add team_size field
+    "created_at": "created_at",
+    "views_count": Field("view_count", 0, or_zero),
+    "interests_count": Field("interest_count", 0, or_zero),
+    "innovator_id": Field("user_id", "", as_str),
+    "ai_score": "ai_score",
+})
+
 
 @router.get("/dashboard", response_model=InvestorDashboard)
 async def investor_dashboard(
@@ -97,6 +120,7 @@ async def get_profile(
             "github_url": profile.get("github_url"),
             "phone": profile.get("phone"),
             "avatar_url": profile.get("avatar_url"),
+            "avatar_variants": profile.get("avatar_variants"),
             "experience_years": profile.get("experience_years", 0),
             "education": profile.get("education"),
             "total_ideas": 0,  # Investors don't have ideas
@@ -151,20 +175,19 @@ async def upload_avatar(
         logger.info(f"Token extracted: {token_str[:20]}...")
         profile_service = SupabaseProfileService(user_token=token_str)
         
-        # Read file content
-        file_content = await file.read()
-        
-        # Upload avatar
+        # Upload avatar (streamed to storage in chunks)
         avatar_url = await profile_service.upload_avatar(
             user_id=current_user.id,
-            file_content=file_content,
-            filename=file.filename
+            file=file
         )
         
         return {
             "message": "Avatar uploaded successfully",
-            "avatar_url": avatar_url
+            "avatar_url": avatar_url,
+            "avatar_variants": avatar_variants(avatar_url)
         }
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error uploading investor avatar: {str(e)}")
         raise HTTPException(
@@ -233,7 +256,7 @@ async def ai_matching(
         )
         
         logger.info(f"AI matching completed: {len(matches)} matches found in {processing_time:.2f}s")
-        return response
+        return adapter_response(AI_MATCHING_RESPONSE, response)
         
     except Exception as e:
         logger.error(f"Error in AI matching: {e}")
@@ -245,72 +268,62 @@ async def ai_matching(
 
 @router.get("/browse-startups")
 async def browse_startups(
+    request: Request,
+    response: Response,
     industry: Optional[str] = None,
     stage: Optional[str] = None,
-    limit: Optional[int] = 20,
-    offset: Optional[int] = 0,
+    status_filter: Optional[str] = Query(None, alias="status"),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: UserResponse = Depends(require_role("investor"))
 ):
-    """Browse public startup ideas with filtering options"""
+    """Browse public startup ideas with filtering options
+    
+    Pass the returned `next_cursor` back as `cursor` to fetch the next page.
+    Supports If-None-Match: an unchanged page is answered with 304.
+    """
     try:
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_VERSION_FIELDS
         
         logger.info(f"Browsing startups for investor {current_user.id}")
         
         # Initialize the ideas service
         ideas_service = SupabaseIdeasService()
         
-        # Get public startup ideas
-        public_ideas = await ideas_service.get_ideas_list(
-            user_id=None,  # Get all public ideas, not user-specific
-            visibility_filter="public",
-            limit=limit + offset if limit else None
-        )
+        # Filters and paging are applied by the database
+        try:
+            page = await ideas_service.browse_public_ideas(
+                industry=industry,
+                stage=stage,
+                status_filter=status_filter,
+                limit=limit,
+                cursor=cursor
+            )
+        except ValueError as e:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=str(e)
+            )
         
-        # Apply filters
-        filtered_ideas = []
-        for idea in public_ideas:
-            # Industry filter
-            if industry and idea.get('category', '').lower() != industry.lower():
-                continue
-            
-            # Stage filter (if we add stage field later)
-            if stage and idea.get('stage', '').lower() != stage.lower():
-                continue
-                
-            filtered_ideas.append(idea)
-        
-        # Apply pagination
-        paginated_ideas = filtered_ideas[offset:offset + limit] if limit else filtered_ideas
+        # Public pages are the same for every investor
+        etag = rows_etag(page["ideas"], *IDEA_VERSION_FIELDS, extra=(page["total"], page["next_cursor"], limit))
+        if is_not_modified(request, etag):
+            return not_modified_response(etag)
+        set_validators(response, etag)
         
         # Transform for frontend
-        startup_list = []
-        for idea in paginated_ideas:
-            startup_list.append({
-                "id": idea.get("id"),
-                "title": idea.get("title"),
-                "description": idea.get("description"),
-                "industry": idea.get("category", "Technology"),
-                "stage": idea.get("stage", "Ideation"),
-                "target_market": idea.get("target_market", ""),
-                "problem": idea.get("problem", ""),
-                "solution": idea.get("solution", ""),
-                "funding_needed": "",  # TODO: Add funding_needed field
-                "team_size": 1,  # TODO: Add team_size field
-                "created_at": idea.get("created_at"),
-                "views_count": idea.get("views_count", 0),
-                "interests_count": idea.get("interests_count", 0),
-                "innovator_id": idea.get("user_id"),
-                "ai_score": idea.get("ai_score")
-            })
+        startup_list = STARTUP_CARD.map(page["ideas"])
         
         return {
             "startups": startup_list,
-            "total": len(filtered_ideas),
-            "offset": offset,
-            "limit": limit
+            "total": page["total"],
+            "limit": limit,
+            "next_cursor": page["next_cursor"],
+            "has_more": page["next_cursor"] is not None
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Error browsing startups: {e}")
         raise HTTPException(
@@ -333,18 +346,8 @@ async def get_startup_details(
         # Initialize the ideas service
         ideas_service = SupabaseIdeasService()
         
-        # Get all public ideas to find the specific one
-        public_ideas = await ideas_service.get_ideas_list(
-            user_id=None,
-            visibility_filter="public"
-        )
-        
-        # Find the specific startup
-        startup = None
-        for idea in public_ideas:
-            if str(idea.get("id")) == startup_id:
-                startup = idea
-                break
+        # Point lookup on the primary key, restricted to public ideas
+        startup = await ideas_service.get_public_idea_by_id(startup_id)
         
         if not startup:
             raise HTTPException(
@@ -352,7 +355,7 @@ async def get_startup_details(
                 detail="Startup not found or not public"
             )
         
-        # Increment view count
+        # Increment view count (buffered, flushed in batches)
         await ideas_service.increment_view_count(startup_id)
         
         # Get innovator profile information (if available)
@@ -365,11 +368,11 @@ async def get_startup_details(
         }
         
         startup_details = {
-            "id": startup.get("id"),
+            "id": str(startup.get("id")),
             "title": startup.get("title"),
             "description": startup.get("description"),
             "industry": startup.get("category", "Technology"),
-            "stage": startup.get("stage", "Ideation"),
+            "stage": "idea",  # Default stage since not in DB schema
             "target_market": startup.get("target_market", ""),
             "problem": startup.get("problem", ""),
             "solution": startup.get("solution", ""),
@@ -377,8 +380,8 @@ async def get_startup_details(
             "team_size": 1,  # TODO: Add team_size field
             "created_at": startup.get("created_at"),
             "updated_at": startup.get("updated_at"),
-            "views_count": startup.get("views_count", 0) + 1,  # Include the increment
-            "interests_count": startup.get("interests_count", 0),
+            "views_count": (startup.get("view_count") or 0) + 1,  # Include the increment
+            "interests_count": startup.get("interest_count") or 0,
             "ai_score": startup.get("ai_score"),
             "tags": startup.get("tags", []),
             "innovator": innovator_info,
@@ -582,20 +585,14 @@ async def express_interest_enhanced(
             )
         
         # Get startup details to find owner
-        from app.services.supabase_ideas import SupabaseIdeasService
+        from app.services.supabase_ideas import SupabaseIdeasService, IDEA_OWNER_COLUMNS
         ideas_service = SupabaseIdeasService()
         
-        public_ideas = await ideas_service.get_ideas_list(
-            user_id=None,
-            visibility_filter="public"
+        startup = await ideas_service.get_public_idea_by_id(
+            str(startup_id),
+            columns=IDEA_OWNER_COLUMNS
         )
         
-        startup = None
-        for idea in public_ideas:
-            if str(idea.get("id")) == str(startup_id):
-                startup = idea
-                break
-        
         if not startup:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
@@ -606,10 +603,12 @@ async def express_interest_enhanced(
         result = await preferences_service.express_interest(
             investor_user_id=current_user.id,
             startup_idea_id=int(startup_id),
-            startup_owner_user_id=startup["user_id"],
+            startup_owner_user_id=str(startup["user_id"]),
             message=message
         )
         
+        await ideas_service.increment_interest_count(startup_id)
+        
         logger.info(f"Investor {current_user.id} expressed interest in startup {startup_id}")
         
         return {
@@ -1,20 +1,24 @@
 """
 User management router - Profile and account management
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
 from typing import Dict, Any
 import logging
 from datetime import datetime
 
+from app.config import settings
 from app.schemas import (
-    UserResponse, NotificationSettings, UserSettings, UserDataExport
+    UserResponse, NotificationSettings, UserSettings
 )
 from app.schemas import (
     ChangePasswordRequest, Enable2FARequest, Verify2FARequest, SessionInfo
 )
 from app.utils.jwt import get_current_user
+from app.middleware.compression import no_compression
 from app.services.auth_supabase import SupabaseAuthService
-from app.services.supabase_profiles import SupabaseProfileService
+from app.services.data_export import DataExportService
+from app.services.storage_uploads import MB
 
 router = APIRouter()
 logger = logging.getLogger(__name__)
@@ -176,147 +180,125 @@ async def get_settings(
         )
 
 
+async def _load_export_manifest(current_user: UserResponse):
+    """Export service and the user's manifest (profile, files, settings)"""
+    from app.services.supabase_files import SupabaseFileService
+    
+    user_data = await SupabaseAuthService().get_user_by_id(current_user.id)
+    export_service = DataExportService(SupabaseFileService().supabase)
+    manifest = await export_service.load_manifest(
+        current_user.id,
+        current_user.email,
+        user_data.get("user_settings", {}) if user_data else {}
+    )
+    return export_service, manifest
+
+
 @router.get("/export")
+@no_compression
 async def export_user_data(
     current_user: UserResponse = Depends(get_current_user)
 ):
-    """Export all user data as a ZIP file"""
-    import zipfile
-    import json
-    import io
-    import tempfile
-    from fastapi.responses import StreamingResponse
+    """Export all user data, including uploaded files, as a streamed ZIP file
     
+    The archive is sent while it is being built, with constant memory.
+    Accounts whose files exceed EXPORT_INLINE_MAX_MB get 409 and should use
+    POST /export/jobs instead.
+    """
     try:
-        auth_service = SupabaseAuthService()
-        
-        # Get user profile data
-        user_data = await auth_service.get_user_by_id(current_user.id)
-        
-        # Get user ideas (if they exist)
-        try:
-            from app.services.supabase_ideas import SupabaseIdeasService
-            ideas_service = SupabaseIdeasService()
-            user_ideas = await ideas_service.get_user_ideas(current_user.id)
-        except Exception:
-            user_ideas = []
-        
-        # Get user profile from profile service
-        try:
-            profile_service = SupabaseProfileService()
-            profile_data = await profile_service.get_profile(current_user.id)
-        except Exception:
-            profile_data = {}
-        
-        # Get user files (if they exist)
-        try:
-            from app.services.supabase_files import SupabaseFileService
-            file_service = SupabaseFileService()
-            user_files = await file_service.get_user_files(current_user.id)
-        except Exception:
-            user_files = []
-        
-        # Compile export data
-        export_data = UserDataExport(
-            profile=profile_data or {},
-            ideas=[idea for idea in user_ideas] if user_ideas else [],
-            activities=[],  # Could be expanded to include activity logs
-            settings=user_data.get("user_settings", {}) if user_data else {},
-            export_date=datetime.now().isoformat()
+        export_service, manifest = await _load_export_manifest(current_user)
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error exporting user data: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to export user data"
+        )
+    
+    if manifest.total_file_bytes > settings.EXPORT_INLINE_MAX_MB * MB:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail="Your files are too large to export in one download. "
+                   "Start an export job with POST /api/v1/users/export/jobs"
         )
+    
+    # Generate filename with user ID and timestamp
+    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
+    filename = f"esal_data_export_{current_user.id}_{timestamp}.zip"
+    
+    return StreamingResponse(
+        export_service.archive(manifest),
+        media_type='application/zip',
+        headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+    )
+
+
+@router.post("/export/jobs", status_code=status.HTTP_202_ACCEPTED)
+async def create_export_job(
+    background_tasks: BackgroundTasks,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Start a background export; poll GET /export/jobs/{job_id} for the download URL"""
+    from app.services.supabase_files import SupabaseFileService
+    
+    try:
+        export_service = DataExportService(SupabaseFileService().supabase)
+        job, created = await export_service.create_job(current_user.id)
         
-        # Create ZIP file in memory
-        zip_buffer = io.BytesIO()
-        with zipfile.ZipFile(zip_buffer, 'w', zipfile.ZIP_DEFLATED) as zip_file:
-            # Add main data export as JSON
-            zip_file.writestr(
-                'user_data.json',
-                json.dumps(export_data.model_dump(), indent=2, ensure_ascii=False)
+        if created:
+            user_data = await SupabaseAuthService().get_user_by_id(current_user.id)
+            background_tasks.add_task(
+                export_service.run_job,
+                job["id"],
+                current_user.id,
+                current_user.email,
+                user_data.get("user_settings", {}) if user_data else {}
             )
-            
-            # Add profile data as separate JSON
-            if profile_data:
-                zip_file.writestr(
-                    'profile.json',
-                    json.dumps(profile_data, indent=2, ensure_ascii=False)
-                )
-            
-            # Add ideas data as separate JSON
-            if user_ideas:
-                zip_file.writestr(
-                    'ideas.json',
-                    json.dumps(user_ideas, indent=2, ensure_ascii=False)
-                )
-            
-            # Add file list information
-            if user_files:
-                file_info = []
-                for file in user_files:
-                    file_info.append({
-                        'filename': file.get('filename'),
-                        'file_type': file.get('file_type'),
-                        'file_size': file.get('file_size'),
-                        'upload_date': file.get('upload_date'),
-                        'download_url': file.get('download_url'),
-                        'note': 'Original files stored in Supabase storage - URLs provided above'
-                    })
-                
-                zip_file.writestr(
-                    'files_list.json',
-                    json.dumps(file_info, indent=2, ensure_ascii=False)
-                )
-            
-            # Add readme file with export information
-            readme_content = f"""# Your ESAL Platform Data Export
-
-Export Date: {datetime.now().isoformat()}
-User ID: {current_user.id}
-User Email: {current_user.email}
-
-## Files in this archive:
-
-- user_data.json: Complete export data in structured format
-- profile.json: Your profile information
-- ideas.json: All your submitted ideas
-- files_list.json: List of your uploaded files with download URLs
-
-## File Downloads:
-Your uploaded files are stored securely in our cloud storage. The files_list.json 
-contains direct download URLs for all your files. These URLs are valid and can be 
-used to download your original files.
-
-## Data Format:
-All data is exported in JSON format for easy parsing and compatibility with 
-various data processing tools.
-
-## Support:
-If you have any questions about this export, please contact our support team.
-
----
-ESAL Platform Data Export
-Generated on {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-"""
-            zip_file.writestr('README.txt', readme_content)
-        
-        zip_buffer.seek(0)
-        
-        # Generate filename with user ID and timestamp
-        timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-        filename = f"esal_data_export_{current_user.id}_{timestamp}.zip"
         
-        # Return ZIP file as download
-        return StreamingResponse(
-            io.BytesIO(zip_buffer.read()),
-            media_type='application/zip',
-            headers={'Content-Disposition': f'attachment; filename="{filename}"'}
+        return {"job_id": job["id"], "status": job["status"]}
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"Error creating export job: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Failed to start data export"
         )
-        
+
+
+@router.get("/export/jobs/{job_id}")
+async def get_export_job(
+    job_id: str,
+    current_user: UserResponse = Depends(get_current_user)
+):
+    """Status of an export job, with a signed download URL once completed"""
+    from app.services.supabase_files import SupabaseFileService
+    
+    try:
+        job = await DataExportService(SupabaseFileService().supabase).get_job(current_user.id, job_id)
     except Exception as e:
-        logger.error(f"Error exporting user data: {str(e)}")
+        logger.error(f"Error fetching export job: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail="Failed to export user data"
+            detail="Failed to fetch export job"
+        )
+    
+    if job is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Export job not found"
         )
+    return {
+        "job_id": job["id"],
+        "status": job["status"],
+        "file_size": job.get("file_size"),
+        "error": job.get("error"),
+        "created_at": job.get("created_at"),
+        "completed_at": job.get("completed_at"),
+        "download_url": job.get("download_url"),
+        "expires_in": settings.SIGNED_URL_TTL_SECONDS if job.get("download_url") else None
+    }
 
 
 @router.delete("/delete-account")
@@ -325,10 +307,17 @@ async def delete_account(
     auth_service: SupabaseAuthService = Depends(get_auth_service)
 ):
     """Delete user account (soft delete)"""
+    from app.services.supabase_files import SupabaseFileService
+    
     try:
         success = await auth_service.delete_user_account(current_user.id)
         
         if success:
+            # Export archives hold a full copy of the user's data
+            try:
+                await DataExportService(SupabaseFileService().supabase).delete_user_exports(current_user.id)
+            except Exception as e:
+                logger.error(f"Error deleting export archives of {current_user.id}: {str(e)}")
             return {
                 "message": "Account deletion initiated successfully",
                 "note": "Your account has been marked for deletion and will be processed within 30 days"
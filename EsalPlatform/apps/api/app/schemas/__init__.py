@@ -1,7 +1,7 @@
 """
 Pydantic schemas for request/response validation
 """
-from pydantic import BaseModel, EmailStr, field_validator, field_serializer
+from pydantic import BaseModel, EmailStr, Field, field_validator, field_serializer
 from typing import Optional, List, Dict, Any, Union
 from datetime import datetime
 import uuid
@@ -192,12 +192,36 @@ class PitchResponse(BaseModel):
 class UsersListResponse(BaseModel):
     users: List[UserResponse]
     total: int
+    # False when total is a lower bound (search or date filters)
+    total_is_exact: bool = True
+    next_cursor: Optional[str] = None
+    has_more: bool = False
 
 
 class BlockUserRequest(BaseModel):
     reason: Optional[str] = None
 
 
+class BulkUserFilter(BaseModel):
+    """Same filters as GET /admin/users"""
+    role: Optional[List[str]] = None
+    status: Optional[str] = None
+    search: Optional[str] = Field(default=None, max_length=100)
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+
+class BulkUserActionRequest(BaseModel):
+    # block, unblock, activate, deactivate, set_role or delete (soft)
+    action: str
+    # Either explicit ids or a filter
+    user_ids: Optional[List[str]] = None
+    filter: Optional[BulkUserFilter] = None
+    # New role for set_role
+    role: Optional[str] = None
+    reason: Optional[str] = None
+
+
 class DashboardStats(BaseModel):
     total_users: int
     total_ideas: int
@@ -544,3 +568,51 @@ class InvestorDashboard(BaseModel):
     
     class Config:
         from_attributes = True
+
+
+# Direct-to-storage upload schemas
+class UploadIntentRequest(BaseModel):
+    bucket: str = "idea-files"  # idea-files or avatars
+    filename: str
+    size: int
+    content_type: Optional[str] = None
+    idea_id: Optional[int] = None
+    description: Optional[str] = None
+
+
+class UploadIntentResponse(BaseModel):
+    intent: str
+    upload_url: str
+    upload_token: str
+    bucket: str
+    path: str
+    content_type: str
+    max_bytes: int
+    expires_at: str
+
+
+class UploadConfirmRequest(BaseModel):
+    intent: str
+
+
+class SignedUrlsRequest(BaseModel):
+    file_ids: List[str]
+    expires_in: Optional[int] = None
+
+    @field_validator('file_ids')
+    @classmethod
+    def limit_batch(cls, value: List[str]) -> List[str]:
+        if len(value) > 100:
+            raise ValueError('At most 100 file ids per request')
+        return value
+
+
+class SignedUrl(BaseModel):
+    file_id: str
+    signed_url: Optional[str] = None
+    expires_in: Optional[int] = None
+    error: Optional[str] = None
+
+
+class SignedUrlsResponse(BaseModel):
+    urls: List[SignedUrl]
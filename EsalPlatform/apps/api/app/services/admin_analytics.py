@@ -0,0 +1,237 @@
+"""
+Admin analytics from precomputed rollups
+
+refresh_analytics_rollups (add_analytics_rollups_migration.sql) folds new
+rows from profiles, ideas, matching_history, connection_requests and
+startup_views into analytics_hourly and analytics_daily. Each API worker
+calls it every ANALYTICS_ROLLUP_INTERVAL_SECONDS (concurrent calls are
+skipped in the database), and each call only rescans the hours since the
+previous one.
+
+Admin endpoints read only the rollup tables, through a stale-while-
+revalidate snapshot cache, so their cost depends on the length of the
+requested range, not on the size of the raw tables.
+"""
+import logging
+import re
+from collections import defaultdict
+from datetime import date, datetime, timedelta, timezone
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.config import settings
+from app.services.background import PeriodicTask, service_client
+from app.utils.snapshot_cache import SnapshotCache
+
+logger = logging.getLogger(__name__)
+
+# Supabase function folding new rows into the rollups
+REFRESH_RPC = "refresh_analytics_rollups"
+
+METRICS = ("signups", "ideas_created", "ai_judgments", "matching_runs", "connection_requests", "views")
+GRANULARITIES = ("day", "hour")
+
+# Hourly rows are kept for this many days (see the migration)
+HOURLY_RETENTION_DAYS = 90
+MAX_RANGE_DAYS = 730
+
+# PostgREST returns at most this many rows per request
+_PAGE_SIZE = 1000
+
+_RANGE = re.compile(r"^(\d{1,4})([dh])$")
+
+# (metric, dimension) -> count; dimension "" is the metric's total
+Totals = Dict[Tuple[str, str], int]
+
+
+def parse_range(time_range: str) -> timedelta:
+    """'30d' or '24h' as a timedelta
+
+    Raises:
+        ValueError: malformed or longer than MAX_RANGE_DAYS
+    """
+    match = _RANGE.match(time_range or "")
+    if match is None:
+        raise ValueError("time_range must look like '30d' or '24h'")
+    amount, unit = int(match.group(1)), match.group(2)
+    span = timedelta(days=amount) if unit == "d" else timedelta(hours=amount)
+    if span <= timedelta(0) or span > timedelta(days=MAX_RANGE_DAYS):
+        raise ValueError(f"time_range must be between 1h and {MAX_RANGE_DAYS}d")
+    return span
+
+
+def percent_change(current: int, previous: int) -> Tuple[str, str]:
+    """(change, trend) as shown on the admin dashboard"""
+    if previous == 0:
+        percent = 100.0 if current else 0.0
+    else:
+        percent = (current - previous) / previous * 100
+    trend = "up" if percent > 0 else "down" if percent < 0 else "flat"
+    return f"{percent:+.0f}%", trend
+
+
+def _total(rows: List[Dict[str, Any]]) -> Totals:
+    totals: Totals = defaultdict(int)
+    for row in rows:
+        metric, dimension, count = row["metric"], row["dimension"] or "", int(row["count"])
+        totals[(metric, "")] += count
+        if dimension:
+            totals[(metric, dimension)] += count
+    return totals
+
+
+class AnalyticsSummary:
+    """Totals for a range and for the range before it"""
+
+    def __init__(self, current: Totals, previous: Totals, start: datetime, end: datetime):
+        self.current = current
+        self.previous = previous
+        self.start = start
+        self.end = end
+
+    def count(self, metric: str, dimension: str = "") -> int:
+        return self.current.get((metric, dimension), 0)
+
+    def change(self, metric: str, dimension: str = "") -> Tuple[str, str]:
+        return percent_change(self.count(metric, dimension), self.previous.get((metric, dimension), 0))
+
+
+class AnalyticsRollups:
+    """Refreshes the rollup tables and serves cached reads from them"""
+
+    def __init__(self,
+                 client_factory: Callable[[], Client] = service_client,
+                 refresh_interval: float = 300.0,
+                 cache: Optional[SnapshotCache] = None):
+        self._client_factory = client_factory
+        self._client: Optional[Client] = None
+        self.cache = cache or SnapshotCache()
+        self._refresher = PeriodicTask("Analytics rollup refresh", self.refresh, refresh_interval, run_first=True)
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    async def refresh(self) -> bool:
+        """Fold new source rows into the rollups; False if another worker is refreshing"""
+        result = await run_in_threadpool(lambda: self.client.rpc(REFRESH_RPC, {}).execute())
+        return bool(result.data)
+
+    def _fetch(self, table: str, column: str, start: Any, end: Any, metric: Optional[str]) -> List[Dict[str, Any]]:
+        rows: List[Dict[str, Any]] = []
+        while True:
+            query = self.client.table(table).select(f"{column}, metric, dimension, count").gte(
+                column, start.isoformat()
+            ).lt(column, end.isoformat())
+            if metric is not None:
+                query = query.eq("metric", metric)
+            page = query.order(column).order("metric").order("dimension").range(
+                len(rows), len(rows) + _PAGE_SIZE - 1
+            ).execute().data or []
+            rows.extend(page)
+            if len(page) < _PAGE_SIZE:
+                return rows
+
+    def _rows(self,
+              granularity: str,
+              start: datetime,
+              end: datetime,
+              metric: Optional[str] = None) -> List[Dict[str, Any]]:
+        if granularity == "hour":
+            return self._fetch("analytics_hourly", "bucket", start, end, metric)
+        return self._fetch("analytics_daily", "day", start.date(), end.date(), metric)
+
+    @staticmethod
+    def _window(granularity: str, span: timedelta) -> Tuple[datetime, datetime]:
+        """Range of whole buckets ending with the current one"""
+        now = datetime.now(timezone.utc)
+        if granularity == "hour":
+            end = now.replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        else:
+            end = datetime.combine(now.date(), datetime.min.time(), timezone.utc) + timedelta(days=1)
+            span = timedelta(days=max(1, span.days))
+        return end - span, end
+
+    async def _load_summary(self, span: timedelta) -> AnalyticsSummary:
+        # Ranges under two days read the hourly table
+        granularity = "hour" if span < timedelta(days=2) else "day"
+        start, end = self._window(granularity, span)
+        rows = await run_in_threadpool(self._rows, granularity, start - (end - start), end)
+
+        key = _bucket_key(granularity)
+        boundary = _comparable(start.isoformat(), granularity)
+        current = [row for row in rows if _comparable(row[key], granularity) >= boundary]
+        previous = [row for row in rows if _comparable(row[key], granularity) < boundary]
+        return AnalyticsSummary(_total(current), _total(previous), start, end)
+
+    async def summary(self, time_range: str) -> AnalyticsSummary:
+        """Totals per metric for the range ending now, and the range before it"""
+        span = parse_range(time_range)
+        return await self.cache.get(("summary", span), lambda: self._load_summary(span))
+
+    async def _load_series(self, metric: str, granularity: str, span: timedelta) -> Dict[str, Any]:
+        start, end = self._window(granularity, span)
+        rows = await run_in_threadpool(self._rows, granularity, start, end, metric)
+        key = _bucket_key(granularity)
+
+        series: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        totals: Dict[str, int] = defaultdict(int)
+        for row in rows:
+            totals[row[key]] += int(row["count"])
+            if row["dimension"]:
+                series[row["dimension"]].append({"t": row[key], "count": int(row["count"])})
+        return {
+            "metric": metric,
+            "granularity": granularity,
+            "start": start.isoformat(),
+            "end": end.isoformat(),
+            "points": [{"t": t, "count": count} for t, count in totals.items()],
+            "by_dimension": dict(series),
+        }
+
+    async def series(self, metric: str, granularity: str, time_range: str) -> Dict[str, Any]:
+        """Counts of one metric per day or hour, in total and per dimension
+
+        Raises:
+            ValueError: unknown metric or granularity, or a bad range
+        """
+        if metric not in METRICS:
+            raise ValueError(f"metric must be one of: {', '.join(METRICS)}")
+        if granularity not in GRANULARITIES:
+            raise ValueError(f"granularity must be one of: {', '.join(GRANULARITIES)}")
+        span = parse_range(time_range)
+        if granularity == "hour" and span > timedelta(days=HOURLY_RETENTION_DAYS):
+            raise ValueError(f"Hourly data covers the last {HOURLY_RETENTION_DAYS} days")
+        return await self.cache.get(("series", metric, granularity, span),
+                                    lambda: self._load_series(metric, granularity, span))
+
+    def start(self) -> None:
+        self._refresher.start()
+
+    async def stop(self) -> None:
+        await self._refresher.stop()
+
+
+def _bucket_key(granularity: str) -> str:
+    return "bucket" if granularity == "hour" else "day"
+
+
+def _comparable(value: str, granularity: str) -> Any:
+    """Rollup keys as comparable values (PostgREST formats timestamps its own way)"""
+    if granularity == "day":
+        return date.fromisoformat(value[:10])
+    parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+
+analytics_rollups = AnalyticsRollups(
+    refresh_interval=settings.ANALYTICS_ROLLUP_INTERVAL_SECONDS,
+    cache=SnapshotCache(
+        fresh_seconds=settings.ANALYTICS_SNAPSHOT_FRESH_SECONDS,
+        max_stale_seconds=settings.ANALYTICS_SNAPSHOT_MAX_STALE_SECONDS
+    )
+)
@@ -0,0 +1,201 @@
+"""
+Bulk admin operations on users
+
+An operation applies one action (block, unblock, activate, deactivate,
+set_role or a soft delete) to up to BULK_MAX_USERS users, given as ids or
+as a GET /admin/users filter, in two steps:
+
+1. apply(): one local transaction, with one UPDATE per chunk of ids
+2. sync(): the matching user_metadata change in Supabase Auth (which login
+   and token checks read), with at most BULK_SUPABASE_CONCURRENCY admin
+   calls in flight. Results are yielded per user as calls finish, so large
+   batches can be streamed to the client.
+
+Supabase Auth has no batch update, so step 2 is one call per user; a
+failed call is reported for that user and does not undo the local change.
+"""
+import asyncio
+import logging
+import uuid
+from dataclasses import asdict, dataclass
+from datetime import datetime
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Set
+
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.models import User
+from app.services.admin_user_stats import ROLES, user_stats
+from app.services.admin_users import UserFilters, filtered_query
+from app.services.background import service_client
+
+logger = logging.getLogger(__name__)
+
+# action -> changed columns (and user_metadata keys)
+ACTIONS: Dict[str, Dict[str, Any]] = {
+    "block": {"is_blocked": True},
+    "unblock": {"is_blocked": False},
+    "activate": {"is_active": True},
+    "deactivate": {"is_active": False},
+    "set_role": {},
+    "delete": {"is_active": False, "is_blocked": True},
+}
+
+# Actions an admin may not apply to their own account
+_NOT_ON_SELF = ("block", "deactivate", "set_role", "delete")
+
+# Ids per SELECT/UPDATE statement
+CHUNK_SIZE = 500
+
+# A progress event is yielded after this many synced users
+PROGRESS_EVERY = 50
+
+# Supabase sync tasks still running. asyncio keeps only weak references to
+# tasks, so this keeps them alive when a streaming client disconnects and
+# the generator that created them is closed.
+_SYNC_TASKS: Set[asyncio.Task] = set()
+
+
+def _chunks(items: List[Any], size: int) -> Iterable[List[Any]]:
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+
+@dataclass
+class BulkItem:
+    user_id: str
+    # updated, synced, sync_failed, not_found, invalid_id or skipped
+    status: str
+    email: Optional[str] = None
+    error: Optional[str] = None
+
+
+class BulkUserOperation:
+    def __init__(self,
+                 action: str,
+                 role: Optional[str] = None,
+                 client_factory: Callable[[], Client] = service_client,
+                 max_users: int = 5000,
+                 concurrency: int = 8):
+        """
+        Raises:
+            ValueError: unknown action, or set_role without a valid role
+        """
+        if action not in ACTIONS:
+            raise ValueError(f"Invalid action. Must be one of: {list(ACTIONS)}")
+        if action == "set_role" and role not in ROLES:
+            raise ValueError(f"set_role needs a role, one of: {list(ROLES)}")
+        self.action = action
+        self.changes = {"role": role} if action == "set_role" else ACTIONS[action]
+        self._client_factory = client_factory
+        self.max_users = max_users
+        self.concurrency = concurrency
+        self.items: List[BulkItem] = []
+
+    def _select(self, db: Session, user_ids: Optional[List[str]], filters: Optional[UserFilters]) -> List[tuple]:
+        """(id, email) of the targeted users that exist; records invalid and unknown ids"""
+        if filters is not None:
+            filters.validate()
+            if filters == UserFilters():
+                raise ValueError("filter must narrow the selection")
+            rows = filtered_query(db, filters).with_entities(User.id, User.email).limit(self.max_users + 1).all()
+            if len(rows) > self.max_users:
+                raise ValueError(f"More than {self.max_users} users match; narrow the filter")
+            return rows
+
+        if len(user_ids) > self.max_users:
+            raise ValueError(f"At most {self.max_users} users per operation")
+        ids: List[uuid.UUID] = []
+        for user_id in dict.fromkeys(user_ids):
+            try:
+                ids.append(uuid.UUID(user_id))
+            except ValueError:
+                self.items.append(BulkItem(user_id=user_id, status="invalid_id"))
+        rows = []
+        for chunk in _chunks(ids, CHUNK_SIZE):
+            rows.extend(db.query(User.id, User.email).filter(User.id.in_(chunk)).all())
+        found = {row[0] for row in rows}
+        self.items.extend(BulkItem(user_id=str(i), status="not_found") for i in ids if i not in found)
+        return rows
+
+    def apply(self,
+              db: Session,
+              user_ids: Optional[List[str]] = None,
+              filters: Optional[UserFilters] = None,
+              actor_id: Optional[str] = None) -> List[BulkItem]:
+        """
+        Update the targeted users in one local transaction
+
+        Returns:
+            the updated users, to pass to sync()
+
+        Raises:
+            ValueError: both or neither of user_ids and filters, or too many users
+        """
+        if (user_ids is None) == (filters is None):
+            raise ValueError("Give either user_ids or a filter")
+
+        updated: List[BulkItem] = []
+        ids: List[uuid.UUID] = []
+        for user_id, email in self._select(db, user_ids, filters):
+            if self.action in _NOT_ON_SELF and str(user_id) == str(actor_id):
+                self.items.append(BulkItem(user_id=str(user_id), status="skipped", email=email,
+                                           error="Cannot apply this action to your own account"))
+                continue
+            ids.append(user_id)
+            updated.append(BulkItem(user_id=str(user_id), status="updated", email=email))
+
+        if ids:
+            values = {**self.changes, "updated_at": datetime.utcnow()}
+            try:
+                for chunk in _chunks(ids, CHUNK_SIZE):
+                    db.query(User).filter(User.id.in_(chunk)).update(values, synchronize_session=False)
+                db.commit()
+            except Exception:
+                db.rollback()
+                raise
+            user_stats.invalidate()
+            logger.info(f"Bulk {self.action} applied to {len(ids)} users")
+
+        self.items.extend(updated)
+        return updated
+
+    async def sync(self, updated: List[BulkItem]) -> AsyncIterator[Dict[str, Any]]:
+        """Mirror the change into Supabase Auth, yielding item and progress events"""
+        if not updated:
+            return
+        client = self._client_factory()
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        async def update(item: BulkItem) -> BulkItem:
+            async with semaphore:
+                try:
+                    await run_in_threadpool(
+                        client.auth.admin.update_user_by_id, item.user_id, {"user_metadata": self.changes}
+                    )
+                    item.status = "synced"
+                except Exception as e:
+                    logger.error(f"Bulk {self.action}: Supabase update failed for {item.user_id}: {e}")
+                    item.status, item.error = "sync_failed", str(e)
+            return item
+
+        # Tasks keep running if a streaming client disconnects, so the
+        # change still reaches every user
+        tasks = [asyncio.create_task(update(item)) for item in updated]
+        for task in tasks:
+            _SYNC_TASKS.add(task)
+            task.add_done_callback(_SYNC_TASKS.discard)
+        for done, task in enumerate(asyncio.as_completed(tasks), start=1):
+            yield {"event": "item", **asdict(await task)}
+            if done % PROGRESS_EVERY == 0 or done == len(tasks):
+                yield {"event": "progress", "done": done, "total": len(tasks)}
+
+    def summary(self) -> Dict[str, Any]:
+        counts: Dict[str, int] = {}
+        for item in self.items:
+            counts[item.status] = counts.get(item.status, 0) + 1
+        return {"action": self.action, "total": len(self.items), "counts": counts}
+
+    def results(self) -> List[Dict[str, Any]]:
+        return [asdict(item) for item in self.items]
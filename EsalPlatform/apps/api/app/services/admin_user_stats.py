@@ -0,0 +1,135 @@
+"""
+User counts for the admin portal
+
+Every admin view that shows user numbers (dashboard, statistics, analytics,
+pending actions, list totals) reads them from one snapshot computed with a
+single GROUP BY over (role, is_active, is_blocked). Snapshots are cached per
+process for ADMIN_STATS_TTL_SECONDS, and admin writes to users in this
+process invalidate them immediately.
+"""
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, Optional, Tuple
+
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.config import settings
+from app.models import User
+
+ROLES = ("innovator", "investor", "hub", "admin")
+STATUSES = ("active", "blocked", "pending", "inactive")
+
+
+def status_matches(status: Optional[str], is_active: bool, is_blocked: bool) -> bool:
+    """Whether a user with these flags has the given status (None matches all)"""
+    if status is None:
+        return True
+    if status == "active":
+        return is_active and not is_blocked
+    if status == "blocked":
+        return is_blocked
+    if status == "pending":
+        return not is_active and not is_blocked
+    return not is_active
+
+
+@dataclass(frozen=True)
+class UserCounts:
+    total: int = 0
+    # Active and not blocked
+    active: int = 0
+    blocked: int = 0
+    # Not active (blocked or not)
+    inactive: int = 0
+    by_role: Dict[str, int] = field(default_factory=dict)
+    # (role, is_active, is_blocked) -> count
+    groups: Dict[Tuple[str, bool, bool], int] = field(default_factory=dict)
+
+    @property
+    def pending(self) -> int:
+        """Neither active nor blocked (awaiting verification)"""
+        return self.total - self.active - self.blocked
+
+    def role(self, role: str) -> int:
+        return self.by_role.get(role, 0)
+
+    def matching(self, roles: Iterable[str] = (), status: Optional[str] = None) -> int:
+        """Users with one of the roles (any if empty) and the status"""
+        roles = set(roles)
+        return sum(
+            count for (role, is_active, is_blocked), count in self.groups.items()
+            if (not roles or role in roles) and status_matches(status, is_active, is_blocked)
+        )
+
+    def statistics(self) -> Dict[str, object]:
+        """Body of /admin/users/stats"""
+        return {
+            "total": self.total,
+            "active": self.active,
+            "blocked": self.blocked,
+            "pending": self.pending,
+            "by_role": {role: self.role(role) for role in ROLES},
+        }
+
+
+def count_users(db: Session) -> UserCounts:
+    """All user counts in one query"""
+    rows = db.query(
+        User.role,
+        func.coalesce(User.is_active, False),
+        func.coalesce(User.is_blocked, False),
+        func.count(),
+    ).group_by(User.role, User.is_active, User.is_blocked).all()
+
+    total = active = blocked = inactive = 0
+    by_role: Dict[str, int] = {}
+    groups: Dict[Tuple[str, bool, bool], int] = {}
+    for role, is_active, is_blocked, count in rows:
+        key = (role, bool(is_active), bool(is_blocked))
+        groups[key] = groups.get(key, 0) + count
+        total += count
+        by_role[role] = by_role.get(role, 0) + count
+        if is_blocked:
+            blocked += count
+        elif is_active:
+            active += count
+        if not is_active:
+            inactive += count
+    return UserCounts(total=total, active=active, blocked=blocked, inactive=inactive,
+                      by_role=by_role, groups=groups)
+
+
+class UserStatsCache:
+    """Per-process cache of the latest UserCounts"""
+
+    def __init__(self, ttl_seconds: float = 15.0, clock: Callable[[], float] = time.monotonic):
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._counts: Optional[UserCounts] = None
+        self._expires_at = 0.0
+        self._generation = 0
+
+    def get(self, db: Session) -> UserCounts:
+        with self._lock:
+            if self._counts is not None and self._clock() < self._expires_at:
+                return self._counts
+            generation = self._generation
+        counts = count_users(db)
+        with self._lock:
+            # Skip storing counts that an invalidation during the query made stale
+            if generation == self._generation:
+                self._counts = counts
+                self._expires_at = self._clock() + self.ttl_seconds
+        return counts
+
+    def invalidate(self) -> None:
+        """Call after creating, updating or deleting users"""
+        with self._lock:
+            self._counts = None
+            self._generation += 1
+
+
+user_stats = UserStatsCache(ttl_seconds=settings.ADMIN_STATS_TTL_SECONDS)
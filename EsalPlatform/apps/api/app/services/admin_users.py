@@ -0,0 +1,152 @@
+"""
+Admin user listing
+
+Pages through users with keyset pagination on (created_at DESC, id DESC),
+so every page is one index range scan however deep the admin has paged
+(see add_admin_user_search_migration.sql for the indexes). Role, status,
+signup date and search filters are all applied in SQL.
+
+Search matches email or full name, case-insensitively:
+
+- terms shorter than 3 characters match as prefixes (btree pattern indexes)
+- longer terms match anywhere (pg_trgm GIN indexes)
+
+Totals for role/status filters come exactly from the cached user counts.
+With a search or date filter, matches are counted up to TOTAL_COUNT_CAP
+only and the total is flagged as inexact beyond that.
+"""
+import uuid
+from dataclasses import dataclass
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, or_, tuple_
+from sqlalchemy.orm import Query, Session
+
+from app.models import User
+from app.services.admin_user_stats import ROLES, STATUSES, UserStatsCache, user_stats
+from app.utils.pagination import decode_cursor, encode_cursor
+
+MAX_PAGE_SIZE = 200
+
+# Matches counted beyond this are reported as an inexact total
+TOTAL_COUNT_CAP = 1000
+
+# Trigram indexes only help with terms at least this long
+TRIGRAM_MIN_LENGTH = 3
+
+
+@dataclass(frozen=True)
+class UserFilters:
+    roles: Tuple[str, ...] = ()
+    status: Optional[str] = None
+    search: Optional[str] = None
+    created_after: Optional[datetime] = None
+    created_before: Optional[datetime] = None
+
+    def validate(self) -> None:
+        """
+        Raises:
+            ValueError: unknown role or status, or a blank search
+        """
+        for role in self.roles:
+            if role not in ROLES:
+                raise ValueError(f"Invalid role. Must be one of: {list(ROLES)}")
+        if self.status is not None and self.status not in STATUSES:
+            raise ValueError(f"Invalid status. Must be one of: {list(STATUSES)}")
+        if self.search is not None and not self.search.strip():
+            raise ValueError("Search must not be blank")
+
+    @property
+    def counted(self) -> bool:
+        """Whether the cached user counts answer the total exactly"""
+        return self.search is None and self.created_after is None and self.created_before is None
+
+
+@dataclass
+class UserPage:
+    users: List[User]
+    next_cursor: Optional[str]
+    total: int
+    total_is_exact: bool
+
+
+def _escape_like(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def search_clause(search: str):
+    """Case-insensitive prefix (short terms) or substring match on email or name"""
+    term = _escape_like(search.strip().lower())
+    pattern = f"{term}%" if len(search.strip()) < TRIGRAM_MIN_LENGTH else f"%{term}%"
+    return or_(
+        func.lower(User.email).like(pattern, escape="\\"),
+        func.lower(User.full_name).like(pattern, escape="\\"),
+    )
+
+
+def status_clause(status: str):
+    """SQL form of admin_user_stats.status_matches"""
+    is_active = func.coalesce(User.is_active, False)
+    is_blocked = func.coalesce(User.is_blocked, False)
+    if status == "active":
+        return and_(is_active, ~is_blocked)
+    if status == "blocked":
+        return is_blocked
+    if status == "pending":
+        return and_(~is_active, ~is_blocked)
+    return ~is_active
+
+
+def filtered_query(db: Session, filters: UserFilters) -> Query:
+    query = db.query(User)
+    if filters.roles:
+        query = query.filter(User.role.in_(filters.roles))
+    if filters.status:
+        query = query.filter(status_clause(filters.status))
+    if filters.search:
+        query = query.filter(search_clause(filters.search))
+    if filters.created_after:
+        query = query.filter(User.created_at >= filters.created_after)
+    if filters.created_before:
+        query = query.filter(User.created_at < filters.created_before)
+    return query
+
+
+def _after(cursor: str):
+    """
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    created_at, row_id = decode_cursor(cursor, id_type=uuid.UUID)
+    return tuple_(User.created_at, User.id) < (datetime.fromisoformat(created_at), uuid.UUID(row_id))
+
+
+def list_users(db: Session,
+               filters: UserFilters = UserFilters(),
+               limit: int = 50,
+               cursor: Optional[str] = None,
+               stats: UserStatsCache = user_stats) -> UserPage:
+    """
+    One page of users, newest first
+
+    Raises:
+        ValueError: invalid filters or cursor
+    """
+    filters.validate()
+    query = filtered_query(db, filters)
+
+    page_query = query.filter(_after(cursor)) if cursor else query
+    rows = page_query.order_by(User.created_at.desc(), User.id.desc()).limit(limit + 1).all()
+    users, next_cursor = rows[:limit], None
+    if len(rows) > limit:
+        last = users[-1]
+        next_cursor = encode_cursor(last.created_at.isoformat(), last.id)
+
+    if filters.counted:
+        total, exact = stats.get(db).matching(filters.roles, filters.status), True
+    else:
+        capped = query.with_entities(User.id).limit(TOTAL_COUNT_CAP + 1).subquery()
+        total = db.query(func.count()).select_from(capped).scalar()
+        total, exact = min(total, TOTAL_COUNT_CAP), total <= TOTAL_COUNT_CAP
+    return UserPage(users=users, next_cursor=next_cursor, total=total, total_is_exact=exact)
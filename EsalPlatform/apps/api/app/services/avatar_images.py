@@ -0,0 +1,169 @@
+"""
+Avatar image processing
+
+Uploaded avatars are never served as-is. Each upload is decoded, oriented
+(EXIF rotation applied), cropped to a square and re-encoded without metadata
+into a fixed set of sizes, each as WebP and JPEG:
+
+    {user_id}/{digest}/{size}.{webp,jpg}
+
+digest is derived from the uploaded bytes, so every key is deterministic and
+immutable and the objects are served with a one-year cache lifetime. The
+profile's avatar_url points at the md JPEG; avatar_variants() derives the
+other URLs from it without any extra column.
+
+Decoding and encoding are CPU-bound and run in a process pool
+(avatar_processor), keeping the event loop and its thread pool free.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import re
+from concurrent.futures import Executor, ProcessPoolExecutor
+from typing import Dict, Optional, Tuple
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+from starlette.concurrency import run_in_threadpool
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+# (label, edge in pixels); sm covers 40-48px list avatars on 2x screens
+AVATAR_SIZES: Tuple[Tuple[str, int], ...] = (("sm", 96), ("md", 256), ("lg", 512))
+
+# Variant formats: (key in avatar_variants, file extension, content type)
+AVATAR_FORMATS: Tuple[Tuple[str, str, str], ...] = (
+    ("webp", "webp", "image/webp"),
+    ("jpeg", "jpg", "image/jpeg"),
+)
+
+# The variant stored as the profile's avatar_url
+PRIMARY_VARIANT = "md.jpg"
+
+# Variant keys never change content, so they can be cached for a year
+AVATAR_CACHE_CONTROL = "31536000"
+
+# Decoders accepted for uploads, and the largest image decoded
+ACCEPTED_FORMATS = frozenset({"JPEG", "PNG", "WEBP", "GIF"})
+MAX_PIXELS = 40_000_000
+
+_VARIANT_URL = re.compile(r"^(?P<base>.*/[0-9a-f]{16}/)" + re.escape(PRIMARY_VARIANT) + r"(?P<query>\?.*)?$")
+
+
+class InvalidImage(ValueError):
+    """The upload is not a decodable image of an accepted format"""
+
+
+def avatar_digest(data: bytes) -> str:
+    """Version component of an avatar's keys"""
+    return hashlib.sha256(data).hexdigest()[:16]
+
+
+def variant_name(label: str, ext: str) -> str:
+    return f"{label}.{ext}"
+
+
+def avatar_variants(avatar_url: Optional[str]) -> Optional[Dict[str, Dict[str, str]]]:
+    """Variant URLs by size and format, derived from a processed avatar_url
+
+    Returns None for avatars stored before processing was introduced.
+    """
+    match = _VARIANT_URL.match(avatar_url or "")
+    if match is None:
+        return None
+    base, query = match.group("base"), match.group("query") or ""
+    return {
+        label: {key: f"{base}{variant_name(label, ext)}{query}" for key, ext, _ in AVATAR_FORMATS}
+        for label, _ in AVATAR_SIZES
+    }
+
+
+def _flatten(image: Image.Image) -> Image.Image:
+    """RGB copy with transparency composited onto white (for JPEG)"""
+    if image.mode != "RGBA":
+        return image.convert("RGB")
+    background = Image.new("RGB", image.size, (255, 255, 255))
+    background.paste(image, mask=image.getchannel("A"))
+    return background
+
+
+def render_variants(data: bytes) -> Dict[str, bytes]:
+    """Decode an upload and encode every variant: file name -> bytes
+
+    Runs in a worker process. Output images are built from pixel data only,
+    so EXIF (including GPS), ICC and comment metadata are dropped.
+
+    Raises:
+        InvalidImage: undecodable, unsupported or oversized input
+    """
+    largest = max(edge for _, edge in AVATAR_SIZES)
+    try:
+        with Image.open(io.BytesIO(data)) as source:
+            if source.format not in ACCEPTED_FORMATS:
+                raise InvalidImage(f"Unsupported image format {source.format}")
+            if source.width * source.height > MAX_PIXELS:
+                raise InvalidImage("Image dimensions are too large")
+            # JPEG can decode at a reduced scale directly
+            source.draft("RGB", (largest * 2, largest * 2))
+            oriented = ImageOps.exif_transpose(source)
+            has_alpha = oriented.mode in ("RGBA", "LA", "PA") or "transparency" in oriented.info
+            square = ImageOps.fit(oriented.convert("RGBA" if has_alpha else "RGB"),
+                                  (largest, largest), Image.Resampling.LANCZOS)
+    except InvalidImage:
+        raise
+    except (UnidentifiedImageError, OSError, ValueError, Image.DecompressionBombError) as e:
+        raise InvalidImage(f"Could not decode image: {e}") from None
+
+    variants: Dict[str, bytes] = {}
+    for label, edge in AVATAR_SIZES:
+        image = square if edge == largest else square.resize((edge, edge), Image.Resampling.LANCZOS)
+
+        pixels = Image.new(image.mode, image.size)
+        pixels.paste(image)
+        webp = io.BytesIO()
+        pixels.save(webp, "WEBP", quality=80, method=4)
+        variants[variant_name(label, "webp")] = webp.getvalue()
+
+        jpeg = io.BytesIO()
+        _flatten(pixels).save(jpeg, "JPEG", quality=82, optimize=True, progressive=True)
+        variants[variant_name(label, "jpg")] = jpeg.getvalue()
+    return variants
+
+
+class AvatarProcessor:
+    """Runs render_variants in a lazily started process pool"""
+
+    def __init__(self, workers: int = 2):
+        """
+        Args:
+            workers: Worker processes; 0 renders in the thread pool instead
+                (for environments that cannot start processes, and tests)
+        """
+        self.workers = workers
+        self._pool: Optional[Executor] = None
+
+    def _executor(self) -> Executor:
+        if self._pool is None:
+            methods = multiprocessing.get_all_start_methods()
+            context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            logger.info(f"Started avatar processing pool with {self.workers} workers")
+        return self._pool
+
+    async def render(self, data: bytes) -> Dict[str, bytes]:
+        """Encode all variants of an uploaded image off the event loop"""
+        if self.workers <= 0:
+            return await run_in_threadpool(render_variants, data)
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor(), render_variants, data)
+
+    def shutdown(self) -> None:
+        if self._pool is not None:
+            self._pool.shutdown(wait=True, cancel_futures=True)
+            self._pool = None
+
+
+avatar_processor = AvatarProcessor(workers=settings.AVATAR_PROCESS_WORKERS)
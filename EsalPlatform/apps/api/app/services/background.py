@@ -0,0 +1,86 @@
+"""
+Shared plumbing for services that work in the background of each API worker
+
+- service_client(): the Supabase client those services create lazily
+  (service role key, falling back to the anon key)
+- PeriodicTask: calls a coroutine every few seconds in an asyncio task that
+  the app lifespan starts and stops; a failing call is logged and the loop
+  carries on
+"""
+import asyncio
+import logging
+from typing import Awaitable, Callable, Optional
+
+from supabase import create_client, Client
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+def service_client() -> Client:
+    service_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
+    return create_client(settings.SUPABASE_URL, service_key or settings.SUPABASE_ANON_KEY)
+
+
+class PeriodicTask:
+    """Runs `step` every `interval` seconds until stopped"""
+
+    def __init__(self,
+                 name: str,
+                 step: Callable[[], Awaitable[object]],
+                 interval: float,
+                 run_first: bool = False):
+        """
+        Args:
+            name: Used in log messages
+            run_first: Call step as soon as the task starts instead of after
+                the first interval
+        """
+        self.name = name
+        self.step = step
+        self.interval = interval
+        self.run_first = run_first
+        self._wake: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def running(self) -> bool:
+        return self._task is not None and not self._task.done()
+
+    def wake(self) -> None:
+        """Run the next step now rather than at the end of the interval"""
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _sleep(self) -> None:
+        try:
+            await asyncio.wait_for(self._wake.wait(), timeout=self.interval)
+        except asyncio.TimeoutError:
+            pass
+        self._wake.clear()
+
+    async def _run(self) -> None:
+        if not self.run_first:
+            await self._sleep()
+        while True:
+            try:
+                await self.step()
+            except Exception as e:
+                logger.error(f"{self.name} failed: {e}")
+            await self._sleep()
+
+    def start(self) -> None:
+        if self._wake is None:
+            self._wake = asyncio.Event()
+        if not self.running:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
@@ -0,0 +1,494 @@
+"""
+User data export
+
+The account archive (profile, ideas, uploaded files and a manifest) is
+produced as a stream of ZIP bytes (app/utils/zip_stream.py) while it is
+being built:
+
+- Profile and file metadata are loaded concurrently; ideas are read in
+  keyset pages, the next page being fetched while the current one is
+  written.
+- File bytes are downloaded from storage by up to EXPORT_FETCH_CONCURRENCY
+  concurrent requests, each feeding a small bounded queue that the archive
+  drains in order. Downloads ahead of the writer pause when their queue is
+  full.
+
+Memory is therefore bounded by the prefetch queues and one idea page,
+whatever the size of the account. Large accounts are exported by a job
+that streams the same archive into the private exports bucket and is
+downloaded through a signed URL (add_export_jobs_migration.sql). A job
+left pending or running by a worker that died is failed after
+EXPORT_JOB_TIMEOUT_SECONDS, so the user can request a new one. Archives are
+deleted EXPORT_RETENTION_HOURS after they complete (ExportRetention), and
+all of a user's archives when the account is deleted.
+"""
+import asyncio
+import json
+import logging
+import os
+import re
+import uuid
+import zipfile
+from datetime import datetime, timedelta, timezone
+from typing import Any, AsyncIterator, Callable, Dict, List, NamedTuple, Optional, Tuple, Union
+from urllib.parse import quote
+
+import httpx
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.config import settings
+from app.services.background import PeriodicTask, service_client
+from app.services.storage_uploads import MB, StreamingUploader
+from app.services.supabase_files import FILE_RECORD
+from app.services.supabase_ideas import IDEA_SUMMARY
+from app.services.supabase_profiles import PROFILE
+from app.services.upload_intents import UploadIntentService
+from app.utils.zip_stream import FAST_COMPRESSLEVEL, ZipStream
+
+logger = logging.getLogger(__name__)
+
+# Private bucket holding export job artifacts
+EXPORT_BUCKET = "exports"
+
+# Storage download chunk and per-file prefetch depth (memory per download)
+DOWNLOAD_CHUNK_SIZE = 256 * 1024
+PREFETCH_CHUNKS = 8
+
+IDEA_PAGE_SIZE = 500
+
+# Jobs expired per query, and archives listed per request, when deleting
+EXPIRE_BATCH_SIZE = 500
+LIST_PAGE_SIZE = 1000
+
+# Content already compressed is only stored with the fastest deflate level
+_COMPRESSED_PREFIXES = ("image/", "video/", "audio/", "application/zip", "application/pdf",
+                        "application/vnd.openxmlformats-officedocument.")
+
+_UNSAFE_NAME = re.compile(r"[^\w.\- ()]+")
+
+_README = """# Your ESAL Platform Data Export
+
+Export Date: {export_date}
+User ID: {user_id}
+User Email: {email}
+
+## Files in this archive:
+
+- user_data.json: Complete export data in structured format
+- profile.json: Your profile information
+- ideas.json: All your submitted ideas
+- files/: Your uploaded files
+- files_list.json: Details of your uploaded files and where each one is in this archive
+
+## Data Format:
+All data is exported in JSON format for easy parsing and compatibility with
+various data processing tools.
+
+## Support:
+If you have any questions about this export, please contact our support team.
+
+---
+ESAL Platform Data Export
+"""
+
+
+class ExportManifest(NamedTuple):
+    """Everything loaded up front for an export (file bytes and ideas stream later)"""
+    user_id: str
+    email: str
+    profile: Dict[str, Any]
+    files: List[Dict[str, Any]]
+    settings: Dict[str, Any]
+
+    @property
+    def total_file_bytes(self) -> int:
+        return sum(record.get("file_size") or 0 for record in self.files)
+
+
+def archive_name(record: Dict[str, Any]) -> str:
+    """Path of an uploaded file inside the archive (unique per files row)"""
+    filename = os.path.basename(str(record.get("original_filename") or record.get("filename") or "file"))
+    filename = _UNSAFE_NAME.sub("_", filename).strip() or "file"
+    return f"files/{record['id']}_{filename}"
+
+
+def _compresslevel(content_type: Optional[str]) -> Optional[int]:
+    if (content_type or "").startswith(_COMPRESSED_PREFIXES):
+        return FAST_COMPRESSLEVEL
+    return None
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, indent=2, ensure_ascii=False, default=str)
+
+
+async def _encode(pieces: AsyncIterator[str]) -> AsyncIterator[bytes]:
+    async for piece in pieces:
+        yield piece.encode("utf-8")
+
+
+async def _queued(queue: "asyncio.Queue[Union[bytes, Exception, None]]") -> AsyncIterator[bytes]:
+    """Chunks put by a download task; None ends the stream, an exception is raised"""
+    while True:
+        item = await queue.get()
+        if item is None:
+            return
+        if isinstance(item, Exception):
+            raise item
+        yield item
+
+
+class DataExportService:
+    """Builds account archives as streams, inline or as stored job artifacts"""
+
+    def __init__(self,
+                 client: Client,
+                 concurrency: Optional[int] = None,
+                 transport: Optional[httpx.AsyncBaseTransport] = None,
+                 page_size: int = IDEA_PAGE_SIZE):
+        """
+        Args:
+            client: Supabase client (service role) for tables and storage
+            concurrency: Concurrent file downloads
+            transport: httpx transport override (tests)
+            page_size: Ideas per page
+        """
+        self.client = client
+        self.concurrency = concurrency or settings.EXPORT_FETCH_CONCURRENCY
+        self.transport = transport
+        self.page_size = page_size
+
+    async def _rows(self, query) -> List[Dict[str, Any]]:
+        result = await run_in_threadpool(query.execute)
+        return result.data or []
+
+    async def load_manifest(self, user_id: str, email: str, user_settings: Dict[str, Any]) -> ExportManifest:
+        """Load the profile and file metadata concurrently"""
+        profile_rows, files = await asyncio.gather(
+            self._rows(self.client.table("profiles").select(PROFILE.columns).eq("id", user_id)),
+            self._rows(self.client.table("files").select(FILE_RECORD.columns)
+                       .eq("user_id", user_id).order("created_at")),
+        )
+        return ExportManifest(
+            user_id=user_id,
+            email=email,
+            profile=PROFILE.map_row(profile_rows[0]) if profile_rows else {},
+            files=files,
+            settings=user_settings or {},
+        )
+
+    async def _idea_pages(self, user_id: str) -> AsyncIterator[List[Dict[str, Any]]]:
+        """All of a user's ideas in id order; the next page loads while one is consumed"""
+        def page(after: Optional[int]):
+            query = self.client.table("ideas").select(IDEA_SUMMARY.columns).eq("user_id", user_id)
+            if after is not None:
+                query = query.gt("id", after)
+            return self._rows(query.order("id").limit(self.page_size))
+
+        pending = asyncio.ensure_future(page(None))
+        try:
+            while True:
+                rows = await pending
+                if len(rows) < self.page_size:
+                    if rows:
+                        yield IDEA_SUMMARY.map(rows)
+                    return
+                pending = asyncio.ensure_future(page(rows[-1]["id"]))
+                yield IDEA_SUMMARY.map(rows)
+        finally:
+            pending.cancel()
+
+    async def _ideas_json(self, user_id: str, indent: str = "") -> AsyncIterator[str]:
+        yield "["
+        first = True
+        async for rows in self._idea_pages(user_id):
+            # One piece per page keeps compression calls coarse
+            items = [_dumps(row).replace("\n", "\n  " + indent) for row in rows]
+            yield ("\n  " if first else ",\n  ") + indent + (",\n  " + indent).join(items)
+            first = False
+        yield "]" if first else "\n" + indent + "]"
+
+    async def _user_data_json(self, manifest: ExportManifest, export_date: str) -> AsyncIterator[str]:
+        """user_data.json (UserDataExport shape) with the ideas streamed"""
+        yield '{\n  "profile": ' + _dumps(manifest.profile).replace("\n", "\n  ")
+        yield ',\n  "ideas": '
+        async for piece in self._ideas_json(manifest.user_id, indent="  "):
+            yield piece
+        yield ',\n  "activities": [],\n  "settings": ' + _dumps(manifest.settings).replace("\n", "\n  ")
+        yield ',\n  "export_date": ' + json.dumps(export_date) + "\n}"
+
+    def _http(self) -> httpx.AsyncClient:
+        key = self.client.supabase_key
+        return httpx.AsyncClient(
+            base_url=f"{self.client.supabase_url.rstrip('/')}/storage/v1/object/",
+            headers={"Authorization": f"Bearer {key}", "apikey": key},
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            transport=self.transport
+        )
+
+    async def _download(self,
+                        http: httpx.AsyncClient,
+                        semaphore: asyncio.Semaphore,
+                        bucket: str,
+                        path: str,
+                        queue: "asyncio.Queue[Union[bytes, Exception, None]]") -> None:
+        async with semaphore:
+            try:
+                async with http.stream("GET", f"{bucket}/{quote(path)}") as response:
+                    response.raise_for_status()
+                    async for chunk in response.aiter_bytes(DOWNLOAD_CHUNK_SIZE):
+                        await queue.put(chunk)
+                await queue.put(None)
+            except Exception as e:
+                await queue.put(e)
+
+    async def archive(self, manifest: ExportManifest, bucket_name: str = "idea-files") -> AsyncIterator[bytes]:
+        """The export ZIP, yielded as it is produced"""
+        export_date = datetime.now().isoformat()
+        archive = ZipStream()
+        semaphore = asyncio.Semaphore(self.concurrency)
+        queues = [asyncio.Queue(maxsize=PREFETCH_CHUNKS) for _ in manifest.files]
+
+        async with self._http() as http:
+            # Downloads start now and overlap with writing the JSON entries
+            downloads = [
+                asyncio.ensure_future(self._download(http, semaphore, bucket_name, record["file_path"], queue))
+                for record, queue in zip(manifest.files, queues)
+            ]
+            try:
+                yield archive.write("README.txt", _README.format(
+                    export_date=export_date, user_id=manifest.user_id, email=manifest.email
+                ).encode("utf-8"))
+                yield archive.write("profile.json", _dumps(manifest.profile).encode("utf-8"))
+                async for piece in archive.write_iter("ideas.json", _encode(self._ideas_json(manifest.user_id))):
+                    yield piece
+                async for piece in archive.write_iter("user_data.json",
+                                                      _encode(self._user_data_json(manifest, export_date))):
+                    yield piece
+
+                listing = []
+                for record, queue in zip(manifest.files, queues):
+                    name = archive_name(record)
+                    size = record.get("file_size") or 0
+                    entry = {
+                        "id": record.get("id"),
+                        "filename": record.get("original_filename") or record.get("filename"),
+                        "content_type": record.get("content_type"),
+                        "file_size": size,
+                        "idea_id": record.get("idea_id"),
+                        "description": record.get("description"),
+                        "created_at": record.get("created_at"),
+                        "archive_path": name,
+                    }
+                    try:
+                        async for piece in archive.write_iter(name, _queued(queue),
+                                                              compresslevel=_compresslevel(record.get("content_type")),
+                                                              large=size >= zipfile.ZIP64_LIMIT):
+                            yield piece
+                    except Exception as e:
+                        logger.warning(f"Export of file {record.get('id')} for user {manifest.user_id} failed: {e}")
+                        entry["error"] = "File could not be read from storage; the archive copy is incomplete"
+                    listing.append(entry)
+
+                yield archive.write("files_list.json", _dumps(listing).encode("utf-8"))
+                yield archive.close()
+            finally:
+                for download in downloads:
+                    download.cancel()
+
+    # Export jobs (add_export_jobs_migration.sql)
+
+    @staticmethod
+    def _is_stale(job: Dict[str, Any]) -> bool:
+        """Whether a pending or running job has outlived EXPORT_JOB_TIMEOUT_SECONDS"""
+        if job.get("status") not in ("pending", "running"):
+            return False
+        since = job.get("started_at") or job.get("created_at")
+        if not since:
+            return True
+        since = datetime.fromisoformat(str(since).replace("Z", "+00:00"))
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        age = (datetime.now(timezone.utc) - since).total_seconds()
+        return age > settings.EXPORT_JOB_TIMEOUT_SECONDS
+
+    async def _expire(self, job: Dict[str, Any]) -> None:
+        """Fail a stale job, unless its status changed meanwhile"""
+        values = {
+            "status": "failed",
+            "error": "Export timed out",
+            "completed_at": datetime.utcnow().isoformat(),
+        }
+        await self._rows(
+            self.client.table("export_jobs").update(values).eq("id", job["id"]).eq("status", job["status"])
+        )
+        logger.warning(f"Export job {job['id']} for user {job.get('user_id')} timed out while {job['status']}")
+        job.update(values)
+
+    async def create_job(self, user_id: str) -> Tuple[Dict[str, Any], bool]:
+        """Create an export job: (job, created)
+
+        A user's job still in progress is returned instead of a new one;
+        stale jobs are failed first.
+        """
+        active = await self._rows(
+            self.client.table("export_jobs").select("*").eq("user_id", user_id)
+            .in_("status", ["pending", "running"])
+        )
+        for job in active:
+            if not self._is_stale(job):
+                return job, False
+            await self._expire(job)
+
+        rows = await self._rows(self.client.table("export_jobs").insert({
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "status": "pending",
+            "created_at": datetime.utcnow().isoformat(),
+        }))
+        if not rows:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to create export job"
+            )
+        return rows[0], True
+
+    async def _update_job(self, job_id: str, values: Dict[str, Any], from_status: str) -> bool:
+        """Update a job still in from_status; False if it has moved on (e.g. timed out)"""
+        rows = await self._rows(
+            self.client.table("export_jobs").update(values).eq("id", job_id).eq("status", from_status)
+        )
+        return bool(rows)
+
+    async def run_job(self, job_id: str, user_id: str, email: str, user_settings: Dict[str, Any]) -> None:
+        """Stream the archive into the exports bucket and record the outcome"""
+        file_path = f"{user_id}/{job_id}.zip"
+        started = {"status": "running", "started_at": datetime.utcnow().isoformat()}
+        if not await self._update_job(job_id, started, "pending"):
+            logger.warning(f"Export job {job_id} for user {user_id} is no longer pending; not running it")
+            return
+        try:
+            manifest = await self.load_manifest(user_id, email, user_settings)
+            stored = await StreamingUploader(self.client).upload(
+                EXPORT_BUCKET,
+                file_path,
+                self.archive(manifest),
+                content_type="application/zip",
+                max_bytes=settings.EXPORT_MAX_MB * MB,
+                cache_control="no-store"
+            )
+            completed = await self._update_job(job_id, {
+                "status": "completed",
+                "file_path": stored.path,
+                "file_size": stored.size,
+                "completed_at": datetime.utcnow().isoformat(),
+            }, "running")
+            if completed:
+                logger.info(f"Export job {job_id} for user {user_id} stored {stored.size} bytes")
+            else:
+                # Timed out or cancelled by account deletion meanwhile
+                logger.warning(f"Export job {job_id} for user {user_id} finished after it was stopped")
+                await self._remove_archives([stored.path])
+        except Exception as e:
+            logger.error(f"Export job {job_id} for user {user_id} failed: {e}")
+            await self._update_job(job_id, {
+                "status": "failed",
+                "error": str(getattr(e, "detail", e))[:500],
+                "completed_at": datetime.utcnow().isoformat(),
+            }, "running")
+
+    async def get_job(self, user_id: str, job_id: str) -> Optional[Dict[str, Any]]:
+        """A user's export job, with a signed download URL once it has completed"""
+        rows = await self._rows(
+            self.client.table("export_jobs").select("*").eq("id", job_id).eq("user_id", user_id)
+        )
+        if not rows:
+            return None
+        job = rows[0]
+        if self._is_stale(job):
+            await self._expire(job)
+        job["download_url"] = None
+        if job.get("status") == "completed" and job.get("file_path"):
+            urls = await UploadIntentService(self.client).signed_download_urls(
+                EXPORT_BUCKET, [job["file_path"]], settings.SIGNED_URL_TTL_SECONDS
+            )
+            job["download_url"] = urls.get(job["file_path"])
+        return job
+
+    async def _remove_archives(self, paths: List[str]) -> None:
+        await run_in_threadpool(self.client.storage.from_(EXPORT_BUCKET).remove, paths)
+
+    async def expire_jobs(self, older_than: timedelta) -> int:
+        """Delete the archives of jobs completed more than older_than ago; returns the number of jobs"""
+        cutoff = (datetime.utcnow() - older_than).isoformat()
+        expired = 0
+        while True:
+            jobs = await self._rows(
+                self.client.table("export_jobs").select("id, file_path").eq("status", "completed")
+                .lt("completed_at", cutoff).limit(EXPIRE_BATCH_SIZE)
+            )
+            if not jobs:
+                break
+            paths = [job["file_path"] for job in jobs if job.get("file_path")]
+            if paths:
+                await self._remove_archives(paths)
+            await self._rows(
+                self.client.table("export_jobs").update({"status": "expired", "file_path": None})
+                .in_("id", [job["id"] for job in jobs]).eq("status", "completed")
+            )
+            expired += len(jobs)
+            if len(jobs) < EXPIRE_BATCH_SIZE:
+                break
+        if expired:
+            logger.info(f"Deleted {expired} expired export archives")
+        return expired
+
+    async def delete_user_exports(self, user_id: str) -> int:
+        """Delete all of a user's archives and stop their jobs; returns the number of objects removed"""
+        await self._rows(
+            self.client.table("export_jobs").update({"status": "expired", "file_path": None})
+            .eq("user_id", user_id).in_("status", ["pending", "running", "completed"])
+        )
+        bucket = self.client.storage.from_(EXPORT_BUCKET)
+        removed = 0
+        while True:
+            entries = await run_in_threadpool(bucket.list, user_id, {"limit": LIST_PAGE_SIZE})
+            paths = [f"{user_id}/{entry['name']}" for entry in entries or [] if entry.get("name")]
+            if paths:
+                await self._remove_archives(paths)
+                removed += len(paths)
+            if len(paths) < LIST_PAGE_SIZE:
+                return removed
+
+
+class ExportRetention:
+    """Deletes export archives once they are older than the retention period"""
+
+    def __init__(self,
+                 client_factory: Callable[[], Client] = service_client,
+                 retention_hours: float = 168,
+                 sweep_interval: float = 3600.0):
+        self._client_factory = client_factory
+        self._client: Optional[Client] = None
+        self.retention = timedelta(hours=retention_hours)
+        self._sweeper = PeriodicTask("Export retention sweep", self.sweep, sweep_interval, run_first=True)
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    async def sweep(self) -> int:
+        return await DataExportService(self.client).expire_jobs(self.retention)
+
+    def start(self) -> None:
+        self._sweeper.start()
+
+    async def stop(self) -> None:
+        await self._sweeper.stop()
+
+
+export_retention = ExportRetention(retention_hours=settings.EXPORT_RETENTION_HOURS)
@@ -0,0 +1,379 @@
+"""
+Durable email outbox with pooled async SMTP delivery
+
+Sending an email from a request only inserts a row into email_outbox
+(add_email_outbox_migration.sql); SMTP time never counts towards request
+latency. A dispatcher task in each API worker claims due messages through
+claim_email_outbox (row locks with SKIP LOCKED, so workers never send the
+same message) and delivers them over a small pool of connections that are
+kept open between messages. Connections log in when SMTP_USER and
+SMTP_PASSWORD are set; otherwise mail goes to the server unauthenticated
+(e.g. a local relay or test sink).
+
+- Transient failures are retried with exponential backoff up to
+  EMAIL_MAX_ATTEMPTS; permanent SMTP rejections (5xx) fail immediately.
+- Each recipient gets at most EMAIL_RECIPIENT_MAX_PER_WINDOW messages per
+  EMAIL_RECIPIENT_WINDOW_SECONDS; the claim leaves the rest queued.
+- Messages claimed by a worker that died are reclaimed after a lease.
+"""
+import asyncio
+import logging
+import random
+import time
+from contextlib import asynccontextmanager
+from datetime import datetime, timedelta, timezone
+from email.message import EmailMessage
+from email.utils import formataddr, make_msgid
+from typing import Any, AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+import aiosmtplib
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.config import settings
+from app.services.background import PeriodicTask, service_client
+
+logger = logging.getLogger(__name__)
+
+# Supabase function claiming due messages (see add_email_outbox_migration.sql)
+CLAIM_RPC = "claim_email_outbox"
+
+# Seconds before a message claimed by a dead dispatcher is claimed again
+CLAIM_LEASE_SECONDS = 600
+
+# Rows per insert when queueing many messages at once
+ENQUEUE_BATCH_SIZE = 500
+
+# Sent messages are kept this long, then purged
+SENT_RETENTION = timedelta(days=7)
+PURGE_INTERVAL_SECONDS = 3600
+
+
+def build_message(from_name: str,
+                  from_email: str,
+                  to_email: str,
+                  subject: str,
+                  text_content: str,
+                  html_content: Optional[str] = None,
+                  reply_to: Optional[str] = None) -> EmailMessage:
+    """A text message, with an HTML alternative if given"""
+    message = EmailMessage()
+    message["Subject"] = subject
+    message["From"] = formataddr((from_name, from_email))
+    message["To"] = to_email
+    message["Message-ID"] = make_msgid(domain=from_email.rpartition("@")[2] or None)
+    if reply_to:
+        message["Reply-To"] = reply_to
+    message.set_content(text_content)
+    if html_content:
+        message.add_alternative(html_content, subtype="html")
+    return message
+
+
+class SMTPConnectionPool:
+    """Up to `size` SMTP connections, reused across messages"""
+
+    def __init__(self,
+                 host: str,
+                 port: int,
+                 username: str = "",
+                 password: str = "",
+                 size: int = 2,
+                 timeout: float = 30.0,
+                 idle_timeout: float = 60.0):
+        """
+        Args:
+            size: Maximum open connections (and concurrent sends)
+            idle_timeout: Connections idle for longer are reopened, since
+                servers drop them silently
+        """
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.size = max(1, size)
+        self.timeout = timeout
+        self.idle_timeout = idle_timeout
+        self._idle: List[Tuple[aiosmtplib.SMTP, float]] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.connections_opened = 0
+
+    async def _open(self) -> aiosmtplib.SMTP:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.host,
+            port=self.port,
+            username=self.username or None,
+            password=self.password or None,
+            use_tls=self.port == 465,  # implicit TLS; otherwise STARTTLS when offered
+            timeout=self.timeout,
+        )
+        await smtp.connect()  # also logs in when credentials are set
+        self.connections_opened += 1
+        return smtp
+
+    @staticmethod
+    async def _discard(smtp: aiosmtplib.SMTP) -> None:
+        try:
+            await smtp.quit()
+        except Exception:
+            smtp.close()
+
+    @asynccontextmanager
+    async def connection(self) -> AsyncIterator[aiosmtplib.SMTP]:
+        """Borrow a connection; it is returned to the pool unless it failed"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.size)
+        async with self._slots:
+            smtp = None
+            while self._idle and smtp is None:
+                candidate, idle_since = self._idle.pop()
+                if candidate.is_connected and time.monotonic() - idle_since < self.idle_timeout:
+                    smtp = candidate
+                else:
+                    await self._discard(candidate)
+            if smtp is None:
+                smtp = await self._open()
+            try:
+                yield smtp
+            except BaseException:
+                await self._discard(smtp)
+                raise
+            self._idle.append((smtp, time.monotonic()))
+
+    async def send(self, message: EmailMessage) -> None:
+        """Send one message; a connection dropped since last use is reopened once"""
+        try:
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+        except aiosmtplib.SMTPServerDisconnected:
+            async with self.connection() as smtp:
+                await smtp.send_message(message)
+
+    async def close(self) -> None:
+        idle, self._idle = self._idle, []
+        for smtp, _ in idle:
+            await self._discard(smtp)
+
+
+def _is_permanent(error: Exception) -> bool:
+    """SMTP 5xx replies (bad recipient, rejected content) will not succeed on retry"""
+    if isinstance(error, aiosmtplib.SMTPRecipientsRefused):
+        return all(500 <= refusal.code < 600 for refusal in error.recipients)
+    code = getattr(error, "code", None)
+    return isinstance(error, aiosmtplib.SMTPResponseException) and code is not None and 500 <= code < 600
+
+
+class EmailOutbox:
+    """Queue emails in the outbox table and deliver them in the background"""
+
+    def __init__(self,
+                 pool: Optional[SMTPConnectionPool] = None,
+                 client_factory: Callable[[], Client] = service_client,
+                 batch_size: int = 20,
+                 poll_interval: float = 10.0,
+                 max_attempts: int = 6,
+                 retry_base_seconds: float = 30.0,
+                 recipient_max_per_window: int = 5,
+                 recipient_window_seconds: int = 60):
+        self.pool = pool or SMTPConnectionPool(
+            settings.SMTP_HOST,
+            settings.SMTP_PORT,
+            settings.SMTP_USER,
+            settings.SMTP_PASSWORD,
+            size=settings.EMAIL_POOL_SIZE
+        )
+        self.from_email = settings.SMTP_FROM_EMAIL
+        self.from_name = settings.SMTP_FROM_NAME
+        self._client_factory = client_factory
+        self._client: Optional[Client] = None
+        self.batch_size = batch_size
+        self.max_attempts = max_attempts
+        self.retry_base_seconds = retry_base_seconds
+        self.recipient_max_per_window = recipient_max_per_window
+        self.recipient_window_seconds = recipient_window_seconds
+        self._dispatch_lock = asyncio.Lock()
+        self._dispatcher = PeriodicTask("Email dispatch", self.dispatch, poll_interval)
+        self._last_purge = 0.0
+
+    def is_configured(self) -> bool:
+        """Check if SMTP is properly configured (credentials are optional)"""
+        return bool(self.pool.host and self.from_email)
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    async def enqueue(self,
+                      to_email: str,
+                      subject: str,
+                      text_content: str,
+                      html_content: Optional[str] = None,
+                      reply_to: Optional[str] = None,
+                      category: str = "transactional") -> bool:
+        """Queue a message; returns False if it could not be stored"""
+        row = {
+            "to_email": to_email,
+            "subject": subject,
+            "text_body": text_content,
+            "html_body": html_content,
+            "reply_to": reply_to,
+            "category": category,
+        }
+        try:
+            await run_in_threadpool(self.client.table("email_outbox").insert(row).execute)
+        except Exception as e:
+            logger.error(f"Failed to queue email to {to_email}: {e}")
+            return False
+        self._dispatcher.wake()
+        return True
+
+    async def enqueue_many(self, messages: Iterable[Dict[str, Any]], category: str = "transactional") -> int:
+        """Queue many messages with one insert per ENQUEUE_BATCH_SIZE rows
+
+        Args:
+            messages: Dicts with enqueue()'s arguments (to_email, subject,
+                text_content, and optionally html_content and reply_to)
+
+        Returns:
+            Number of messages queued; a failed batch is logged and skipped
+        """
+        queued = 0
+        batch: List[Dict[str, Any]] = []
+
+        async def flush() -> None:
+            nonlocal queued, batch
+            rows, batch = batch, []
+            try:
+                await run_in_threadpool(self.client.table("email_outbox").insert(rows).execute)
+                queued += len(rows)
+            except Exception as e:
+                logger.error(f"Failed to queue {len(rows)} emails: {e}")
+
+        for message in messages:
+            batch.append({
+                "to_email": message["to_email"],
+                "subject": message["subject"],
+                "text_body": message["text_content"],
+                "html_body": message.get("html_content"),
+                "reply_to": message.get("reply_to"),
+                "category": category,
+            })
+            if len(batch) >= ENQUEUE_BATCH_SIZE:
+                await flush()
+        if batch:
+            await flush()
+        if queued:
+            self._dispatcher.wake()
+        return queued
+
+    def _backoff(self, attempts: int) -> timedelta:
+        """Exponential backoff with jitter, capped at one hour"""
+        delay = min(self.retry_base_seconds * (2 ** max(0, attempts - 1)), 3600.0)
+        return timedelta(seconds=delay * random.uniform(0.8, 1.2))
+
+    async def _claim(self) -> List[Dict[str, Any]]:
+        result = await run_in_threadpool(self.client.rpc(CLAIM_RPC, {
+            "p_limit": self.batch_size,
+            "p_per_recipient": self.recipient_max_per_window,
+            "p_window_seconds": self.recipient_window_seconds,
+            "p_lease_seconds": CLAIM_LEASE_SECONDS,
+        }).execute)
+        return result.data or []
+
+    async def _deliver(self, row: Dict[str, Any]) -> Optional[Exception]:
+        message = build_message(
+            self.from_name, self.from_email, row["to_email"], row["subject"],
+            row["text_body"], row.get("html_body"), row.get("reply_to")
+        )
+        try:
+            await self.pool.send(message)
+        except Exception as e:
+            return e
+        return None
+
+    async def _update(self, values: Dict[str, Any], ids: List[Any]) -> None:
+        await run_in_threadpool(self.client.table("email_outbox").update(values).in_("id", ids).execute)
+
+    async def _record(self, rows: List[Dict[str, Any]], errors: List[Optional[Exception]]) -> None:
+        now = datetime.now(timezone.utc)
+        sent = [row["id"] for row, error in zip(rows, errors) if error is None]
+        if sent:
+            await self._update({"status": "sent", "sent_at": now.isoformat(), "last_error": None}, sent)
+
+        for row, error in zip(rows, errors):
+            if error is None:
+                continue
+            attempts = row.get("attempts") or 1
+            if _is_permanent(error) or attempts >= self.max_attempts:
+                logger.error(f"Giving up on email {row['id']} to {row['to_email']} after {attempts} attempts: {error}")
+                values = {"status": "failed", "last_error": str(error)[:500]}
+            else:
+                logger.warning(f"Email {row['id']} to {row['to_email']} failed (attempt {attempts}), retrying: {error}")
+                values = {
+                    "status": "pending",
+                    "next_attempt_at": (now + self._backoff(attempts)).isoformat(),
+                    "last_error": str(error)[:500],
+                }
+            await self._update(values, [row["id"]])
+
+    async def _purge(self) -> None:
+        if time.monotonic() - self._last_purge < PURGE_INTERVAL_SECONDS:
+            return
+        self._last_purge = time.monotonic()
+        cutoff = (datetime.now(timezone.utc) - SENT_RETENTION).isoformat()
+        await run_in_threadpool(
+            self.client.table("email_outbox").delete().eq("status", "sent").lt("sent_at", cutoff).execute
+        )
+
+    async def dispatch(self) -> int:
+        """Send everything currently due; returns the number of messages sent"""
+        sent = 0
+        async with self._dispatch_lock:
+            while True:
+                try:
+                    rows = await self._claim()
+                except Exception as e:
+                    logger.error(f"Failed to claim queued emails: {e}")
+                    break
+                if not rows:
+                    break
+                # Concurrency is bounded by the connection pool
+                errors = await asyncio.gather(*(self._deliver(row) for row in rows))
+                try:
+                    await self._record(rows, errors)
+                except Exception as e:
+                    # Unrecorded messages are reclaimed after the lease
+                    logger.error(f"Failed to record email delivery results: {e}")
+                sent += sum(error is None for error in errors)
+                if len(rows) < self.batch_size:
+                    break
+            try:
+                await self._purge()
+            except Exception as e:
+                logger.warning(f"Failed to purge sent emails: {e}")
+        if sent:
+            logger.info(f"Sent {sent} queued emails")
+        return sent
+
+    def start(self) -> None:
+        if not self.is_configured():
+            logger.warning("SMTP not configured - queued emails will not be sent")
+            return
+        self._dispatcher.start()
+
+    async def stop(self) -> None:
+        """Stop the dispatcher and close pooled connections"""
+        await self._dispatcher.stop()
+        await self.pool.close()
+
+
+email_outbox = EmailOutbox(
+    batch_size=settings.EMAIL_BATCH_SIZE,
+    poll_interval=settings.EMAIL_POLL_INTERVAL_SECONDS,
+    max_attempts=settings.EMAIL_MAX_ATTEMPTS,
+    retry_base_seconds=settings.EMAIL_RETRY_BASE_SECONDS,
+    recipient_max_per_window=settings.EMAIL_RECIPIENT_MAX_PER_WINDOW,
+    recipient_window_seconds=settings.EMAIL_RECIPIENT_WINDOW_SECONDS
+)
@@ -1,14 +1,12 @@
 """
 Email service for sending custom emails when Supabase email is not configured
 """
-import smtplib
-import ssl
-from email.mime.text import MIMEText
-from email.mime.multipart import MIMEMultipart
-from typing import Optional
+from typing import Any, Dict, Iterable, Iterator, Optional
 import logging
 
 from app.config import settings
+from app.services.email_outbox import email_outbox
+from app.services.email_templates import email_templates
 
 logger = logging.getLogger(__name__)
 
@@ -26,12 +24,7 @@ class EmailService:
     
     def is_configured(self) -> bool:
         """Check if SMTP is properly configured"""
-        return bool(
-            self.smtp_host and 
-            self.smtp_user and 
-            self.smtp_password and 
-            self.from_email
-        )
+        return email_outbox.is_configured()
     
     async def send_confirmation_email(self, email: str, confirmation_token: str) -> bool:
         """Send email confirmation email"""
@@ -43,106 +36,66 @@ class EmailService:
             # Create confirmation URL
             confirm_url = f"{self.site_url}/api/v1/auth/confirm?token={confirmation_token}"
             
-            # Create email content
-            subject = "Confirm Your ESAL Platform Account"
-            
-            html_content = f"""
-            <!DOCTYPE html>
-            <html>
-            <head>
-                <style>
-                    body {{ font-family: Arial, sans-serif; line-height: 1.6; color: #333; }}
-                    .container {{ max-width: 600px; margin: 0 auto; padding: 20px; }}
-                    .header {{ background-color: #007bff; color: white; padding: 20px; text-align: center; }}
-                    .content {{ padding: 20px; background-color: #f9f9f9; }}
-                    .button {{ 
-                        display: inline-block; 
-                        padding: 12px 30px; 
-                        background-color: #007bff; 
-                        color: white; 
-                        text-decoration: none; 
-                        border-radius: 5px; 
-                        margin: 20px 0; 
-                    }}
-                    .footer {{ text-align: center; padding: 20px; color: #666; font-size: 14px; }}
-                </style>
-            </head>
-            <body>
-                <div class="container">
-                    <div class="header">
-                        <h1>Welcome to ESAL Platform!</h1>
-                    </div>
-                    <div class="content">
-                        <h2>Confirm Your Email Address</h2>
-                        <p>Thank you for signing up for ESAL Platform. To complete your registration and start using your account, please confirm your email address by clicking the button below:</p>
-                        
-                        <a href="{confirm_url}" class="button">Confirm Email Address</a>
-                        
-                        <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
-                        <p style="word-break: break-all; color: #007bff;">{confirm_url}</p>
-                        
-                        <p>If you didn't create an account with ESAL Platform, please ignore this email.</p>
-                        
-                        <p>Best regards,<br>The ESAL Platform Team</p>
-                    </div>
-                    <div class="footer">
-                        <p>&copy; 2024 ESAL Platform. All rights reserved.</p>
-                    </div>
-                </div>
-            </body>
-            </html>
-            """
-            
-            text_content = f"""
-            Welcome to ESAL Platform!
-            
-            Thank you for signing up. To complete your registration, please confirm your email address by visiting:
-            
-            {confirm_url}
-            
-            If you didn't create an account with ESAL Platform, please ignore this email.
-            
-            Best regards,
-            The ESAL Platform Team
-            """
+            rendered = email_templates.render("confirmation", confirm_url=confirm_url)
             
             # Send email
-            return await self._send_email(email, subject, text_content, html_content)
+            return await self._send_email(email, *rendered)
             
         except Exception as e:
             logger.error(f"Error sending confirmation email: {e}")
             return False
     
-    async def _send_email(self, to_email: str, subject: str, text_content: str, html_content: str) -> bool:
-        """Send email using SMTP"""
-        try:
-            # Create message
-            msg = MIMEMultipart("alternative")
-            msg["Subject"] = subject
-            msg["From"] = f"{self.from_name} <{self.from_email}>"
-            msg["To"] = to_email
-            
-            # Add text and HTML parts
-            text_part = MIMEText(text_content, "plain")
-            html_part = MIMEText(html_content, "html")
-            
-            msg.attach(text_part)
-            msg.attach(html_part)
-            
-            # Send email
-            context = ssl.create_default_context()
-            
-            with smtplib.SMTP(self.smtp_host, self.smtp_port) as server:
-                server.starttls(context=context)
-                server.login(self.smtp_user, self.smtp_password)
-                server.send_message(msg)
-            
-            logger.info(f"Email sent successfully to {to_email}")
-            return True
-            
-        except Exception as e:
-            logger.error(f"Failed to send email to {to_email}: {e}")
-            return False
+    async def _send_email(self, to_email: str, subject: str, text_content: str, html_content: str,
+                          reply_to: Optional[str] = None) -> bool:
+        """Queue an email for delivery (see app/services/email_outbox.py)"""
+        queued = await email_outbox.enqueue(to_email, subject, text_content, html_content, reply_to=reply_to)
+        if queued:
+            logger.info(f"Email to {to_email} queued for delivery")
+        return queued
+
+    async def send_digest(self,
+                          recipients: Iterable[Dict[str, Any]],
+                          title: str,
+                          intro: str,
+                          items: Iterable[Dict[str, Any]]) -> int:
+        """Queue the same digest to many recipients; returns the number queued
+
+        The item list is rendered once and bound into the template, so each
+        recipient only costs a join and a row in a batched outbox insert.
+
+        Args:
+            recipients: Dicts with email and (optionally) full_name
+            items: Dicts with title, summary and url
+        """
+        if not self.is_configured():
+            logger.warning("SMTP not configured - cannot send digest")
+            return 0
+
+        entry = email_templates["digest_item"]
+        rendered_items = [entry.render(**item) for item in items]
+        digest = email_templates.bind(
+            "digest",
+            title=title,
+            intro=intro,
+            items_html="".join(item.html for item in rendered_items),
+            items_text="\n".join(item.text for item in rendered_items),
+        )
+
+        def messages() -> Iterator[Dict[str, Any]]:
+            for recipient in recipients:
+                if not recipient.get("email"):
+                    continue
+                subject, text_content, html_content = digest.render(name=recipient.get("full_name") or "there")
+                yield {
+                    "to_email": recipient["email"],
+                    "subject": subject,
+                    "text_content": text_content,
+                    "html_content": html_content,
+                }
+
+        queued = await email_outbox.enqueue_many(messages(), category="digest")
+        logger.info(f"Queued digest '{title}' for {queued} recipients")
+        return queued
 
 
 # Global email service instance
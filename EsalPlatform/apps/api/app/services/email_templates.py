@@ -0,0 +1,390 @@
+"""
+Precompiled email templates
+
+Every email is defined once below as a subject, an HTML body and a text body,
+and rendered into the shared layout (styles, header, footer). Templates are
+compiled when this module is imported: the body is placed into the layout,
+split at its {{ field }} placeholders, and everything that does not vary per
+message (layout, styles, site URL, expiry, year) is substituted up front.
+Rendering a message is then a single join over the remaining pieces, and the
+text and HTML parts are always produced together.
+
+Placeholders are escaped for HTML unless a filter says otherwise:
+
+    {{ name }}          escaped
+    {{ message|lines }} escaped, newlines become <br>
+    {{ items|raw }}     inserted as-is (already rendered HTML)
+
+For bulk sends, bind() fixes the values shared by every recipient (a digest's
+item list) once, so each message only fills in its recipient's fields:
+
+    digest = email_templates.bind("digest", items_html=..., items_text=...)
+    for investor in investors:
+        rendered = digest.render(name=investor["full_name"])
+"""
+import html
+import re
+import textwrap
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Any, Dict, Mapping, NamedTuple, Optional, Tuple, Union
+
+from app.config import settings
+
+_PLACEHOLDER = re.compile(r"\{\{\s*(\w+)(?:\|(\w+))?\s*\}\}")
+_FILTERS = frozenset({"escape", "lines", "raw"})
+
+# Where a template's HTML body goes in the layout
+_CONTENT = "<!--content-->"
+
+
+class _Field(NamedTuple):
+    name: str
+    filter: str
+
+
+class CompiledText:
+    """Template source split into literal text and placeholders"""
+
+    __slots__ = ("parts", "html")
+
+    def __init__(self, parts: Tuple[Union[str, _Field], ...], html: bool):
+        self.parts = parts
+        self.html = html
+
+    @classmethod
+    def parse(cls, source: str, html: bool) -> "CompiledText":
+        parts = []
+        position = 0
+        for match in _PLACEHOLDER.finditer(source):
+            name, filter_ = match.group(1), match.group(2) or "escape"
+            if filter_ not in _FILTERS:
+                raise ValueError(f"Unknown template filter {filter_!r}")
+            parts.append(source[position:match.start()])
+            parts.append(_Field(name, filter_))
+            position = match.end()
+        parts.append(source[position:])
+        return cls(tuple(part for part in parts if part != ""), html)
+
+    @property
+    def fields(self) -> frozenset:
+        return frozenset(part.name for part in self.parts if isinstance(part, _Field))
+
+    def _format(self, field: _Field, value: Any) -> str:
+        text = str(value)
+        if not self.html or field.filter == "raw":
+            return text
+        text = html.escape(text)
+        if field.filter == "lines":
+            text = text.replace("\r\n", "\n").replace("\n", "<br>\n")
+        return text
+
+    def bind(self, values: Mapping[str, Any]) -> "CompiledText":
+        """Substitute the given fields, merging them into the literal text"""
+        parts = []
+        for part in self.parts:
+            if isinstance(part, _Field) and part.name in values:
+                part = self._format(part, values[part.name])
+            if isinstance(part, str) and parts and isinstance(parts[-1], str):
+                parts[-1] += part
+            else:
+                parts.append(part)
+        return CompiledText(tuple(parts), self.html)
+
+    def render(self, values: Mapping[str, Any]) -> str:
+        """Fill in every remaining field
+
+        Raises:
+            KeyError: a field has no value
+        """
+        return "".join(
+            part if isinstance(part, str) else self._format(part, values[part.name])
+            for part in self.parts
+        )
+
+
+@dataclass(frozen=True)
+class EmailTemplate:
+    """Source of one email; html is placed into the layout unless layout=False"""
+    subject: str
+    html: str
+    text: str
+    heading: str = ""
+    subheading: str = ""
+    layout: bool = True
+
+
+class RenderedEmail(NamedTuple):
+    subject: str
+    text: str
+    html: str
+
+
+class BoundTemplate:
+    """A compiled template; render() fills in the per-message fields"""
+
+    __slots__ = ("name", "subject", "text", "html")
+
+    def __init__(self, name: str, subject: CompiledText, text: CompiledText, html: CompiledText):
+        self.name = name
+        self.subject = subject
+        self.text = text
+        self.html = html
+
+    @property
+    def fields(self) -> frozenset:
+        return self.subject.fields | self.text.fields | self.html.fields
+
+    def bind(self, **values: Any) -> "BoundTemplate":
+        return BoundTemplate(self.name, self.subject.bind(values), self.text.bind(values), self.html.bind(values))
+
+    def render(self, **values: Any) -> RenderedEmail:
+        try:
+            # Subjects are a single header line whatever the values contain
+            subject = " ".join(self.subject.render(values).split())
+            return RenderedEmail(subject, self.text.render(values), self.html.render(values))
+        except KeyError as e:
+            raise ValueError(f"Email template {self.name!r} needs a value for {e.args[0]!r}") from None
+
+
+LAYOUT_HTML = """\
+<!DOCTYPE html>
+<html>
+<head>
+    <meta charset="utf-8">
+    <title>{{ heading }}</title>
+    <style>
+        body { font-family: Arial, sans-serif; line-height: 1.6; color: #333; margin: 0; padding: 0; }
+        .container { max-width: 600px; margin: 0 auto; padding: 20px; background-color: #f9f9f9; }
+        .header { background: linear-gradient(135deg, #667eea 0%, #764ba2 100%); color: white; padding: 30px 20px; text-align: center; border-radius: 10px 10px 0 0; }
+        .logo { font-size: 28px; font-weight: bold; margin-bottom: 10px; }
+        .content { padding: 30px 20px; background-color: white; border-radius: 0 0 10px 10px; box-shadow: 0 2px 10px rgba(0,0,0,0.1); }
+        .button { display: inline-block; padding: 12px 30px; background-color: #667eea; color: white; text-decoration: none; border-radius: 5px; margin: 20px 0; }
+        .link { word-break: break-all; color: #667eea; }
+        .verification-code { font-size: 36px; font-weight: bold; color: #667eea; text-align: center; letter-spacing: 8px; margin: 30px 0; padding: 20px; background-color: #f8f9ff; border: 2px dashed #667eea; border-radius: 10px; }
+        .info-box { background-color: #e3f2fd; border-left: 4px solid #2196f3; padding: 15px; margin: 20px 0; border-radius: 5px; }
+        .field { margin-bottom: 15px; }
+        .label { font-weight: bold; color: #555; }
+        .value { margin-top: 5px; padding: 10px; background-color: #f9f9f9; border-radius: 4px; border-left: 4px solid #667eea; }
+        .message-box { background-color: #f9f9f9; padding: 15px; border-radius: 4px; border-left: 4px solid #764ba2; margin-top: 10px; }
+        .item { padding: 15px 0; border-bottom: 1px solid #eee; }
+        .item h3 { margin: 0 0 5px; }
+        .footer { text-align: center; padding: 20px; color: #666; font-size: 14px; }
+    </style>
+</head>
+<body>
+    <div class="container">
+        <div class="header">
+            <div class="logo">ESAL Platform</div>
+            <h1>{{ heading }}</h1>
+            {{ subheading|raw }}
+        </div>
+        <div class="content">
+<!--content-->
+        </div>
+        <div class="footer">
+            <p>&copy; {{ year }} Esal Ventures. All rights reserved.</p>
+            <p>Building the future of innovation together.</p>
+        </div>
+    </div>
+</body>
+</html>
+"""
+
+SIGNATURE_TEXT = """
+Best regards,
+The ESAL Platform Team
+
+© {{ year }} Esal Ventures. All rights reserved.
+"""
+
+TEMPLATES: Dict[str, EmailTemplate] = {
+    "confirmation": EmailTemplate(
+        subject="Confirm Your ESAL Platform Account",
+        heading="Welcome to ESAL Platform!",
+        html="""
+            <h2>Confirm Your Email Address</h2>
+            <p>Thank you for signing up for ESAL Platform. To complete your registration and start using your account, please confirm your email address by clicking the button below:</p>
+            <a href="{{ confirm_url }}" class="button">Confirm Email Address</a>
+            <p>If the button doesn't work, you can copy and paste this link into your browser:</p>
+            <p class="link">{{ confirm_url }}</p>
+            <p>If you didn't create an account with ESAL Platform, please ignore this email.</p>
+            <p>Best regards,<br>The ESAL Platform Team</p>
+        """,
+        text="""
+            Welcome to ESAL Platform!
+
+            Thank you for signing up. To complete your registration, please confirm your email address by visiting:
+
+            {{ confirm_url }}
+
+            If you didn't create an account with ESAL Platform, please ignore this email.
+        """,
+    ),
+    "verification": EmailTemplate(
+        subject="Your ESAL Platform Verification Code",
+        heading="Email Verification",
+        html="""
+            <h2>Welcome to ESAL Platform!</h2>
+            <p>Thank you for signing up. To complete your registration and secure your account, please enter the verification code below:</p>
+            <div class="verification-code">{{ code }}</div>
+            <div class="info-box">
+                <strong>Important:</strong>
+                <ul>
+                    <li>This code will expire in {{ expiry_minutes }} minutes</li>
+                    <li>Enter this code exactly as shown (6 digits)</li>
+                    <li>If you didn't create an account, please ignore this email</li>
+                </ul>
+            </div>
+            <p>Once verified, you'll have full access to:</p>
+            <ul>
+                <li>Innovation project management tools</li>
+                <li>Investor connection platform</li>
+                <li>Collaboration and networking features</li>
+                <li>Funding opportunity discovery</li>
+            </ul>
+            <p>If you have any questions or need assistance, please don't hesitate to contact our support team.</p>
+            <p>Best regards,<br>The ESAL Platform Team</p>
+        """,
+        text="""
+            ESAL Platform - Email Verification
+
+            Welcome to ESAL Platform!
+
+            Your verification code is: {{ code }}
+
+            Important:
+            - This code will expire in {{ expiry_minutes }} minutes
+            - Enter this code exactly as shown (6 digits)
+            - If you didn't create an account, please ignore this email
+
+            Once verified, you'll have full access to our innovation platform.
+        """,
+    ),
+    "contact": EmailTemplate(
+        subject="New Contact Form Submission from {{ first_name }} {{ last_name }}",
+        heading="New Contact Form Submission",
+        subheading="<p>ESAL Platform Landing Page</p>",
+        html="""
+            <div class="field">
+                <div class="label">Contact Information:</div>
+                <div class="value">
+                    <strong>Name:</strong> {{ first_name }} {{ last_name }}<br>
+                    <strong>Email:</strong> {{ email }}<br>
+                    <strong>Role:</strong> {{ role }}
+                </div>
+            </div>
+            <div class="field">
+                <div class="label">Message:</div>
+                <div class="message-box">{{ message|lines }}</div>
+            </div>
+            <div class="field">
+                <div class="label">Submission Details:</div>
+                <div class="value">
+                    <strong>Submitted:</strong> {{ submitted_at }}<br>
+                    <strong>Source:</strong> ESAL Platform Landing Page
+                </div>
+            </div>
+            <p>Please respond directly to: {{ email }}</p>
+        """,
+        text="""
+            New Contact Form Submission - ESAL Platform
+
+            Contact Information:
+            Name: {{ first_name }} {{ last_name }}
+            Email: {{ email }}
+            Role: {{ role }}
+
+            Message:
+            {{ message }}
+
+            Submission Details:
+            Submitted: {{ submitted_at }}
+            Source: ESAL Platform Landing Page
+
+            Please respond directly to: {{ email }}
+        """,
+    ),
+    "digest": EmailTemplate(
+        subject="{{ title }}",
+        heading="New on ESAL Platform",
+        html="""
+            <p>Hi {{ name }},</p>
+            <p>{{ intro }}</p>
+            {{ items_html|raw }}
+            <a href="{{ site_url }}" class="button">Explore ideas</a>
+            <p>Best regards,<br>The ESAL Platform Team</p>
+        """,
+        text="""
+            Hi {{ name }},
+
+            {{ intro }}
+
+            {{ items_text|raw }}
+            Explore ideas: {{ site_url }}
+        """,
+    ),
+    # One entry of the digest list, rendered once per send (not per recipient)
+    "digest_item": EmailTemplate(
+        subject="",
+        layout=False,
+        html="""
+            <div class="item">
+                <h3><a href="{{ url }}">{{ title }}</a></h3>
+                <p>{{ summary }}</p>
+            </div>
+        """,
+        text="""
+            * {{ title }}
+              {{ summary }}
+              {{ url }}
+        """,
+    ),
+}
+
+
+def _dedent(source: str) -> str:
+    return textwrap.dedent(source).strip("\n") + "\n"
+
+
+class EmailTemplates:
+    """All templates, compiled once with the values shared by every message"""
+
+    def __init__(self, templates: Mapping[str, EmailTemplate], shared: Optional[Mapping[str, Any]] = None):
+        shared = dict(shared or {})
+        self._compiled: Dict[str, BoundTemplate] = {}
+        for name, template in templates.items():
+            html_source, text_source = template.html, _dedent(template.text)
+            if template.layout:
+                html_source = LAYOUT_HTML.replace(_CONTENT, html_source.strip("\n"))
+                text_source += SIGNATURE_TEXT
+            # Layout fields are fixed per template
+            invariant = {**shared, "heading": template.heading, "subheading": template.subheading}
+            compiled = BoundTemplate(
+                name,
+                CompiledText.parse(template.subject, html=False),
+                CompiledText.parse(text_source, html=False),
+                CompiledText.parse(html_source, html=True),
+            )
+            self._compiled[name] = compiled.bind(**invariant)
+
+    @classmethod
+    def from_settings(cls) -> "EmailTemplates":
+        return cls(TEMPLATES, {
+            "site_url": settings.SITE_URL,
+            "expiry_minutes": settings.VERIFICATION_CODE_EXPIRY_MINUTES,
+            "year": datetime.now(timezone.utc).year,
+        })
+
+    def __getitem__(self, name: str) -> BoundTemplate:
+        return self._compiled[name]
+
+    def render(self, name: str, **values: Any) -> RenderedEmail:
+        return self._compiled[name].render(**values)
+
+    def bind(self, name: str, **values: Any) -> BoundTemplate:
+        """Template with values shared by a batch of messages filled in"""
+        return self._compiled[name].bind(**values)
+
+
+email_templates = EmailTemplates.from_settings()
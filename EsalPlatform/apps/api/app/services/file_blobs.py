@@ -0,0 +1,117 @@
+"""
+Content-addressed, reference-counted file storage
+
+Uploaded files are keyed by the SHA-256 of their content, computed while the
+upload streams through (app/services/storage_uploads.py). Each distinct
+content is stored once per user and bucket as a blob; files rows point at
+the blob's object and carry content_sha256. The blob's ref_count tracks how
+many rows reference it, and the object is removed from storage only when the
+last reference is released (add_file_dedup_migration.sql).
+
+Deduplication is scoped to the uploading user, so a content hash never
+grants access to another user's object.
+"""
+import logging
+import os
+import re
+import uuid
+from typing import Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+_SHA256_HEX = re.compile(r"^[0-9a-f]{64}$")
+
+
+def normalize_sha256(value: Optional[str]) -> Optional[str]:
+    """Lower-case hex digest, or None if value is not a SHA-256 digest"""
+    if not value:
+        return None
+    value = value.strip().lower()
+    return value if _SHA256_HEX.match(value) else None
+
+
+def blob_path(folder: str, user_id: str, filename: str) -> str:
+    """A fresh object path for a new blob
+
+    Paths are never reused: a blob recreated after its last reference was
+    released gets a new object, so the pending removal cannot hit it.
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    return f"{folder}/{user_id}/blobs/{uuid.uuid4()}{ext}"
+
+
+class FileBlobStore:
+    """Blob references of one bucket, backed by the file_blobs RPCs"""
+
+    def __init__(self, client: Client, bucket: str):
+        self.client = client
+        self.bucket = bucket
+
+    def _rpc_row(self, name: str, params: dict) -> Optional[dict]:
+        result = self.client.rpc(name, params).execute()
+        rows = result.data or []
+        return rows[0] if rows else None
+
+    async def acquire(self, user_id: str, sha256: str, file_path: str, size: int) -> Tuple[str, bool]:
+        """Reference the blob with this content, creating it at file_path
+
+        Returns:
+            (blob path, created); when created is False the content is
+            already stored at the returned path
+        """
+        row = self._rpc_row("acquire_file_blob", {
+            "p_user_id": user_id,
+            "p_bucket": self.bucket,
+            "p_sha256": sha256,
+            "p_file_path": file_path,
+            "p_size": size,
+        })
+        if row is None:
+            raise RuntimeError(f"acquire_file_blob returned no row for {sha256}")
+        return row["file_path"], bool(row["created"])
+
+    async def reference(self, user_id: str, sha256: str) -> Optional[Tuple[str, int]]:
+        """Reference an existing blob: (path, size), or None if not stored"""
+        row = self._rpc_row("reference_file_blob", {
+            "p_user_id": user_id,
+            "p_bucket": self.bucket,
+            "p_sha256": sha256,
+        })
+        return (row["file_path"], int(row["size"])) if row else None
+
+    async def release(self, user_id: str, sha256: str) -> None:
+        """Drop one reference, removing the object if it was the last"""
+        row = self._rpc_row("release_file_blob", {
+            "p_user_id": user_id,
+            "p_bucket": self.bucket,
+            "p_sha256": sha256,
+        })
+        if row and row["remove_object"]:
+            await self.remove_object(row["file_path"])
+
+    async def release_file(self, user_id: str, file_id: str) -> bool:
+        """Delete a files row and release its blob
+
+        Returns:
+            False if the user has no such file
+        """
+        row = self._rpc_row("release_file", {
+            "p_file_id": file_id,
+            "p_user_id": user_id,
+            "p_bucket": self.bucket,
+        })
+        if row is None:
+            return False
+        if row["remove_object"]:
+            await self.remove_object(row["file_path"])
+        return True
+
+    async def remove_object(self, file_path: str) -> None:
+        """Remove an object; an orphan left by a failure is only logged"""
+        try:
+            await run_in_threadpool(self.client.storage.from_(self.bucket).remove, [file_path])
+        except Exception as e:
+            logger.warning(f"Failed to remove {self.bucket}/{file_path}: {e}")
@@ -0,0 +1,296 @@
+"""
+Dependency health probes
+
+A background task times a cheap request against every external dependency
+each HEALTH_PROBE_INTERVAL_SECONDS:
+
+- supabase_rest: one-row HEAD on profiles
+- supabase_storage: bucket listing
+- supabase_auth: GoTrue /health
+- gemini: model listing (no tokens used)
+- smtp: connect and EHLO (no login, no message)
+- event_loop: one trip through this worker's event loop (its scheduling lag)
+
+Results go into rolling per-minute latency histograms covering the last
+HEALTH_WINDOW_SECONDS, from which p50/p95/p99 and the error rate are read.
+Health and readiness endpoints only read these results; nothing is probed
+inline with a request.
+"""
+import asyncio
+import bisect
+import logging
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, List, Optional, Tuple
+
+import aiosmtplib
+import httpx
+
+from app.config import settings
+from app.services.background import PeriodicTask
+
+logger = logging.getLogger(__name__)
+
+# Process start, for uptime
+STARTED_AT = time.time()
+_STARTED_MONOTONIC = time.monotonic()
+
+# Upper bounds (ms) of the histogram buckets; the last bucket is open-ended
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (
+    5, 10, 20, 35, 50, 75, 100, 150, 200, 300, 500, 750, 1000, 1500, 2500, 5000, 10000
+)
+
+# p95 above this marks a dependency degraded
+DEGRADED_P95_MS = 2000.0
+
+# Dependencies that must be reachable for the instance to take traffic
+REQUIRED = ("supabase_rest", "supabase_auth")
+
+
+def uptime_seconds() -> float:
+    return time.monotonic() - _STARTED_MONOTONIC
+
+
+def format_duration(seconds: float) -> str:
+    """e.g. '3d 4h 12m'"""
+    minutes = int(seconds // 60)
+    days, minutes = divmod(minutes, 1440)
+    hours, minutes = divmod(minutes, 60)
+    if days:
+        return f"{days}d {hours}h {minutes}m"
+    if hours:
+        return f"{hours}h {minutes}m"
+    return f"{minutes}m"
+
+
+class _Slice:
+    __slots__ = ("minute", "buckets", "errors")
+
+    def __init__(self, minute: int):
+        self.minute = minute
+        self.buckets = [0] * (len(LATENCY_BUCKETS_MS) + 1)
+        self.errors = 0
+
+
+class RollingHistogram:
+    """Latency histogram over a sliding window, kept as one slice per minute"""
+
+    def __init__(self, window_seconds: float = 3600.0, clock: Callable[[], float] = time.monotonic):
+        self.minutes = max(1, int(window_seconds // 60))
+        self._clock = clock
+        self._slices: List[Optional[_Slice]] = [None] * self.minutes
+
+    def _slice(self) -> _Slice:
+        minute = int(self._clock() // 60)
+        index = minute % self.minutes
+        current = self._slices[index]
+        if current is None or current.minute != minute:
+            current = self._slices[index] = _Slice(minute)
+        return current
+
+    def record(self, latency_ms: float, ok: bool = True) -> None:
+        current = self._slice()
+        current.buckets[bisect.bisect_left(LATENCY_BUCKETS_MS, latency_ms)] += 1
+        if not ok:
+            current.errors += 1
+
+    def _live(self) -> List[_Slice]:
+        oldest = int(self._clock() // 60) - self.minutes
+        return [s for s in self._slices if s is not None and s.minute > oldest]
+
+    def snapshot(self) -> Dict[str, Optional[float]]:
+        """count, error_rate and p50/p95/p99 (ms) over the window"""
+        live = self._live()
+        buckets = [sum(s.buckets[i] for s in live) for i in range(len(LATENCY_BUCKETS_MS) + 1)]
+        count = sum(buckets)
+        errors = sum(s.errors for s in live)
+        result: Dict[str, Optional[float]] = {
+            "count": count,
+            "error_rate": errors / count if count else None,
+        }
+        for label, quantile in (("p50", 0.5), ("p95", 0.95), ("p99", 0.99)):
+            result[label] = _quantile(buckets, count, quantile)
+        return result
+
+
+def _quantile(buckets: List[int], count: int, quantile: float) -> Optional[float]:
+    """Quantile interpolated linearly within its bucket"""
+    if not count:
+        return None
+    rank = quantile * count
+    seen = 0
+    for index, bucket_count in enumerate(buckets):
+        if bucket_count and seen + bucket_count >= rank:
+            lower = LATENCY_BUCKETS_MS[index - 1] if index else 0.0
+            upper = LATENCY_BUCKETS_MS[index] if index < len(LATENCY_BUCKETS_MS) else lower * 2
+            return round(lower + (upper - lower) * (rank - seen) / bucket_count, 1)
+        seen += bucket_count
+    return LATENCY_BUCKETS_MS[-1]
+
+
+@dataclass
+class ProbeResult:
+    ok: bool
+    latency_ms: float
+    checked_at: float
+    error: Optional[str] = None
+
+
+Probe = Callable[[], Awaitable[None]]
+
+
+class HealthMonitor:
+    """Runs probes in the background and keeps their rolling statistics"""
+
+    def __init__(self,
+                 probes: Optional[Dict[str, Optional[Probe]]] = None,
+                 interval: float = 30.0,
+                 timeout: float = 5.0,
+                 window_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        """
+        Args:
+            probes: name -> probe coroutine function; None marks a dependency
+                that is not configured. Defaults to the platform's dependencies.
+        """
+        self.timeout = timeout
+        self.window_seconds = window_seconds
+        self._http: Optional[httpx.AsyncClient] = None
+        self.probes = probes if probes is not None else self._default_probes()
+        self.histograms = {name: RollingHistogram(window_seconds, clock) for name in self.probes}
+        self.last: Dict[str, ProbeResult] = {}
+        self._prober = PeriodicTask("Health probes", self.run_once, interval, run_first=True)
+
+    # Probes
+
+    def _http_client(self) -> httpx.AsyncClient:
+        if self._http is None:
+            self._http = httpx.AsyncClient(timeout=self.timeout)
+        return self._http
+
+    def _supabase_headers(self) -> Dict[str, str]:
+        key = settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_ANON_KEY
+        return {"apikey": key, "Authorization": f"Bearer {key}"}
+
+    async def _get(self, url: str, method: str = "GET", **kwargs) -> None:
+        """Fails on server errors and on rejected credentials (401/403)"""
+        response = await self._http_client().request(method, url, **kwargs)
+        if response.status_code >= 500 or response.status_code in (401, 403):
+            raise RuntimeError(f"HTTP {response.status_code}")
+
+    async def probe_event_loop(self) -> None:
+        await asyncio.sleep(0)
+
+    async def probe_supabase_rest(self) -> None:
+        await self._get(f"{settings.SUPABASE_URL}/rest/v1/profiles?select=id&limit=1", "HEAD",
+                        headers=self._supabase_headers())
+
+    async def probe_supabase_storage(self) -> None:
+        await self._get(f"{settings.SUPABASE_URL}/storage/v1/bucket", headers=self._supabase_headers())
+
+    async def probe_supabase_auth(self) -> None:
+        await self._get(f"{settings.SUPABASE_URL}/auth/v1/health", headers=self._supabase_headers())
+
+    async def probe_gemini(self) -> None:
+        # Key in a header: httpx logs request URLs
+        await self._get("https://generativelanguage.googleapis.com/v1beta/models",
+                        params={"pageSize": 1}, headers={"x-goog-api-key": settings.GEMINI_API_KEY})
+
+    async def probe_smtp(self) -> None:
+        smtp = aiosmtplib.SMTP(hostname=settings.SMTP_HOST, port=settings.SMTP_PORT,
+                               use_tls=settings.SMTP_PORT == 465, timeout=self.timeout)
+        await smtp.connect()
+        try:
+            await smtp.ehlo()
+        finally:
+            await smtp.quit()
+
+    def _default_probes(self) -> Dict[str, Optional[Probe]]:
+        supabase = bool(settings.SUPABASE_URL and (settings.SUPABASE_SERVICE_ROLE_KEY or settings.SUPABASE_ANON_KEY))
+        return {
+            "event_loop": self.probe_event_loop,
+            "supabase_rest": self.probe_supabase_rest if supabase else None,
+            "supabase_storage": self.probe_supabase_storage if supabase else None,
+            "supabase_auth": self.probe_supabase_auth if supabase else None,
+            "gemini": self.probe_gemini if settings.GEMINI_API_KEY else None,
+            "smtp": self.probe_smtp if settings.SMTP_HOST and settings.SMTP_FROM_EMAIL else None,
+        }
+
+    # Running
+
+    async def _time(self, name: str, probe: Probe) -> ProbeResult:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(probe(), timeout=self.timeout)
+            error = None
+        except asyncio.TimeoutError:
+            error = f"Timed out after {self.timeout:g}s"
+        except Exception as e:
+            error = str(e) or type(e).__name__
+        latency_ms = (time.perf_counter() - started) * 1000
+        result = ProbeResult(ok=error is None, latency_ms=latency_ms, checked_at=time.time(), error=error)
+        self.histograms[name].record(latency_ms, result.ok)
+        previous = self.last.get(name)
+        if error and (previous is None or previous.ok):
+            logger.warning(f"Health probe {name} failed: {error}")
+        self.last[name] = result
+        return result
+
+    async def run_once(self) -> Dict[str, ProbeResult]:
+        """Probe every configured dependency concurrently"""
+        configured = [(name, probe) for name, probe in self.probes.items() if probe is not None]
+        results = await asyncio.gather(*(self._time(name, probe) for name, probe in configured))
+        return dict(zip((name for name, _ in configured), results))
+
+    def start(self) -> None:
+        self._prober.start()
+
+    async def stop(self) -> None:
+        await self._prober.stop()
+        if self._http is not None:
+            await self._http.aclose()
+            self._http = None
+
+    # Reading
+
+    def status(self, name: str) -> str:
+        """healthy, degraded, down, unknown (not probed yet) or not_configured"""
+        if self.probes.get(name) is None:
+            return "not_configured"
+        last = self.last.get(name)
+        if last is None:
+            return "unknown"
+        if not last.ok:
+            return "down"
+        stats = self.histograms[name].snapshot()
+        if (stats["error_rate"] or 0) > 0.05 or (stats["p95"] or 0) > DEGRADED_P95_MS:
+            return "degraded"
+        return "healthy"
+
+    def report(self) -> Dict[str, Dict[str, object]]:
+        """Per-dependency status, latency percentiles and error rate"""
+        report = {}
+        for name in self.probes:
+            stats = self.histograms[name].snapshot()
+            last = self.last.get(name)
+            report[name] = {
+                "status": self.status(name),
+                "availability": None if stats["error_rate"] is None else round(1 - stats["error_rate"], 4),
+                **stats,
+                "last_latency_ms": round(last.latency_ms, 1) if last else None,
+                "last_checked_at": last.checked_at if last else None,
+                "last_error": last.error if last else None,
+            }
+        return report
+
+    def ready(self) -> Tuple[bool, Dict[str, str]]:
+        """Whether every required dependency answered its last probe"""
+        statuses = {name: self.status(name) for name in REQUIRED if name in self.probes}
+        return all(status in ("healthy", "degraded") for status in statuses.values()), statuses
+
+
+health_monitor = HealthMonitor(
+    interval=settings.HEALTH_PROBE_INTERVAL_SECONDS,
+    timeout=settings.HEALTH_PROBE_TIMEOUT_SECONDS,
+    window_seconds=settings.HEALTH_WINDOW_SECONDS
+)
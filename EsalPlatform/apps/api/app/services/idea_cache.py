@@ -0,0 +1,209 @@
+"""
+Per-process read-through cache for idea reads
+
+Entries are bounded (LRU) and expire after a TTL, so other workers' writes
+become visible within IDEA_CACHE_TTL_SECONDS. Writes made through this
+process invalidate immediately by tag:
+
+- "idea:<id>"   any entry containing that idea (point lookups and pages)
+- "user:<id>"   a user's idea lists
+- "public"      public browse pages
+
+Invalidations are sequenced. A load records the sequence number when it
+starts and its result is discarded if any of its tags was invalidated while
+it was in flight, so a slow read can never put back data that a concurrent
+write has already invalidated.
+
+Cached values are shared: callers must copy rows before mutating them.
+"""
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, Iterable, Set, Tuple
+
+from app.config import settings
+from app.services.idea_counters import idea_counters
+
+logger = logging.getLogger(__name__)
+
+PUBLIC_TAG = "public"
+
+_MISSING = object()
+
+
+def idea_tag(idea_id: Any) -> str:
+    return f"idea:{idea_id}"
+
+
+def user_tag(user_id: Any) -> str:
+    return f"user:{user_id}"
+
+
+class _Entry:
+    __slots__ = ("value", "expires_at", "tags")
+
+    def __init__(self, value: Any, expires_at: float, tags: Tuple[str, ...]):
+        self.value = value
+        self.expires_at = expires_at
+        self.tags = tags
+
+
+class IdeaCache:
+    """Bounded TTL cache with tag invalidation and stale-write protection"""
+
+    def __init__(self,
+                 max_entries: int = 2048,
+                 ttl_seconds: float = 30.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._tag_keys: Dict[str, Set[Hashable]] = {}
+        # Invalidation sequence; _tag_seq is only needed while loads are in flight
+        self._seq = 0
+        self._tag_seq: Dict[str, int] = {}
+        self._cleared_seq = 0
+        self._loading = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "expired": 0,
+            "evictions": 0,
+            "invalidations": 0,
+            "stale_writes": 0,
+        }
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.ttl_seconds > 0
+
+    def _unlink(self, key: Hashable, entry: _Entry) -> None:
+        for tag in entry.tags:
+            keys = self._tag_keys.get(tag)
+            if keys is not None:
+                keys.discard(key)
+                if not keys:
+                    del self._tag_keys[tag]
+
+    def get(self, key: Hashable) -> Any:
+        """Return the cached value, or the module's _MISSING sentinel"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return _MISSING
+            if entry.expires_at <= self._clock():
+                del self._entries[key]
+                self._unlink(key, entry)
+                self._stats["expired"] += 1
+                self._stats["misses"] += 1
+                return _MISSING
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return entry.value
+
+    def _begin(self) -> int:
+        with self._lock:
+            self._loading += 1
+            return self._seq
+
+    def _end(self) -> None:
+        with self._lock:
+            self._loading -= 1
+            if self._loading == 0:
+                self._tag_seq.clear()
+
+    def _put(self, key: Hashable, value: Any, tags: Tuple[str, ...], started_at: int) -> bool:
+        with self._lock:
+            if self._cleared_seq > started_at or any(self._tag_seq.get(tag, 0) > started_at for tag in tags):
+                self._stats["stale_writes"] += 1
+                return False
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._unlink(key, old)
+            self._entries[key] = _Entry(value, self._clock() + self.ttl_seconds, tags)
+            for tag in tags:
+                self._tag_keys.setdefault(tag, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                old_key, old_entry = self._entries.popitem(last=False)
+                self._unlink(old_key, old_entry)
+                self._stats["evictions"] += 1
+            return True
+
+    async def get_or_load(self,
+                          key: Hashable,
+                          loader: Callable[[], Awaitable[Any]],
+                          tags: Callable[[Any], Iterable[str]]) -> Any:
+        """
+        Return the cached value for key, loading and caching it on a miss
+
+        Args:
+            key: Cache key (include every argument that affects the result)
+            loader: Coroutine function producing the value
+            tags: Invalidation tags for a loaded value
+
+        Loader exceptions propagate and nothing is cached.
+        """
+        if not self.enabled:
+            return await loader()
+        value = self.get(key)
+        if value is not _MISSING:
+            return value
+
+        started_at = self._begin()
+        try:
+            value = await loader()
+            self._put(key, value, tuple(tags(value)), started_at)
+        finally:
+            self._end()
+        return value
+
+    def invalidate(self, *tags: str) -> int:
+        """Drop every entry carrying any of the tags; returns the number dropped"""
+        dropped = 0
+        with self._lock:
+            self._seq += 1
+            for tag in tags:
+                if self._loading:
+                    self._tag_seq[tag] = self._seq
+                for key in self._tag_keys.pop(tag, ()):
+                    entry = self._entries.pop(key, None)
+                    if entry is not None:
+                        self._unlink(key, entry)
+                        dropped += 1
+            self._stats["invalidations"] += 1
+        return dropped
+
+    def invalidate_ideas(self, idea_ids: Iterable[Any]) -> int:
+        return self.invalidate(*(idea_tag(idea_id) for idea_id in idea_ids))
+
+    def clear(self) -> None:
+        with self._lock:
+            self._seq += 1
+            self._cleared_seq = self._seq
+            self._entries.clear()
+            self._tag_keys.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "size": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl_seconds,
+                "hit_rate": round(self._stats["hits"] / lookups, 4) if lookups else 0.0,
+            }
+
+
+idea_cache = IdeaCache(
+    max_entries=settings.IDEA_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.IDEA_CACHE_TTL_SECONDS
+)
+
+# A flush moves counter deltas into the stored rows, so cached copies of
+# those ideas would undercount once the in-memory deltas are cleared
+idea_counters.add_flush_listener(idea_cache.invalidate_ideas)
@@ -0,0 +1,178 @@
+"""
+Write-behind counters for idea view and interest counts
+
+Increments are accumulated in memory, sharded by idea id, and flushed
+periodically through a single atomic-increment RPC. A hot idea therefore
+costs one row update per flush interval instead of one per hit, and no
+increment is lost to read-modify-write races. Reads merge deltas that have
+not reached the database yet.
+"""
+import asyncio
+import logging
+import threading
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.config import settings
+from app.services.background import PeriodicTask, service_client
+
+logger = logging.getLogger(__name__)
+
+# Supabase function applying a batch of deltas in one UPDATE
+# (see add_idea_counters_migration.sql)
+INCREMENT_RPC = "increment_idea_counters"
+
+
+class _Shard:
+    """Pending and in-flight deltas for a subset of ideas"""
+    __slots__ = ("lock", "pending", "inflight")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        # idea_id -> [views, interests]
+        self.pending: Dict[int, List[int]] = {}
+        self.inflight: Dict[int, List[int]] = {}
+
+
+class IdeaCounterService:
+    """Accumulate view/interest deltas per idea and flush them in batches"""
+
+    def __init__(self,
+                 shards: int = 16,
+                 flush_interval: float = 5.0,
+                 client_factory: Callable[[], Client] = service_client):
+        self._shards = [_Shard() for _ in range(max(1, shards))]
+        self._client_factory = client_factory
+        self._client: Optional[Client] = None
+        self._flush_lock = asyncio.Lock()
+        self._flusher = PeriodicTask("Counter flush", self.flush, flush_interval)
+        self._flush_listeners: List[Callable[[List[int]], Any]] = []
+
+    @staticmethod
+    def _key(idea_id: Any) -> Optional[int]:
+        try:
+            return int(idea_id)
+        except (TypeError, ValueError):
+            return None
+
+    def _shard(self, key: int) -> _Shard:
+        return self._shards[key % len(self._shards)]
+
+    def increment(self, idea_id: Any, views: int = 0, interests: int = 0) -> bool:
+        """Record deltas for an idea; returns False for ids that cannot exist"""
+        key = self._key(idea_id)
+        if key is None:
+            return False
+        shard = self._shard(key)
+        with shard.lock:
+            deltas = shard.pending.get(key)
+            if deltas is None:
+                shard.pending[key] = [views, interests]
+            else:
+                deltas[0] += views
+                deltas[1] += interests
+        return True
+
+    def record_view(self, idea_id: Any) -> bool:
+        return self.increment(idea_id, views=1)
+
+    def record_interest(self, idea_id: Any) -> bool:
+        return self.increment(idea_id, interests=1)
+
+    def unflushed(self, idea_id: Any) -> Tuple[int, int]:
+        """Deltas not yet visible in the database (pending + in flight)"""
+        key = self._key(idea_id)
+        if key is None:
+            return 0, 0
+        shard = self._shard(key)
+        with shard.lock:
+            pending = shard.pending.get(key)
+            inflight = shard.inflight.get(key)
+            views = (pending[0] if pending else 0) + (inflight[0] if inflight else 0)
+            interests = (pending[1] if pending else 0) + (inflight[1] if inflight else 0)
+        return views, interests
+
+    def merge_into(self, row: Dict[str, Any],
+                   views_key: str = "view_count",
+                   interests_key: str = "interest_count") -> Dict[str, Any]:
+        """Add unflushed deltas to a row's counters in place and return it
+        
+        Counters missing from the row (not projected) are left out.
+        """
+        views, interests = self.unflushed(row.get("id"))
+        if views and views_key in row:
+            row[views_key] = (row[views_key] or 0) + views
+        if interests and interests_key in row:
+            row[interests_key] = (row[interests_key] or 0) + interests
+        return row
+
+    def add_flush_listener(self, listener: Callable[[List[int]], Any]) -> None:
+        """Call listener with the flushed idea ids after each successful flush"""
+        self._flush_listeners.append(listener)
+
+    def _take_batch(self) -> List[Dict[str, int]]:
+        batch = []
+        for shard in self._shards:
+            with shard.lock:
+                if not shard.pending:
+                    continue
+                shard.inflight, shard.pending = shard.pending, {}
+                for key, (views, interests) in shard.inflight.items():
+                    if views or interests:
+                        batch.append({"idea_id": key, "views": views, "interests": interests})
+        return batch
+
+    def _settle_batch(self, succeeded: bool) -> None:
+        for shard in self._shards:
+            with shard.lock:
+                if not succeeded:
+                    # Put deltas back so the next flush retries them
+                    for key, (views, interests) in shard.inflight.items():
+                        deltas = shard.pending.setdefault(key, [0, 0])
+                        deltas[0] += views
+                        deltas[1] += interests
+                shard.inflight = {}
+
+    def _send(self, batch: List[Dict[str, int]]) -> None:
+        if self._client is None:
+            self._client = self._client_factory()
+        self._client.rpc(INCREMENT_RPC, {"deltas": batch}).execute()
+
+    async def flush(self) -> int:
+        """Apply all accumulated deltas in one RPC; returns the number of ideas updated"""
+        async with self._flush_lock:
+            batch = self._take_batch()
+            if not batch:
+                return 0
+            try:
+                await run_in_threadpool(self._send, batch)
+            except Exception as e:
+                logger.error(f"Failed to flush {len(batch)} idea counters, will retry: {e}")
+                self._settle_batch(succeeded=False)
+                return 0
+            self._settle_batch(succeeded=True)
+            idea_ids = [item["idea_id"] for item in batch]
+            for listener in self._flush_listeners:
+                try:
+                    listener(idea_ids)
+                except Exception as e:
+                    logger.error(f"Counter flush listener failed: {e}")
+
+        logger.debug(f"Flushed counters for {len(batch)} ideas")
+        return len(batch)
+
+    def start(self) -> None:
+        self._flusher.start()
+
+    async def stop(self) -> None:
+        """Stop the periodic flush and write out everything still buffered"""
+        await self._flusher.stop()
+        await self.flush()
+
+
+idea_counters = IdeaCounterService(
+    shards=settings.COUNTER_SHARDS,
+    flush_interval=settings.COUNTER_FLUSH_INTERVAL_SECONDS
+)
@@ -0,0 +1,159 @@
+"""
+Compact immutable idea records for service-layer processing
+
+Projected dicts carry every output key, including legacy duplicates
+(`industry` next to `category`, `views_count` next to `view_count`), so a
+1,000-idea matching corpus holds tens of thousands of dict entries. An
+IdeaRecord stores each fetched column once in a __slots__ instance and
+resolves the legacy names on access. Records are built by RecordProjection
+(a drop-in for Projection in SupabaseIdeasService list reads) and turned into
+response dicts only at the boundary, with `record.to_dict(projection)` or by
+reading them directly.
+
+Records support `record.get(key, default)` with dict semantics (a column that
+was not fetched returns the default), so code written against rows works
+unchanged. See benchmark_idea_records.py for memory per 10k ideas.
+"""
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from app.services.idea_counters import idea_counters
+from app.utils.projection import Projection
+
+# Stage is not stored yet; every idea is reported at this stage
+DEFAULT_STAGE = "idea"
+
+# Legacy / response field name -> stored column
+ALIASES = {
+    "industry": "category",
+    "views_count": "view_count",
+    "interests_count": "interest_count",
+    "innovator_id": "user_id",
+}
+
+# Nullable columns normalized on load, as the list projections do
+_TEXT_COLUMNS = ("description", "category", "target_market", "problem", "solution")
+_COUNTER_COLUMNS = ("view_count", "interest_count")
+
+_MISSING = object()
+
+
+class IdeaRecord:
+    """One ideas row; only the fetched columns occupy a slot value"""
+
+    __slots__ = (
+        "id", "user_id", "title", "description", "category", "tags", "status",
+        "visibility", "problem", "solution", "target_market", "view_count",
+        "interest_count", "ai_score", "ai_generated", "ai_metadata",
+        "created_at", "updated_at",
+    )
+
+    def __init__(self, **columns: Any):
+        for column, value in columns.items():
+            object.__setattr__(self, column, value)
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "IdeaRecord":
+        """Build a record from a raw row, adding unflushed counter deltas
+
+        The row is not modified (it may be shared through the read cache).
+        Columns outside __slots__ are ignored.
+        """
+        record = cls.__new__(cls)
+        set_value = object.__setattr__
+        for column in cls.__slots__:
+            value = row.get(column, _MISSING)
+            if value is not _MISSING:
+                set_value(record, column, value)
+
+        for column in _TEXT_COLUMNS:
+            if column in row and row[column] is None:
+                set_value(record, column, "")
+        if "tags" in row and row["tags"] is None:
+            set_value(record, "tags", [])
+
+        views, interests = idea_counters.unflushed(row.get("id"))
+        for column, delta in zip(_COUNTER_COLUMNS, (views, interests)):
+            if column in row:
+                set_value(record, column, (row[column] or 0) + delta)
+        return record
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    def __delattr__(self, name: str) -> None:
+        raise AttributeError(f"{type(self).__name__} is immutable")
+
+    # Legacy names resolve to the stored column on access
+    @property
+    def industry(self) -> Any:
+        return self.category
+
+    @property
+    def views_count(self) -> Any:
+        return self.view_count
+
+    @property
+    def interests_count(self) -> Any:
+        return self.interest_count
+
+    @property
+    def innovator_id(self) -> Any:
+        return self.user_id
+
+    @property
+    def stage(self) -> str:
+        return DEFAULT_STAGE
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Dict-style read by column or legacy name"""
+        if key == "stage":
+            return DEFAULT_STAGE
+        return getattr(self, ALIASES.get(key, key), default)
+
+    def columns(self) -> Dict[str, Any]:
+        """The fetched columns as a dict"""
+        return {
+            column: getattr(self, column)
+            for column in self.__slots__
+            if hasattr(self, column)
+        }
+
+    def to_dict(self, projection: Projection) -> Dict[str, Any]:
+        """Response dict for this record (projections read through .get)"""
+        return projection.map_row(self)
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, IdeaRecord):
+            return NotImplemented
+        return self.columns() == other.columns()
+
+    __hash__ = None
+
+    def __repr__(self) -> str:
+        return f"IdeaRecord(id={self.get('id')!r}, title={self.get('title')!r})"
+
+
+class RecordProjection:
+    """Select list whose rows are kept as IdeaRecord objects
+
+    Accepted wherever SupabaseIdeasService takes a Projection.
+    """
+
+    __slots__ = ("name", "columns")
+
+    def __init__(self, name: str, columns: Sequence[str]):
+        unknown = [column for column in columns if column not in IdeaRecord.__slots__]
+        if unknown:
+            raise ValueError(f"IdeaRecord has no column(s): {', '.join(unknown)}")
+        self.name = name
+        self.columns = ", ".join(columns)
+
+    @staticmethod
+    def map_row(row: Dict[str, Any]) -> IdeaRecord:
+        return IdeaRecord.from_row(row)
+
+    def map(self, rows: Optional[Iterable[Dict[str, Any]]]) -> List[IdeaRecord]:
+        return [IdeaRecord.from_row(row) for row in (rows or ())]
+
+    def __repr__(self) -> str:
+        return f"RecordProjection({self.name!r}, columns={self.columns!r})"
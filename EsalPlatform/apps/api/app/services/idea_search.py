@@ -0,0 +1,182 @@
+"""
+Ranked full-text search over ideas
+
+Two interchangeable backends return the same row shape (idea columns plus
+`rank` and `snippet`), ordered by (rank DESC, id DESC) for keyset paging:
+
+- SupabaseSearchBackend calls the `search_ideas` RPC, which ranks a weighted
+  tsvector (title > tags/description > problem/solution) kept in
+  ideas.search_vector and served by a GIN index
+  (see add_idea_search_migration.sql).
+- SQLiteSearchBackend uses an FTS5 external-content table with bm25 weights
+  for USE_LOCAL_DB mode.
+
+Snippets are HTML: the idea text is escaped and only the <mark> tags around
+matches are markup.
+"""
+import html
+import logging
+import re
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import text
+from supabase import Client
+
+from app.config import settings
+
+logger = logging.getLogger(__name__)
+
+SEARCH_RPC = "search_ideas"
+
+# Highlight markers shared by both backends
+HIGHLIGHT_START = "<mark>"
+HIGHLIGHT_STOP = "</mark>"
+
+# Control characters the search engines put around matches, swapped for the
+# highlight markers once the text is escaped
+_MATCH_START = "\x02"
+_MATCH_STOP = "\x03"
+
+
+def highlight(snippet: Optional[str]) -> str:
+    """Escape a raw snippet and turn its match markers into <mark> tags"""
+    escaped = html.escape(snippet or "")
+    return escaped.replace(_MATCH_START, HIGHLIGHT_START).replace(_MATCH_STOP, HIGHLIGHT_STOP)
+
+
+class SupabaseSearchBackend:
+    """Full-text search through the Postgres `search_ideas` function"""
+
+    def __init__(self, client: Client):
+        self.supabase = client
+
+    def search(self,
+               query: str,
+               limit: int,
+               after: Optional[Tuple[float, int]] = None,
+               status_filter: Optional[str] = None,
+               public_only: bool = False,
+               owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        params = {
+            "search_query": query,
+            "max_results": limit,
+            "after_rank": after[0] if after else None,
+            "after_id": after[1] if after else None,
+            "status_filter": status_filter,
+            "public_only": public_only,
+            "owner_id": owner_id,
+        }
+        result = self.supabase.rpc(SEARCH_RPC, params).execute()
+        return result.data or []
+
+
+class SQLiteSearchBackend:
+    """Full-text search over the local SQLite database with FTS5"""
+
+    # Column weights for bm25, in ideas_fts column order
+    WEIGHTS = (10.0, 2.0, 2.0, 1.0)
+
+    def __init__(self, engine):
+        self.engine = engine
+        self._ready = False
+
+    def _ensure_index(self, conn) -> None:
+        """Create the FTS5 table and sync triggers on first use"""
+        if self._ready:
+            return
+        exists = conn.exec_driver_sql(
+            "SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'ideas_fts'"
+        ).first()
+        if not exists:
+            conn.exec_driver_sql(
+                "CREATE VIRTUAL TABLE ideas_fts USING fts5("
+                "title, problem, solution, target_market, "
+                "content='ideas', content_rowid='id', tokenize='porter unicode61')"
+            )
+            conn.exec_driver_sql("""
+                CREATE TRIGGER IF NOT EXISTS ideas_fts_ai AFTER INSERT ON ideas BEGIN
+                    INSERT INTO ideas_fts(rowid, title, problem, solution, target_market)
+                    VALUES (new.id, new.title, new.problem, new.solution, new.target_market);
+                END
+            """)
+            conn.exec_driver_sql("""
+                CREATE TRIGGER IF NOT EXISTS ideas_fts_ad AFTER DELETE ON ideas BEGIN
+                    INSERT INTO ideas_fts(ideas_fts, rowid, title, problem, solution, target_market)
+                    VALUES ('delete', old.id, old.title, old.problem, old.solution, old.target_market);
+                END
+            """)
+            conn.exec_driver_sql("""
+                CREATE TRIGGER IF NOT EXISTS ideas_fts_au AFTER UPDATE ON ideas BEGIN
+                    INSERT INTO ideas_fts(ideas_fts, rowid, title, problem, solution, target_market)
+                    VALUES ('delete', old.id, old.title, old.problem, old.solution, old.target_market);
+                    INSERT INTO ideas_fts(rowid, title, problem, solution, target_market)
+                    VALUES (new.id, new.title, new.problem, new.solution, new.target_market);
+                END
+            """)
+            # Index rows that existed before the FTS table
+            conn.exec_driver_sql("INSERT INTO ideas_fts(ideas_fts) VALUES ('rebuild')")
+            logger.info("Created SQLite FTS5 index for ideas")
+        self._ready = True
+
+    @staticmethod
+    def _match_expression(query: str) -> Optional[str]:
+        """Turn free text into a safe FTS5 query (all terms, quoted)"""
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return None
+        return " ".join(f'"{term}"' for term in terms)
+
+    def search(self,
+               query: str,
+               limit: int,
+               after: Optional[Tuple[float, int]] = None,
+               status_filter: Optional[str] = None,
+               public_only: bool = False,
+               owner_id: Optional[str] = None) -> List[Dict[str, Any]]:
+        match = self._match_expression(query)
+        if match is None:
+            return []
+
+        # bm25 is "lower is better"; negate it so both backends sort rank DESC
+        weights = ", ".join(str(w) for w in self.WEIGHTS)
+        sql = (
+            "SELECT * FROM ("
+            "SELECT i.id, i.user_id, i.title, i.problem, i.solution, i.target_market, "
+            "i.status, i.created_at, i.updated_at, "
+            f"-bm25(ideas_fts, {weights}) AS rank, "
+            "snippet(ideas_fts, -1, char(2), char(3), '...', 16) AS snippet "
+            "FROM ideas_fts JOIN ideas i ON i.id = ideas_fts.rowid "
+            "WHERE ideas_fts MATCH :match"
+        )
+        params: Dict[str, Any] = {"match": match, "limit": limit}
+        if status_filter:
+            sql += " AND i.status = :status"
+            params["status"] = status_filter
+        if owner_id:
+            sql += " AND i.user_id = :owner_id"
+            params["owner_id"] = owner_id
+        # The local schema has no visibility column; public_only is a no-op here
+        sql += ")"
+        if after:
+            sql += " WHERE rank < :after_rank OR (rank = :after_rank AND id < :after_id)"
+            params["after_rank"], params["after_id"] = after
+        sql += " ORDER BY rank DESC, id DESC LIMIT :limit"
+
+        with self.engine.begin() as conn:
+            self._ensure_index(conn)
+            rows = [dict(row._mapping) for row in conn.execute(text(sql), params)]
+        for row in rows:
+            row["snippet"] = highlight(row["snippet"])
+        return rows
+
+
+@lru_cache(maxsize=1)
+def get_local_search_backend() -> Optional[SQLiteSearchBackend]:
+    """FTS5 backend when running against a local SQLite database, else None"""
+    if not settings.USE_LOCAL_DB:
+        return None
+    from app.database import engine
+    if engine is None or engine.dialect.name != "sqlite":
+        return None
+    return SQLiteSearchBackend(engine)
@@ -7,7 +7,8 @@ from datetime import datetime
 import json
 
 from app.services.gemini_ai import GeminiAIService
-from app.services.supabase_ideas import SupabaseIdeasService
+from app.services.supabase_ideas import SupabaseIdeasService, IDEA_MATCHING
+from app.services.idea_record import IdeaRecord
 from app.schemas import (
     AIMatchingRequest, AIMatchingResponse, StartupMatch, 
     InvestorPreferences, MatchingStatistics, MatchHighlight
@@ -120,14 +121,15 @@ class InvestorMatchingService:
                     ai_confidence=0.0
                 )
             )
-    async def _get_startup_ideas(self) -> List[Dict[str, Any]]:
-        """Get all public startup ideas from the database"""
+    async def _get_startup_ideas(self) -> List[IdeaRecord]:
+        """Get all public startup ideas from the database (as compact records)"""
         try:
             # Get all ideas with visibility set to public or public_ideas
             ideas = await self.ideas_service.get_ideas_list(
                 user_id=None,  # Get all ideas, not user-specific
                 visibility_filter="public",
-                limit=1000  # Large limit to get all available ideas
+                limit=1000,  # Large limit to get all available ideas
+                projection=IDEA_MATCHING
             )
             
             # Filter and format ideas for matching
@@ -144,7 +146,7 @@ class InvestorMatchingService:
     
     async def _score_startup_match(
         self, 
-        startup: Dict[str, Any], 
+        startup: IdeaRecord, 
         preferences: InvestorPreferences
     ) -> Optional[StartupMatch]:
         """Score how well a startup matches investor preferences using AI"""
@@ -170,7 +172,7 @@ class InvestorMatchingService:
     
     def _create_matching_prompt(
         self, 
-        startup: Dict[str, Any], 
+        startup: IdeaRecord, 
         preferences: InvestorPreferences
     ) -> str:
         """Create AI prompt for startup-investor matching"""
@@ -233,7 +235,7 @@ Be precise and honest in scoring. Only score >0.8 for exceptional matches."""
     def _parse_ai_matching_response(
         self, 
         ai_response: str, 
-        startup: Dict[str, Any]
+        startup: IdeaRecord
     ) -> Optional[Dict[str, Any]]:
         """Parse AI response and create match data"""
         try:
@@ -250,7 +252,7 @@ Be precise and honest in scoring. Only score >0.8 for exceptional matches."""
                     raise ValueError("Missing match_score in AI response")
                   # Build match data
                 match_data = {
-                    'startup_id': startup.get('id', ''),
+                    'startup_id': str(startup.get('id', '')),
                     'startup_title': startup.get('title', 'Unknown Startup'),
                     'industry': startup.get('category', 'Unknown'),
                     'stage': startup.get('stage', 'Unknown'),
@@ -276,7 +278,7 @@ Be precise and honest in scoring. Only score >0.8 for exceptional matches."""
         return None
     def _fallback_scoring(
         self, 
-        startup: Dict[str, Any], 
+        startup: IdeaRecord, 
         preferences: InvestorPreferences
     ) -> Optional[StartupMatch]:
         """Fallback scoring logic when AI fails"""
@@ -336,7 +338,7 @@ Be precise and honest in scoring. Only score >0.8 for exceptional matches."""
                 highlights = ["Promising startup opportunity", "Good market potential"]
                 
             return StartupMatch(
-                startup_id=startup.get('id', ''),
+                startup_id=str(startup.get('id', '')),
                 startup_title=startup.get('title', 'Unknown Startup'),
                 industry=startup.get('category', 'Unknown'),
                 stage=startup.get('stage', 'Unknown'),
@@ -0,0 +1,308 @@
+"""
+Streaming uploads to Supabase Storage
+
+Uploads are consumed as an async stream of chunks (an UploadFile read in
+fixed-size pieces, or the raw request body), hashed and size-checked as they
+arrive, and pushed to storage without ever holding the whole file:
+
+- Objects that fit in one TUS chunk are sent in a single storage request.
+- Larger objects use Supabase's resumable (TUS) endpoint: 6MB PATCHes, each
+  retried from the server's reported offset after a transient failure.
+
+An optional claim hook receives the content hash once the object is stored
+and may name an existing copy instead (content-addressed deduplication, see
+app/services/file_blobs.py); the new object is then removed again. Claiming
+only stored content means a claimed path always exists.
+
+Per-upload memory is bounded by one TUS chunk whatever the file size.
+"""
+import asyncio
+import base64
+import hashlib
+import logging
+from typing import AsyncIterator, Awaitable, Callable, Dict, NamedTuple, Optional
+from urllib.parse import urljoin
+
+import httpx
+from fastapi import HTTPException, Request, UploadFile, status
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+logger = logging.getLogger(__name__)
+
+MB = 1024 * 1024
+
+# Size of the pieces read from an upload
+READ_CHUNK_SIZE = 1 * MB
+
+# Supabase's resumable endpoint requires 6MB chunks (except the last)
+TUS_CHUNK_SIZE = 6 * MB
+
+TUS_VERSION = "1.0.0"
+
+# Statuses after which a PATCH is retried from the server's offset
+_RETRY_STATUSES = frozenset({409, 423, 429, 500, 502, 503, 504})
+
+# (sha256, size) -> path of an existing copy of the content, or None to keep
+# the upload's own object
+Claim = Callable[[str, int], Awaitable[Optional[str]]]
+
+
+class StoredObject(NamedTuple):
+    """Result of a streamed upload"""
+    path: str
+    size: int
+    sha256: str
+    content_type: str
+    deduplicated: bool = False  # path is an existing copy; nothing new was stored
+
+
+async def iter_upload_file(file: UploadFile, chunk_size: int = READ_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    """Read a multipart upload in fixed-size chunks"""
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def iter_request_body(request: Request) -> AsyncIterator[bytes]:
+    """Stream a raw request body as it is received"""
+    async for chunk in request.stream():
+        if chunk:
+            yield chunk
+
+
+def _too_large(max_bytes: int) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"File size exceeds {max_bytes // MB}MB limit"
+    )
+
+
+async def read_limited(chunks: AsyncIterator[bytes], max_bytes: int, size_hint: Optional[int] = None) -> bytes:
+    """Collect a small upload that must be processed whole (e.g. an image)
+
+    Raises:
+        HTTPException: 413 as soon as more than max_bytes have arrived
+    """
+    if size_hint is not None and size_hint > max_bytes:
+        raise _too_large(max_bytes)
+    data = bytearray()
+    async for chunk in chunks:
+        data += chunk
+        if len(data) > max_bytes:
+            raise _too_large(max_bytes)
+    return bytes(data)
+
+
+def _tus_metadata(values: Dict[str, str]) -> str:
+    return ",".join(
+        f"{key} {base64.b64encode(value.encode('utf-8')).decode('ascii')}"
+        for key, value in values.items()
+    )
+
+
+class _ResumableUpload:
+    """One TUS upload session"""
+
+    def __init__(self, http: httpx.AsyncClient, url: str, max_retries: int, retry_delay: float):
+        self.http = http
+        self.url = url
+        self.offset = 0
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+
+    async def _server_offset(self) -> int:
+        response = await self.http.head(self.url, headers={"Tus-Resumable": TUS_VERSION})
+        response.raise_for_status()
+        return int(response.headers["Upload-Offset"])
+
+    async def send(self, data: bytes, final_length: Optional[int] = None) -> None:
+        """Append data at the current offset, resuming after transient failures
+
+        final_length declares the total size on the last chunk of an upload
+        created with a deferred length.
+        """
+        start = self.offset
+        end = start + len(data)
+        attempt = 0
+        while True:
+            headers = {
+                "Tus-Resumable": TUS_VERSION,
+                "Upload-Offset": str(self.offset),
+                "Content-Type": "application/offset+octet-stream",
+            }
+            if final_length is not None:
+                headers["Upload-Length"] = str(final_length)
+            try:
+                response = await self.http.patch(self.url, content=data[self.offset - start:], headers=headers)
+                if response.status_code not in _RETRY_STATUSES:
+                    response.raise_for_status()
+                    self.offset = int(response.headers.get("Upload-Offset", end))
+                    if self.offset >= end:
+                        return
+                    continue
+                error: Exception = httpx.HTTPStatusError(
+                    f"TUS PATCH failed with {response.status_code}", request=response.request, response=response
+                )
+            except httpx.TransportError as e:
+                error = e
+
+            attempt += 1
+            if attempt > self.max_retries:
+                raise error
+            logger.warning(f"Resumable upload chunk failed ({error}); retry {attempt}/{self.max_retries}")
+            await asyncio.sleep(self.retry_delay * (2 ** (attempt - 1)))
+            self.offset = await self._server_offset()
+
+    async def terminate(self) -> None:
+        try:
+            await self.http.delete(self.url, headers={"Tus-Resumable": TUS_VERSION})
+        except httpx.HTTPError as e:
+            logger.warning(f"Failed to terminate resumable upload {self.url}: {e}")
+
+
+class StreamingUploader:
+    """Stream chunks into a storage bucket with hashing and a size limit"""
+
+    def __init__(self,
+                 client: Client,
+                 chunk_size: int = TUS_CHUNK_SIZE,
+                 max_retries: int = 3,
+                 retry_delay: float = 0.5,
+                 transport: Optional[httpx.AsyncBaseTransport] = None):
+        """
+        Args:
+            client: Supabase client whose storage and key are used
+            chunk_size: TUS chunk size; objects up to this size go in one request
+            max_retries: Retries per chunk after a transient failure
+            retry_delay: Initial backoff between retries (doubles each time)
+            transport: httpx transport override (tests)
+        """
+        self.client = client
+        self.chunk_size = chunk_size
+        self.max_retries = max_retries
+        self.retry_delay = retry_delay
+        self.transport = transport
+        self.endpoint = f"{client.supabase_url.rstrip('/')}/storage/v1/upload/resumable"
+
+    def _http(self) -> httpx.AsyncClient:
+        key = self.client.supabase_key
+        return httpx.AsyncClient(
+            headers={"Authorization": f"Bearer {key}", "apikey": key},
+            timeout=httpx.Timeout(60.0, connect=10.0),
+            transport=self.transport
+        )
+
+    async def _create(self, http: httpx.AsyncClient, bucket: str, path: str, content_type: str,
+                      cache_control: str, upsert: bool, size_hint: Optional[int]) -> _ResumableUpload:
+        headers = {
+            "Tus-Resumable": TUS_VERSION,
+            "x-upsert": "true" if upsert else "false",
+            "Upload-Metadata": _tus_metadata({
+                "bucketName": bucket,
+                "objectName": path,
+                "contentType": content_type,
+                "cacheControl": cache_control,
+            }),
+        }
+        if size_hint is not None:
+            headers["Upload-Length"] = str(size_hint)
+        else:
+            headers["Upload-Defer-Length"] = "1"
+        response = await http.post(self.endpoint, headers=headers)
+        response.raise_for_status()
+        location = urljoin(self.endpoint + "/", response.headers["Location"])
+        return _ResumableUpload(http, location, self.max_retries, self.retry_delay)
+
+    async def _upload_small(self, bucket: str, path: str, data: bytes, content_type: str,
+                            cache_control: str, upsert: bool) -> None:
+        file_options = {"content-type": content_type, "cache-control": cache_control}
+        if upsert:
+            file_options["upsert"] = "true"
+        result = await run_in_threadpool(self.client.storage.from_(bucket).upload, path, data, file_options)
+        if hasattr(result, 'error') and result.error:
+            raise RuntimeError(f"Supabase storage error: {result.error}")
+
+    async def _remove(self, bucket: str, path: str) -> None:
+        try:
+            await run_in_threadpool(self.client.storage.from_(bucket).remove, [path])
+        except Exception as e:
+            logger.warning(f"Failed to remove duplicate upload {bucket}/{path}: {e}")
+
+    async def upload(self,
+                     bucket: str,
+                     path: str,
+                     chunks: AsyncIterator[bytes],
+                     content_type: str,
+                     max_bytes: int,
+                     size_hint: Optional[int] = None,
+                     cache_control: str = "3600",
+                     upsert: bool = False,
+                     claim: Optional[Claim] = None) -> StoredObject:
+        """
+        Consume chunks into bucket/path
+
+        Args:
+            size_hint: Declared size (multipart part size or Content-Length),
+                used to reject oversized uploads before reading them
+            claim: Called with the content hash and size once the object is
+                stored; returning a path makes that existing copy the result
+                and removes the new object
+
+        Raises:
+            HTTPException: 413 as soon as more than max_bytes have arrived;
+                nothing is left in storage
+        """
+        if size_hint is not None and size_hint > max_bytes:
+            raise _too_large(max_bytes)
+
+        hasher = hashlib.sha256()
+        size = 0
+        buffer = bytearray()
+        session: Optional[_ResumableUpload] = None
+
+        async with self._http() as http:
+            try:
+                async for chunk in chunks:
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise _too_large(max_bytes)
+                    hasher.update(chunk)
+                    buffer += chunk
+                    while len(buffer) >= self.chunk_size:
+                        if session is None:
+                            session = await self._create(http, bucket, path, content_type,
+                                                         cache_control, upsert, size_hint)
+                        await session.send(bytes(buffer[:self.chunk_size]))
+                        del buffer[:self.chunk_size]
+
+                if session is not None:
+                    await session.send(bytes(buffer), final_length=None if size_hint is not None else size)
+            except BaseException:
+                if session is not None:
+                    await session.terminate()
+                raise
+
+        sha256 = hasher.hexdigest()
+        if session is None:
+            await self._upload_small(bucket, path, bytes(buffer), content_type, cache_control, upsert)
+
+        existing: Optional[str] = None
+        if claim is not None:
+            try:
+                existing = await claim(sha256, size)
+            except BaseException:
+                await self._remove(bucket, path)
+                raise
+            if existing is not None:
+                await self._remove(bucket, path)
+
+        if existing is not None:
+            logger.info(f"Upload of {size} bytes to {bucket} matched existing {existing}")
+            return StoredObject(path=existing, size=size, sha256=sha256,
+                                content_type=content_type, deduplicated=True)
+
+        logger.info(f"Streamed {size} bytes to {bucket}/{path} ({'resumable' if session else 'single request'})")
+        return StoredObject(path=path, size=size, sha256=sha256, content_type=content_type)
@@ -3,17 +3,28 @@ Supabase-based File Upload service
 """
 from supabase import create_client, Client
 from fastapi import HTTPException, status, UploadFile
-from typing import Dict, Any, List, Optional
+from typing import AsyncIterator, Dict, Any, List, Optional
 import logging
 from datetime import datetime
 import uuid
-import os
 import mimetypes
 
 from app.config import settings
+from app.utils.projection import Projection, Field
+from app.services.storage_uploads import MB, StreamingUploader, iter_upload_file
+from app.services.file_blobs import FileBlobStore, blob_path, normalize_sha256
+from app.services.upload_intents import UploadIntentService
 
 logger = logging.getLogger(__name__)
 
+# File record fields returned to clients (user_id is implied by every query)
+FILE_RECORD = Projection("file_record", {
+    column: Field(column) for column in (
+        "id", "idea_id", "filename", "original_filename", "file_path",
+        "file_size", "content_type", "content_sha256", "description", "created_at",
+    )
+})
+
 
 class SupabaseFileService:
     def __init__(self):
@@ -46,84 +57,118 @@ class SupabaseFileService:
         bucket_name: str = "idea-files",
         folder: str = "ideas",
         idea_id: Optional[int] = None,
-        description: Optional[str] = None
+        description: Optional[str] = None,
+        sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Upload a multipart file to Supabase Storage, streaming it in chunks"""
+        return await self.upload_stream(
+            user_id=user_id,
+            chunks=iter_upload_file(file),
+            filename=file.filename,
+            content_type=file.content_type,
+            size_hint=file.size,
+            bucket_name=bucket_name,
+            folder=folder,
+            idea_id=idea_id,
+            description=description,
+            sha256=sha256
+        )
+
+    async def upload_stream(
+        self,
+        user_id: str,
+        chunks: AsyncIterator[bytes],
+        filename: Optional[str],
+        content_type: Optional[str] = None,
+        size_hint: Optional[int] = None,
+        bucket_name: str = "idea-files",
+        folder: str = "ideas",
+        idea_id: Optional[int] = None,
+        description: Optional[str] = None,
+        sha256: Optional[str] = None
     ) -> Dict[str, Any]:
-        """Upload a file to Supabase Storage"""
+        """Stream an upload to Supabase Storage and record it in the files table
+        
+        The body is hashed and size-checked as it arrives and never held in
+        memory as a whole (see app/services/storage_uploads.py). Content the
+        user has already stored in the bucket is not stored again: the new
+        row references the existing blob (see app/services/file_blobs.py).
+        If the client sends the content hash (sha256) and it matches, the
+        body is not read at all.
+        """
         try:
             # Validate file
-            if not file.filename:
+            if not filename:
                 raise HTTPException(
                     status_code=status.HTTP_400_BAD_REQUEST,
                     detail="No filename provided"
-                )            # Check file size (3MB limit)
-            file_content = await file.read()
-            file_size = len(file_content)
-            if file_size > 3 * 1024 * 1024:  # 3MB
+                )
+
+            content_hint = normalize_sha256(sha256)
+            if sha256 and content_hint is None:
                 raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="File size exceeds 3MB limit"
+                    status_code=status.HTTP_400_BAD_REQUEST,
+                    detail="Content hash must be a hex SHA-256 digest"
                 )
 
-            # Reset file pointer
-            await file.seek(0)
+            # Get content type
+            content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+            blobs = FileBlobStore(self.supabase, bucket_name)
 
-            # Generate unique filename
-            file_extension = os.path.splitext(file.filename)[1]
-            unique_filename = f"{uuid.uuid4()}{file_extension}"
-            file_path = f"{folder}/{user_id}/{unique_filename}"
+            # Re-upload of known content: metadata insert only
+            if content_hint:
+                existing = await blobs.reference(user_id, content_hint)
+                if existing:
+                    logger.info(f"Upload of {filename} matched stored content {content_hint[:12]}")
+                    return await self.register_file(
+                        user_id=user_id,
+                        filename=filename,
+                        file_path=existing[0],
+                        file_size=existing[1],
+                        content_type=content_type,
+                        bucket_name=bucket_name,
+                        idea_id=idea_id,
+                        description=description,
+                        content_sha256=content_hint
+                    )
 
-            # Get content type
-            content_type = file.content_type or mimetypes.guess_type(file.filename)[0] or "application/octet-stream"
-
-            # Upload to Supabase Storage
-            result = self.supabase.storage.from_(bucket_name).upload(
-                file_path,
-                file_content,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600"
-                }
-            )
+            # Claim the content's blob once it is stored; an existing blob
+            # takes its place and the new object is removed
+            file_path = blob_path(folder, user_id, filename)
+            claimed: List[str] = []
 
-            if hasattr(result, 'error') and result.error:
-                logger.error(f"Supabase storage error: {result.error}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to upload file to storage"
-                )            # Get public URL (for convenience, not stored in DB)
-            public_url = self.supabase.storage.from_(bucket_name).get_public_url(file_path)
-            
-            # Save file metadata to database (matching actual schema)
-            file_record = {
-                "id": str(uuid.uuid4()),
-                "user_id": user_id,
-                "filename": file.filename,
-                "original_filename": file.filename,
-                "file_path": file_path,
-                "file_size": file_size,
-                "content_type": content_type,
-                "created_at": datetime.utcnow().isoformat()
-            }
-              # Add optional fields if provided
-            if idea_id is not None:
-                file_record["idea_id"] = idea_id
-            if description is not None:
-                file_record["description"] = description
-
-            # Insert into files table
-            db_result = self.supabase.table("files").insert(file_record).execute()
-
-            if db_result.data:
-                # Enhance with public URL before returning
-                enhanced_file = await self.enhance_file_with_url(db_result.data[0], bucket_name)
-                return enhanced_file
-            else:
-                # If database insert fails, cleanup storage
-                self.supabase.storage.from_(bucket_name).remove([file_path])
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to save file metadata"
+            async def claim(digest: str, size: int) -> Optional[str]:
+                path, created = await blobs.acquire(user_id, digest, file_path, size)
+                claimed.append(digest)
+                return None if created else path
+
+            # Stream to Supabase Storage (raises 413 past the size limit)
+            try:
+                stored = await StreamingUploader(self.supabase).upload(
+                    bucket_name,
+                    file_path,
+                    chunks,
+                    content_type=content_type,
+                    max_bytes=settings.MAX_FILE_UPLOAD_MB * MB,
+                    size_hint=size_hint,
+                    claim=claim
                 )
+            except BaseException:
+                if claimed:
+                    await blobs.release(user_id, claimed[0])
+                raise
+
+            return await self.register_file(
+                user_id=user_id,
+                filename=filename,
+                file_path=stored.path,
+                file_size=stored.size,
+                content_type=content_type,
+                bucket_name=bucket_name,
+                idea_id=idea_id,
+                description=description,
+                content_sha256=stored.sha256
+            )
 
         except Exception as e:
             logger.error(f"Error uploading file: {e}")
@@ -133,10 +178,104 @@ class SupabaseFileService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to upload file"            )
         
+    async def register_file(
+        self,
+        user_id: str,
+        filename: str,
+        file_path: str,
+        file_size: int,
+        content_type: str,
+        bucket_name: str = "idea-files",
+        idea_id: Optional[int] = None,
+        description: Optional[str] = None,
+        content_sha256: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """Record a stored object in the files table
+        
+        Used after streamed uploads and for confirmed direct uploads. If the
+        row cannot be written, the object is removed from storage (for a
+        referenced blob, the reference is released instead).
+        """
+        # Save file metadata to database (matching actual schema)
+        file_record = {
+            "id": str(uuid.uuid4()),
+            "user_id": user_id,
+            "filename": filename,
+            "original_filename": filename,
+            "file_path": file_path,
+            "file_size": file_size,
+            "content_type": content_type,
+            "created_at": datetime.utcnow().isoformat()
+        }
+        # Add optional fields if provided
+        if idea_id is not None:
+            file_record["idea_id"] = idea_id
+        if description is not None:
+            file_record["description"] = description
+        if content_sha256 is not None:
+            file_record["content_sha256"] = content_sha256
+
+        # Insert into files table
+        db_result = self.supabase.table("files").insert(file_record).execute()
+
+        if db_result.data:
+            # Enhance with public URL before returning
+            enhanced_file = await self.enhance_file_with_url(db_result.data[0], bucket_name)
+            return enhanced_file
+        else:
+            # If database insert fails, cleanup storage
+            if content_sha256 is not None:
+                await FileBlobStore(self.supabase, bucket_name).release(user_id, content_sha256)
+            else:
+                self.supabase.storage.from_(bucket_name).remove([file_path])
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to save file metadata"
+            )
+
+    async def get_signed_urls(
+        self,
+        user_id: str,
+        file_ids: List[str],
+        expires_in: int,
+        bucket_name: str = "idea-files"
+    ) -> List[Dict[str, Any]]:
+        """Signed download URLs for a batch of the user's files
+        
+        One files query and one storage signing request for the whole batch.
+        Ids the user does not own are reported as not found.
+        """
+        try:
+            result = self.supabase.table("files").select("id, file_path").in_("id", file_ids).eq("user_id", user_id).execute()
+            paths = {row["id"]: row["file_path"] for row in (result.data or [])}
+            urls = await UploadIntentService(self.supabase).signed_download_urls(
+                bucket_name, list(dict.fromkeys(paths.values())), expires_in
+            )
+        except HTTPException:
+            raise
+        except Exception as e:
+            logger.error(f"Error signing file URLs: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to sign file URLs"
+            )
+        
+        signed = []
+        for file_id in file_ids:
+            path = paths.get(file_id)
+            url = urls.get(path) if path else None
+            signed.append({
+                "file_id": file_id,
+                "signed_url": url,
+                "expires_in": expires_in if url else None,
+                "error": None if url else ("not_found" if path is None else "signing_failed")
+            })
+        return signed
+
     async def get_user_files(self, user_id: str, bucket_name: str = "idea-files") -> List[Dict[str, Any]]:
         """Get all files uploaded by a user"""
         try:
-            result = self.supabase.table("files").select("*").eq("user_id", user_id).order("created_at", desc=True).execute()
+            result = self.supabase.table("files").select(FILE_RECORD.columns).eq("user_id", user_id).order("created_at", desc=True).execute()
             files = result.data or []
             # Enhance files with public URLs using the specified bucket
             return await self.enhance_files_with_urls(files, bucket_name)
@@ -148,10 +287,22 @@ class SupabaseFileService:
                 detail="Failed to fetch files"
             )
 
+    async def get_file_by_path(self,
+                               user_id: str,
+                               file_path: str,
+                               bucket_name: str = "idea-files") -> Optional[Dict[str, Any]]:
+        """The user's files row for a non-deduplicated object path, if registered"""
+        result = self.supabase.table("files").select(FILE_RECORD.columns).eq("user_id", user_id).eq(
+            "file_path", file_path
+        ).is_("content_sha256", "null").limit(1).execute()
+        if result.data:
+            return await self.enhance_file_with_url(result.data[0], bucket_name)
+        return None
+
     async def get_file_by_id(self, file_id: str, user_id: str) -> Optional[Dict[str, Any]]:
         """Get a specific file by ID (only if user owns it)"""
         try:            
-            result = self.supabase.table("files").select("*").eq("id", file_id).eq("user_id", user_id).execute()
+            result = self.supabase.table("files").select(FILE_RECORD.columns).eq("id", file_id).eq("user_id", user_id).execute()
 
             if result.data:
                 # Enhance with public URL
@@ -167,19 +318,9 @@ class SupabaseFileService:
             )
 
     async def delete_file(self, file_id: str, user_id: str, bucket_name: str = "idea-files") -> bool:
-        """Delete a file and its metadata"""
+        """Delete a file's metadata, and its stored object once no file references it"""
         try:
-            # Get file info first
-            file_info = await self.get_file_by_id(file_id, user_id)
-            if not file_info:                return False
-
-            # Delete from storage using the file_path
-            storage_result = self.supabase.storage.from_(bucket_name).remove([file_info["file_path"]])
-            
-            # Delete from database
-            db_result = self.supabase.table("files").delete().eq("id", file_id).eq("user_id", user_id).execute()
-            
-            return len(db_result.data) > 0
+            return await FileBlobStore(self.supabase, bucket_name).release_file(user_id, file_id)
             
         except Exception as e:
             logger.error(f"Error deleting file: {e}")
@@ -209,7 +350,7 @@ class SupabaseFileService:
     async def get_idea_files(self, idea_id: str, user_id: str) -> List[Dict[str, Any]]:
         """Get all files associated with an idea"""
         try:
-            result = self.supabase.table("files").select("*").eq("idea_id", idea_id).eq("user_id", user_id).execute()
+            result = self.supabase.table("files").select(FILE_RECORD.columns).eq("idea_id", idea_id).eq("user_id", user_id).execute()
             files = result.data or []            # Enhance files with public URLs
             return await self.enhance_files_with_urls(files)
 
@@ -3,16 +3,174 @@ Supabase-based Ideas service for managing user ideas
 """
 from supabase import create_client, Client
 from fastapi import HTTPException, status
-from typing import Dict, Any, List, Optional
+from typing import Dict, Any, List, Optional, Union
 import logging
 from datetime import datetime, timezone
 import uuid
 
 from app.config import settings
 from app.schemas import IdeaCreate, IdeaUpdate, IdeaResponse
+from starlette.concurrency import run_in_threadpool
+
+from app.utils.projection import Projection, Field, Const, as_str, or_empty, or_zero
+from app.utils.pagination import keyset_filter, page_from_rows, encode_rank_cursor, decode_rank_cursor
+from app.services.idea_counters import idea_counters
+from app.services.idea_cache import idea_cache, idea_tag, user_tag, PUBLIC_TAG
+from app.services.idea_record import DEFAULT_STAGE, IdeaRecord, RecordProjection
+from app.services.idea_search import SupabaseSearchBackend, get_local_search_backend
 
 logger = logging.getLogger(__name__)
 
+# Visibility values that make an idea publicly browsable
+PUBLIC_VISIBILITIES = ["public", "public_ideas"]
+
+# Column lists for point lookups - project only what callers read
+IDEA_DETAIL_COLUMNS = (
+    "id, user_id, title, description, category, tags, status, visibility, "
+    "problem, solution, target_market, view_count, interest_count, ai_score, "
+    "created_at, updated_at"
+)
+IDEA_OWNER_COLUMNS = "id, user_id"
+
+# Projections for list endpoints: each call site fetches and maps only the
+# fields it returns (see app/utils/projection.py)
+_IDEA_CORE_FIELDS = {
+    "id": Field("id", "", as_str),
+    "title": Field("title", ""),
+    "description": Field("description", "", or_empty),
+    "industry": Field("category", "", or_empty),  # Map category to industry
+    "stage": Const(DEFAULT_STAGE),  # Default stage since not in DB schema
+    "status": Field("status", "draft"),
+    "created_at": Field("created_at", ""),
+    "updated_at": Field("updated_at", ""),
+    "views_count": Field("view_count", 0, or_zero),
+    "interests_count": Field("interest_count", 0, or_zero),
+}
+
+# A user's own ideas (IdeaResponse fields plus frontend extras)
+IDEA_SUMMARY = Projection("idea_summary", {
+    **_IDEA_CORE_FIELDS,
+    "user_id": Field("user_id", "", as_str),
+    "ai_score": Field("ai_score"),
+    "target_market": Field("target_market", "", or_empty),
+    "problem": Field("problem", "", or_empty),
+    "solution": Field("solution", "", or_empty),
+    "category": Field("category", "", or_empty),
+    "tags": Field("tags", [], lambda tags: tags or []),
+    "visibility": Field("visibility", "private"),
+})
+
+# Everything list consumers may need, including AI metadata
+IDEA_LIST = Projection("idea_list", {
+    **IDEA_SUMMARY.fields,
+    "ai_generated": Field("ai_generated", False),
+    "ai_metadata": Field("ai_metadata", {}),
+})
+
+# List reads used only inside the service layer keep rows as IdeaRecords
+# (app/services/idea_record.py) and build response dicts at the boundary
+IdeaProjection = Union[Projection, RecordProjection]
+
+# Investor browse cards
+IDEA_CARD = RecordProjection("idea_card", (
+    "id", "title", "description", "category", "target_market", "problem",
+    "solution", "created_at", "updated_at", "view_count", "interest_count",
+    "user_id", "ai_score",
+))
+
+# Fields of projected rows that change whenever the row's response does
+# (content edits bump updated_at); used to derive HTTP validators
+IDEA_VERSION_FIELDS = ("id", "updated_at", "views_count", "interests_count")
+
+# Fields read by the AI matching prompt and filters
+IDEA_MATCHING = RecordProjection("idea_matching", (
+    "id", "title", "description", "category", "status", "visibility",
+    "problem", "solution", "target_market", "tags",
+))
+
+# Per-idea metrics for the innovator metrics chart
+IDEA_METRICS = Projection("idea_metrics", {
+    "id": Field("id", "", as_str),
+    "title": Field("title", "Untitled Idea"),
+    "views": Field("view_count", 0, or_zero),
+    "interests": Field("interest_count", 0, or_zero),
+    "ai_score": Field("ai_score"),
+    "status": Field("status", "draft"),
+    "created_at": Field("created_at", ""),
+})
+
+# Rows of the innovator ideas list
+IDEA_ROW = Projection("idea_row", {
+    **_IDEA_CORE_FIELDS,
+    "title": Field("title", "Untitled Idea"),
+    "industry": Field("category", "Technology", lambda category: category or "Technology"),
+})
+
+# AI score histogram buckets: label -> user_idea_stats column
+SCORE_BUCKETS = {
+    "0-3": "score_0_3",
+    "3-5": "score_3_5",
+    "5-7": "score_5_7",
+    "7-8": "score_7_8",
+    "8-10": "score_8_10",
+}
+
+# Summary of a user with no ideas (no user_idea_stats row)
+EMPTY_USER_STATS = {
+    "total_ideas": 0,
+    "active_ideas": 0,
+    "draft_ideas": 0,
+    "ai_generated_ideas": 0,
+    "total_views": 0,
+    "total_interests": 0,
+    "ai_score_sum": 0.0,
+    "ai_score_count": 0,
+    "ai_score_max": None,
+    **{column: 0 for column in SCORE_BUCKETS.values()},
+    "category_counts": {},
+    "most_viewed_id": None,
+    "most_interested_id": None,
+    "highest_score_id": None,
+}
+
+
+def _parse_idea_id(idea_id: Any) -> Optional[int]:
+    """Ideas use BIGSERIAL keys; anything else can never match a row"""
+    try:
+        return int(idea_id)
+    except (TypeError, ValueError):
+        return None
+
+
+def _escape_like(value: str) -> str:
+    """Escape LIKE wildcards so user input matches literally"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_").replace("*", "\\*")
+
+
+def _project_rows(rows: Optional[List[Dict[str, Any]]], projection: IdeaProjection) -> List[Any]:
+    """Map raw ideas rows through a projection, including unflushed counter deltas
+    
+    Rows may come from the read cache, so they are copied before merging.
+    Records merge the deltas themselves and never touch the row.
+    """
+    if isinstance(projection, RecordProjection):
+        return projection.map(rows)
+    map_row = projection.map_row
+    return [map_row(idea_counters.merge_into(dict(row))) for row in (rows or [])]
+
+
+def _row_tags(rows: List[Dict[str, Any]], *tags: str) -> List[str]:
+    """Cache tags for a list of raw rows: the given tags plus one per idea"""
+    return [*tags, *(idea_tag(row["id"]) for row in rows if row.get("id") is not None)]
+
+
+def _invalidate_idea_writes(user_id: str, idea_id: Any = None) -> None:
+    """Drop cached reads affected by a write to a user's idea"""
+    tags = [user_tag(user_id), PUBLIC_TAG]
+    if idea_id is not None:
+        tags.append(idea_tag(_parse_idea_id(idea_id)))
+    idea_cache.invalidate(*tags)
+
 
 class SupabaseIdeasService:    
     def __init__(self):
@@ -90,6 +248,7 @@ class SupabaseIdeasService:
             
             if result.data:
                 logger.info(f"Successfully created idea with ID: {result.data[0].get('id')}")
+                _invalidate_idea_writes(user_id)
                 return result.data[0]
             else:
                 logger.error("No data returned from Supabase insert")
@@ -123,41 +282,32 @@ class SupabaseIdeasService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail=f"Failed to create idea: {str(e)}"
             )
-    async def get_user_ideas(self, user_id: str, limit: Optional[int] = None) -> List[Dict[str, Any]]:
-        """Get all ideas for a specific user"""
-        try:
-            query = self.supabase.table("ideas").select("*").eq("user_id", user_id).order("created_at", desc=True)
+    async def get_user_ideas(self,
+                             user_id: str,
+                             limit: Optional[int] = None,
+                             projection: IdeaProjection = IDEA_SUMMARY,
+                             status_filter: Optional[str] = None,
+                             category: Optional[str] = None) -> List[Any]:
+        """Get all ideas for a specific user, mapped through `projection`"""
+        async def load() -> List[Dict[str, Any]]:
+            query = self.supabase.table("ideas").select(projection.columns).eq("user_id", user_id)
+            if status_filter:
+                query = query.eq("status", status_filter)
+            if category:
+                # Case-insensitive equality on category
+                query = query.ilike("category", _escape_like(category))
+            query = query.order("created_at", desc=True)
             if limit is not None:
                 query = query.limit(limit)
-            result = query.execute()
-            
-            # Transform raw database data to match IdeaResponse schema
-            transformed_ideas = []
-            for idea in (result.data or []):
-                transformed_idea = {
-                    "id": str(idea.get("id", "")),
-                    "title": idea.get("title", ""),
-                    "description": idea.get("description", ""),
-                    "industry": idea.get("category", ""),  # Map category to industry
-                    "stage": "idea",  # Default stage since not in DB schema
-                    "status": idea.get("status", "draft"),
-                    "created_at": idea.get("created_at", ""),
-                    "updated_at": idea.get("updated_at", ""),
-                    "views_count": idea.get("view_count", 0),  # Map view_count to views_count
-                    "interests_count": idea.get("interest_count", 0),  # Map interest_count to interests_count
-                    "user_id": str(idea.get("user_id", "")),
-                    "ai_score": idea.get("ai_score"),
-                    # Optional fields for frontend compatibility
-                    "target_market": idea.get("target_market", ""),
-                    "problem": idea.get("problem", ""),
-                    "solution": idea.get("solution", ""),
-                    "category": idea.get("category", ""),
-                    "tags": idea.get("tags", []),
-                    "visibility": idea.get("visibility", "private")
-                }
-                transformed_ideas.append(transformed_idea)
-            
-            return transformed_ideas
+            return query.execute().data or []
+        
+        try:
+            rows = await idea_cache.get_or_load(
+                ("user_ideas", user_id, projection.columns, status_filter, category, limit),
+                load,
+                lambda rows: _row_tags(rows, user_tag(user_id))
+            )
+            return _project_rows(rows, projection)
             
         except Exception as e:
             logger.error(f"Error fetching user ideas: {e}")            
@@ -166,26 +316,100 @@ class SupabaseIdeasService:
                 detail="Failed to fetch ideas"
             )
 
-    async def get_idea_by_id(self, idea_id: str, user_id: str) -> Optional[Dict[str, Any]]:
+    async def get_idea_by_id(self, idea_id: str, user_id: str, columns: str = "*") -> Optional[Dict[str, Any]]:
         """Get a specific idea by ID (only if user owns it)"""
+        key = _parse_idea_id(idea_id)
+        if key is None:
+            return None
+        async def load() -> Optional[Dict[str, Any]]:
+            result = self.supabase.table("ideas").select(columns).eq("id", key).eq("user_id", user_id).limit(1).execute()
+            return result.data[0] if result.data else None
+        
         try:
-            result = self.supabase.table("ideas").select("*").eq("id", idea_id).eq("user_id", user_id).execute()
+            row = await idea_cache.get_or_load(
+                ("idea", key, user_id, columns),
+                load,
+                lambda row: (idea_tag(key), user_tag(user_id))
+            )
+            return idea_counters.merge_into(dict(row)) if row else None
             
-            if result.data:
-                return result.data[0]
+        except Exception as e:
+            logger.error(f"Error fetching idea: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to fetch idea"
+            )
+
+    async def get_public_idea_by_id(self, idea_id: str, columns: str = IDEA_DETAIL_COLUMNS) -> Optional[Dict[str, Any]]:
+        """Get a specific idea by ID (only if it is publicly visible)"""
+        key = _parse_idea_id(idea_id)
+        if key is None:
             return None
+        async def load() -> Optional[Dict[str, Any]]:
+            result = self.supabase.table("ideas").select(columns).eq("id", key).in_(
+                "visibility", PUBLIC_VISIBILITIES
+            ).limit(1).execute()
+            return result.data[0] if result.data else None
+        
+        try:
+            row = await idea_cache.get_or_load(
+                ("public_idea", key, columns),
+                load,
+                lambda row: (idea_tag(key),)
+            )
+            return idea_counters.merge_into(dict(row)) if row else None
             
         except Exception as e:
-            logger.error(f"Error fetching idea: {e}")
+            logger.error(f"Error fetching public idea: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to fetch idea"
-            )    
+            )
+
+    async def get_ideas_by_ids(self,
+                               idea_ids: List[str],
+                               columns: str = IDEA_DETAIL_COLUMNS,
+                               user_id: Optional[str] = None,
+                               public_only: bool = False) -> List[Dict[str, Any]]:
+        """Get several ideas in one query, returned in the order of idea_ids
+        
+        Unknown ids, and ids failing the owner/visibility predicate, are skipped.
+        """
+        keys = []
+        for idea_id in idea_ids:
+            key = _parse_idea_id(idea_id)
+            if key is not None and key not in keys:
+                keys.append(key)
+        if not keys:
+            return []
+        
+        # The id is needed to restore the requested order
+        if columns != "*" and "id" not in [c.strip() for c in columns.split(",")]:
+            columns = f"id, {columns}"
+        
+        try:
+            query = self.supabase.table("ideas").select(columns).in_("id", keys)
+            if user_id:
+                query = query.eq("user_id", user_id)
+            if public_only:
+                query = query.in_("visibility", PUBLIC_VISIBILITIES)
+            result = query.execute()
+            
+            by_id = {int(row["id"]): idea_counters.merge_into(row) for row in (result.data or [])}
+            return [by_id[key] for key in keys if key in by_id]
+            
+        except Exception as e:
+            logger.error(f"Error fetching ideas by ids: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to fetch ideas"
+            )
+
     async def update_idea(self, idea_id: str, user_id: str, idea_data: IdeaUpdate) -> Optional[Dict[str, Any]]:
         """Update an existing idea"""
         try:
             # First check if the idea exists and belongs to the user
-            existing_idea = await self.get_idea_by_id(idea_id, user_id)
+            existing_idea = await self.get_idea_by_id(idea_id, user_id, columns=IDEA_OWNER_COLUMNS)
             if not existing_idea:
                 return None
 
@@ -235,6 +459,7 @@ class SupabaseIdeasService:
             
             if result.data:
                 logger.info(f"Successfully updated idea {idea_id}")
+                _invalidate_idea_writes(user_id, idea_id)
                 return result.data[0]
             else:
                 logger.warning(f"No rows updated for idea {idea_id}")
@@ -258,6 +483,7 @@ class SupabaseIdeasService:
         """Delete an idea"""
         try:
             result = self.supabase.table("ideas").delete().eq("id", idea_id).eq("user_id", user_id).execute()
+            _invalidate_idea_writes(user_id, idea_id)
             return len(result.data) > 0
             
         except Exception as e:
@@ -267,22 +493,28 @@ class SupabaseIdeasService:
                 detail="Failed to delete idea"
             )
 
+    async def get_user_stats(self, user_id: str) -> Dict[str, Any]:
+        """Get the precomputed idea summary for a user
+        
+        user_idea_stats is kept current by triggers on ideas (including the
+        batched counter flush), so this is one row however many ideas the
+        user has. See add_user_idea_stats_migration.sql.
+        """
+        result = self.supabase.table("user_idea_stats").select("*").eq("user_id", user_id).limit(1).execute()
+        if not result.data:
+            return dict(EMPTY_USER_STATS)
+        return {**EMPTY_USER_STATS, **{k: v for k, v in result.data[0].items() if v is not None}}
+
     async def get_dashboard_stats(self, user_id: str) -> Dict[str, Any]:
         """Get dashboard statistics for a user"""
         try:
-            # Get all user ideas
-            ideas = await self.get_user_ideas(user_id)
-            
-            total_ideas = len(ideas)
-            active_ideas = len([idea for idea in ideas if idea.get("status") in ["active", "published"]])
-            total_views = sum(idea.get("view_count", 0) for idea in ideas)
-            total_interests = sum(idea.get("interest_count", 0) for idea in ideas)
+            stats = await self.get_user_stats(user_id)
             
             return {
-                "total_ideas": total_ideas,
-                "active_ideas": active_ideas,
-                "total_views": total_views,
-                "total_interests": total_interests
+                "total_ideas": stats["total_ideas"],
+                "active_ideas": stats["active_ideas"],
+                "total_views": stats["total_views"],
+                "total_interests": stats["total_interests"]
             }
             
         except Exception as e:
@@ -293,39 +525,68 @@ class SupabaseIdeasService:
             )
 
     async def increment_view_count(self, idea_id: str) -> bool:
-        """Increment view count for an idea"""
-        try:
-            # Get current view count
-            result = self.supabase.table("ideas").select("view_count").eq("id", idea_id).execute()
-            
-            if result.data:
-                current_views = result.data[0].get("view_count", 0)
-                new_views = current_views + 1
-                
-                self.supabase.table("ideas").update({"view_count": new_views}).eq("id", idea_id).execute()
-                return True
-            
-            return False
-        except Exception as e:
-            logger.error(f"Error incrementing view count: {e}")
-            return False
+        """Increment view count for an idea
+        
+        Buffered in memory and applied by the write-behind counter flush, so
+        this never touches the database on the request path.
+        """
+        return idea_counters.record_view(idea_id)
 
-    async def search_ideas(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
-        """Search ideas by title or description"""
+    async def increment_interest_count(self, idea_id: str) -> bool:
+        """Increment interest count for an idea (buffered like view counts)"""
+        return idea_counters.record_interest(idea_id)
+
+    async def search_ideas(self,
+                           query: str,
+                           limit: int = 20,
+                           cursor: Optional[str] = None,
+                           status_filter: Optional[str] = "published",
+                           public_only: bool = False,
+                           owner_id: Optional[str] = None) -> Dict[str, Any]:
+        """Ranked full-text search over ideas
+        
+        Matches title, description, problem, solution and tags through a
+        GIN-indexed weighted tsvector (FTS5 in USE_LOCAL_DB mode). Results are
+        ordered by relevance and carry a highlighted `snippet`; pass the
+        returned `next_cursor` back to continue.
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = decode_rank_cursor(cursor) if cursor else None
+        backend = get_local_search_backend() or SupabaseSearchBackend(self.supabase)
+        
         try:
-            # Note: This is a simple search. For production, you might want to use Supabase's full-text search
-            result = self.supabase.table("ideas").select("*").or_(
-                f"title.ilike.%{query}%,description.ilike.%{query}%"
-            ).eq("status", "published").limit(limit).execute()
-            
-            return result.data or []
-            
+            # Fetch one extra row to know whether another page exists
+            rows = await run_in_threadpool(
+                backend.search,
+                query,
+                limit + 1,
+                after=after,
+                status_filter=status_filter,
+                public_only=public_only,
+                owner_id=owner_id
+            )
         except Exception as e:
             logger.error(f"Error searching ideas: {e}")
             raise HTTPException(
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to search ideas"
             )
+        
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = encode_rank_cursor(rows[-1]["rank"], rows[-1]["id"])
+        
+        ideas = []
+        for row in rows:
+            idea = IDEA_LIST.map_row(idea_counters.merge_into(row))
+            idea["rank"] = row.get("rank")
+            idea["snippet"] = row.get("snippet") or ""
+            ideas.append(idea)
+        
+        return {"ideas": ideas, "next_cursor": next_cursor}
 
     # AI Integration Methods
     
@@ -364,6 +625,7 @@ class SupabaseIdeasService:
             
             if result.data:
                 logger.info(f"Created AI-generated idea {result.data[0]['id']} for user {user_id}")
+                _invalidate_idea_writes(user_id)
                 return result.data[0]
             else:
                 raise HTTPException(
@@ -415,6 +677,7 @@ class SupabaseIdeasService:
             
             if result.data:
                 logger.info(f"Updated AI score for idea {idea_id}: {ai_score}")
+                idea_cache.invalidate(idea_tag(_parse_idea_id(idea_id)), user_tag(user_id))
                 return True
             else:
                 logger.warning(f"No idea found with id {idea_id} for user {user_id}")
@@ -427,55 +690,22 @@ class SupabaseIdeasService:
     async def get_ai_analytics(self, user_id: str) -> Dict[str, Any]:
         """Get AI-related analytics for a user"""
         try:
-            # Get user's ideas with AI scores
-            result = self.supabase.table("ideas").select("ai_score, ai_generated, ai_metadata").eq("user_id", user_id).execute()
-            
-            if not result.data:
-                return {
-                    "total_ideas": 0,
-                    "ai_generated_ideas": 0,
-                    "ai_scored_ideas": 0,
-                    "average_ai_score": None,
-                    "highest_ai_score": None,
-                    "ai_score_distribution": {}
-                }
-            
-            ideas = result.data
-            total_ideas = len(ideas)
-            ai_generated_count = sum(1 for idea in ideas if idea.get("ai_generated", False))
-            ai_scored_ideas = [idea for idea in ideas if idea.get("ai_score") is not None]
-            ai_scored_count = len(ai_scored_ideas)
-            
-            # Calculate AI score statistics
-            average_score = None
-            highest_score = None
-            score_distribution = {"0-3": 0, "3-5": 0, "5-7": 0, "7-8": 0, "8-10": 0}
-            
-            if ai_scored_ideas:
-                scores = [idea["ai_score"] for idea in ai_scored_ideas]
-                average_score = sum(scores) / len(scores)
-                highest_score = max(scores)
-                
-                # Calculate distribution
-                for score in scores:
-                    if score < 3:
-                        score_distribution["0-3"] += 1
-                    elif score < 5:
-                        score_distribution["3-5"] += 1
-                    elif score < 7:
-                        score_distribution["5-7"] += 1
-                    elif score < 8:
-                        score_distribution["7-8"] += 1
-                    else:
-                        score_distribution["8-10"] += 1
+            stats = await self.get_user_stats(user_id)
+            
+            scored = stats["ai_score_count"]
+            average_score = stats["ai_score_sum"] / scored if scored else None
+            highest_score = stats["ai_score_max"]
             
             return {
-                "total_ideas": total_ideas,
-                "ai_generated_ideas": ai_generated_count,
-                "ai_scored_ideas": ai_scored_count,
+                "total_ideas": stats["total_ideas"],
+                "ai_generated_ideas": stats["ai_generated_ideas"],
+                "ai_scored_ideas": scored,
                 "average_ai_score": round(average_score, 2) if average_score else None,
                 "highest_ai_score": round(highest_score, 2) if highest_score else None,
-                "ai_score_distribution": score_distribution
+                "ai_score_distribution": (
+                    {label: stats[column] for label, column in SCORE_BUCKETS.items()}
+                    if stats["total_ideas"] else {}
+                )
             }
             
         except Exception as e:
@@ -552,11 +782,12 @@ class SupabaseIdeasService:
     async def get_ideas_list(self, 
                            user_id: Optional[str] = None, 
                            visibility_filter: Optional[str] = None,
-                           limit: Optional[int] = None) -> List[Dict[str, Any]]:
+                           limit: Optional[int] = None,
+                           projection: IdeaProjection = IDEA_LIST) -> List[Any]:
         """Get list of ideas with optional filtering for AI matching and other services"""
-        try:
+        async def load() -> List[Dict[str, Any]]:
             # Build query
-            query = self.supabase.table("ideas").select("*")
+            query = self.supabase.table("ideas").select(projection.columns)
             
             # Apply filters
             if user_id:
@@ -564,7 +795,7 @@ class SupabaseIdeasService:
             
             if visibility_filter:
                 if visibility_filter == "public":
-                    query = query.in_("visibility", ["public", "public_ideas"])
+                    query = query.in_("visibility", PUBLIC_VISIBILITIES)
                 else:
                     query = query.eq("visibility", visibility_filter)
             
@@ -575,36 +806,17 @@ class SupabaseIdeasService:
             if limit:
                 query = query.limit(limit)
             
-            result = query.execute()
+            return query.execute().data or []
+        
+        try:
+            rows = await idea_cache.get_or_load(
+                ("ideas_list", user_id, visibility_filter, limit, projection.columns),
+                load,
+                lambda rows: _row_tags(rows, user_tag(user_id) if user_id else PUBLIC_TAG)
+            )
             
             # Transform data for consistency
-            transformed_ideas = []
-            for idea in (result.data or []):
-                transformed_idea = {
-                    "id": str(idea.get("id", "")),
-                    "title": idea.get("title", ""),
-                    "description": idea.get("description", ""),
-                    "industry": idea.get("category", ""),  # Map category to industry
-                    "stage": "idea",  # Default stage since not in DB schema
-                    "status": idea.get("status", "draft"),
-                    "created_at": idea.get("created_at", ""),
-                    "updated_at": idea.get("updated_at", ""),
-                    "views_count": idea.get("view_count", 0),
-                    "interests_count": idea.get("interest_count", 0),
-                    "user_id": str(idea.get("user_id", "")),
-                    "ai_score": idea.get("ai_score"),
-                    # Fields needed for AI matching
-                    "target_market": idea.get("target_market", ""),
-                    "problem": idea.get("problem", ""),
-                    "solution": idea.get("solution", ""),
-                    "category": idea.get("category", ""),
-                    "tags": idea.get("tags", []),
-                    "visibility": idea.get("visibility", "private"),
-                    # Additional AI metadata
-                    "ai_generated": idea.get("ai_generated", False),
-                    "ai_metadata": idea.get("ai_metadata", {})
-                }
-                transformed_ideas.append(transformed_idea)
+            transformed_ideas = _project_rows(rows, projection)
             
             logger.info(f"Retrieved {len(transformed_ideas)} ideas with filters: user_id={user_id}, visibility={visibility_filter}")
             return transformed_ideas
@@ -615,3 +827,64 @@ class SupabaseIdeasService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to fetch ideas list"
             )
+
+    async def browse_public_ideas(self,
+                                  industry: Optional[str] = None,
+                                  stage: Optional[str] = None,
+                                  status_filter: Optional[str] = None,
+                                  limit: int = 20,
+                                  cursor: Optional[str] = None,
+                                  projection: IdeaProjection = IDEA_CARD) -> Dict[str, Any]:
+        """
+        Page through public ideas with filters applied in the database
+        
+        Uses keyset pagination on (created_at, id) so every page costs the same
+        index range scan however deep the client has scrolled. The total is the
+        planner's estimate, returned alongside the page in the same request.
+        
+        Raises:
+            ValueError: If the cursor is malformed
+        """
+        after = keyset_filter(cursor)
+        
+        # Stage is derived, not stored: any other stage can never match
+        if stage and stage.lower() != DEFAULT_STAGE:
+            return {"ideas": [], "next_cursor": None, "total": 0}
+        
+        async def load() -> Dict[str, Any]:
+            query = self.supabase.table("ideas").select(projection.columns, count="estimated").in_(
+                "visibility", PUBLIC_VISIBILITIES
+            )
+            
+            if industry:
+                # Case-insensitive equality on category
+                query = query.ilike("category", _escape_like(industry))
+            if status_filter:
+                query = query.eq("status", status_filter)
+            if after:
+                query = query.or_(after)
+            
+            # Fetch one extra row to know whether another page exists
+            result = query.order("created_at", desc=True).order("id", desc=True).limit(limit + 1).execute()
+            return {"rows": result.data or [], "count": result.count}
+        
+        try:
+            page = await idea_cache.get_or_load(
+                ("browse", industry.lower() if industry else None, status_filter, limit, cursor, projection.columns),
+                load,
+                lambda page: _row_tags(page["rows"], PUBLIC_TAG)
+            )
+            
+            rows, next_cursor = page_from_rows(page["rows"], limit)
+            ideas = _project_rows(rows, projection)
+            total = page["count"] if page["count"] is not None else len(ideas)
+            
+            logger.info(f"Browsed {len(ideas)} public ideas: industry={industry}, status={status_filter}, cursor={'yes' if cursor else 'no'}")
+            return {"ideas": ideas, "next_cursor": next_cursor, "total": total}
+            
+        except Exception as e:
+            logger.error(f"Error browsing public ideas: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to browse ideas"
+            )
@@ -2,15 +2,69 @@
 Supabase-based Profile service for managing user profiles
 """
 from supabase import create_client, Client
-from fastapi import HTTPException, status
+from fastapi import HTTPException, UploadFile, status
 from typing import Dict, Any, Optional, List
+import asyncio
 import logging
 from datetime import datetime
 
+from starlette.concurrency import run_in_threadpool
+
 from app.config import settings
+from app.utils.projection import Projection, Field
+from app.services.storage_uploads import MB, iter_upload_file, read_limited
+from app.services.avatar_images import (
+    AVATAR_CACHE_CONTROL, AVATAR_FORMATS, PRIMARY_VARIANT, InvalidImage,
+    avatar_digest, avatar_processor, avatar_variants
+)
 
 logger = logging.getLogger(__name__)
 
+# Full profile as returned by the profile endpoints
+PROFILE = Projection("profile", {
+    "id": Field("id"),
+    "username": Field("username"),
+    "full_name": Field("full_name"),
+    "bio": Field("bio"),
+    "location": Field("location"),
+    "company": Field("company"),
+    "position": Field("position"),
+    "skills": Field("skills", []),
+    "interests": Field("interests", []),
+    "website_url": Field("website_url"),
+    "linkedin_url": Field("linkedin_url"),
+    "twitter_url": Field("twitter_url"),
+    "github_url": Field("github_url"),
+    "phone": Field("phone"),
+    "avatar_url": Field("avatar_url"),
+    "avatar_variants": Field("avatar_url", convert=avatar_variants),
+    "experience_years": Field("experience_years", 0),
+    "education": Field("education"),
+    "total_ideas": Field("total_ideas", 0),
+    "total_views": Field("total_views", 0),
+    "total_interests": Field("total_interests", 0),
+    "created_at": Field("created_at"),
+    "updated_at": Field("updated_at"),
+})
+
+# Profile search results
+PROFILE_CARD = Projection("profile_card", {
+    **{
+        column: Field(column) for column in (
+            "id", "username", "full_name", "bio", "company", "position",
+            "location", "avatar_url",
+        )
+    },
+    "avatar_variants": Field("avatar_url", convert=avatar_variants),
+})
+
+# Content type of each avatar variant by file extension
+AVATAR_CONTENT_TYPES = {ext: content_type for _, ext, content_type in AVATAR_FORMATS}
+
+# Recent activity columns
+RECENT_IDEA_COLUMNS = "id, title, description, category, status, visibility, created_at, updated_at"
+RECENT_FILE_COLUMNS = "id, idea_id, filename, original_filename, file_size, content_type, created_at"
+
 
 class SupabaseProfileService:    
     def __init__(self, user_token: Optional[str] = None):
@@ -153,34 +207,12 @@ class SupabaseProfileService:
         """Get user profile with extended information"""
         try:
             # Get profile data from profiles table
-            profile_result = self.supabase.table("profiles").select("*").eq("id", user_id).execute()
+            profile_result = self.supabase.table("profiles").select(PROFILE.columns).eq("id", user_id).execute()
             
             if not profile_result.data:
                 return None
                 
-            profile_data = profile_result.data[0]
-            return {
-                "id": profile_data.get("id"),  # Use id as the main id
-                "username": profile_data.get("username"),
-                "full_name": profile_data.get("full_name"),
-                "bio": profile_data.get("bio"),
-                "location": profile_data.get("location"),
-                "company": profile_data.get("company"),
-                "position": profile_data.get("position"),
-                "skills": profile_data.get("skills", []),
-                "interests": profile_data.get("interests", []),
-                "website_url": profile_data.get("website_url"),
-                "linkedin_url": profile_data.get("linkedin_url"),
-                "twitter_url": profile_data.get("twitter_url"),
-                "github_url": profile_data.get("github_url"),
-                "phone": profile_data.get("phone"),
-                "avatar_url": profile_data.get("avatar_url"),
-                "experience_years": profile_data.get("experience_years", 0),
-                "education": profile_data.get("education"),
-                "total_ideas": profile_data.get("total_ideas", 0),                "total_views": profile_data.get("total_views", 0),                "total_interests": profile_data.get("total_interests", 0),
-                "created_at": profile_data.get("created_at"),
-                "updated_at": profile_data.get("updated_at")
-            }
+            return PROFILE.map_row(profile_result.data[0])
             
         except Exception as e:
             logger.error(f"Error fetching profile: {e}")
@@ -247,66 +279,15 @@ class SupabaseProfileService:
                 status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
                 detail="Failed to update profile"
             )
-    async def upload_avatar(self, user_id: str, file_content: bytes, filename: str) -> str:
-        """Upload user avatar file and update profile"""
+    async def upload_avatar(self, user_id: str, file: UploadFile) -> str:
+        """Upload a user avatar, store its size variants and update the profile"""
         try:
-            import uuid
-            import os
-            import mimetypes
-            
-            # Validate file size (max 5MB)
-            if len(file_content) > 5 * 1024 * 1024:
-                raise HTTPException(
-                    status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
-                    detail="Avatar file size exceeds 5MB limit"
-                )
-            
-            # Generate unique filename for avatar with user folder structure
-            file_extension = os.path.splitext(filename)[1] if filename else '.jpg'
-            unique_filename = f"avatar_{uuid.uuid4()}{file_extension}"
-            # Store in user-specific folder: avatars/user_id/filename
-            file_path = f"{user_id}/{unique_filename}"
-            
-            # Get content type
-            content_type = mimetypes.guess_type(filename)[0] if filename else "image/jpeg"
-            if not content_type or not content_type.startswith("image/"):
-                content_type = "image/jpeg"
-            
-            # Upload to Supabase Storage avatars bucket
-            upload_result = self.supabase.storage.from_("avatars").upload(
-                file_path,
-                file_content,
-                file_options={
-                    "content-type": content_type,
-                    "cache-control": "3600",
-                    "upsert": "true"  # Allow overwriting
-                }
+            data = await read_limited(
+                iter_upload_file(file),
+                max_bytes=settings.MAX_AVATAR_UPLOAD_MB * MB,
+                size_hint=file.size
             )
-            
-            if hasattr(upload_result, 'error') and upload_result.error:
-                logger.error(f"Supabase storage error: {upload_result.error}")
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail=f"Failed to upload avatar to storage: {upload_result.error}"
-                )
-            
-            # Get public URL for the uploaded avatar
-            avatar_url = self.supabase.storage.from_("avatars").get_public_url(file_path)              # Update profile with new avatar URL (service role bypasses RLS)
-            result = self.supabase.table("profiles").upsert({
-                "id": user_id,  # Use 'id' instead of 'user_id' for profiles table
-                "avatar_url": avatar_url,
-                "updated_at": datetime.utcnow().isoformat()
-            }).execute()
-            logger.info(f"Updated profile avatar for user {user_id}")
-            
-            if not result.data:
-                raise HTTPException(
-                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                    detail="Failed to update profile with avatar URL"
-                )
-            
-            logger.info(f"Avatar uploaded successfully for user {user_id}: {avatar_url}")
-            return avatar_url
+            return await self.store_avatar(user_id, data)
             
         except Exception as e:
             logger.error(f"Error uploading avatar: {e}")
@@ -317,21 +298,87 @@ class SupabaseProfileService:
                 detail=f"Failed to upload avatar: {str(e)}"
             )
 
+    async def avatar_from_upload(self, user_id: str, file_path: str) -> str:
+        """Process an original uploaded straight to the avatars bucket
+        
+        The original is replaced by its variants (see app/services/avatar_images.py).
+        """
+        bucket = self.supabase.storage.from_("avatars")
+        data = await run_in_threadpool(bucket.download, file_path)
+        try:
+            return await self.store_avatar(user_id, data)
+        finally:
+            try:
+                await run_in_threadpool(bucket.remove, [file_path])
+            except Exception as e:
+                logger.warning(f"Failed to remove original avatar {file_path}: {e}")
+
+    async def store_avatar(self, user_id: str, data: bytes) -> str:
+        """Encode an avatar image into its variants, store them and update the profile
+        
+        Variants are rendered in a process pool and stored under keys derived
+        from the image content, so they are cached for a year.
+        
+        Raises:
+            HTTPException: 415 if the data is not an accepted image
+        """
+        try:
+            variants = await avatar_processor.render(data)
+        except InvalidImage as e:
+            logger.warning(f"Rejected avatar for user {user_id}: {e}")
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail="Avatar must be a JPEG, PNG, WebP or GIF image"
+            )
+
+        prefix = f"{user_id}/{avatar_digest(data)}"
+        bucket = self.supabase.storage.from_("avatars")
+
+        def put(name: str, body: bytes) -> None:
+            bucket.upload(f"{prefix}/{name}", body, {
+                "content-type": AVATAR_CONTENT_TYPES[name.rsplit(".", 1)[1]],
+                "cache-control": AVATAR_CACHE_CONTROL,
+                "upsert": "true",  # same key, same bytes
+            })
+
+        await asyncio.gather(*(run_in_threadpool(put, name, body) for name, body in variants.items()))
+        logger.info(f"Stored {len(variants)} avatar variants ({sum(map(len, variants.values()))} bytes) for user {user_id}")
+        return await self.set_avatar(user_id, f"{prefix}/{PRIMARY_VARIANT}")
+
+    async def set_avatar(self, user_id: str, file_path: str) -> str:
+        """Point the user's profile at an avatar stored in the avatars bucket"""
+        # Get public URL for the uploaded avatar
+        avatar_url = self.supabase.storage.from_("avatars").get_public_url(file_path)
+        # Update profile with new avatar URL (service role bypasses RLS)
+        result = self.supabase.table("profiles").upsert({
+            "id": user_id,  # Use 'id' instead of 'user_id' for profiles table
+            "avatar_url": avatar_url,
+            "updated_at": datetime.utcnow().isoformat()
+        }).execute()
+        logger.info(f"Updated profile avatar for user {user_id}")
+        
+        if not result.data:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Failed to update profile with avatar URL"
+            )
+        
+        logger.info(f"Avatar uploaded successfully for user {user_id}: {avatar_url}")
+        return avatar_url
+
     async def get_profile_stats(self, user_id: str) -> Dict[str, Any]:
         """Get profile statistics"""
         try:
-            # Get ideas count
-            ideas_result = self.supabase.table("ideas").select("id", count="exact").eq("user_id", user_id).execute()
-            ideas_count = ideas_result.count or 0
-            
-            # Get total views
-            views_result = self.supabase.table("ideas").select("view_count").eq("user_id", user_id).execute()
-            total_views = sum(idea.get("view_count", 0) for idea in (views_result.data or []))
-            
-            # Get total interests
-            interests_result = self.supabase.table("ideas").select("interest_count").eq("user_id", user_id).execute()
-            total_interests = sum(idea.get("interest_count", 0) for idea in (interests_result.data or []))
-            
+            # Idea totals come from the per-user summary row
+            # (see add_user_idea_stats_migration.sql)
+            stats_result = self.supabase.table("user_idea_stats").select(
+                "total_ideas, total_views, total_interests"
+            ).eq("user_id", user_id).limit(1).execute()
+            stats = stats_result.data[0] if stats_result.data else {}
+            ideas_count = stats.get("total_ideas") or 0
+            total_views = stats.get("total_views") or 0
+            total_interests = stats.get("total_interests") or 0
+
             # Get files count
             files_result = self.supabase.table("files").select("id", count="exact").eq("user_id", user_id).execute()
             files_count = files_result.count or 0
@@ -353,11 +400,11 @@ class SupabaseProfileService:
     async def search_profiles(self, query: str, limit: int = 20) -> List[Dict[str, Any]]:
         """Search user profiles"""
         try:
-            result = self.supabase.table("profiles").select("*").or_(
+            result = self.supabase.table("profiles").select(PROFILE_CARD.columns).or_(
                 f"full_name.ilike.%{query}%,bio.ilike.%{query}%,company.ilike.%{query}%"
             ).limit(limit).execute()
             
-            return result.data or []
+            return PROFILE_CARD.map(result.data)
             
         except Exception as e:
             logger.error(f"Error searching profiles: {e}")            
@@ -370,10 +417,10 @@ class SupabaseProfileService:
         """Get user activity summary"""
         try:
             # Get recent ideas
-            recent_ideas = self.supabase.table("ideas").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(5).execute()
+            recent_ideas = self.supabase.table("ideas").select(RECENT_IDEA_COLUMNS).eq("user_id", user_id).order("created_at", desc=True).limit(5).execute()
             
             # Get recent files
-            recent_files = self.supabase.table("files").select("*").eq("user_id", user_id).order("created_at", desc=True).limit(5).execute()
+            recent_files = self.supabase.table("files").select(RECENT_FILE_COLUMNS).eq("user_id", user_id).order("created_at", desc=True).limit(5).execute()
             
             return {
                 "recent_ideas": recent_ideas.data or [],
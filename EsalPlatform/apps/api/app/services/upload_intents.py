@@ -0,0 +1,265 @@
+"""
+Direct-to-storage uploads via signed URLs
+
+Clients upload idea attachments and avatars straight to Supabase Storage, so
+no file bytes pass through API workers:
+
+1. create_intent: the declared filename, size and content type are checked
+   against the bucket's UploadPolicy; the API picks the object path and
+   returns a signed upload URL plus an intent token (a short-lived JWT naming
+   the user, bucket, path and declared metadata).
+2. The client PUTs the file to the signed URL. Bucket limits
+   (add_upload_policies_migration.sql) reject oversized or disallowed files.
+3. confirm: the intent is verified, the stored object's real size and
+   content type are checked against the policy (violations are removed),
+   and the caller registers the files row or avatar.
+
+Downloads are served as batches of signed URLs (signed_download_urls).
+"""
+import logging
+import mimetypes
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple
+
+import jwt
+from fastapi import HTTPException, status
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.config import settings
+from app.services.storage_uploads import MB
+
+logger = logging.getLogger(__name__)
+
+# Audience of intent tokens, so they can never pass as access tokens
+INTENT_AUDIENCE = "esal:upload-intent"
+
+
+class UploadPolicy(NamedTuple):
+    """What a bucket accepts and where uploads are placed"""
+    bucket: str
+    max_bytes: int
+    content_types: Tuple[str, ...]  # exact types, or "family/*"
+    path_template: str  # formatted with user_id, name and ext
+
+    def allows(self, content_type: str) -> bool:
+        content_type = (content_type or "").split(";", 1)[0].strip().lower()
+        family = content_type.split("/", 1)[0] + "/*"
+        return content_type in self.content_types or family in self.content_types
+
+    def object_path(self, user_id: str, filename: str) -> str:
+        ext = os.path.splitext(filename)[1].lower()
+        return self.path_template.format(user_id=user_id, name=uuid.uuid4(), ext=ext)
+
+
+# Keep in sync with add_upload_policies_migration.sql
+UPLOAD_POLICIES: Dict[str, UploadPolicy] = {
+    "idea-files": UploadPolicy(
+        bucket="idea-files",
+        max_bytes=settings.MAX_FILE_UPLOAD_MB * MB,
+        content_types=(
+            "application/pdf",
+            "application/msword",
+            "application/vnd.ms-excel",
+            "application/vnd.ms-powerpoint",
+            "application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+            "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+            "application/vnd.openxmlformats-officedocument.presentationml.presentation",
+            "application/zip",
+            "text/plain",
+            "text/csv",
+            "image/*",
+            "video/*",
+        ),
+        path_template="ideas/{user_id}/{name}{ext}",
+    ),
+    "avatars": UploadPolicy(
+        bucket="avatars",
+        max_bytes=settings.MAX_AVATAR_UPLOAD_MB * MB,
+        content_types=("image/jpeg", "image/png", "image/webp", "image/gif"),
+        path_template="{user_id}/avatar_{name}{ext}",
+    ),
+}
+
+
+class ConfirmedUpload(NamedTuple):
+    """An uploaded object that matched its intent and policy"""
+    bucket: str
+    path: str
+    filename: str
+    size: int
+    content_type: str
+    idea_id: Optional[int]
+    description: Optional[str]
+
+
+class UploadIntentService:
+    """Issues and confirms signed direct uploads; signs download batches"""
+
+    def __init__(self,
+                 client: Client,
+                 secret: Optional[str] = None,
+                 ttl_seconds: Optional[int] = None):
+        self.client = client
+        self.secret = secret if secret is not None else settings.JWT_SECRET_KEY
+        self.ttl_seconds = ttl_seconds if ttl_seconds is not None else settings.UPLOAD_INTENT_TTL_SECONDS
+
+    @staticmethod
+    def policy(bucket: str) -> UploadPolicy:
+        policy = UPLOAD_POLICIES.get(bucket)
+        if policy is None:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Uploads to bucket '{bucket}' are not supported"
+            )
+        return policy
+
+    @staticmethod
+    def _check(policy: UploadPolicy, size: int, content_type: str) -> None:
+        if size > policy.max_bytes:
+            raise HTTPException(
+                status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                detail=f"File size exceeds {policy.max_bytes // MB}MB limit"
+            )
+        if not policy.allows(content_type):
+            raise HTTPException(
+                status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+                detail=f"Content type '{content_type}' is not allowed in {policy.bucket}"
+            )
+
+    async def create_intent(self,
+                            user_id: str,
+                            bucket: str,
+                            filename: str,
+                            size: int,
+                            content_type: Optional[str] = None,
+                            idea_id: Optional[int] = None,
+                            description: Optional[str] = None) -> Dict[str, Any]:
+        """Validate the declared upload and issue a signed upload URL"""
+        policy = self.policy(bucket)
+        content_type = content_type or mimetypes.guess_type(filename)[0] or "application/octet-stream"
+        if size <= 0:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="File size must be positive"
+            )
+        self._check(policy, size, content_type)
+
+        path = policy.object_path(user_id, filename)
+        signed = await run_in_threadpool(self.client.storage.from_(bucket).create_signed_upload_url, path)
+
+        expires_at = datetime.now(timezone.utc) + timedelta(seconds=self.ttl_seconds)
+        intent = jwt.encode({
+            "sub": user_id,
+            "aud": INTENT_AUDIENCE,
+            "exp": expires_at,
+            "bucket": bucket,
+            "path": path,
+            "filename": filename,
+            "size": size,
+            "content_type": content_type,
+            "idea_id": idea_id,
+            "description": description,
+        }, self.secret, algorithm="HS256")
+
+        return {
+            "intent": intent,
+            "upload_url": signed["signed_url"],
+            "upload_token": signed["token"],
+            "bucket": bucket,
+            "path": path,
+            "content_type": content_type,
+            "max_bytes": policy.max_bytes,
+            "expires_at": expires_at.isoformat(),
+        }
+
+    def _decode(self, intent: str, user_id: str) -> Dict[str, Any]:
+        try:
+            claims = jwt.decode(intent, self.secret, algorithms=["HS256"], audience=INTENT_AUDIENCE)
+        except jwt.ExpiredSignatureError:
+            raise HTTPException(
+                status_code=status.HTTP_410_GONE,
+                detail="Upload intent has expired"
+            )
+        except jwt.InvalidTokenError:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Invalid upload intent"
+            )
+        if claims.get("sub") != user_id:
+            raise HTTPException(
+                status_code=status.HTTP_403_FORBIDDEN,
+                detail="Upload intent belongs to another user"
+            )
+        return claims
+
+    async def stat(self, bucket: str, path: str) -> Optional[Dict[str, Any]]:
+        """Stored object metadata (size, mimetype), or None if it does not exist"""
+        folder, _, name = path.rpartition("/")
+        entries = await run_in_threadpool(
+            self.client.storage.from_(bucket).list, folder, {"search": name, "limit": 2}
+        )
+        for entry in entries or []:
+            if entry.get("name") == name:
+                return entry.get("metadata") or {}
+        return None
+
+    async def _remove(self, bucket: str, path: str) -> None:
+        try:
+            await run_in_threadpool(self.client.storage.from_(bucket).remove, [path])
+        except Exception as e:
+            logger.warning(f"Failed to remove rejected upload {bucket}/{path}: {e}")
+
+    async def confirm(self, user_id: str, intent: str) -> ConfirmedUpload:
+        """Verify an intent against the uploaded object
+
+        Raises:
+            HTTPException: 404 if nothing was uploaded; 413/415 (and the object
+                is removed) if the stored object violates the bucket policy
+        """
+        claims = self._decode(intent, user_id)
+        bucket, path = claims["bucket"], claims["path"]
+        policy = self.policy(bucket)
+
+        metadata = await self.stat(bucket, path)
+        if metadata is None:
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail="No upload found for this intent"
+            )
+
+        size = int(metadata.get("size") or metadata.get("contentLength") or 0)
+        content_type = metadata.get("mimetype") or claims["content_type"]
+        try:
+            self._check(policy, size, content_type)
+        except HTTPException:
+            await self._remove(bucket, path)
+            raise
+
+        return ConfirmedUpload(
+            bucket=bucket,
+            path=path,
+            filename=claims["filename"],
+            size=size,
+            content_type=content_type,
+            idea_id=claims.get("idea_id"),
+            description=claims.get("description"),
+        )
+
+    async def signed_download_urls(self,
+                                   bucket: str,
+                                   paths: List[str],
+                                   expires_in: int) -> Dict[str, Optional[str]]:
+        """Sign many object paths in one storage request: path -> URL (None on error)"""
+        if not paths:
+            return {}
+        signed = await run_in_threadpool(
+            self.client.storage.from_(bucket).create_signed_urls, paths, expires_in
+        )
+        urls: Dict[str, Optional[str]] = {path: None for path in paths}
+        for item in signed or []:
+            if item.get("path") in urls and not item.get("error"):
+                urls[item["path"]] = item.get("signedURL")
+        return urls
@@ -0,0 +1,119 @@
+"""
+Email verification code store
+
+Each operation is a single round trip to email_verifications
+(add_verification_codes_migration.sql):
+
+- issue: replace the user's unused codes and insert the new one
+- verify: check and consume the user's latest code atomically, counting
+  wrong attempts; after VERIFICATION_MAX_ATTEMPTS the code is locked until
+  a new one is issued
+
+The database decides every outcome, so a resend handled by another worker
+or a lock reached through another worker applies everywhere at once. Codes
+that are not six digits are rejected without a round trip. A periodic sweep
+bulk-deletes expired rows.
+"""
+import logging
+import re
+import secrets
+from datetime import datetime, timezone
+from typing import Any, Callable, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+from supabase import Client
+
+from app.config import settings
+from app.services.background import PeriodicTask, service_client
+
+logger = logging.getLogger(__name__)
+
+# Supabase functions (see add_verification_codes_migration.sql)
+ISSUE_RPC = "issue_verification_code"
+CONSUME_RPC = "consume_verification_code"
+
+VERIFIED = "verified"
+INVALID = "invalid"
+LOCKED = "locked"
+EXPIRED = "expired"
+MISSING = "missing"
+
+_CODE = re.compile(r"^\d{6}$")
+
+
+def generate_code() -> str:
+    """A random 6-digit code"""
+    return str(100000 + secrets.randbelow(900000))
+
+
+class VerificationCodeStore:
+    """Verification codes in email_verifications, one RPC per operation"""
+
+    def __init__(self,
+                 client_factory: Callable[[], Client] = service_client,
+                 ttl_seconds: float = 600.0,
+                 max_attempts: int = 5,
+                 sweep_interval: float = 60.0):
+        self.ttl_seconds = ttl_seconds
+        self.max_attempts = max_attempts
+        self._client_factory = client_factory
+        self._client: Optional[Client] = None
+        self._sweeper = PeriodicTask("Verification code sweep", self.sweep, sweep_interval)
+
+    @property
+    def client(self) -> Client:
+        if self._client is None:
+            self._client = self._client_factory()
+        return self._client
+
+    def _rpc(self, name: str, params: Dict[str, Any]) -> Any:
+        return self.client.rpc(name, params).execute().data
+
+    async def issue(self, user_id: str, email: str) -> str:
+        """Create a code for the user, replacing any unused one
+
+        Raises:
+            Exception: the code could not be stored
+        """
+        code = generate_code()
+        await run_in_threadpool(self._rpc, ISSUE_RPC, {
+            "p_user_id": user_id,
+            "p_email": email,
+            "p_code": code,
+            "p_ttl_seconds": int(self.ttl_seconds),
+        })
+        return code
+
+    async def verify(self, user_id: str, code: str) -> str:
+        """Check and consume a code; returns one of VERIFIED, INVALID, LOCKED, EXPIRED, MISSING"""
+        if not _CODE.match(code or ""):
+            return INVALID
+        result = await run_in_threadpool(self._rpc, CONSUME_RPC, {
+            "p_user_id": user_id,
+            "p_code": code,
+            "p_max_attempts": self.max_attempts,
+        })
+        return result or MISSING
+
+    async def sweep(self) -> None:
+        """Delete expired codes"""
+        cutoff = datetime.now(timezone.utc).isoformat()
+        try:
+            await run_in_threadpool(
+                self.client.table("email_verifications").delete().lt("expires_at", cutoff).execute
+            )
+        except Exception as e:
+            logger.warning(f"Failed to purge expired verification codes: {e}")
+
+    def start(self) -> None:
+        self._sweeper.start()
+
+    async def stop(self) -> None:
+        await self._sweeper.stop()
+
+
+verification_codes = VerificationCodeStore(
+    ttl_seconds=settings.VERIFICATION_CODE_EXPIRY_MINUTES * 60,
+    max_attempts=settings.VERIFICATION_MAX_ATTEMPTS,
+    sweep_interval=settings.VERIFICATION_SWEEP_INTERVAL_SECONDS
+)
@@ -0,0 +1,119 @@
+"""
+Conditional GET helpers (ETag / Last-Modified)
+
+Validators are computed from a few cheap fields of the rows an endpoint is
+about to return (ids, updated_at watermarks and counters) rather than from
+the serialized body, so a matching `If-None-Match` is answered with
+`304 Not Modified` before any response model is built or JSON encoded.
+
+Usage in an endpoint:
+
+    etag = rows_etag(ideas, "id", "updated_at", "views_count", "interests_count")
+    if is_not_modified(request, etag):
+        return not_modified_response(etag)
+    set_validators(response, etag)
+
+List endpoints only send an ETag: a deletion cannot be expressed by a
+last-modified watermark. Single-resource endpoints also send Last-Modified,
+taken from updated_at; it tracks content edits, while counter changes are
+only reflected in the ETag (which clients sending both headers use).
+"""
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Any, Dict, Iterable, Optional, Union
+
+from fastapi import Request, Response, status
+
+# Authenticated, per-user content: browsers may store it but must revalidate
+CACHE_CONTROL = "private, no-cache"
+
+
+def make_etag(*parts: Any) -> str:
+    """Weak ETag over the repr of the given parts"""
+    digest = hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=16).hexdigest()
+    return f'W/"{digest}"'
+
+
+def rows_etag(rows: Iterable[Dict[str, Any]], *fields: str, extra: Any = None) -> str:
+    """Weak ETag over selected fields of each row (in order) plus extra state"""
+    return make_etag(extra, [tuple(row.get(field) for field in fields) for row in rows])
+
+
+def parse_timestamp(value: Union[str, datetime, None]) -> Optional[datetime]:
+    """Parse a database timestamp into an aware datetime (None if unusable)"""
+    if value is None or value == "":
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        try:
+            parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+        except ValueError:
+            return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def _etag_matches(header: str, etag: str) -> bool:
+    """Weak comparison against an If-None-Match header (RFC 7232 3.2)"""
+    if header.strip() == "*":
+        return True
+    opaque = etag[2:] if etag.startswith("W/") else etag
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate.startswith("W/"):
+            candidate = candidate[2:]
+        if candidate == opaque:
+            return True
+    return False
+
+
+def is_not_modified(request: Request,
+                    etag: Optional[str] = None,
+                    last_modified: Optional[datetime] = None) -> bool:
+    """
+    Evaluate If-None-Match / If-Modified-Since for a GET request
+
+    If-None-Match takes precedence; If-Modified-Since is only consulted when
+    the client sent no entity tags.
+    """
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        return etag is not None and _etag_matches(if_none_match, etag)
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and last_modified is not None:
+        try:
+            since = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return False
+        if since.tzinfo is None:
+            since = since.replace(tzinfo=timezone.utc)
+        # HTTP dates have one-second resolution
+        return last_modified.replace(microsecond=0) <= since
+    return False
+
+
+def _validator_headers(etag: Optional[str], last_modified: Optional[datetime]) -> Dict[str, str]:
+    headers = {"Cache-Control": CACHE_CONTROL}
+    if etag:
+        headers["ETag"] = etag
+    if last_modified is not None:
+        headers["Last-Modified"] = format_datetime(last_modified.astimezone(timezone.utc), usegmt=True)
+    return headers
+
+
+def set_validators(response: Response,
+                   etag: Optional[str] = None,
+                   last_modified: Optional[datetime] = None) -> None:
+    """Attach validators to the (200) response FastAPI will send"""
+    response.headers.update(_validator_headers(etag, last_modified))
+
+
+def not_modified_response(etag: Optional[str] = None,
+                          last_modified: Optional[datetime] = None) -> Response:
+    """Empty 304 carrying the same validators as the full response"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED,
+                    headers=_validator_headers(etag, last_modified))
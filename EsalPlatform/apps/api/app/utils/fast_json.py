@@ -0,0 +1,88 @@
+"""
+Fast JSON response pipeline
+
+- FastJSONResponse renders with orjson (stdlib json if orjson is missing) and
+  is the application's default response class.
+- Hot list schemas have precompiled TypeAdapters. Endpoints that validate
+  their rows through one and return `adapter_response(...)` skip FastAPI's
+  generic path (per-row response-model validation, serialization to Python
+  objects, then stdlib json.dumps): pydantic-core encodes straight to bytes.
+
+See benchmark_json.py for timings.
+"""
+import json
+from decimal import Decimal
+from typing import Any, List, Mapping, Optional
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, TypeAdapter
+from starlette.background import BackgroundTask
+from starlette.responses import Response
+
+from app.schemas import (
+    AIMatchingResponse, IdeaResponse, StartupMatch, UserResponse, UsersListResponse
+)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - orjson is in requirements.txt
+    orjson = None
+
+
+def _default(obj: Any) -> Any:
+    """Types orjson does not encode natively"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Compact JSON bytes, as rendered by FastJSONResponse"""
+    if orjson is None:
+        return json.dumps(content, default=_default, ensure_ascii=False,
+                          separators=(",", ":")).encode("utf-8")
+    return orjson.dumps(content, default=_default, option=orjson.OPT_NON_STR_KEYS)
+
+
+def json_line(content: Any) -> bytes:
+    """One NDJSON line"""
+    return dumps(content) + b"\n"
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+# Precompiled adapters for hot response schemas
+STARTUP_MATCHES = TypeAdapter(List[StartupMatch])
+AI_MATCHING_RESPONSE = TypeAdapter(AIMatchingResponse)
+IDEA_RESPONSES = TypeAdapter(List[IdeaResponse])
+USER_RESPONSES = TypeAdapter(List[UserResponse])
+USERS_LIST_RESPONSE = TypeAdapter(UsersListResponse)
+
+
+def adapter_response(adapter: TypeAdapter,
+                     value: Any,
+                     status_code: int = 200,
+                     headers: Optional[Mapping[str, str]] = None,
+                     background: Optional[BackgroundTask] = None) -> Response:
+    """
+    Encode an already-validated value with a precompiled adapter
+
+    The value must be of the adapter's type (model instances, not dicts);
+    use adapter.validate_python(...) first for raw rows.
+    """
+    return Response(
+        content=adapter.dump_json(value),
+        status_code=status_code,
+        headers=dict(headers) if headers else None,
+        media_type="application/json",
+        background=background
+    )
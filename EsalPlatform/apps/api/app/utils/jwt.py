@@ -2,11 +2,12 @@
 JWT token utilities for authentication with Supabase
 """
 from datetime import datetime, timedelta
+from functools import lru_cache
 from typing import Dict, Any, Optional
 import jwt
 import logging
-from fastapi import HTTPException, status, Depends
-from fastapi.security import HTTPBearer
+from fastapi import HTTPException, status, Depends, Request
+from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from supabase import create_client, Client
 
 from app.config import settings
@@ -15,6 +16,10 @@ from app.schemas import UserResponse
 security = HTTPBearer()
 logger = logging.getLogger(__name__)
 
+# Keys under scope["state"] holding the principal resolved for the request
+STATE_USER_KEY = "user"
+STATE_AUTH_ERROR_KEY = "auth_error"
+
 
 def create_access_token(data: Dict[str, Any]) -> str:
     """Create JWT access token"""
@@ -52,32 +57,24 @@ def verify_token(token: str) -> Dict[str, Any]:
         )
 
 
-def get_current_user(
-    token: str = Depends(security)
-) -> UserResponse:
-    """Get current user from JWT token using Supabase"""
+@lru_cache(maxsize=1)
+def _get_auth_client() -> Client:
+    """Create the Supabase client used for token verification (once per process)"""
+    # Prefer service role for admin operations, anon for user verification
+    service_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
+    if service_key:
+        logger.debug("JWT service using service role key")
+        return create_client(settings.SUPABASE_URL, service_key)
+    # Fallback to anon key for user token verification
+    logger.debug("JWT service using anon key")
+    return create_client(settings.SUPABASE_URL, settings.SUPABASE_ANON_KEY)
+
+
+def authenticate_token(token_str: str) -> UserResponse:
+    """Resolve a bearer token to a user, via Supabase with a local JWT fallback"""
     try:
-        # Extract token from Bearer format
-        if hasattr(token, 'credentials'):
-            token_str = token.credentials
-        else:
-            token_str = str(token)
-          # Initialize Supabase client - prefer service role for admin operations, anon for user verification
         try:
-            service_key = getattr(settings, 'SUPABASE_SERVICE_ROLE_KEY', None)
-            if service_key:
-                supabase: Client = create_client(
-                    settings.SUPABASE_URL,
-                    service_key
-                )
-                logger.debug("JWT service using service role key")
-            else:
-                # Fallback to anon key for user token verification
-                supabase: Client = create_client(
-                    settings.SUPABASE_URL,
-                    settings.SUPABASE_ANON_KEY
-                )
-                logger.debug("JWT service using anon key")
+            supabase = _get_auth_client()
         except Exception as e:
             logger.error(f"Failed to initialize Supabase client: {e}")
             raise HTTPException(
@@ -109,38 +106,40 @@ def get_current_user(
                     is_blocked=user_metadata.get("is_blocked", False),
                     created_at=supabase_user.created_at.isoformat() if supabase_user.created_at else ""
                 )
+        except HTTPException:
+            raise
         except Exception as supabase_error:
             logger.warning(f"Supabase auth failed, trying JWT fallback: {supabase_error}")
+        
+        # Fallback to our JWT verification if Supabase auth fails
+        try:
+            payload = verify_token(token_str)
+            user_id = payload.get("sub")
+            user_email = payload.get("email")
+            user_role = payload.get("role", "innovator")
             
-            # Fallback to our JWT verification if Supabase auth fails
-            try:
-                payload = verify_token(token_str)
-                user_id = payload.get("sub")
-                user_email = payload.get("email")
-                user_role = payload.get("role", "innovator")
-                
-                if user_id is None or user_email is None:
-                    raise HTTPException(
-                        status_code=status.HTTP_401_UNAUTHORIZED,
-                        detail="Invalid token payload"
-                    )
-                
-                # Return user data from JWT payload
-                return UserResponse(
-                    id=user_id,
-                    email=user_email,
-                    full_name=payload.get("full_name", ""),
-                    role=user_role,
-                    is_active=True,
-                    is_blocked=False,
-                    created_at=""
-                )
-            except Exception as jwt_error:
-                logger.error(f"Both Supabase and JWT auth failed: {jwt_error}")
+            if user_id is None or user_email is None:
                 raise HTTPException(
                     status_code=status.HTTP_401_UNAUTHORIZED,
-                    detail="Authentication failed"
+                    detail="Invalid token payload"
                 )
+            
+            # Return user data from JWT payload
+            return UserResponse(
+                id=user_id,
+                email=user_email,
+                full_name=payload.get("full_name", ""),
+                role=user_role,
+                is_active=True,
+                is_blocked=False,
+                created_at=""
+            )
+        except Exception as jwt_error:
+            logger.error(f"Both Supabase and JWT auth failed: {jwt_error}")
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Authentication failed"
+            )
         
     except HTTPException:
         raise
@@ -152,10 +151,40 @@ def get_current_user(
         )
 
 
+def resolve_principal(state: Dict[str, Any], token_str: str) -> UserResponse:
+    """
+    Authenticate a token at most once per request.
+    
+    The outcome (user or HTTPException) is memoized in the request's
+    scope["state"] dict, so AuthMiddleware and every dependency that needs the
+    current user share a single verification.
+    """
+    if STATE_USER_KEY in state:
+        return state[STATE_USER_KEY]
+    if STATE_AUTH_ERROR_KEY in state:
+        raise state[STATE_AUTH_ERROR_KEY]
+    
+    try:
+        user = authenticate_token(token_str)
+    except HTTPException as e:
+        state[STATE_AUTH_ERROR_KEY] = e
+        raise
+    state[STATE_USER_KEY] = user
+    return user
+
+
+def get_current_user(
+    request: Request,
+    token: HTTPAuthorizationCredentials = Depends(security)
+) -> UserResponse:
+    """Get current user, reusing the principal resolved by AuthMiddleware"""
+    return resolve_principal(request.scope.setdefault("state", {}), token.credentials)
+
+
 async def get_current_user_from_token(token: str) -> Optional[UserResponse]:
     """Get current user from JWT token - for middleware use"""
     try:
-        return get_current_user(token)
+        return authenticate_token(token)
     except HTTPException:
         return None
     except Exception as e:
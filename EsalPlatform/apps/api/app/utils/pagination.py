@@ -0,0 +1,104 @@
+"""
+Keyset (cursor) pagination helpers
+
+Cursors are opaque to clients: a urlsafe base64 of the sort key of the last
+row on a page. Lists are ordered by (created_at DESC, id DESC), so the next
+page is everything strictly "before" that key, which an index on
+(created_at, id) answers in constant time regardless of scroll depth.
+"""
+import base64
+import json
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional, Tuple
+
+
+def _encode(values: list) -> str:
+    raw = json.dumps(values, separators=(",", ":")).encode("utf-8")
+    return base64.urlsafe_b64encode(raw).decode("ascii").rstrip("=")
+
+
+def _decode(cursor: str) -> list:
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode("ascii")))
+    except Exception as e:
+        raise ValueError("Invalid pagination cursor") from e
+    if not isinstance(values, list) or len(values) != 2:
+        raise ValueError("Invalid pagination cursor")
+    return values
+
+
+def encode_cursor(created_at: str, row_id: Any) -> str:
+    """Encode the sort key of the last row of a page into an opaque cursor"""
+    return _encode([created_at, str(row_id)])
+
+
+def decode_cursor(cursor: str, id_type: Callable[[str], Any] = int) -> Tuple[str, str]:
+    """
+    Decode a cursor produced by encode_cursor
+
+    Both values are checked (an ISO timestamp, an id of id_type), since
+    callers build query filters from them.
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    created_at, row_id = _decode(cursor)
+    if not isinstance(created_at, str) or not isinstance(row_id, str):
+        raise ValueError("Invalid pagination cursor")
+    try:
+        datetime.fromisoformat(created_at)
+        row_id = str(id_type(row_id))
+    except (TypeError, ValueError) as e:
+        raise ValueError("Invalid pagination cursor") from e
+    return created_at, row_id
+
+
+def encode_rank_cursor(rank: float, row_id: Any) -> str:
+    """Encode a (rank DESC, id DESC) sort key, as used by ranked search"""
+    return _encode([float(rank), int(row_id)])
+
+
+def decode_rank_cursor(cursor: str) -> Tuple[float, int]:
+    """
+    Decode a cursor produced by encode_rank_cursor
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    rank, row_id = _decode(cursor)
+    if not isinstance(rank, (int, float)) or not isinstance(row_id, int):
+        raise ValueError("Invalid pagination cursor")
+    return float(rank), row_id
+
+
+def keyset_filter(cursor: Optional[str], created_col: str = "created_at", id_col: str = "id") -> Optional[str]:
+    """
+    Build the PostgREST `or` filter selecting rows after a cursor
+
+    Equivalent to `(created_at, id) < (cursor_created_at, cursor_id)` for a
+    (created_at DESC, id DESC) ordering.
+    """
+    if not cursor:
+        return None
+    created_at, row_id = decode_cursor(cursor)
+    # Quote the timestamp: ISO strings contain ':' and '+' which PostgREST
+    # would otherwise parse as syntax
+    return (
+        f'{created_col}.lt."{created_at}",'
+        f'and({created_col}.eq."{created_at}",{id_col}.lt.{row_id})'
+    )
+
+
+def page_from_rows(rows: list, limit: int) -> Tuple[list, Optional[str]]:
+    """
+    Trim a `limit + 1` fetch to one page and compute the next cursor
+
+    Returns:
+        (page_rows, next_cursor) - next_cursor is None on the last page
+    """
+    if len(rows) <= limit:
+        return rows, None
+    page = rows[:limit]
+    last: Dict[str, Any] = page[-1]
+    return page, encode_cursor(str(last.get("created_at", "")), last.get("id"))
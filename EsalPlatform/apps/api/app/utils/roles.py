@@ -2,17 +2,24 @@
 Role-based access control utilities
 """
 from functools import wraps
-from typing import List, Union
+from typing import Callable, Dict, List, Tuple, Union
 from fastapi import HTTPException, status, Depends
 
 from app.utils.jwt import get_current_user
 from app.schemas import UserResponse
 
+# One checker per role set, so FastAPI's per-request dependency cache
+# deduplicates repeated role checks on the same route
+_role_checkers: Dict[Tuple[str, ...], Callable[..., UserResponse]] = {}
+
 
 def require_role(allowed_roles: Union[str, List[str]]):
     """
     Dependency to require specific user roles
     
+    The current user comes from get_current_user, which reads the principal
+    already resolved for this request instead of re-verifying the token.
+    
     Args:
         allowed_roles: Single role string or list of allowed roles
     
@@ -22,6 +29,11 @@ def require_role(allowed_roles: Union[str, List[str]]):
     if isinstance(allowed_roles, str):
         allowed_roles = [allowed_roles]
     
+    key = tuple(allowed_roles)
+    checker = _role_checkers.get(key)
+    if checker is not None:
+        return checker
+    
     def role_checker(current_user: UserResponse = Depends(get_current_user)) -> UserResponse:
         if current_user.role not in allowed_roles:
             raise HTTPException(
@@ -30,6 +42,7 @@ def require_role(allowed_roles: Union[str, List[str]]):
             )
         return current_user
     
+    _role_checkers[key] = role_checker
     return role_checker
 
 
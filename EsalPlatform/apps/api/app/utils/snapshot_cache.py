@@ -0,0 +1,82 @@
+"""
+Stale-while-revalidate snapshot cache
+
+For expensive, read-mostly values (admin analytics, health summaries):
+
+- fresh (younger than fresh_seconds): returned as-is
+- stale (younger than max_stale_seconds): returned immediately while one
+  background task reloads it
+- missing or older: loaded before returning
+
+Concurrent loads of the same key share one call to the loader. A failed
+background reload keeps the stale value; a failed foreground load raises.
+"""
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Hashable, Optional
+
+logger = logging.getLogger(__name__)
+
+Loader = Callable[[], Awaitable[Any]]
+
+
+class _Snapshot:
+    __slots__ = ("value", "loaded_at")
+
+    def __init__(self, value: Any, loaded_at: float):
+        self.value = value
+        self.loaded_at = loaded_at
+
+
+class SnapshotCache:
+    def __init__(self,
+                 fresh_seconds: float = 60.0,
+                 max_stale_seconds: float = 3600.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.fresh_seconds = fresh_seconds
+        self.max_stale_seconds = max_stale_seconds
+        self._clock = clock
+        self._snapshots: Dict[Hashable, _Snapshot] = {}
+        self._loads: Dict[Hashable, asyncio.Task] = {}
+
+    def _load(self, key: Hashable, loader: Loader) -> asyncio.Task:
+        task = self._loads.get(key)
+        if task is None:
+            task = asyncio.create_task(self._run(key, loader))
+            self._loads[key] = task
+        return task
+
+    async def _run(self, key: Hashable, loader: Loader) -> Any:
+        try:
+            value = await loader()
+            self._snapshots[key] = _Snapshot(value, self._clock())
+            return value
+        finally:
+            self._loads.pop(key, None)
+
+    @staticmethod
+    def _log_failure(key: Hashable, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.warning(f"Background refresh of {key!r} failed, serving stale data: {task.exception()}")
+
+    async def get(self, key: Hashable, loader: Loader) -> Any:
+        snapshot = self._snapshots.get(key)
+        if snapshot is not None:
+            age = self._clock() - snapshot.loaded_at
+            if age < self.fresh_seconds:
+                return snapshot.value
+            if age < self.max_stale_seconds:
+                if key not in self._loads:
+                    self._load(key, loader).add_done_callback(lambda task: self._log_failure(key, task))
+                return snapshot.value
+        # shield: a cancelled request must not cancel a load others wait on
+        return await asyncio.shield(self._load(key, loader))
+
+    def age(self, key: Hashable) -> Optional[float]:
+        """Seconds since the key was loaded, or None"""
+        snapshot = self._snapshots.get(key)
+        return None if snapshot is None else self._clock() - snapshot.loaded_at
+
+    def clear(self) -> None:
+        self._snapshots.clear()
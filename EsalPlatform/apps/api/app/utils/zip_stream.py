@@ -0,0 +1,97 @@
+"""
+Streaming ZIP writer
+
+zipfile writes to non-seekable outputs by emitting a data descriptor after
+each entry instead of seeking back to patch the local header. ZipStream
+gives it such an output and hands back whatever was produced after every
+write, so an archive can be sent while it is being built:
+
+    archive = ZipStream()
+    yield archive.write("profile.json", data)
+    async for piece in archive.write_iter("files/deck.pdf", chunks):
+        yield piece
+    yield archive.close()
+
+Only the central directory (one small record per entry) is kept until
+close(); entry data is never buffered beyond the chunk being compressed.
+"""
+import io
+import zipfile
+from typing import AsyncIterator, List, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+# Deflate level for data that is already compressed (images, video, archives)
+FAST_COMPRESSLEVEL = 1
+
+
+class _Sink(io.RawIOBase):
+    """Write-only, non-seekable output that collects bytes until drained"""
+
+    def __init__(self):
+        self._pieces: List[bytes] = []
+        self._position = 0
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self._pieces.append(bytes(data))
+        self._position += len(data)
+        return len(data)
+
+    def tell(self) -> int:
+        return self._position
+
+    def drain(self) -> bytes:
+        data = b"".join(self._pieces)
+        self._pieces.clear()
+        return data
+
+
+class ZipStream:
+    """Incrementally written ZIP archive; every method returns the new output"""
+
+    def __init__(self, compresslevel: int = 6):
+        self._sink = _Sink()
+        self._zip = zipfile.ZipFile(self._sink, "w", zipfile.ZIP_DEFLATED, compresslevel=compresslevel)
+        self.compresslevel = compresslevel
+
+    def _open(self, name: str, compresslevel: Optional[int], large: bool):
+        # ZipFile.open copies the archive's level into the new entry
+        self._zip.compresslevel = self.compresslevel if compresslevel is None else compresslevel
+        return self._zip.open(name, "w", force_zip64=large)
+
+    def write(self, name: str, data: bytes, compresslevel: Optional[int] = None) -> bytes:
+        """Add a complete (small) entry"""
+        with self._open(name, compresslevel, large=False) as entry:
+            entry.write(data)
+        return self._sink.drain()
+
+    async def write_iter(self,
+                         name: str,
+                         chunks: AsyncIterator[bytes],
+                         compresslevel: Optional[int] = None,
+                         large: bool = False) -> AsyncIterator[bytes]:
+        """Add an entry from a stream of chunks, yielding output as it is produced
+
+        Compression runs in the thread pool (zlib releases the GIL). Set
+        large for entries that may exceed 4GB.
+        """
+        entry = self._open(name, compresslevel, large)
+        try:
+            async for chunk in chunks:
+                await run_in_threadpool(entry.write, chunk)
+                output = self._sink.drain()
+                if output:
+                    yield output
+        finally:
+            entry.close()
+        output = self._sink.drain()
+        if output:
+            yield output
+
+    def close(self) -> bytes:
+        """Write the central directory; returns the final bytes of the archive"""
+        self._zip.close()
+        return self._sink.drain()
@@ -0,0 +1,89 @@
+#!/usr/bin/env python3
+"""
+Measure memory held by service-layer idea lists
+
+For N raw rows (as PostgREST returns them), compares the memory retained by
+the projected dicts the list reads used to return with the IdeaRecords they
+return now (app/services/idea_record.py), per 10k ideas. The raw rows are
+excluded from both figures: they are shared through the read cache either way.
+
+Usage:
+    python benchmark_idea_records.py [--rows 10000]
+"""
+import argparse
+import gc
+import os
+import sys
+import tracemalloc
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app.services.idea_record import RecordProjection
+from app.services.supabase_ideas import IDEA_CARD, IDEA_MATCHING, IDEA_SUMMARY, _project_rows
+from app.utils.projection import Projection
+
+
+def raw_row(i: int) -> dict:
+    return {
+        "id": i, "user_id": f"8c1f4f0e-0000-4000-8000-{i % 97:012d}",
+        "title": f"Idea {i}", "description": "A platform connecting " * 8,
+        "category": "fintech", "tags": ["payments", "b2b"], "status": "published",
+        "visibility": "public", "problem": "Slow payments " * 5,
+        "solution": "Instant settlement " * 5, "target_market": "SMEs in MENA",
+        "view_count": i % 500, "interest_count": i % 40, "ai_score": 7.5,
+        "ai_generated": False, "ai_metadata": {},
+        "created_at": "2024-05-01T10:00:00+00:00", "updated_at": "2024-05-02T10:00:00+00:00",
+    }
+
+
+def retained_bytes(build: Callable[[], List[Any]]) -> int:
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.take_snapshot()
+    result = build()
+    after = tracemalloc.take_snapshot()
+    tracemalloc.stop()
+    size = sum(stat.size_diff for stat in after.compare_to(before, "filename"))
+    del result
+    return size
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=10000)
+    args = parser.parse_args()
+
+    rows = [raw_row(i) for i in range(args.rows)]
+    scale = 10000 / args.rows
+
+    cases = [
+        # name, projection used before, record projection used now
+        ("matching", Projection("matching_dicts", {
+            key: IDEA_SUMMARY.fields[key] for key in (
+                "id", "title", "description", "category", "stage", "status",
+                "visibility", "problem", "solution", "target_market", "tags",
+            )
+        }), IDEA_MATCHING),
+        ("browse", Projection("browse_dicts", {
+            key: IDEA_SUMMARY.fields[key] for key in (
+                "id", "title", "description", "category", "stage", "target_market",
+                "problem", "solution", "created_at", "updated_at", "views_count",
+                "interests_count", "user_id", "ai_score",
+            )
+        }), IDEA_CARD),
+    ]
+
+    print(f"{'read':<10}{'dict KiB/10k':>14}{'record KiB/10k':>16}{'saved':>8}")
+    for name, before, after in cases:
+        assert isinstance(after, RecordProjection)
+        # Only the columns the record projection fetches, for a fair comparison
+        fetched = [{column: row[column] for column in after.columns.split(", ")} for row in rows]
+        dict_bytes = retained_bytes(lambda: _project_rows(fetched, before)) * scale
+        record_bytes = retained_bytes(lambda: _project_rows(fetched, after)) * scale
+        print(f"{name:<10}{dict_bytes / 1024:>14.0f}{record_bytes / 1024:>16.0f}"
+              f"{1 - record_bytes / dict_bytes:>7.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Benchmark response serialization for large list payloads
+
+For 1k-10k rows, times what each endpoint did before and after the fast
+JSON pipeline (app/utils/fast_json.py):
+
+- /innovator/view-ideas  (IdeaResponse): dict rows through jsonable_encoder
+  and stdlib JSONResponse -> one TypeAdapter validation + dump_json
+- /investor/ai-matching  (StartupMatch): response-model validation and
+  serialization of the models -> dump_json of the models
+- /admin/users           (UserResponse): as for ai-matching
+- /ideas/list            (plain dicts): jsonable_encoder + stdlib json ->
+  orjson via FastJSONResponse
+
+Usage:
+    python benchmark_json.py [--rows 1000 5000 10000] [--repeat 5]
+"""
+import argparse
+import asyncio
+import gc
+import os
+import statistics
+import sys
+import time
+from typing import Any, Callable, List
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from app.schemas import StartupMatch, UserResponse
+from app.utils.fast_json import (
+    FastJSONResponse, IDEA_RESPONSES, STARTUP_MATCHES, USER_RESPONSES, adapter_response
+)
+
+
+def idea_row(i: int) -> dict:
+    return {
+        "id": str(i), "title": f"Idea {i}", "description": "A platform connecting " * 8,
+        "industry": "fintech", "stage": "idea", "status": "published",
+        "created_at": "2024-05-01T10:00:00+00:00", "updated_at": "2024-05-02T10:00:00+00:00",
+        "views_count": i % 500, "interests_count": i % 40, "user_id": f"user-{i % 97}",
+        "ai_score": 7.5, "target_market": "SMEs in MENA", "problem": "Slow payments " * 5,
+        "solution": "Instant settlement " * 5, "category": "fintech",
+        "tags": ["payments", "b2b", "mena"], "visibility": "public",
+    }
+
+
+def match_row(i: int) -> dict:
+    return {
+        "startup_id": str(i), "startup_title": f"Startup {i}", "match_score": 0.87,
+        "highlights": [
+            {"reason": "Matches preferred industry", "score": 0.9},
+            {"reason": "Target market overlap", "score": 0.8},
+        ],
+        "industry": "fintech", "stage": "idea", "description": "A platform connecting " * 8,
+        "target_market": "SMEs in MENA", "team_size": 3,
+    }
+
+
+def user_row(i: int) -> dict:
+    return {
+        "id": f"8c1f4f0e-0000-4000-8000-{i:012d}", "email": f"user{i}@example.com",
+        "full_name": f"User {i}", "role": "innovator", "is_active": True,
+        "is_blocked": False, "created_at": "2024-05-01T10:00:00+00:00",
+    }
+
+
+def timed(fn: Callable[[], Any], repeat: int) -> float:
+    """Median wall time in milliseconds"""
+    samples = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            fn()
+            samples.append((time.perf_counter() - start) * 1000)
+    finally:
+        gc.enable()
+    return statistics.median(samples)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 5000, 10000])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    loop = asyncio.new_event_loop()
+
+    def model_field_path(annotation):
+        field = create_response_field(name="Response", type_=annotation)
+
+        def run(value):
+            content = loop.run_until_complete(serialize_response(field=field, response_content=value))
+            return JSONResponse(content).body
+        return run
+
+    def encoder_path(value):
+        return JSONResponse(jsonable_encoder(value)).body
+
+    cases = [
+        # name, row factory, prepare input, before, after
+        ("view-ideas", idea_row, lambda rows: rows, encoder_path,
+         lambda rows: adapter_response(IDEA_RESPONSES, IDEA_RESPONSES.validate_python(rows)).body),
+        ("ai-matching", match_row, STARTUP_MATCHES.validate_python,
+         model_field_path(List[StartupMatch]),
+         lambda models: adapter_response(STARTUP_MATCHES, models).body),
+        ("admin/users", user_row, USER_RESPONSES.validate_python,
+         model_field_path(List[UserResponse]),
+         lambda models: adapter_response(USER_RESPONSES, models).body),
+        ("ideas/list", idea_row, lambda rows: rows, encoder_path,
+         lambda rows: FastJSONResponse(rows).body),
+    ]
+
+    print(f"{'endpoint':<14}{'rows':>7}{'before ms':>11}{'after ms':>10}{'speedup':>9}")
+    for name, make_row, prepare, before, after in cases:
+        for count in args.rows:
+            value = prepare([make_row(i) for i in range(count)])
+            assert len(after(value)) > 0
+            before_ms = timed(lambda: before(value), args.repeat)
+            after_ms = timed(lambda: after(value), args.repeat)
+            print(f"{name:<14}{count:>7}{before_ms:>11.1f}{after_ms:>10.1f}{before_ms / after_ms:>8.1f}x")
+    loop.close()
+
+
+if __name__ == "__main__":
+    main()
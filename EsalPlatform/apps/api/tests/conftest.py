@@ -25,6 +25,14 @@ def event_loop():
     loop.close()
 
 
+@pytest.fixture(autouse=True)
+def clear_idea_cache():
+    """Keep the per-process idea read cache from leaking between tests."""
+    from app.services.idea_cache import idea_cache
+    idea_cache.clear()
+    yield
+
+
 @pytest.fixture(scope="session")
 def test_app():
     """Create test FastAPI application instance."""
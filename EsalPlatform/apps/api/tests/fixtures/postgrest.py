@@ -0,0 +1,100 @@
+"""
+In-memory stand-in for the Supabase PostgREST client used by unit tests
+
+FakeSupabase holds rows per table. Every builder call is recorded in
+`calls` as (method, args), so tests can assert on the query that was
+built. execute() applies the filters, ordering, projection and limit
+the services use to the stored rows; other builder methods are only
+recorded.
+"""
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+
+class Result:
+    def __init__(self, data: List[Dict[str, Any]], count: Optional[int] = None):
+        self.data = data
+        self.count = count
+
+
+class Query:
+    """Records the PostgREST calls made while building a query"""
+
+    def __init__(self, rows: List[Dict[str, Any]], calls: List[Tuple[str, tuple]]):
+        self.rows = rows
+        self.calls = calls
+        self.filters: List[Callable[[Dict[str, Any]], bool]] = []
+        self.values: Optional[Tuple[str, Any]] = None
+        self.columns: Optional[List[str]] = None
+        self.sort: List[Tuple[str, bool]] = []
+        self.count: Optional[int] = None
+
+    def _record(self, name: str, args: tuple) -> "Query":
+        self.calls.append((name, args))
+        return self
+
+    def __getattr__(self, name):
+        def method(*args, **kwargs):
+            return self._record(name, args)
+        return method
+
+    def select(self, columns, *args, **kwargs):
+        if columns != "*":
+            self.columns = [column.strip() for column in columns.split(",")]
+        return self._record("select", (columns,) + args)
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self._record("eq", (column, value))
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) < value)
+        return self._record("lt", (column, value))
+
+    def gt(self, column, value):
+        self.filters.append(lambda row: row.get(column) is not None and row.get(column) > value)
+        return self._record("gt", (column, value))
+
+    def in_(self, column, values):
+        self.filters.append(lambda row: row.get(column) in values)
+        return self._record("in_", (column, values))
+
+    def order(self, column, desc=False, **kwargs):
+        self.sort.append((column, desc))
+        return self._record("order", (column,))
+
+    def limit(self, count):
+        self.count = count
+        return self._record("limit", (count,))
+
+    def insert(self, values):
+        self.values = ("insert", values)
+        return self._record("insert", (values,))
+
+    def update(self, values):
+        self.values = ("update", values)
+        return self._record("update", (values,))
+
+    def execute(self) -> Result:
+        if self.values and self.values[0] == "insert":
+            inserted = [dict(row) for row in (self.values[1] if isinstance(self.values[1], list) else [self.values[1]])]
+            self.rows.extend(inserted)
+            return Result(inserted)
+        matched = [row for row in self.rows if all(f(row) for f in self.filters)]
+        if self.values:
+            for row in matched:
+                row.update(self.values[1])
+        for column, desc in reversed(self.sort):
+            matched.sort(key=lambda row: row[column], reverse=desc)
+        if self.columns:
+            matched = [{column: row[column] for column in self.columns if column in row} for row in matched]
+        return Result(matched[:self.count] if self.count else matched)
+
+
+class FakeSupabase:
+    def __init__(self, tables: Optional[Dict[str, List[Dict[str, Any]]]] = None):
+        self.tables = tables if tables is not None else {}
+        self.calls: List[Tuple[str, tuple]] = []
+
+    def table(self, name: str) -> Query:
+        self.calls.append(("table", (name,)))
+        return Query(self.tables.setdefault(name, []), self.calls)
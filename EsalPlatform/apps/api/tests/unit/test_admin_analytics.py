@@ -0,0 +1,164 @@
+"""
+Unit tests for analytics rollup reads and the snapshot cache
+"""
+import asyncio
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.services.admin_analytics import AnalyticsRollups, parse_range, percent_change
+from app.utils.snapshot_cache import SnapshotCache
+
+
+class _Rollups:
+    """analytics_daily / analytics_hourly with PostgREST-style filters and paging"""
+
+    def __init__(self, daily=(), hourly=()):
+        self.tables = {"analytics_daily": list(daily), "analytics_hourly": list(hourly)}
+        self.requests = 0
+
+    def table(self, name):
+        self.rows = self.tables[name]
+        self.filters = []
+        return self
+
+    def select(self, columns):
+        return self
+
+    def gte(self, column, value):
+        self.filters.append(lambda row: row[column] >= value)
+        return self
+
+    def lt(self, column, value):
+        self.filters.append(lambda row: row[column] < value)
+        return self
+
+    def eq(self, column, value):
+        self.filters.append(lambda row: row[column] == value)
+        return self
+
+    def order(self, column):
+        return self
+
+    def range(self, start, end):
+        self.window = (start, end + 1)
+        return self
+
+    def execute(self):
+        self.requests += 1
+        rows = [row for row in self.rows if all(check(row) for check in self.filters)]
+        return type("Result", (), {"data": rows[self.window[0]:self.window[1]]})()
+
+
+def _day(offset):
+    return (datetime.now(timezone.utc).date() - timedelta(days=offset)).isoformat()
+
+
+@pytest.mark.asyncio
+async def test_summary_compares_with_the_previous_range():
+    daily = [
+        {"day": _day(0), "metric": "signups", "dimension": "investor", "count": 3},
+        {"day": _day(6), "metric": "signups", "dimension": "innovator", "count": 5},
+        {"day": _day(7), "metric": "signups", "dimension": "innovator", "count": 4},
+        {"day": _day(10), "metric": "ideas_created", "dimension": "", "count": 2},
+        {"day": _day(20), "metric": "signups", "dimension": "investor", "count": 9},
+    ]
+    rollups = AnalyticsRollups(client_factory=lambda: _Rollups(daily=daily))
+
+    summary = await rollups.summary("7d")
+
+    assert summary.count("signups") == 8
+    assert summary.count("signups", "investor") == 3
+    assert summary.count("ideas_created") == 0
+    assert summary.change("signups") == ("+100%", "up")  # 8 vs 4
+    assert summary.change("ideas_created") == ("-100%", "down")
+
+
+@pytest.mark.asyncio
+async def test_series_pages_through_rollups():
+    start = datetime.now(timezone.utc).replace(minute=0, second=0, microsecond=0) - timedelta(hours=20)
+    hourly = []
+    for hour in range(20):
+        bucket = (start + timedelta(hours=hour)).isoformat()
+        for source in range(60):
+            hourly.append({"bucket": bucket, "metric": "views", "dimension": f"s{source}", "count": 1})
+        hourly.append({"bucket": bucket, "metric": "signups", "dimension": "hub", "count": 7})
+    client = _Rollups(hourly=hourly)
+    rollups = AnalyticsRollups(client_factory=lambda: client)
+
+    series = await rollups.series("views", "hour", "24h")
+
+    assert client.requests == 2  # 1200 rows in pages of 1000
+    assert len(series["points"]) == 20
+    assert all(point["count"] == 60 for point in series["points"])
+    assert len(series["by_dimension"]) == 60
+
+    with pytest.raises(ValueError):
+        await rollups.series("logins", "day", "7d")
+    with pytest.raises(ValueError):
+        await rollups.series("views", "hour", "365d")
+
+
+def test_ranges_and_changes():
+    assert parse_range("30d") == timedelta(days=30)
+    assert parse_range("24h") == timedelta(hours=24)
+    for bad in ("", "30", "0d", "9999d", "1w"):
+        with pytest.raises(ValueError):
+            parse_range(bad)
+    assert percent_change(150, 100) == ("+50%", "up")
+    assert percent_change(0, 0) == ("+0%", "flat")
+
+
+@pytest.mark.asyncio
+async def test_stale_snapshots_are_served_while_reloading():
+    clock = [0.0]
+    cache = SnapshotCache(fresh_seconds=60, max_stale_seconds=600, clock=lambda: clock[0])
+    loads = []
+    release = asyncio.Event()
+
+    async def loader():
+        loads.append(clock[0])
+        if len(loads) > 1:
+            await release.wait()
+        return len(loads)
+
+    assert await cache.get("k", loader) == 1
+    clock[0] = 30
+    assert await cache.get("k", loader) == 1
+    assert len(loads) == 1
+
+    # Stale: the old value is returned at once and one reload starts
+    clock[0] = 90
+    assert await cache.get("k", loader) == 1
+    assert await cache.get("k", loader) == 1
+    await asyncio.sleep(0)
+    assert len(loads) == 2
+    release.set()
+    await asyncio.sleep(0)
+    assert await cache.get("k", loader) == 2
+
+    # Too old: the caller waits for the load
+    clock[0] = 1000
+    assert await cache.get("k", loader) == 3
+
+
+@pytest.mark.asyncio
+async def test_failed_reload_keeps_the_stale_snapshot():
+    clock = [0.0]
+    cache = SnapshotCache(fresh_seconds=60, max_stale_seconds=600, clock=lambda: clock[0])
+
+    async def ok():
+        return "ok"
+
+    async def failing():
+        raise RuntimeError("database down")
+
+    await cache.get("k", ok)
+    clock[0] = 100
+    assert await cache.get("k", failing) == "ok"
+    await asyncio.sleep(0)
+    assert await cache.get("k", failing) == "ok"
+
+    clock[0] = 1000
+    with pytest.raises(RuntimeError):
+        await cache.get("k", failing)
@@ -0,0 +1,149 @@
+"""
+Unit tests for bulk admin user operations
+"""
+import asyncio
+import gc
+import threading
+import time
+import uuid
+from datetime import datetime
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User
+from app.services.admin_bulk import _SYNC_TASKS, BulkUserOperation
+from app.services.admin_users import UserFilters
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+class _Admin:
+    """Stands in for client.auth.admin; tracks calls in flight"""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.calls = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self._lock = threading.Lock()
+
+    def update_user_by_id(self, user_id, attributes):
+        with self._lock:
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.01)
+        with self._lock:
+            self.in_flight -= 1
+            self.calls.append((user_id, attributes))
+        if user_id in self.failing:
+            raise RuntimeError("User not found in auth")
+
+
+class _Client:
+    def __init__(self, admin):
+        self.auth = type("Auth", (), {"admin": admin})()
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    for i in range(20):
+        session.add(User(id=uuid.uuid4(), email=f"spam{i}@example.com" if i < 12 else f"user{i}@example.com",
+                         role="innovator", is_active=True, is_blocked=False, created_at=datetime(2024, 1, 1)))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _ids(db, prefix):
+    return [str(u.id) for u in db.query(User).filter(User.email.like(f"{prefix}%")).all()]
+
+
+@pytest.mark.asyncio
+async def test_filter_selection_is_applied_locally_then_synced(db):
+    admin = _Admin()
+    operation = BulkUserOperation("block", client_factory=lambda: _Client(admin), concurrency=3)
+
+    updated = operation.apply(db, filters=UserFilters(search="spam"))
+    assert len(updated) == 12
+    db.expire_all()
+    assert sorted(str(u.id) for u in db.query(User).filter(User.is_blocked == True)) == sorted(_ids(db, "spam"))
+
+    events = [event async for event in operation.sync(updated)]
+
+    assert [e for e in events if e["event"] == "progress"][-1] == {"event": "progress", "done": 12, "total": 12}
+    assert sum(e["event"] == "item" for e in events) == 12
+    assert {attributes["user_metadata"]["is_blocked"] for _, attributes in admin.calls} == {True}
+    assert 1 < admin.max_in_flight <= 3
+    assert operation.summary() == {"action": "block", "total": 12, "counts": {"synced": 12}}
+
+
+@pytest.mark.asyncio
+async def test_per_item_results(db):
+    spam = _ids(db, "spam")
+    actor, failing = spam[0], spam[1]
+    missing = str(uuid.uuid4())
+    admin = _Admin(failing=[failing])
+    operation = BulkUserOperation("set_role", role="hub", client_factory=lambda: _Client(admin))
+
+    updated = operation.apply(db, user_ids=spam[:4] + [spam[2], missing, "nope"], actor_id=actor)
+    async for _ in operation.sync(updated):
+        pass
+
+    results = {item["user_id"]: item for item in operation.results()}
+    assert results[actor]["status"] == "skipped"
+    assert results[failing]["status"] == "sync_failed"
+    assert results[failing]["error"] == "User not found in auth"
+    assert results[spam[2]]["status"] == results[spam[3]]["status"] == "synced"
+    assert results[missing]["status"] == "not_found"
+    assert results["nope"]["status"] == "invalid_id"
+    assert len(operation.results()) == 6
+    db.expire_all()
+    assert db.query(User).filter(User.role == "hub").count() == 3
+
+
+@pytest.mark.asyncio
+async def test_sync_finishes_after_the_stream_is_closed(db):
+    admin = _Admin()
+    operation = BulkUserOperation("block", client_factory=lambda: _Client(admin), concurrency=2)
+    updated = operation.apply(db, filters=UserFilters(search="spam"))
+
+    events = operation.sync(updated)
+    assert (await events.__anext__())["event"] == "item"
+    # The client disconnected: the response closes the generator
+    await events.aclose()
+    del events
+    gc.collect()
+
+    for _ in range(200):
+        if len(admin.calls) == 12:
+            break
+        await asyncio.sleep(0.01)
+    await asyncio.sleep(0.01)
+    assert len(admin.calls) == 12
+    assert operation.summary()["counts"] == {"synced": 12}
+    assert not _SYNC_TASKS
+
+
+@pytest.mark.parametrize("action, role, kwargs", [
+    ("ban", None, {"user_ids": []}),
+    ("set_role", "root", {"user_ids": []}),
+    ("block", None, {}),
+    ("block", None, {"filters": UserFilters()}),
+    ("block", None, {"filters": UserFilters(search="example")}),
+    ("block", None, {"user_ids": [str(uuid.uuid4()) for _ in range(11)]}),
+])
+def test_invalid_requests_change_nothing(db, action, role, kwargs):
+    with pytest.raises(ValueError):
+        BulkUserOperation(action, role=role, max_users=10).apply(db, **kwargs)
+    db.expire_all()
+    assert db.query(User).filter(User.is_blocked == True).count() == 0
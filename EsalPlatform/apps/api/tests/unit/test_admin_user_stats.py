@@ -0,0 +1,76 @@
+"""
+Unit tests for single-pass admin user counts
+"""
+import uuid
+
+import pytest
+from sqlalchemy import create_engine, event
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User
+from app.services.admin_user_stats import UserStatsCache, count_users
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    users = [
+        ("innovator", True, False), ("innovator", True, False), ("innovator", False, False),
+        ("investor", True, False), ("investor", True, True), ("hub", False, True),
+        ("admin", True, False),
+    ]
+    for i, (role, is_active, is_blocked) in enumerate(users):
+        session.add(User(id=uuid.uuid4(), email=f"user{i}@example.com", role=role,
+                         is_active=is_active, is_blocked=is_blocked))
+    session.commit()
+
+    session.queries = 0
+
+    def count(*args):
+        session.queries += 1
+
+    event.listen(engine, "before_cursor_execute", count)
+    yield session
+    session.close()
+
+
+def test_counts_match_the_per_filter_queries(db):
+    counts = count_users(db)
+
+    assert db.queries == 1
+    assert counts.total == db.query(User).count()
+    assert counts.active == db.query(User).filter(User.is_active == True, User.is_blocked == False).count()
+    assert counts.blocked == db.query(User).filter(User.is_blocked == True).count()
+    assert counts.inactive == db.query(User).filter(User.is_active == False).count()
+    assert counts.statistics() == {
+        "total": 7, "active": 4, "blocked": 2, "pending": 1,
+        "by_role": {"innovator": 3, "investor": 2, "hub": 1, "admin": 1},
+    }
+
+
+def test_cache_is_shared_until_invalidated(db):
+    clock = [0.0]
+    cache = UserStatsCache(ttl_seconds=15, clock=lambda: clock[0])
+
+    assert cache.get(db).total == 7
+    assert cache.get(db).total == 7
+    assert db.queries == 1
+
+    db.add(User(id=uuid.uuid4(), email="new@example.com", role="hub", is_active=True, is_blocked=False))
+    db.commit()
+    cache.invalidate()
+    assert cache.get(db).role("hub") == 2
+
+    clock[0] += 16
+    queries = db.queries
+    cache.get(db)
+    assert db.queries == queries + 1
@@ -0,0 +1,102 @@
+"""
+Unit tests for keyset-paged admin user listing
+"""
+import uuid
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.compiler import compiles
+from sqlalchemy.orm import sessionmaker
+
+from app.models import User
+from app.services import admin_users
+from app.services.admin_user_stats import UserStatsCache
+from app.services.admin_users import UserFilters, list_users
+
+
+@compiles(UUID, "sqlite")
+def _uuid_on_sqlite(type_, compiler, **kw):
+    return "CHAR(32)"
+
+
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    roles = ("innovator", "investor", "hub")
+    for i in range(30):
+        session.add(User(
+            id=uuid.uuid4(), email=f"user{i:02d}@example.com", full_name=f"Person {i:02d}",
+            role=roles[i % 3], is_active=i % 5 != 0, is_blocked=i % 7 == 0,
+            # Pairs share a timestamp so the id breaks ties
+            created_at=START + timedelta(hours=i // 2),
+        ))
+    session.add(User(id=uuid.uuid4(), email="ada@lovelace.org", full_name="Ada 100%_Lovelace",
+                     role="admin", is_active=True, is_blocked=False, created_at=START))
+    session.commit()
+    yield session
+    session.close()
+
+
+def _walk(db, filters, limit):
+    seen, cursor = [], None
+    while True:
+        page = list_users(db, filters, limit=limit, cursor=cursor, stats=UserStatsCache())
+        seen.extend(page.users)
+        cursor = page.next_cursor
+        if cursor is None:
+            return seen, page
+
+
+def test_pages_cover_every_user_once_newest_first(db):
+    users, page = _walk(db, UserFilters(), limit=4)
+
+    expected = db.query(User).order_by(User.created_at.desc(), User.id.desc()).all()
+    assert [u.id for u in users] == [u.id for u in expected]
+    assert page.total == 31 and page.total_is_exact
+
+
+def test_role_and_status_totals_come_from_the_counts(db):
+    filters = UserFilters(roles=("innovator", "hub"), status="active")
+    users, page = _walk(db, filters, limit=3)
+
+    assert all(u.role in ("innovator", "hub") and u.is_active and not u.is_blocked for u in users)
+    assert page.total == len(users) and page.total_is_exact
+
+
+def test_search_matches_prefixes_and_substrings(db):
+    assert [u.email for u in _walk(db, UserFilters(search="AD"), limit=10)[0]] == ["ada@lovelace.org"]
+    assert _walk(db, UserFilters(search="z"), limit=10)[0] == []
+    # Substring of the name; LIKE wildcards are literal
+    assert len(_walk(db, UserFilters(search="son 1"), limit=10)[0]) == 10
+    assert [u.email for u in _walk(db, UserFilters(search="100%_l"), limit=10)[0]] == ["ada@lovelace.org"]
+    assert _walk(db, UserFilters(search="10%"), limit=10)[0] == []
+
+
+def test_filtered_totals_are_capped(db, monkeypatch):
+    monkeypatch.setattr(admin_users, "TOTAL_COUNT_CAP", 5)
+    after = START + timedelta(hours=5)
+
+    page = list_users(db, UserFilters(created_after=after), limit=2, stats=UserStatsCache())
+    assert all(u.created_at >= after for u in page.users)
+    assert page.total == 5 and not page.total_is_exact
+
+    page = list_users(db, UserFilters(search="ada"), limit=2, stats=UserStatsCache())
+    assert page.total == 1 and page.total_is_exact
+
+
+@pytest.mark.parametrize("filters, cursor", [
+    (UserFilters(roles=("root",)), None),
+    (UserFilters(status="gone"), None),
+    (UserFilters(search="  "), None),
+    (UserFilters(), "not-a-cursor"),
+])
+def test_invalid_input_raises_value_error(db, filters, cursor):
+    with pytest.raises(ValueError):
+        list_users(db, filters, cursor=cursor, stats=UserStatsCache())
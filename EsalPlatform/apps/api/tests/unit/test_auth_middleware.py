@@ -0,0 +1,110 @@
+"""
+Unit tests for the pure-ASGI authentication middleware
+"""
+from fastapi import Depends, FastAPI
+from fastapi.testclient import TestClient
+
+from app.middleware.auth import AuthMiddleware, PathPrefixTrie
+from app.schemas import UserResponse
+from app.utils import jwt as jwt_utils
+from app.utils.jwt import get_current_user
+from app.utils.roles import require_role
+
+
+def _make_user(role="investor"):
+    return UserResponse(
+        id="user-1",
+        email="investor@example.com",
+        full_name="Test Investor",
+        role=role,
+        is_active=True,
+        is_blocked=False,
+        created_at="",
+    )
+
+
+def test_trie_matches_exact_and_prefix_paths():
+    trie = PathPrefixTrie(exact=["/", "/health"], prefixes=["/api/docs", "/api/v1/auth/login"])
+
+    assert trie.match("/")
+    assert trie.match("/health")
+    assert not trie.match("/health/deep")
+    assert trie.match("/api/docs")
+    assert trie.match("/api/docs/oauth2-redirect")
+    assert not trie.match("/api/docsx")
+    assert trie.match("/api/v1/auth/login")
+    assert not trie.match("/api/v1/auth/me")
+    assert not trie.match("/api/v1/investor/dashboard")
+
+
+def test_token_verified_once_per_request(monkeypatch):
+    calls = []
+
+    def fake_authenticate(token):
+        calls.append(token)
+        return _make_user()
+
+    monkeypatch.setattr(jwt_utils, "authenticate_token", fake_authenticate)
+
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+
+    def nested(user: UserResponse = Depends(require_role(["investor", "admin"]))):
+        return user
+
+    @app.get("/api/v1/investor/thing")
+    def endpoint(
+        user: UserResponse = Depends(require_role("investor")),
+        again: UserResponse = Depends(require_role("investor")),
+        other: UserResponse = Depends(nested),
+        direct: UserResponse = Depends(get_current_user),
+    ):
+        return {"id": user.id, "same": user is again is other is direct}
+
+    client = TestClient(app)
+    response = client.get("/api/v1/investor/thing", headers={"Authorization": "Bearer abc"})
+
+    assert response.status_code == 200
+    assert response.json() == {"id": "user-1", "same": True}
+    assert calls == ["abc"]
+
+
+def test_public_paths_skip_authentication(monkeypatch):
+    calls = []
+    monkeypatch.setattr(jwt_utils, "authenticate_token", lambda token: calls.append(token))
+
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+
+    @app.get("/health")
+    def health():
+        return {"status": "healthy"}
+
+    client = TestClient(app)
+    assert client.get("/health", headers={"Authorization": "Bearer abc"}).status_code == 200
+    assert calls == []
+
+
+def test_failed_authentication_is_not_retried(monkeypatch):
+    from fastapi import HTTPException
+
+    calls = []
+
+    def fake_authenticate(token):
+        calls.append(token)
+        raise HTTPException(status_code=401, detail="Authentication failed")
+
+    monkeypatch.setattr(jwt_utils, "authenticate_token", fake_authenticate)
+
+    app = FastAPI()
+    app.add_middleware(AuthMiddleware)
+
+    @app.get("/api/v1/investor/thing")
+    def endpoint(user: UserResponse = Depends(require_role("investor"))):
+        return {"id": user.id}
+
+    client = TestClient(app)
+    response = client.get("/api/v1/investor/thing", headers={"Authorization": "Bearer bad"})
+
+    assert response.status_code == 401
+    assert calls == ["bad"]
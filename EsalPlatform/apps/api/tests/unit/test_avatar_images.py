@@ -0,0 +1,152 @@
+"""
+Unit tests for avatar variant processing
+"""
+import io
+
+import pytest
+from fastapi import HTTPException
+from PIL import Image
+
+from app.services import supabase_profiles
+from app.services.avatar_images import (
+    AvatarProcessor, InvalidImage, avatar_digest, avatar_variants, render_variants
+)
+from app.services.supabase_profiles import SupabaseProfileService
+
+
+def _photo(size=(1200, 800), mode="RGB", fmt="JPEG", **save_args):
+    buffer = io.BytesIO()
+    Image.new(mode, size, (200, 30, 30, 128) if mode == "RGBA" else (200, 30, 30)).save(buffer, fmt, **save_args)
+    return buffer.getvalue()
+
+
+def _exif_with_gps():
+    exif = Image.Exif()
+    exif[0x0112] = 6  # Orientation: rotate 90 degrees
+    exif[0x010F] = "PhoneMaker"
+    exif[0x8825] = {1: "N", 2: (52.0, 22.0, 0.0)}  # GPS IFD
+    return exif
+
+
+def test_variants_are_square_sizes_without_metadata():
+    variants = render_variants(_photo(exif=_exif_with_gps()))
+
+    assert sorted(variants) == ["lg.jpg", "lg.webp", "md.jpg", "md.webp", "sm.jpg", "sm.webp"]
+    for name, data in variants.items():
+        with Image.open(io.BytesIO(data)) as image:
+            edge = {"sm": 96, "md": 256, "lg": 512}[name.split(".")[0]]
+            assert image.size == (edge, edge)
+            assert image.format == ("WEBP" if name.endswith(".webp") else "JPEG")
+            assert not image.getexif()
+            assert "icc_profile" not in image.info
+
+
+def test_variants_are_much_smaller_than_the_original():
+    original = _photo(size=(3000, 3000), fmt="PNG")
+    variants = render_variants(original)
+
+    assert len(variants["sm.webp"]) < len(original) / 20
+
+
+def test_transparent_png_is_flattened_for_jpeg():
+    variants = render_variants(_photo(mode="RGBA", fmt="PNG"))
+
+    with Image.open(io.BytesIO(variants["md.jpg"])) as jpeg:
+        assert jpeg.mode == "RGB"
+    with Image.open(io.BytesIO(variants["md.webp"])) as webp:
+        assert webp.mode == "RGBA"
+
+
+def test_non_images_are_rejected():
+    with pytest.raises(InvalidImage):
+        render_variants(b"%PDF-1.4 not an image")
+    with pytest.raises(InvalidImage):
+        render_variants(_photo(fmt="BMP"))
+
+
+def test_variant_urls_derive_from_the_primary_url():
+    url = "https://p.supabase.co/storage/v1/object/public/avatars/u1/0123456789abcdef/md.jpg?"
+
+    variants = avatar_variants(url)
+
+    assert variants["sm"]["webp"] == "https://p.supabase.co/storage/v1/object/public/avatars/u1/0123456789abcdef/sm.webp?"
+    assert variants["lg"]["jpeg"].endswith("/0123456789abcdef/lg.jpg?")
+    assert avatar_variants("https://p.supabase.co/storage/v1/object/public/avatars/u1/avatar_x.png") is None
+    assert avatar_variants(None) is None
+
+
+class _Bucket:
+    def __init__(self, objects):
+        self.objects = objects
+
+    def upload(self, path, data, file_options=None):
+        self.objects[path] = (data, dict(file_options or {}))
+
+    def get_public_url(self, path):
+        return f"https://p.supabase.co/storage/v1/object/public/avatars/{path}?"
+
+
+class _Profiles:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def upsert(self, row):
+        self.rows.append(row)
+        return self
+
+    def execute(self):
+        return type("Result", (), {"data": self.rows[-1:]})()
+
+
+class _Supabase:
+    def __init__(self):
+        self.objects = {}
+        self.rows = []
+        self.storage = type("Storage", (), {"from_": lambda _, bucket: _Bucket(self.objects)})()
+
+    def table(self, name):
+        return _Profiles(self.rows)
+
+
+@pytest.mark.asyncio
+async def test_store_avatar_uploads_immutable_variants(monkeypatch):
+    monkeypatch.setattr(supabase_profiles, "avatar_processor", AvatarProcessor(workers=0))
+    service = SupabaseProfileService.__new__(SupabaseProfileService)
+    service.supabase = _Supabase()
+    data = _photo()
+
+    avatar_url = await service.store_avatar("u1", data)
+
+    prefix = f"u1/{avatar_digest(data)}"
+    assert avatar_url.endswith(f"/avatars/{prefix}/md.jpg?")
+    assert service.supabase.rows[-1]["avatar_url"] == avatar_url
+    assert sorted(service.supabase.objects) == sorted(
+        f"{prefix}/{name}" for name in ("sm.webp", "sm.jpg", "md.webp", "md.jpg", "lg.webp", "lg.jpg")
+    )
+    _, options = service.supabase.objects[f"{prefix}/sm.webp"]
+    assert options["content-type"] == "image/webp"
+    assert options["cache-control"] == "31536000"
+
+
+@pytest.mark.asyncio
+async def test_store_avatar_rejects_non_images(monkeypatch):
+    monkeypatch.setattr(supabase_profiles, "avatar_processor", AvatarProcessor(workers=0))
+    service = SupabaseProfileService.__new__(SupabaseProfileService)
+    service.supabase = _Supabase()
+
+    with pytest.raises(HTTPException) as exc:
+        await service.store_avatar("u1", b"<svg/>")
+
+    assert exc.value.status_code == 415
+    assert service.supabase.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_process_pool_renders_variants():
+    processor = AvatarProcessor(workers=1)
+    try:
+        variants = await processor.render(_photo(size=(300, 300)))
+    finally:
+        processor.shutdown()
+
+    assert set(variants) >= {"sm.webp", "md.jpg"}
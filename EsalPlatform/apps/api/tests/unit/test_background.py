@@ -0,0 +1,34 @@
+"""
+Unit tests for the shared periodic background task
+"""
+import asyncio
+
+import pytest
+
+from app.services.background import PeriodicTask
+
+
+@pytest.mark.asyncio
+async def test_steps_survive_failures_and_can_be_woken():
+    calls = []
+
+    async def step():
+        calls.append(len(calls))
+        if len(calls) == 1:
+            raise RuntimeError("database unavailable")
+
+    task = PeriodicTask("Test step", step, interval=60, run_first=True)
+    task.start()
+    await asyncio.sleep(0.01)
+    assert calls == [0] and task.running
+
+    # A failed step does not end the loop, and wake() skips the interval
+    task.wake()
+    await asyncio.sleep(0.01)
+    assert calls == [0, 1]
+
+    await task.stop()
+    assert not task.running
+    task.wake()
+    await asyncio.sleep(0.01)
+    assert calls == [0, 1]
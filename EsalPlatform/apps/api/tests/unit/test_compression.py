@@ -0,0 +1,120 @@
+"""
+Unit tests for negotiated response compression
+"""
+import gzip
+
+import brotli
+from fastapi import FastAPI
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from fastapi.testclient import TestClient
+
+from app.middleware.compression import (
+    CompressionMiddleware, cache_compressed, compression_stats, negotiate_encoding, no_compression
+)
+
+PAYLOAD = {"ideas": [{"id": str(i), "title": f"Idea {i}", "industry": "fintech"} for i in range(200)]}
+
+
+def _make_app():
+    app = FastAPI()
+    app.add_middleware(CompressionMiddleware, minimum_size=500)
+    app.add_middleware(CORSMiddleware, allow_origins=["https://app.example.com"])
+
+    @app.get("/large")
+    async def large():
+        return PAYLOAD
+
+    @app.get("/small")
+    async def small():
+        return {"ok": True}
+
+    @app.get("/catalog")
+    @cache_compressed
+    async def catalog():
+        return PAYLOAD
+
+    @app.get("/stream")
+    async def stream():
+        return StreamingResponse((f"line {i}\n" * 50 for i in range(5)), media_type="text/plain")
+
+    @app.get("/export")
+    @no_compression
+    async def export():
+        return PlainTextResponse("x" * 5000)
+
+    return app
+
+
+def _get(client, path, encoding):
+    # The test client decodes gzip/br bodies transparently
+    return client.get(path, headers={"Accept-Encoding": encoding, "Origin": "https://app.example.com"})
+
+
+def test_negotiation_prefers_brotli_and_honours_q_values():
+    assert negotiate_encoding("gzip, deflate, br") == "br"
+    assert negotiate_encoding("br;q=0.5, gzip") == "gzip"
+    assert negotiate_encoding("gzip;q=0, br;q=0") is None
+    assert negotiate_encoding("*") == "br"
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding(None) is None
+
+
+def test_large_json_is_compressed_with_cors_headers():
+    client = TestClient(_make_app())
+
+    response = _get(client, "/large", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "Accept-Encoding" in response.headers["vary"]
+    assert response.headers["access-control-allow-origin"] == "https://app.example.com"
+    assert response.json() == PAYLOAD
+
+    response = _get(client, "/large", "br")
+    assert response.headers["content-encoding"] == "br"
+    assert int(response.headers["content-length"]) < len(response.content)
+    assert response.json() == PAYLOAD
+
+
+def test_small_and_opted_out_responses_are_not_compressed():
+    client = TestClient(_make_app())
+
+    small = _get(client, "/small", "gzip, br")
+    assert "content-encoding" not in small.headers
+    assert small.json() == {"ok": True}
+
+    export = _get(client, "/export", "gzip, br")
+    assert "content-encoding" not in export.headers
+    assert export.text == "x" * 5000
+
+
+def test_streamed_body_is_compressed_incrementally():
+    client = TestClient(_make_app())
+
+    response = _get(client, "/stream", "gzip")
+    assert response.headers["content-encoding"] == "gzip"
+    assert "content-length" not in response.headers
+    assert response.text == "".join(f"line {i}\n" * 50 for i in range(5))
+
+
+def test_cached_responses_and_bytes_saved_are_counted():
+    compression_stats.reset()
+    client = TestClient(_make_app())
+
+    _get(client, "/catalog", "br")
+    _get(client, "/catalog", "br")
+    _get(client, "/small", "br")
+
+    stats = compression_stats.snapshot()
+    assert stats["responses"] == 3
+    assert stats["compressed"] == 2
+    assert stats["by_encoding"] == {"br": 2}
+    assert stats["cache_hits"] == 1
+    assert stats["bytes_saved"] > 0
+    assert stats["bytes_out"] < stats["bytes_in"]
+
+
+def test_compressed_bodies_decode_to_the_original():
+    middleware = CompressionMiddleware(app=None)
+    body = b'{"title": "Idea"}' * 100
+    assert gzip.decompress(middleware.compress("gzip", body)) == body
+    assert brotli.decompress(middleware.compress("br", body)) == body
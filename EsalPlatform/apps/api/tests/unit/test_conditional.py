@@ -0,0 +1,66 @@
+"""
+Unit tests for conditional GET helpers
+"""
+from datetime import datetime, timezone
+
+from fastapi import FastAPI, Request, Response
+from fastapi.testclient import TestClient
+
+from app.utils.conditional import (
+    rows_etag, parse_timestamp, is_not_modified, not_modified_response, set_validators
+)
+
+ROWS = [{"id": 1, "updated_at": "2024-05-01T10:00:00.123+00:00", "views_count": 3}]
+UPDATED = parse_timestamp(ROWS[0]["updated_at"])
+
+
+def _client(rows):
+    app = FastAPI()
+    built = []
+
+    @app.get("/items")
+    async def items(request: Request, response: Response):
+        etag = rows_etag(rows, "id", "updated_at", "views_count")
+        if is_not_modified(request, etag, UPDATED):
+            return not_modified_response(etag, UPDATED)
+        set_validators(response, etag, UPDATED)
+        built.append(1)
+        return rows
+
+    return TestClient(app), built
+
+
+def test_etag_changes_with_counters():
+    bumped = [{**ROWS[0], "views_count": 4}]
+    assert rows_etag(ROWS, "id", "views_count") != rows_etag(bumped, "id", "views_count")
+
+
+def test_matching_if_none_match_returns_304_without_building_body():
+    client, built = _client(ROWS)
+
+    first = client.get("/items")
+    etag = first.headers["etag"]
+    second = client.get("/items", headers={"If-None-Match": etag})
+
+    assert first.status_code == 200
+    assert second.status_code == 304
+    assert second.content == b""
+    assert second.headers["etag"] == etag
+    assert built == [1]
+
+
+def test_if_none_match_takes_precedence_over_if_modified_since():
+    client, _ = _client(ROWS)
+    last_modified = client.get("/items").headers["last-modified"]
+
+    assert client.get("/items", headers={"If-Modified-Since": last_modified}).status_code == 304
+    response = client.get("/items", headers={
+        "If-None-Match": 'W/"stale"', "If-Modified-Since": last_modified
+    })
+    assert response.status_code == 200
+
+
+def test_parse_timestamp_handles_zulu_and_naive_values():
+    assert parse_timestamp("2024-05-01T10:00:00Z") == datetime(2024, 5, 1, 10, tzinfo=timezone.utc)
+    assert parse_timestamp("2024-05-01T10:00:00").tzinfo is timezone.utc
+    assert parse_timestamp("not a date") is None
@@ -0,0 +1,183 @@
+"""
+Unit tests for the streamed data export
+"""
+import asyncio
+import io
+import json
+import zipfile
+from datetime import datetime, timedelta
+
+import httpx
+import pytest
+
+from app.services.data_export import DataExportService
+from tests.fixtures.postgrest import FakeSupabase
+
+
+class _Bucket:
+    def __init__(self, objects, name):
+        self.objects = objects
+        self.name = name
+
+    def upload(self, path, data, file_options=None):
+        self.objects[(self.name, path)] = bytes(data)
+
+    def remove(self, paths):
+        for path in paths:
+            self.objects.pop((self.name, path), None)
+
+    def list(self, folder, options=None):
+        names = [path[len(folder) + 1:] for bucket, path in self.objects
+                 if bucket == self.name and path.startswith(folder + "/")]
+        return [{"name": name} for name in names[:(options or {}).get("limit", 100)]]
+
+    def create_signed_urls(self, paths, expires_in):
+        return [{"path": path, "signedURL": f"http://storage.local/sign/{path}", "error": None} for path in paths]
+
+
+class _Supabase(FakeSupabase):
+    supabase_url = "https://project.supabase.co"
+    supabase_key = "service-key"
+
+    def __init__(self, tables):
+        super().__init__(tables)
+        self.objects = {}
+        self.storage = type("Storage", (), {"from_": lambda _, bucket: _Bucket(self.objects, bucket)})()
+
+
+def _account(file_count=2):
+    files = [
+        {"id": f"f{i}", "user_id": "u1", "filename": f"deck{i}.pdf", "original_filename": f"Deck {i}.pdf",
+         "file_path": f"ideas/u1/blobs/{i}.pdf", "file_size": 3000, "content_type": "application/pdf",
+         "created_at": f"2026-01-0{i + 1}"}
+        for i in range(file_count)
+    ]
+    ideas = [{"id": i, "user_id": "u1", "title": f"Idea {i}", "search_vector": "'idea':1"} for i in range(1, 6)]
+    tables = {
+        "profiles": [{"id": "u1", "full_name": "Ada Innovator"}],
+        "ideas": ideas + [{"id": 99, "user_id": "u2", "title": "Not mine"}],
+        "files": files,
+    }
+    return _Supabase(tables)
+
+
+class _StorageServer:
+    """Serves object bytes; tracks how many downloads run at once"""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+        self.active = 0
+        self.max_active = 0
+
+    async def __call__(self, request: httpx.Request) -> httpx.Response:
+        path = request.url.path.split("/storage/v1/object/idea-files/", 1)[1]
+        self.active += 1
+        self.max_active = max(self.max_active, self.active)
+        await asyncio.sleep(0.01)
+        self.active -= 1
+        if path in self.fail:
+            return httpx.Response(404)
+        return httpx.Response(200, content=path.encode() * 1000)
+
+
+async def _export(client, server, concurrency=2):
+    service = DataExportService(client, concurrency=concurrency, transport=httpx.MockTransport(server), page_size=2)
+    manifest = await service.load_manifest("u1", "ada@example.com", {"theme": "dark"})
+    pieces = [piece async for piece in service.archive(manifest)]
+    return zipfile.ZipFile(io.BytesIO(b"".join(pieces))), pieces
+
+
+@pytest.mark.asyncio
+async def test_archive_contains_data_and_file_bytes():
+    archive, pieces = await _export(_account(), _StorageServer())
+
+    assert archive.testzip() is None
+    assert archive.read("files/f0_Deck 0.pdf") == b"ideas/u1/blobs/0.pdf" * 1000
+    ideas = json.loads(archive.read("ideas.json"))
+    assert [idea["id"] for idea in ideas] == ["1", "2", "3", "4", "5"]
+    assert ideas[0]["title"] == "Idea 1" and "search_vector" not in ideas[0]
+
+    user_data = json.loads(archive.read("user_data.json"))
+    assert user_data["profile"]["full_name"] == "Ada Innovator"
+    assert len(user_data["ideas"]) == 5 and user_data["settings"] == {"theme": "dark"}
+
+    listing = json.loads(archive.read("files_list.json"))
+    assert [entry["archive_path"] for entry in listing] == ["files/f0_Deck 0.pdf", "files/f1_Deck 1.pdf"]
+    assert len(pieces) > 5  # emitted incrementally, not as one buffer
+
+
+@pytest.mark.asyncio
+async def test_downloads_are_bounded_and_failures_are_reported():
+    client = _account(file_count=6)
+    server = _StorageServer(fail={"ideas/u1/blobs/3.pdf"})
+
+    archive, _ = await _export(client, server, concurrency=2)
+
+    assert server.max_active <= 2
+    listing = {entry["id"]: entry for entry in json.loads(archive.read("files_list.json"))}
+    assert "error" in listing["f3"] and "error" not in listing["f4"]
+    assert archive.read("files/f5_Deck 5.pdf") == b"ideas/u1/blobs/5.pdf" * 1000
+
+
+@pytest.mark.asyncio
+async def test_export_job_stores_archive_and_signs_download():
+    client = _account()
+    service = DataExportService(client, transport=httpx.MockTransport(_StorageServer()))
+
+    job, created = await service.create_job("u1")
+    again, created_again = await service.create_job("u1")
+    assert created and not created_again and again["id"] == job["id"]
+
+    await service.run_job(job["id"], "u1", "ada@example.com", {})
+    finished = await service.get_job("u1", job["id"])
+
+    assert finished["status"] == "completed"
+    stored = client.objects[("exports", f"u1/{job['id']}.zip")]
+    assert finished["file_size"] == len(stored)
+    assert "files/f1_Deck 1.pdf" in zipfile.ZipFile(io.BytesIO(stored)).namelist()
+    assert finished["download_url"] == f"http://storage.local/sign/u1/{job['id']}.zip"
+    assert await service.get_job("u2", job["id"]) is None
+
+
+@pytest.mark.asyncio
+async def test_stale_jobs_are_failed_and_replaced():
+    client = _account()
+    service = DataExportService(client, transport=httpx.MockTransport(_StorageServer()))
+    long_ago = (datetime.utcnow() - timedelta(days=1)).isoformat()
+
+    queued, _ = await service.create_job("u1")
+    queued["created_at"] = long_ago
+    running, created = await service.create_job("u1")
+    assert created and running["id"] != queued["id"]
+    assert (await service.get_job("u1", queued["id"]))["status"] == "failed"
+
+    running.update(status="running", started_at=long_ago)
+    assert (await service.get_job("u1", running["id"]))["error"] == "Export timed out"
+
+    # A worker that died cannot resurrect its job; a failed job is never run
+    await service.run_job(running["id"], "u1", "ada@example.com", {})
+    assert (await service.get_job("u1", running["id"]))["status"] == "failed"
+    assert client.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_archives_are_deleted_after_retention_and_with_the_account():
+    client = _account()
+    service = DataExportService(client, transport=httpx.MockTransport(_StorageServer()))
+    jobs = []
+    for _ in range(2):
+        job, _ = await service.create_job("u1")
+        await service.run_job(job["id"], "u1", "ada@example.com", {})
+        jobs.append(job)
+    old, recent = jobs
+    old["completed_at"] = (datetime.utcnow() - timedelta(days=8)).isoformat()
+
+    assert await service.expire_jobs(timedelta(days=7)) == 1
+    assert set(client.objects) == {("exports", f"u1/{recent['id']}.zip")}
+    expired = await service.get_job("u1", old["id"])
+    assert expired["status"] == "expired" and expired["download_url"] is None
+    assert await service.expire_jobs(timedelta(days=7)) == 0
+
+    assert await service.delete_user_exports("u1") == 1
+    assert client.objects == {}
+    assert (await service.get_job("u1", recent["id"]))["status"] == "expired"
@@ -0,0 +1,236 @@
+"""
+Unit tests for the email outbox, delivered to a local SMTP sink
+"""
+import asyncio
+import base64
+from contextlib import asynccontextmanager
+from datetime import datetime, timezone
+from email import message_from_bytes
+
+import pytest
+
+from app.services.email_outbox import EmailOutbox, SMTPConnectionPool
+
+
+class _SMTPSink:
+    """Minimal SMTP server: accepts AUTH PLAIN, rejects some recipients"""
+
+    def __init__(self, rejected=(), deferred=()):
+        self.rejected = set(rejected)
+        self.deferred = set(deferred)
+        self.messages = []
+        self.connections = 0
+        self.logins = 0
+        self.server = None
+
+    async def start(self):
+        self.server = await asyncio.start_server(self._session, "127.0.0.1", 0)
+        return self.server.sockets[0].getsockname()[1]
+
+    async def stop(self):
+        self.server.close()
+        await self.server.wait_closed()
+
+    async def _session(self, reader, writer):
+        self.connections += 1
+
+        def reply(line):
+            writer.write(line.encode() + b"\r\n")
+
+        reply("220 sink ESMTP")
+        recipients = []
+        while True:
+            line = (await reader.readline()).decode().rstrip("\r\n")
+            command = line.upper()
+            if not line or command == "QUIT":
+                reply("221 bye")
+                break
+            if command.startswith("EHLO"):
+                reply("250-sink\r\n250-AUTH PLAIN\r\n250 8BITMIME")
+            elif command.startswith("AUTH PLAIN"):
+                credentials = line.split(" ", 2)[2] if line.count(" ") == 2 else None
+                if credentials is None:
+                    reply("334 ")
+                    credentials = (await reader.readline()).decode().strip()
+                assert base64.b64decode(credentials).split(b"\0")[1:] == [b"mailer", b"secret"]
+                self.logins += 1
+                reply("235 authenticated")
+            elif command.startswith("MAIL FROM"):
+                recipients = []
+                reply("250 ok")
+            elif command.startswith("RCPT TO"):
+                address = line.split(":", 1)[1].strip("<> ")
+                if address in self.rejected:
+                    reply("550 no such user")
+                elif address in self.deferred:
+                    reply("451 try again later")
+                else:
+                    recipients.append(address)
+                    reply("250 ok")
+            elif command == "DATA":
+                reply("354 go ahead")
+                data = bytearray()
+                while True:
+                    chunk = await reader.readline()
+                    if chunk == b".\r\n":
+                        break
+                    data += chunk
+                self.messages.append((recipients, message_from_bytes(bytes(data))))
+                reply("250 queued")
+            else:
+                reply("250 ok")
+            await writer.drain()
+        await writer.drain()
+        writer.close()
+
+
+def _parse(value):
+    return datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+class _Outbox:
+    """In-memory email_outbox table and claim RPC"""
+
+    def __init__(self):
+        self.rows = []
+        self.values = None
+        self.ids = None
+
+    def table(self, name):
+        assert name == "email_outbox"
+        self.values, self.ids = None, None
+        return self
+
+    def insert(self, row):
+        self.rows.append({
+            **row, "id": len(self.rows) + 1, "status": "pending", "attempts": 0,
+            "next_attempt_at": datetime.now(timezone.utc).isoformat(),
+        })
+        return self
+
+    def update(self, values):
+        self.values = values
+        return self
+
+    def in_(self, column, ids):
+        self.ids = set(ids)
+        return self
+
+    def delete(self):
+        return self
+
+    def eq(self, *args):
+        return self
+
+    def lt(self, *args):
+        return self
+
+    def execute(self):
+        if self.values is not None:
+            for row in self.rows:
+                if row["id"] in self.ids:
+                    row.update(self.values)
+        return type("Result", (), {"data": []})()
+
+    def rpc(self, name, params):
+        assert name == "claim_email_outbox"
+        now = datetime.now(timezone.utc)
+        due = [row for row in self.rows if row["status"] == "pending" and _parse(row["next_attempt_at"]) <= now]
+        claimed = due[:params["p_limit"]]
+        for row in claimed:
+            row["status"] = "sending"
+            row["attempts"] += 1
+        return type("Call", (), {"execute": lambda _: type("Result", (), {"data": [dict(r) for r in claimed]})()})()
+
+
+@asynccontextmanager
+async def _running_sink():
+    server = _SMTPSink(rejected={"nobody@example.com"}, deferred={"busy@example.com"})
+    server.port = await server.start()
+    try:
+        yield server
+    finally:
+        await server.stop()
+
+
+def _outbox(sink, table, batch_size=20, credentials=("mailer", "secret")):
+    pool = SMTPConnectionPool("127.0.0.1", sink.port, *credentials, size=2, timeout=5)
+    outbox = EmailOutbox(pool=pool, client_factory=lambda: table, batch_size=batch_size)
+    outbox.from_email, outbox.from_name = "noreply@esal.test", "ESAL Platform"
+    return outbox
+
+
+@pytest.mark.asyncio
+async def test_queued_emails_are_sent_over_pooled_connections():
+    async with _running_sink() as sink:
+        table = _Outbox()
+        outbox = _outbox(sink, table, batch_size=3)
+
+        for i in range(7):
+            assert await outbox.enqueue(f"user{i % 3}@example.com", f"Hello {i}", "Plain body", "<p>HTML body</p>",
+                                        reply_to="visitor@example.com")
+        assert sink.messages == []  # enqueueing never touches SMTP
+
+        assert await outbox.dispatch() == 7
+        await outbox.pool.close()
+
+        assert len(sink.messages) == 7
+        assert sink.connections == sink.logins <= 2
+        recipients, message = sink.messages[0]
+        assert recipients == ["user0@example.com"]
+        assert message["Reply-To"] == "visitor@example.com"
+        assert [part.get_content_type() for part in message.walk()][1:] == ["text/plain", "text/html"]
+        assert {row["status"] for row in table.rows} == {"sent"}
+
+
+@pytest.mark.asyncio
+async def test_unauthenticated_servers_are_supported():
+    async with _running_sink() as sink:
+        table = _Outbox()
+        outbox = _outbox(sink, table, credentials=())
+        assert outbox.is_configured()
+
+        assert await outbox.enqueue("user@example.com", "Hello", "Plain body")
+        assert await outbox.dispatch() == 1
+        await outbox.pool.close()
+
+        assert len(sink.messages) == 1 and sink.logins == 0
+
+
+@pytest.mark.asyncio
+async def test_failures_are_retried_with_backoff_or_given_up():
+    async with _running_sink() as sink:
+        table = _Outbox()
+        outbox = _outbox(sink, table)
+        await outbox.enqueue("busy@example.com", "Deferred", "body")
+        await outbox.enqueue("nobody@example.com", "Rejected", "body")
+        await outbox.enqueue("ok@example.com", "Fine", "body")
+
+        assert await outbox.dispatch() == 1
+        busy, nobody, ok = table.rows
+        assert (busy["status"], busy["attempts"]) == ("pending", 1)
+        assert _parse(busy["next_attempt_at"]) > datetime.now(timezone.utc)
+        assert nobody["status"] == "failed" and "550" in nobody["last_error"]
+        assert ok["status"] == "sent"
+
+        # Not due yet: nothing is resent
+        assert await outbox.dispatch() == 0
+        await outbox.pool.close()
+        assert len(sink.messages) == 1
+
+
+@pytest.mark.asyncio
+async def test_attempts_are_capped():
+    async with _running_sink() as sink:
+        table = _Outbox()
+        outbox = _outbox(sink, table)
+        outbox.max_attempts = 2
+        outbox.retry_base_seconds = 0
+        await outbox.enqueue("busy@example.com", "Deferred", "body")
+
+        await outbox.dispatch()
+        table.rows[0]["next_attempt_at"] = datetime.now(timezone.utc).isoformat()
+        await outbox.dispatch()
+        await outbox.pool.close()
+
+        assert (table.rows[0]["status"], table.rows[0]["attempts"]) == ("failed", 2)
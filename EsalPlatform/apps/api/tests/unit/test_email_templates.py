@@ -0,0 +1,91 @@
+"""
+Unit tests for precompiled email templates and batched digests
+"""
+import pytest
+
+from app.services import email_service as email_service_module
+from app.services.email_outbox import EmailOutbox, SMTPConnectionPool
+from app.services.email_service import EmailService
+from app.services.email_templates import TEMPLATES, EmailTemplates
+
+
+@pytest.fixture
+def templates():
+    return EmailTemplates(TEMPLATES, {"site_url": "https://esal.test", "expiry_minutes": 10, "year": 2025})
+
+
+def test_templates_render_text_and_html_together(templates):
+    subject, text, html = templates.render("verification", code="123456")
+
+    assert subject == "Your ESAL Platform Verification Code"
+    assert "Your verification code is: 123456" in text
+    assert "expire in 10 minutes" in text and "expire in 10 minutes" in html
+    assert '<div class="verification-code">123456</div>' in html
+    assert "<style>" in html and "© 2025 Esal Ventures" in text
+
+
+def test_values_are_escaped_in_html_only(templates):
+    subject, text, html = templates.render(
+        "contact", first_name="Ada\r\nBcc: x@y.z", last_name="<b>L</b>", email="ada@example.com",
+        role="Investor", message="Hello\n<script>alert(1)</script>", submitted_at="now"
+    )
+
+    assert "\n" not in subject
+    assert "<script>" in text
+    assert "Hello<br>\n&lt;script&gt;alert(1)&lt;/script&gt;" in html
+    assert "&lt;b&gt;L&lt;/b&gt;" in html and "<b>L</b>" not in html
+
+
+def test_invariant_parts_are_compiled_in(templates):
+    template = templates["verification"]
+
+    # Layout, styles and settings are literal text; only the code is left
+    assert template.fields == {"code"}
+    assert len(template.html.parts) == 3
+    with pytest.raises(ValueError, match="code"):
+        template.render()
+
+
+def test_bound_digest_only_needs_the_recipient(templates):
+    digest = templates.bind("digest", title="This week", intro="New ideas", items_html="<div>x</div>", items_text="* x\n")
+
+    assert digest.fields == {"name"}
+    subject, text, html = digest.render(name="Grace")
+    assert subject == "This week"
+    assert "Hi Grace," in text and "<div>x</div>" in html and "https://esal.test" in html
+
+
+class _Table:
+    def __init__(self):
+        self.inserts = []
+
+    def table(self, name):
+        return self
+
+    def insert(self, rows):
+        self.inserts.append(rows)
+        return self
+
+    def execute(self):
+        return None
+
+
+@pytest.mark.asyncio
+async def test_digest_is_queued_in_batches(monkeypatch):
+    table = _Table()
+    outbox = EmailOutbox(pool=SMTPConnectionPool("smtp.test", 587, "u", "p"), client_factory=lambda: table)
+    outbox.from_email = "a@b.c"
+    monkeypatch.setattr(email_service_module, "email_outbox", outbox)
+    service = EmailService.__new__(EmailService)
+
+    recipients = [{"email": f"investor{i}@example.com", "full_name": f"Investor {i}"} for i in range(1200)]
+    recipients.append({"email": None})
+    items = [{"title": "Solar <kiosk>", "summary": "Off-grid charging", "url": "https://esal.test/ideas/1"}]
+
+    assert await service.send_digest(recipients, "Weekly digest", "Fresh ideas", items) == 1200
+
+    assert [len(rows) for rows in table.inserts] == [500, 500, 200]
+    row = table.inserts[2][-1]
+    assert row["to_email"] == "investor1199@example.com" and row["category"] == "digest"
+    assert "Hi Investor 1199," in row["html_body"] and "Solar &lt;kiosk&gt;" in row["html_body"]
+    assert "* Solar <kiosk>" in row["text_body"]
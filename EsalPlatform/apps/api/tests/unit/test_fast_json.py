@@ -0,0 +1,37 @@
+"""
+Unit tests for the fast JSON response pipeline
+"""
+import json
+from datetime import datetime, timezone
+from decimal import Decimal
+
+from app.schemas import StartupMatch
+from app.utils.fast_json import FastJSONResponse, STARTUP_MATCHES, adapter_response
+
+
+def test_fast_json_response_encodes_common_types():
+    body = FastJSONResponse({
+        "when": datetime(2024, 5, 1, tzinfo=timezone.utc),
+        "amount": Decimal("1.5"),
+        "match": StartupMatch(startup_id="1", startup_title="A", match_score=0.9),
+        1: "non-str key",
+    }).body
+
+    data = json.loads(body)
+    assert data["when"] == "2024-05-01T00:00:00+00:00"
+    assert data["amount"] == 1.5
+    assert data["match"]["startup_title"] == "A"
+    assert data["1"] == "non-str key"
+
+
+def test_adapter_response_matches_model_dump():
+    matches = STARTUP_MATCHES.validate_python([
+        {"startup_id": "1", "startup_title": "A", "match_score": 0.9,
+         "highlights": [{"reason": "Industry", "score": 0.8}]},
+    ])
+
+    response = adapter_response(STARTUP_MATCHES, matches, headers={"ETag": 'W/"x"'})
+
+    assert response.media_type == "application/json"
+    assert response.headers["etag"] == 'W/"x"'
+    assert json.loads(response.body) == [matches[0].model_dump(mode="json")]
@@ -0,0 +1,208 @@
+"""
+Unit tests for content-addressed, reference-counted file uploads
+"""
+import asyncio
+import hashlib
+import threading
+
+import pytest
+
+from app.services.supabase_files import SupabaseFileService
+
+
+class _Result:
+    def __init__(self, data):
+        self.data = data
+
+
+class _Call:
+    def __init__(self, fn):
+        self.fn = fn
+
+    def execute(self):
+        return _Result(self.fn())
+
+
+class _Bucket:
+    def __init__(self, objects, name):
+        self.objects = objects
+        self.name = name
+
+    def upload(self, path, data, file_options=None):
+        self.objects[(self.name, path)] = bytes(data)
+
+    def remove(self, paths):
+        for path in paths:
+            self.objects.pop((self.name, path), None)
+
+    def get_public_url(self, path):
+        return f"http://storage.local/{self.name}/{path}"
+
+
+class _Storage:
+    def __init__(self):
+        self.objects = {}
+
+    def from_(self, bucket):
+        return _Bucket(self.objects, bucket)
+
+
+class _Files:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def insert(self, row):
+        return _Call(lambda: [self.rows.setdefault(row["id"], dict(row))])
+
+
+class _Supabase:
+    """Storage, the files table and the file_blobs RPCs, kept in memory"""
+    supabase_url = "https://project.supabase.co"
+    supabase_key = "service-key"
+
+    def __init__(self):
+        self.storage = _Storage()
+        self.files = {}
+        self.blobs = {}
+
+    def table(self, name):
+        assert name == "files"
+        return _Files(self.files)
+
+    def rpc(self, name, params):
+        return _Call(lambda: getattr(self, name)(**params))
+
+    def acquire_file_blob(self, p_user_id, p_bucket, p_sha256, p_file_path, p_size):
+        blob = self.blobs.setdefault((p_user_id, p_bucket, p_sha256),
+                                     {"file_path": p_file_path, "size": p_size, "ref_count": 0})
+        blob["ref_count"] += 1
+        return [{"file_path": blob["file_path"], "created": blob["file_path"] == p_file_path}]
+
+    def reference_file_blob(self, p_user_id, p_bucket, p_sha256):
+        blob = self.blobs.get((p_user_id, p_bucket, p_sha256))
+        if blob is None:
+            return []
+        blob["ref_count"] += 1
+        return [{"file_path": blob["file_path"], "size": blob["size"]}]
+
+    def release_file_blob(self, p_user_id, p_bucket, p_sha256):
+        key = (p_user_id, p_bucket, p_sha256)
+        blob = self.blobs.get(key)
+        if blob is None:
+            return []
+        blob["ref_count"] -= 1
+        if blob["ref_count"] <= 0:
+            del self.blobs[key]
+        return [{"file_path": blob["file_path"], "remove_object": blob["ref_count"] <= 0}]
+
+    def release_file(self, p_file_id, p_user_id, p_bucket):
+        row = self.files.get(p_file_id)
+        if row is None or row["user_id"] != p_user_id:
+            return []
+        del self.files[p_file_id]
+        if row.get("content_sha256") is None:
+            return [{"file_path": row["file_path"], "remove_object": True}]
+        released = self.release_file_blob(p_user_id, p_bucket, row["content_sha256"])
+        return [{"file_path": row["file_path"], "remove_object": bool(released and released[0]["remove_object"])}]
+
+
+def _service():
+    service = SupabaseFileService.__new__(SupabaseFileService)
+    service.supabase = _Supabase()
+    return service
+
+
+async def _chunks(data):
+    yield data
+
+
+async def _upload(service, data, user_id="user-1", sha256=None):
+    return await service.upload_stream(user_id, _chunks(data), "deck.pdf", "application/pdf", sha256=sha256)
+
+
+@pytest.mark.asyncio
+async def test_same_content_is_stored_once():
+    service = _service()
+
+    first = await _upload(service, b"pitch deck")
+    second = await _upload(service, b"pitch deck")
+    other = await _upload(service, b"another deck")
+
+    assert first["file_path"] == second["file_path"] != other["file_path"]
+    assert first["content_sha256"] == hashlib.sha256(b"pitch deck").hexdigest()
+    assert len(service.supabase.storage.objects) == 2
+    assert len(service.supabase.files) == 3
+
+
+@pytest.mark.asyncio
+async def test_object_is_removed_with_the_last_reference():
+    service = _service()
+    first = await _upload(service, b"pitch deck")
+    second = await _upload(service, b"pitch deck")
+    key = ("idea-files", first["file_path"])
+
+    assert await service.delete_file(first["id"], "user-1") is True
+    assert key in service.supabase.storage.objects
+
+    assert await service.delete_file(second["id"], "user-1") is True
+    assert key not in service.supabase.storage.objects
+    assert service.supabase.blobs == {}
+    assert await service.delete_file(second["id"], "user-1") is False
+
+
+@pytest.mark.asyncio
+async def test_known_hash_skips_the_body():
+    service = _service()
+    first = await _upload(service, b"pitch deck")
+
+    async def unread():
+        raise AssertionError("body should not be read")
+        yield b""
+
+    second = await service.upload_stream("user-1", unread(), "deck-v2.pdf", "application/pdf",
+                                         sha256=first["content_sha256"].upper())
+
+    assert (second["file_path"], second["file_size"]) == (first["file_path"], len(b"pitch deck"))
+    assert second["original_filename"] == "deck-v2.pdf"
+
+
+@pytest.mark.asyncio
+async def test_deduplication_is_per_user():
+    service = _service()
+    mine = await _upload(service, b"pitch deck", user_id="user-1")
+    theirs = await _upload(service, b"pitch deck", user_id="user-2", sha256=mine["content_sha256"])
+
+    assert theirs["file_path"].startswith("ideas/user-2/")
+    assert len(service.supabase.storage.objects) == 2
+
+
+@pytest.mark.asyncio
+async def test_failed_upload_never_leaves_a_claimed_path_unwritten(monkeypatch):
+    service = _service()
+    supabase = service.supabase
+    uploads, other_claim = [], threading.Event()
+    acquire, store = supabase.acquire_file_blob, _Bucket.upload
+
+    def acquire_file_blob(**params):
+        row = acquire(**params)
+        if uploads and params["p_file_path"] != uploads[0]:
+            other_claim.set()
+        return row
+
+    def upload(bucket, path, data, file_options=None):
+        uploads.append(path)
+        if len(uploads) == 1:
+            # The first write fails only once the second upload has claimed
+            other_claim.wait(5)
+            raise RuntimeError("storage unavailable")
+        store(bucket, path, data, file_options)
+
+    supabase.acquire_file_blob = acquire_file_blob
+    monkeypatch.setattr(_Bucket, "upload", upload)
+
+    failed, second = await asyncio.gather(_upload(service, b"pitch deck"), _upload(service, b"pitch deck"),
+                                          return_exceptions=True)
+
+    assert isinstance(failed, Exception) and other_claim.is_set()
+    assert ("idea-files", second["file_path"]) in supabase.storage.objects
+    assert [blob["file_path"] for blob in supabase.blobs.values()] == [second["file_path"]]
@@ -0,0 +1,117 @@
+"""
+Unit tests for background dependency health probes
+"""
+import asyncio
+
+import httpx
+import pytest
+
+from app.services import health_probes
+from app.services.health_probes import HealthMonitor, RollingHistogram, format_duration
+
+
+def test_histogram_percentiles_and_error_rate():
+    histogram = RollingHistogram(window_seconds=3600, clock=lambda: 0.0)
+    for latency in range(1, 101):
+        histogram.record(float(latency), ok=latency <= 90)
+
+    stats = histogram.snapshot()
+
+    assert stats["count"] == 100
+    assert stats["error_rate"] == 0.1
+    assert 35 <= stats["p50"] <= 75
+    assert 75 <= stats["p95"] <= 100
+    assert stats["p50"] < stats["p95"] <= stats["p99"] <= 100
+
+
+def test_histogram_forgets_samples_outside_the_window():
+    clock = [0.0]
+    histogram = RollingHistogram(window_seconds=600, clock=lambda: clock[0])
+    histogram.record(4000.0, ok=False)
+
+    clock[0] = 300.0
+    histogram.record(8.0)
+    assert histogram.snapshot()["count"] == 2
+
+    clock[0] = 660.0
+    stats = histogram.snapshot()
+    assert stats["count"] == 1
+    assert stats["error_rate"] == 0.0
+    assert stats["p99"] <= 10
+
+
+@pytest.mark.asyncio
+async def test_probes_run_in_background_and_are_read_without_probing():
+    calls = {"ok": 0, "broken": 0, "slow": 0}
+
+    async def ok():
+        calls["ok"] += 1
+
+    async def broken():
+        calls["broken"] += 1
+        raise ConnectionError("connection refused")
+
+    async def slow():
+        calls["slow"] += 1
+        await asyncio.sleep(1)
+
+    monitor = HealthMonitor(
+        probes={"supabase_rest": ok, "supabase_auth": broken, "gemini": slow, "smtp": None},
+        interval=60, timeout=0.05,
+    )
+    assert monitor.ready() == (False, {"supabase_rest": "unknown", "supabase_auth": "unknown"})
+
+    await monitor.run_once()
+    report = monitor.report()
+    monitor.report()
+    monitor.ready()
+
+    assert calls == {"ok": 1, "broken": 1, "slow": 1}
+    assert report["supabase_rest"]["status"] == "healthy"
+    assert report["supabase_rest"]["availability"] == 1.0
+    assert report["supabase_auth"]["status"] == "down"
+    assert report["supabase_auth"]["last_error"] == "connection refused"
+    assert report["gemini"]["status"] == "down"
+    assert report["gemini"]["last_error"].startswith("Timed out")
+    assert report["smtp"]["status"] == "not_configured"
+    assert monitor.ready() == (False, {"supabase_rest": "healthy", "supabase_auth": "down"})
+
+    monitor.probes["supabase_auth"] = ok
+    monitor.start()
+    await asyncio.sleep(0.1)
+    await monitor.stop()
+
+    ready, statuses = monitor.ready()
+    assert ready
+    # One failure in two probes
+    assert statuses["supabase_auth"] == "degraded"
+
+
+@pytest.mark.asyncio
+async def test_http_probes_keep_keys_out_of_urls_and_fail_on_rejected_keys(monkeypatch):
+    requests = []
+    statuses = iter([200, 403, 401, 404])
+
+    def handler(request):
+        requests.append(request)
+        return httpx.Response(next(statuses))
+
+    monkeypatch.setattr(health_probes.settings, "GEMINI_API_KEY", "secret-key")
+    monitor = HealthMonitor(probes={}, timeout=1)
+    monitor._http = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+
+    await monitor.probe_gemini()
+    for _ in range(2):
+        with pytest.raises(RuntimeError):
+            await monitor.probe_gemini()
+    await monitor.probe_gemini()
+    await monitor._http.aclose()
+
+    assert all("secret-key" not in str(request.url) for request in requests)
+    assert requests[0].headers["x-goog-api-key"] == "secret-key"
+
+
+def test_format_duration():
+    assert format_duration(59) == "0m"
+    assert format_duration(3 * 3600 + 120) == "3h 2m"
+    assert format_duration(2 * 86400 + 3600 + 60) == "2d 1h 1m"
@@ -0,0 +1,87 @@
+"""
+Unit tests for the per-process idea read cache
+"""
+import asyncio
+
+import pytest
+
+from app.services.idea_cache import IdeaCache, idea_tag, PUBLIC_TAG
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.mark.asyncio
+async def test_hit_after_miss_and_ttl_expiry():
+    clock = _Clock()
+    cache = IdeaCache(max_entries=10, ttl_seconds=30, clock=clock)
+    loads = []
+
+    async def load():
+        loads.append(1)
+        return {"id": 1}
+
+    await cache.get_or_load("k", load, lambda v: (idea_tag(1),))
+    await cache.get_or_load("k", load, lambda v: (idea_tag(1),))
+    assert len(loads) == 1
+
+    clock.now = 31
+    await cache.get_or_load("k", load, lambda v: (idea_tag(1),))
+    assert len(loads) == 2
+    assert cache.stats()["hits"] == 1
+    assert cache.stats()["expired"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_drops_tagged_entries_only():
+    cache = IdeaCache()
+
+    async def page():
+        return [{"id": 1}, {"id": 2}]
+
+    async def other():
+        return [{"id": 3}]
+
+    await cache.get_or_load("page", page, lambda v: (PUBLIC_TAG, idea_tag(1), idea_tag(2)))
+    await cache.get_or_load("other", other, lambda v: (idea_tag(3),))
+
+    assert cache.invalidate_ideas([2]) == 1
+    assert cache.stats()["size"] == 1
+
+
+@pytest.mark.asyncio
+async def test_invalidation_during_load_discards_stale_result():
+    cache = IdeaCache()
+    release = asyncio.Event()
+
+    async def slow_load():
+        await release.wait()
+        return "old"
+
+    task = asyncio.ensure_future(cache.get_or_load("k", slow_load, lambda v: (idea_tag(1),)))
+    await asyncio.sleep(0)
+    cache.invalidate(idea_tag(1))
+    release.set()
+
+    assert await task == "old"
+    assert cache.stats()["stale_writes"] == 1
+    assert cache.stats()["size"] == 0
+
+
+@pytest.mark.asyncio
+async def test_lru_eviction_is_bounded():
+    cache = IdeaCache(max_entries=2)
+
+    for key in ("a", "b", "c"):
+        async def load(key=key):
+            return key
+        await cache.get_or_load(key, load, lambda v: ())
+
+    stats = cache.stats()
+    assert stats["size"] == 2
+    assert stats["evictions"] == 1
@@ -0,0 +1,91 @@
+"""
+Unit tests for the write-behind idea counter service
+"""
+import pytest
+
+from app.services.idea_counters import INCREMENT_RPC, IdeaCounterService
+
+
+class _Rpc:
+    def __init__(self, client, name, params):
+        self.client, self.name, self.params = client, name, params
+
+    def execute(self):
+        if self.client.fail:
+            raise RuntimeError("network down")
+        self.client.calls.append((self.name, self.params))
+
+
+class _FakeClient:
+    def __init__(self):
+        self.calls = []
+        self.fail = False
+
+    def rpc(self, name, params):
+        return _Rpc(self, name, params)
+
+
+def _service(client, shards=4):
+    return IdeaCounterService(shards=shards, flush_interval=60, client_factory=lambda: client)
+
+
+@pytest.mark.asyncio
+async def test_flush_sends_one_batched_rpc():
+    client = _FakeClient()
+    counters = _service(client)
+
+    for _ in range(100):
+        counters.record_view(7)
+    counters.record_view("8")
+    counters.record_interest(7)
+
+    assert await counters.flush() == 2
+    assert len(client.calls) == 1
+    name, params = client.calls[0]
+    assert name == INCREMENT_RPC
+    assert sorted(params["deltas"], key=lambda d: d["idea_id"]) == [
+        {"idea_id": 7, "views": 100, "interests": 1},
+        {"idea_id": 8, "views": 1, "interests": 0},
+    ]
+    assert counters.unflushed(7) == (0, 0)
+    assert await counters.flush() == 0
+
+
+@pytest.mark.asyncio
+async def test_failed_flush_keeps_deltas_for_retry():
+    client = _FakeClient()
+    counters = _service(client)
+    counters.record_view(3)
+
+    client.fail = True
+    assert await counters.flush() == 0
+    assert counters.unflushed(3) == (1, 0)
+
+    counters.record_view(3)
+    client.fail = False
+    assert await counters.flush() == 1
+    assert client.calls[0][1]["deltas"] == [{"idea_id": 3, "views": 2, "interests": 0}]
+
+
+def test_reads_merge_unflushed_deltas():
+    counters = _service(_FakeClient())
+    counters.record_view(5)
+    counters.record_view(5)
+    counters.record_interest(5)
+
+    row = counters.merge_into({"id": 5, "view_count": 10, "interest_count": None})
+    assert row == {"id": 5, "view_count": 12, "interest_count": 1}
+    assert counters.merge_into({"id": 5}) == {"id": 5}
+    assert counters.record_view("not-an-id") is False
+
+
+@pytest.mark.asyncio
+async def test_stop_flushes_remaining_deltas():
+    client = _FakeClient()
+    counters = _service(client)
+    counters.start()
+    counters.record_interest(9)
+
+    await counters.stop()
+
+    assert client.calls == [(INCREMENT_RPC, {"deltas": [{"idea_id": 9, "views": 0, "interests": 1}]})]
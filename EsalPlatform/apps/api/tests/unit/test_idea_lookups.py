@@ -0,0 +1,61 @@
+"""
+Unit tests for SupabaseIdeasService point lookups
+"""
+import pytest
+
+from app.services.supabase_ideas import SupabaseIdeasService
+from tests.fixtures.postgrest import FakeSupabase
+
+
+def _service(rows):
+    service = SupabaseIdeasService.__new__(SupabaseIdeasService)
+    service.supabase = FakeSupabase({"ideas": rows})
+    return service
+
+
+@pytest.mark.asyncio
+async def test_non_numeric_id_skips_query():
+    service = _service([{"id": 1}])
+
+    assert await service.get_public_idea_by_id("not-an-id") is None
+    assert await service.get_idea_by_id("abc", "user-1") is None
+    assert service.supabase.calls == []
+
+
+@pytest.mark.asyncio
+async def test_public_lookup_projects_columns_and_filters_visibility():
+    service = _service([{"id": 7, "user_id": "owner", "visibility": "public"}])
+
+    idea = await service.get_public_idea_by_id("7", columns="id, user_id")
+
+    assert idea == {"id": 7, "user_id": "owner"}
+    assert ("select", ("id, user_id",)) in service.supabase.calls
+    assert ("eq", ("id", 7)) in service.supabase.calls
+    assert ("in_", ("visibility", ["public", "public_ideas"])) in service.supabase.calls
+
+
+@pytest.mark.asyncio
+async def test_multi_get_uses_one_query_and_keeps_request_order():
+    service = _service([{"id": 3, "title": "c"}, {"id": 1, "title": "a"}])
+
+    ideas = await service.get_ideas_by_ids(["1", "2", "3", "1"], columns="title")
+
+    assert [idea["title"] for idea in ideas] == ["a", "c"]
+    assert [c for c in service.supabase.calls if c[0] == "table"] == [("table", ("ideas",))]
+    assert ("select", ("id, title",)) in service.supabase.calls
+    assert ("in_", ("id", [1, 2, 3])) in service.supabase.calls
+
+
+@pytest.mark.asyncio
+async def test_public_lookup_is_served_from_cache_until_the_idea_changes():
+    from app.services.idea_cache import idea_cache
+
+    service = _service([{"id": 9, "view_count": 1, "visibility": "public"}])
+
+    await service.get_public_idea_by_id("9", columns="id, view_count")
+    await service.get_public_idea_by_id("9", columns="id, view_count")
+    assert [c for c in service.supabase.calls if c[0] == "table"] == [("table", ("ideas",))]
+
+    idea_cache.invalidate_ideas([9])
+    await service.get_public_idea_by_id("9", columns="id, view_count")
+    assert len([c for c in service.supabase.calls if c[0] == "table"]) == 2
@@ -0,0 +1,101 @@
+"""
+Unit tests for compact idea records
+"""
+import pytest
+
+from app.routers.investor import STARTUP_CARD
+from app.schemas import InvestorPreferences
+from app.services.idea_counters import IdeaCounterService
+from app.services.idea_record import IdeaRecord, RecordProjection
+from app.services.investor_matching import InvestorMatchingService
+from app.services import idea_record
+from app.services.supabase_ideas import IDEA_CARD, IDEA_SUMMARY, _project_rows
+
+ROW = {
+    "id": 7, "user_id": "owner-1", "title": "Solar kiosks", "description": None,
+    "category": "energy", "tags": None, "status": "published", "visibility": "public",
+    "view_count": 3, "interest_count": None, "created_at": "2024-05-01T10:00:00+00:00",
+}
+
+
+@pytest.fixture(autouse=True)
+def counters(monkeypatch):
+    service = IdeaCounterService(shards=2)
+    monkeypatch.setattr(idea_record, "idea_counters", service)
+    return service
+
+
+def test_legacy_names_alias_stored_columns():
+    record = IdeaRecord.from_row(ROW)
+
+    assert record.industry == record.category == "energy"
+    assert record.get("industry") == "energy"
+    assert record.get("views_count") == record.view_count == 3
+    assert record.get("innovator_id") == "owner-1"
+    assert record.stage == record.get("stage") == "idea"
+    assert not hasattr(record, "__dict__")
+
+
+def test_nullable_columns_are_normalized_and_missing_ones_use_defaults():
+    record = IdeaRecord.from_row(ROW)
+
+    assert record.description == ""
+    assert record.tags == []
+    assert record.interest_count == 0
+    assert record.get("ai_score", 1.5) == 1.5
+    assert record.get("team_size") is None
+    assert "ai_score" not in record.columns()
+
+
+def test_records_are_immutable():
+    record = IdeaRecord.from_row(ROW)
+
+    with pytest.raises(AttributeError):
+        record.title = "Changed"
+    with pytest.raises(AttributeError):
+        del record.title
+
+
+def test_unflushed_counters_are_merged_without_touching_the_row(counters):
+    counters.increment(7, views=2, interests=1)
+    row = dict(ROW)
+
+    record = IdeaRecord.from_row(row)
+
+    assert (record.view_count, record.interest_count) == (5, 1)
+    assert row == ROW
+
+
+def test_to_dict_matches_projecting_the_row():
+    record = _project_rows([ROW], RecordProjection("sample", ("id", "title", "category", "view_count")))[0]
+
+    assert isinstance(record, IdeaRecord)
+    assert record.to_dict(IDEA_SUMMARY) == IDEA_SUMMARY.map_row(IdeaRecord.from_row(ROW))
+    assert record.to_dict(IDEA_SUMMARY)["industry"] == "energy"
+
+
+def test_record_projection_rejects_unknown_columns():
+    with pytest.raises(ValueError):
+        RecordProjection("bad", ("id", "funding_needed"))
+
+
+def test_browse_cards_are_built_from_records():
+    card = STARTUP_CARD.map_row(IDEA_CARD.map_row(ROW))
+
+    assert card["id"] == "7"
+    assert card["industry"] == "energy"
+    assert card["stage"] == "idea"
+    assert card["views_count"] == 3
+    assert card["interests_count"] == 0
+    assert card["innovator_id"] == "owner-1"
+
+
+def test_fallback_scoring_reads_records():
+    service = InvestorMatchingService.__new__(InvestorMatchingService)
+    record = IdeaRecord.from_row({**ROW, "description": "x" * 150, "problem": "p"})
+
+    match = service._fallback_scoring(record, InvestorPreferences(industries=["Energy"]))
+
+    assert match.startup_id == "7"
+    assert match.industry == "energy"
+    assert match.match_score >= 0.4
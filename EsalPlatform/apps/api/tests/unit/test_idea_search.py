@@ -0,0 +1,69 @@
+"""
+Unit tests for the SQLite FTS5 idea search backend
+"""
+from sqlalchemy import create_engine
+
+from app.services.idea_search import SQLiteSearchBackend
+
+
+def _engine_with_ideas(rows):
+    engine = create_engine("sqlite://")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE ideas (id INTEGER PRIMARY KEY, user_id TEXT, title TEXT, problem TEXT, "
+            "solution TEXT, target_market TEXT, status TEXT, created_at TEXT, updated_at TEXT)"
+        )
+        for row in rows:
+            conn.exec_driver_sql(
+                "INSERT INTO ideas VALUES (?, 'user-1', ?, ?, ?, 'farmers', ?, '2024-01-01', '2024-01-01')",
+                row,
+            )
+    return engine
+
+
+def test_title_matches_rank_above_body_matches_and_are_highlighted():
+    engine = _engine_with_ideas([
+        (1, "Irrigation sensors", "Solar pumps are expensive", "Cheap sensors", "published"),
+        (2, "Solar irrigation", "Farms lack water", "Pumps", "published"),
+        (3, "Solar drafts", "Unpublished", "Nothing", "draft"),
+    ])
+    backend = SQLiteSearchBackend(engine)
+
+    rows = backend.search("solar", 10, status_filter="published")
+
+    assert [row["id"] for row in rows] == [2, 1]
+    assert "<mark>Solar</mark>" in rows[0]["snippet"]
+
+
+def test_keyset_paging_and_index_tracks_new_rows():
+    engine = _engine_with_ideas([
+        (i, f"Solar idea {i}", "Energy", "Panels", "published") for i in range(1, 6)
+    ])
+    backend = SQLiteSearchBackend(engine)
+
+    first = backend.search("solar", 2)
+    rest = backend.search("solar", 10, after=(first[-1]["rank"], first[-1]["id"]))
+    assert len(first) == 2
+    assert {row["id"] for row in first}.isdisjoint(row["id"] for row in rest)
+    assert len(first) + len(rest) == 5
+
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "INSERT INTO ideas VALUES (9, 'user-1', 'Solar boats', 'x', 'y', 'z', 'published', '', '')"
+        )
+    assert 9 in [row["id"] for row in backend.search("boats", 10)]
+    assert backend.search("***", 10) == []
+
+
+def test_snippets_escape_idea_text():
+    engine = _engine_with_ideas([
+        (1, "Solar <img src=x onerror=alert(1)>", "Solar & \"wind\"", "x", "published"),
+    ])
+    backend = SQLiteSearchBackend(engine)
+
+    snippet = backend.search("solar", 10)[0]["snippet"]
+
+    assert "<img" not in snippet
+    assert "&lt;img src=x onerror=alert(1)&gt;" in snippet
+    assert snippet.count("<mark>") == snippet.count("</mark>") >= 1
+    assert snippet.replace("<mark>", "").replace("</mark>", "").count("<") == 0
@@ -0,0 +1,52 @@
+"""
+Unit tests for keyset pagination helpers
+"""
+import pytest
+
+from app.utils.pagination import decode_cursor, encode_cursor, keyset_filter, page_from_rows
+
+
+def test_cursor_round_trip():
+    cursor = encode_cursor("2024-05-01T10:00:00+00:00", 42)
+
+    assert "=" not in cursor
+    assert decode_cursor(cursor) == ("2024-05-01T10:00:00+00:00", "42")
+
+
+def test_invalid_cursor_raises_value_error():
+    with pytest.raises(ValueError):
+        decode_cursor("not-a-cursor")
+
+
+@pytest.mark.parametrize("values", [
+    ['2024-05-01",visibility.eq.private,id.gt."1', "42"],
+    ["2024-05-01T10:00:00+00:00", "42),visibility.eq.private"],
+    ["2024-05-01T10:00:00+00:00", "not-an-id"],
+])
+def test_cursor_values_are_checked_before_building_filters(values):
+    from app.utils.pagination import _encode
+
+    with pytest.raises(ValueError):
+        keyset_filter(_encode(values))
+
+
+def test_keyset_filter_selects_rows_before_cursor():
+    cursor = encode_cursor("2024-05-01T10:00:00+00:00", 42)
+
+    assert keyset_filter(None) is None
+    assert keyset_filter(cursor) == (
+        'created_at.lt."2024-05-01T10:00:00+00:00",'
+        'and(created_at.eq."2024-05-01T10:00:00+00:00",id.lt.42)'
+    )
+
+
+def test_page_from_rows_trims_extra_row():
+    rows = [{"id": i, "created_at": f"2024-05-0{9 - i}"} for i in range(4)]
+
+    page, next_cursor = page_from_rows(rows, 3)
+    assert page == rows[:3]
+    assert decode_cursor(next_cursor) == ("2024-05-07", "2")
+
+    page, next_cursor = page_from_rows(rows[:3], 3)
+    assert page == rows[:3]
+    assert next_cursor is None
@@ -0,0 +1,57 @@
+"""
+Unit tests for declarative column projections
+"""
+from app.utils.projection import Projection, Field, Const, as_str, or_zero
+from app.services.supabase_ideas import IDEA_CARD, IDEA_METRICS
+
+
+def test_columns_are_derived_once_and_deduplicated():
+    projection = Projection("sample", {
+        "id": Field("id", "", as_str),
+        "industry": Field("category", ""),
+        "category": Field("category", ""),
+        "stage": Const("idea"),
+    }, extra_columns=("created_at", "id"))
+
+    assert projection.columns == "id, category, created_at"
+
+
+def test_map_row_applies_defaults_and_converters():
+    projection = Projection("sample", {
+        "id": Field("id", "", as_str),
+        "views": Field("view_count", 0, or_zero),
+        "title": Field("title", "Untitled"),
+        "stage": Const("idea"),
+    })
+
+    assert projection.map_row({"id": 5, "view_count": None}) == {
+        "id": "5", "views": 0, "title": "Untitled", "stage": "idea",
+    }
+
+
+def test_mutable_defaults_are_not_shared_between_rows():
+    projection = Projection("sample", {"tags": Field("tags", [])})
+
+    first, second = projection.map([{}, {}])
+    first["tags"].append("x")
+
+    assert second["tags"] == []
+
+
+def test_non_empty_mutable_defaults_are_copied():
+    projection = Projection("sample", {
+        "tags": Field("tags", ["general"]),
+        "meta": Field("meta", {"source": "web"}),
+    })
+
+    first, second = projection.map([{}, {}])
+    first["tags"].append("x")
+    first["meta"]["source"] = "api"
+
+    assert second == {"tags": ["general"], "meta": {"source": "web"}}
+
+
+def test_list_projections_fetch_only_what_they_return():
+    assert "ai_metadata" not in IDEA_CARD.columns
+    assert IDEA_METRICS.columns == "id, title, view_count, interest_count, ai_score, status, created_at"
+    assert IDEA_METRICS.map_row({"id": 1, "title": "T", "view_count": 3})["views"] == 3
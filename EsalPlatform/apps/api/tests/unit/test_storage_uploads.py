@@ -0,0 +1,167 @@
+"""
+Unit tests for streaming uploads to storage
+"""
+import hashlib
+
+import httpx
+import pytest
+from fastapi import HTTPException
+
+from app.services.storage_uploads import StreamingUploader
+
+
+class _Bucket:
+    def __init__(self, objects, name):
+        self.objects = objects
+        self.name = name
+
+    def upload(self, path, data, file_options=None):
+        self.objects[(self.name, path)] = bytes(data)
+        return None
+
+    def remove(self, paths):
+        for path in paths:
+            self.objects.pop((self.name, path), None)
+
+
+class _Storage:
+    def __init__(self):
+        self.objects = {}
+
+    def from_(self, bucket):
+        return _Bucket(self.objects, bucket)
+
+
+class _FakeClient:
+    supabase_url = "https://project.supabase.co"
+    supabase_key = "service-key"
+
+    def __init__(self):
+        self.storage = _Storage()
+
+
+class _TusServer:
+    """Minimal TUS endpoint; can drop the connection mid-PATCH once"""
+
+    def __init__(self, fail_patch_at=None):
+        self.uploads = {}
+        self.requests = []
+        self.fail_patch_at = fail_patch_at
+
+    def __call__(self, request: httpx.Request) -> httpx.Response:
+        self.requests.append((request.method, request.url.path))
+        if request.method == "POST":
+            upload_id = f"u{len(self.uploads) + 1}"
+            self.uploads[upload_id] = bytearray()
+            return httpx.Response(201, headers={"Location": f"/storage/v1/upload/resumable/{upload_id}"})
+
+        upload_id = request.url.path.rsplit("/", 1)[-1]
+        data = self.uploads[upload_id]
+        if request.method == "HEAD":
+            return httpx.Response(200, headers={"Upload-Offset": str(len(data))})
+        if request.method == "DELETE":
+            del self.uploads[upload_id]
+            return httpx.Response(204)
+
+        assert int(request.headers["Upload-Offset"]) == len(data)
+        body = request.read()
+        if self.fail_patch_at is not None and len(self.uploads[upload_id]) + len(body) > self.fail_patch_at:
+            # Server keeps what arrived before the connection dropped
+            data.extend(body[:self.fail_patch_at - len(data)])
+            self.fail_patch_at = None
+            raise httpx.ReadError("connection reset", request=request)
+        data.extend(body)
+        return httpx.Response(204, headers={"Upload-Offset": str(len(data))})
+
+
+async def _chunks(data, size=1000):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+
+def _uploader(server=None, chunk_size=4096):
+    transport = httpx.MockTransport(server) if server else None
+    return StreamingUploader(_FakeClient(), chunk_size=chunk_size, retry_delay=0, transport=transport)
+
+
+@pytest.mark.asyncio
+async def test_small_upload_is_sent_in_one_request():
+    uploader = _uploader()
+    data = b"deck" * 100
+
+    stored = await uploader.upload("idea-files", "ideas/u1/a.pdf", _chunks(data), "application/pdf", max_bytes=10_000)
+
+    assert uploader.client.storage.objects[("idea-files", "ideas/u1/a.pdf")] == data
+    assert stored.size == len(data)
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+
+
+@pytest.mark.asyncio
+async def test_large_upload_uses_fixed_size_resumable_chunks():
+    server = _TusServer()
+    uploader = _uploader(server)
+    data = bytes(range(256)) * 40  # 10240 bytes -> 4096 + 4096 + 2048
+
+    stored = await uploader.upload("idea-files", "ideas/u1/v.mp4", _chunks(data), "video/mp4",
+                                   max_bytes=20_000, size_hint=len(data))
+
+    assert bytes(server.uploads["u1"]) == data
+    assert [method for method, _ in server.requests] == ["POST", "PATCH", "PATCH", "PATCH"]
+    assert stored.sha256 == hashlib.sha256(data).hexdigest()
+    assert uploader.client.storage.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_interrupted_chunk_resumes_from_server_offset():
+    server = _TusServer(fail_patch_at=5000)
+    uploader = _uploader(server)
+    data = b"x" * 10240
+
+    await uploader.upload("idea-files", "ideas/u1/v.mp4", _chunks(data), "video/mp4", max_bytes=20_000)
+
+    assert bytes(server.uploads["u1"]) == data
+    assert ("HEAD", "/storage/v1/upload/resumable/u1") in server.requests
+
+
+@pytest.mark.asyncio
+async def test_claimed_content_is_not_stored_again():
+    uploader = _uploader()
+    claims = []
+
+    async def claim(sha256, size):
+        claims.append((sha256, size))
+        return "ideas/u1/blobs/existing.pdf"
+
+    stored = await uploader.upload("idea-files", "ideas/u1/blobs/new.pdf", _chunks(b"deck"), "application/pdf",
+                                   max_bytes=10_000, claim=claim)
+
+    assert claims == [(hashlib.sha256(b"deck").hexdigest(), 4)]
+    assert (stored.path, stored.deduplicated) == ("ideas/u1/blobs/existing.pdf", True)
+    assert uploader.client.storage.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_oversized_upload_is_rejected_and_cleaned_up():
+    server = _TusServer()
+    uploader = _uploader(server)
+
+    with pytest.raises(HTTPException) as exc:
+        await uploader.upload("idea-files", "ideas/u1/big.bin", _chunks(b"x" * 12000), "application/octet-stream",
+                              max_bytes=9000)
+
+    assert exc.value.status_code == 413
+    assert server.uploads == {}
+    assert server.requests[-1][0] == "DELETE"
+
+
+@pytest.mark.asyncio
+async def test_declared_size_over_limit_is_rejected_before_reading():
+    uploader = _uploader()
+
+    async def never():
+        raise AssertionError("body should not be read")
+        yield b""
+
+    with pytest.raises(HTTPException) as exc:
+        await uploader.upload("avatars", "u1/a.png", never(), "image/png", max_bytes=100, size_hint=101)
+    assert exc.value.status_code == 413
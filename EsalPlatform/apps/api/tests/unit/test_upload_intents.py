@@ -0,0 +1,145 @@
+"""
+Unit tests for direct-to-storage upload intents, against a local storage stand-in
+"""
+import pytest
+from fastapi import HTTPException
+
+from app.services.upload_intents import UploadIntentService
+
+
+class _LocalBucket:
+    """The subset of the storage3 bucket API used by UploadIntentService"""
+
+    def __init__(self, storage, name):
+        self.storage = storage
+        self.name = name
+
+    def create_signed_upload_url(self, path):
+        token = f"tok-{len(self.storage.tokens) + 1}"
+        self.storage.tokens[token] = (self.name, path)
+        return {"signed_url": f"http://storage.local/upload/{self.name}/{path}?token={token}",
+                "token": token, "path": path}
+
+    def list(self, folder, options):
+        prefix = f"{folder}/" if folder else ""
+        return [
+            {"name": path[len(prefix):], "metadata": {"size": len(data), "mimetype": mimetype}}
+            for (bucket, path), (data, mimetype) in self.storage.objects.items()
+            if bucket == self.name and path.startswith(prefix) and path[len(prefix):].startswith(options["search"])
+        ][:options.get("limit", 100)]
+
+    def remove(self, paths):
+        for path in paths:
+            self.storage.objects.pop((self.name, path), None)
+
+    def create_signed_urls(self, paths, expires_in):
+        return [
+            {"path": path, "signedURL": f"http://storage.local/sign/{self.name}/{path}?exp={expires_in}", "error": None}
+            if (self.name, path) in self.storage.objects
+            else {"path": path, "signedURL": None, "error": "Either the object does not exist or you do not have access to it"}
+            for path in paths
+        ]
+
+
+class _LocalStorage:
+    def __init__(self):
+        self.objects = {}
+        self.tokens = {}
+
+    def from_(self, bucket):
+        return _LocalBucket(self, bucket)
+
+    def put_signed(self, token, data, mimetype):
+        """What a client's PUT to the signed upload URL does"""
+        bucket, path = self.tokens.pop(token)
+        self.objects[(bucket, path)] = (data, mimetype)
+
+
+class _Client:
+    def __init__(self):
+        self.storage = _LocalStorage()
+
+
+def _service(ttl_seconds=900):
+    return UploadIntentService(_Client(), secret="upload-intent-test-secret-0123456789", ttl_seconds=ttl_seconds)
+
+
+@pytest.mark.asyncio
+async def test_intent_upload_and_confirm_round_trip():
+    service = _service()
+
+    intent = await service.create_intent("user-1", "idea-files", "Deck.PDF", 2048, idea_id=4, description="Q3")
+    assert intent["path"].startswith("ideas/user-1/") and intent["path"].endswith(".pdf")
+    assert intent["content_type"] == "application/pdf"
+
+    service.client.storage.put_signed(intent["upload_token"], b"%" * 2048, "application/pdf")
+    upload = await service.confirm("user-1", intent["intent"])
+
+    assert upload.path == intent["path"]
+    assert (upload.size, upload.content_type) == (2048, "application/pdf")
+    assert (upload.filename, upload.idea_id, upload.description) == ("Deck.PDF", 4, "Q3")
+
+
+@pytest.mark.asyncio
+async def test_declared_upload_is_checked_against_policy():
+    service = _service()
+
+    with pytest.raises(HTTPException) as too_large:
+        await service.create_intent("user-1", "avatars", "me.png", 6 * 1024 * 1024)
+    with pytest.raises(HTTPException) as bad_type:
+        await service.create_intent("user-1", "avatars", "me.svg", 100, content_type="image/svg+xml")
+    with pytest.raises(HTTPException) as bad_bucket:
+        await service.create_intent("user-1", "secrets", "a.txt", 100)
+
+    assert too_large.value.status_code == 413
+    assert bad_type.value.status_code == 415
+    assert bad_bucket.value.status_code == 400
+    assert service.client.storage.tokens == {}
+
+
+@pytest.mark.asyncio
+async def test_stored_object_violating_policy_is_removed():
+    service = _service()
+    intent = await service.create_intent("user-1", "avatars", "me.png", 1000)
+
+    # The client lied about the size
+    service.client.storage.put_signed(intent["upload_token"], b"x" * (6 * 1024 * 1024), "image/png")
+    with pytest.raises(HTTPException) as exc:
+        await service.confirm("user-1", intent["intent"])
+
+    assert exc.value.status_code == 413
+    assert service.client.storage.objects == {}
+
+
+@pytest.mark.asyncio
+async def test_confirm_rejects_missing_foreign_and_expired_intents():
+    service = _service()
+    intent = await service.create_intent("user-1", "idea-files", "a.pdf", 10)
+
+    with pytest.raises(HTTPException) as missing:
+        await service.confirm("user-1", intent["intent"])
+    with pytest.raises(HTTPException) as foreign:
+        await service.confirm("user-2", intent["intent"])
+    with pytest.raises(HTTPException) as tampered:
+        await service.confirm("user-1", intent["intent"] + "x")
+
+    expired_service = _service(ttl_seconds=-1)
+    expired = await expired_service.create_intent("user-1", "idea-files", "a.pdf", 10)
+    with pytest.raises(HTTPException) as gone:
+        await expired_service.confirm("user-1", expired["intent"])
+
+    assert missing.value.status_code == 404
+    assert foreign.value.status_code == 403
+    assert tampered.value.status_code == 400
+    assert gone.value.status_code == 410
+
+
+@pytest.mark.asyncio
+async def test_download_urls_are_signed_in_one_batch():
+    service = _service()
+    service.client.storage.objects[("idea-files", "ideas/u/a.pdf")] = (b"a", "application/pdf")
+
+    urls = await service.signed_download_urls("idea-files", ["ideas/u/a.pdf", "ideas/u/gone.pdf"], 600)
+
+    assert urls["ideas/u/a.pdf"].endswith("exp=600")
+    assert urls["ideas/u/gone.pdf"] is None
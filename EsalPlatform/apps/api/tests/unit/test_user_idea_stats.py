@@ -0,0 +1,52 @@
+"""
+Unit tests for the per-user idea summary reads
+"""
+import pytest
+
+from app.services.supabase_ideas import SupabaseIdeasService
+from tests.fixtures.postgrest import FakeSupabase
+
+
+def _service(rows):
+    service = SupabaseIdeasService.__new__(SupabaseIdeasService)
+    service.supabase = FakeSupabase({"user_idea_stats": rows})
+    return service
+
+
+@pytest.mark.asyncio
+async def test_dashboard_stats_read_one_summary_row():
+    service = _service([{
+        "user_id": "u1", "total_ideas": 4, "active_ideas": 3,
+        "total_views": 120, "total_interests": 9,
+    }])
+
+    stats = await service.get_dashboard_stats("u1")
+
+    assert stats == {"total_ideas": 4, "active_ideas": 3, "total_views": 120, "total_interests": 9}
+    assert service.supabase.calls[0] == ("table", ("user_idea_stats",))
+    assert ("eq", ("user_id", "u1")) in service.supabase.calls
+
+
+@pytest.mark.asyncio
+async def test_ai_analytics_from_summary_row():
+    service = _service([{
+        "user_id": "u1", "total_ideas": 3, "ai_generated_ideas": 1, "ai_score_sum": 21.0,
+        "ai_score_count": 3, "ai_score_max": 8.5,
+        "score_0_3": 0, "score_3_5": 1, "score_5_7": 0, "score_7_8": 1, "score_8_10": 1,
+    }])
+
+    analytics = await service.get_ai_analytics("u1")
+
+    assert analytics["average_ai_score"] == 7.0
+    assert analytics["highest_ai_score"] == 8.5
+    assert analytics["ai_scored_ideas"] == 3
+    assert analytics["ai_score_distribution"] == {"0-3": 0, "3-5": 1, "5-7": 0, "7-8": 1, "8-10": 1}
+
+
+@pytest.mark.asyncio
+async def test_user_without_ideas_gets_empty_summary():
+    analytics = await _service([]).get_ai_analytics("u1")
+
+    assert analytics["total_ideas"] == 0
+    assert analytics["average_ai_score"] is None
+    assert analytics["ai_score_distribution"] == {}
@@ -0,0 +1,148 @@
+"""
+Unit tests for the verification code store
+"""
+import pytest
+
+from app.services.verification_codes import (
+    CONSUME_RPC, EXPIRED, INVALID, ISSUE_RPC, LOCKED, MISSING, VERIFIED, VerificationCodeStore
+)
+
+
+class _Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self):
+        return self.now
+
+
+class _Database:
+    """email_verifications with the migration's RPCs; counts round trips"""
+
+    def __init__(self, clock):
+        self.clock = clock
+        self.rows = {}
+        self.calls = []
+        self.purged = 0
+
+    def rpc(self, name, params):
+        self.calls.append(name)
+        self._pending = (name, params)
+        return self
+
+    def table(self, name):
+        self.calls.append("purge")
+        self._pending = ("purge", None)
+        return self
+
+    def delete(self):
+        return self
+
+    def lt(self, *args):
+        return self
+
+    def execute(self):
+        name, params = self._pending
+        data = None
+        if name == ISSUE_RPC:
+            self.rows[params["p_user_id"]] = {
+                "code": params["p_code"], "expires_at": self.clock() + params["p_ttl_seconds"],
+                "attempts": 0, "is_used": False,
+            }
+        elif name == CONSUME_RPC:
+            row = self.rows.get(params["p_user_id"])
+            if row is None or row["is_used"]:
+                data = MISSING
+            elif row["expires_at"] <= self.clock():
+                data = EXPIRED
+            elif row["attempts"] >= params["p_max_attempts"]:
+                data = LOCKED
+            elif row["code"] != params["p_code"]:
+                row["attempts"] += 1
+                data = INVALID
+            else:
+                row["is_used"] = True
+                data = VERIFIED
+        elif name == "purge":
+            expired = [user for user, row in self.rows.items() if row["expires_at"] <= self.clock()]
+            for user in expired:
+                del self.rows[user]
+            self.purged += len(expired)
+        return type("Result", (), {"data": data})()
+
+
+def _store(**kwargs):
+    clock = _Clock()
+    database = _Database(clock)
+    store = VerificationCodeStore(client_factory=lambda: database, ttl_seconds=600, **kwargs)
+    return store, database, clock
+
+
+def _wrong(code):
+    return "000000" if code != "000000" else "111111"
+
+
+@pytest.mark.asyncio
+async def test_issue_and_verify_take_one_round_trip_each():
+    store, database, _ = _store()
+
+    code = await store.issue("u1", "u1@example.com")
+    assert len(code) == 6 and code.isdigit()
+    assert database.calls == [ISSUE_RPC]
+
+    assert await store.verify("u1", code) == VERIFIED
+    assert database.calls == [ISSUE_RPC, CONSUME_RPC]
+    assert database.rows["u1"]["is_used"]
+    assert await store.verify("u1", code) == MISSING
+
+
+@pytest.mark.asyncio
+async def test_resend_on_another_worker_replaces_the_code_everywhere():
+    first, database, _ = _store()
+    second = VerificationCodeStore(client_factory=lambda: database, ttl_seconds=600)
+
+    old = await first.issue("u1", "u1@example.com")
+    newer = await second.issue("u1", "u1@example.com")
+
+    if old != newer:
+        assert await first.verify("u1", old) == INVALID
+    assert await first.verify("u1", newer) == VERIFIED
+
+
+@pytest.mark.asyncio
+async def test_lock_applies_on_every_worker():
+    first, database, _ = _store(max_attempts=3)
+    second = VerificationCodeStore(client_factory=lambda: database, ttl_seconds=600, max_attempts=3)
+    code = await first.issue("u1", "u1@example.com")
+
+    assert [await second.verify("u1", _wrong(code)) for _ in range(3)] == [INVALID] * 3
+    assert await first.verify("u1", code) == LOCKED
+
+    code = await first.issue("u1", "u1@example.com")
+    assert await second.verify("u1", code) == VERIFIED
+
+
+@pytest.mark.asyncio
+async def test_malformed_codes_are_rejected_without_a_round_trip():
+    store, database, _ = _store()
+    await store.issue("u1", "u1@example.com")
+
+    assert await store.verify("u1", "12345") == INVALID
+    assert await store.verify("u1", "12a456") == INVALID
+    assert database.calls == [ISSUE_RPC]
+    assert database.rows["u1"]["attempts"] == 0
+
+
+@pytest.mark.asyncio
+async def test_expired_codes_are_swept():
+    store, database, clock = _store()
+    code = await store.issue("u1", "u1@example.com")
+    clock.now += 300
+    await store.issue("u2", "u2@example.com")
+
+    clock.now += 301
+    assert await store.verify("u1", code) == EXPIRED
+    await store.sweep()
+
+    assert set(database.rows) == {"u2"} and database.purged == 1
+    assert await store.verify("u1", code) == MISSING